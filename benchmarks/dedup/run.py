@@ -0,0 +1,253 @@
+"""Micro-benchmark for near-duplicate detection over expertise entries.
+
+Builds one domain of N synthetic entries (default 5000) in which a
+fraction are lightly edited copies of earlier ones, then times:
+
+  * the governance duplicate rule — a first full cycle and an
+    incremental cycle after new entries arrive — with the MinHash/LSH
+    index (``GovernanceEngine._detect_duplicates``), against the old
+    all-pairs ``SequenceMatcher`` loop. The all-pairs time is measured
+    on the first ``--pairwise-sample`` rows and extrapolated to N;
+  * ``MemoryService.store`` dedup on that domain, against the old
+    linear ``SequenceMatcher`` scan over every active description
+    (``--legacy-iterations`` samples, each scan takes seconds);
+  * agreement: on the first ``--verify`` entries the LSH rule must
+    archive exactly what the all-pairs loop archives.
+
+Runs in-process against ``services/prism-service`` — no MCP service
+needed. Works in a scratch directory.
+
+Usage:
+    python benchmarks/dedup/run.py --entries 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+SERVICE_ROOT = REPO_ROOT / "services" / "prism-service"
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+THRESHOLD = 0.85
+
+
+@dataclass
+class Entry:
+    id: str
+    name: str
+    description: str
+    status: str = "active"
+
+
+def _vocabulary(seed: int = 3, size: int = 2000) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(string.ascii_lowercase)
+                    for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def _edit(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(max(1, len(chars) // 30)):
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def synthetic_entries(n: int, dup_rate: float = 0.05,
+                      seed: int = 7) -> list[Entry]:
+    """``n`` entries; about ``dup_rate`` of them edit an earlier one."""
+    rng = random.Random(seed)
+    words = _vocabulary()
+    out: list[Entry] = []
+    for i in range(n):
+        if out and rng.random() < dup_rate:
+            src = rng.choice(out)
+            out.append(Entry(f"mx-{i:06x}", src.name, _edit(rng, src.description)))
+            continue
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(8, 24)))
+        out.append(Entry(f"mx-{i:06x}", f"rule-{i}", text))
+    return out
+
+
+class FakeMemory:
+    """The slice of MemoryService the duplicate rule calls."""
+
+    def __init__(self, entries: list[Entry]) -> None:
+        self.entries = entries
+
+    def list_domains(self) -> list[str]:
+        return ["d0"]
+
+    def list_entries(self, domain: str, status_filter: str = "active") -> list:
+        return [e for e in self.entries if e.status == status_filter]
+
+    def update_entry(self, entry_id: str, **kwargs: object) -> None:
+        for e in self.entries:
+            if e.id == entry_id:
+                e.status = str(kwargs.get("status", e.status))
+
+
+def pairwise_archive(entries: list[Entry], rows: int | None = None) -> set[str]:
+    """The old governance loop (outer loop cut at ``rows`` if given)."""
+    archived: set[str] = set()
+    for i, a in enumerate(entries[:rows] if rows else entries):
+        if a.id in archived:
+            continue
+        text_a = f"{a.name} {a.description}"
+        for b in entries[i + 1:]:
+            if b.id in archived:
+                continue
+            if SequenceMatcher(None, text_a, f"{b.name} {b.description}"
+                               ).ratio() >= THRESHOLD:
+                archived.add(b.id)
+    return archived
+
+
+def legacy_store_scan(descriptions: list[str], wanted: str) -> int:
+    wanted = wanted.lower()
+    for i, d in enumerate(descriptions):
+        if SequenceMatcher(None, d.lower(), wanted).ratio() > THRESHOLD:
+            return i
+    return -1
+
+
+def _timed(fn: Callable[[int], Any], iterations: int) -> dict[str, Any]:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1,
+                                    int(len(samples) * 0.95))], 3),
+    }
+
+
+def _governance(entries: list[Entry]):
+    from app.services.governance import GovernanceEngine
+
+    memory = FakeMemory(entries)
+    return memory, GovernanceEngine(memory, None, None)
+
+
+def run(n_entries: int, new_entries: int, pairwise_sample: int,
+        verify: int, iterations: int,
+        legacy_iterations: int = 5) -> dict[str, Any]:
+    from app.services.memory_service import MemoryService
+
+    all_entries = synthetic_entries(n_entries + new_entries)
+    result: dict[str, Any] = {"entries": n_entries,
+                              "new_entries": new_entries}
+
+    # Governance rule, LSH: first cycle, then a cycle after new arrivals.
+    memory, gov = _governance(all_entries[:n_entries])
+    t0 = time.perf_counter()
+    archived_first = gov._detect_duplicates()
+    first_s = time.perf_counter() - t0
+    memory.entries.extend(all_entries[n_entries:])
+    t0 = time.perf_counter()
+    archived_incr = gov._detect_duplicates()
+    incr_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    gov._detect_duplicates()
+    idle_s = time.perf_counter() - t0
+
+    # Governance rule, all pairs: sample the outer loop, extrapolate.
+    baseline = synthetic_entries(n_entries)
+    rows = min(pairwise_sample, n_entries)
+    t0 = time.perf_counter()
+    pairwise_archive(baseline, rows)
+    sample_s = time.perf_counter() - t0
+    sampled_pairs = sum(n_entries - 1 - i for i in range(rows))
+    total_pairs = n_entries * (n_entries - 1) // 2
+    result["governance"] = {
+        "lsh_first_cycle_s": round(first_s, 3),
+        "lsh_incremental_cycle_ms": round(incr_s * 1000, 3),
+        "lsh_unchanged_cycle_ms": round(idle_s * 1000, 3),
+        "archived_first_cycle": archived_first,
+        "archived_incremental": archived_incr,
+        "pairwise_estimated_s": round(
+            sample_s / max(1, sampled_pairs) * total_pairs, 3),
+        "pairwise_sample_rows": rows,
+    }
+
+    # Agreement with the all-pairs loop on a prefix.
+    prefix = synthetic_entries(verify)
+    _, check = _governance(prefix)
+    check._detect_duplicates()
+    lsh_archived = {e.id for e in prefix if e.status != "active"}
+    exact_archived = pairwise_archive(synthetic_entries(verify))
+    result["agreement"] = {
+        "entries": verify,
+        "pairwise_archived": len(exact_archived),
+        "lsh_archived": len(lsh_archived),
+        "missed": len(exact_archived - lsh_archived),
+        "extra": len(lsh_archived - exact_archived),
+    }
+
+    # store() dedup over one big domain.
+    survivors = [e for e in all_entries[:n_entries] if e.status == "active"]
+    rng = random.Random(5)
+    words = _vocabulary()
+
+    def fresh(_: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(16))
+
+    descriptions = [e.description for e in survivors]
+    with tempfile.TemporaryDirectory(prefix="prism-dedup-bench-") as tmp:
+        svc = MemoryService(str(Path(tmp) / "mulch"), export_delay=3600,
+                            recall_flush_delay=3600)
+        for e in survivors:
+            svc.store("d0", e.name, e.description, "pattern", "tactical")
+        result["store"] = {
+            "legacy_scan": _timed(
+                lambda i: legacy_store_scan(descriptions, fresh(i)),
+                legacy_iterations),
+            "lsh": _timed(lambda i: svc.store(
+                "d0", f"bench-{i}", fresh(i), "pattern", "tactical"),
+                iterations),
+        }
+        svc.flush_export()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--new-entries", type=int, default=50)
+    parser.add_argument("--pairwise-sample", type=int, default=3)
+    parser.add_argument("--verify", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--legacy-iterations", type=int, default=5)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    result = run(max(2, args.entries), max(0, args.new_entries),
+                 max(1, args.pairwise_sample), max(2, args.verify),
+                 max(1, args.iterations), max(1, args.legacy_iterations))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,396 @@
+"""Micro-benchmark for PRISM graph.db traversals and entity search.
+
+Builds a synthetic code graph (N entities, ~E call edges with a
+power-law-ish fan-out) in a scratch graph.db, then times:
+
+  * the Brain graph API with the in-memory CSR adjacency cache against
+    the legacy per-hop SQL joins;
+  * ``_graph_search`` token matching via the ``entities_fts`` trigram
+    index against the legacy ``LIKE '%tok%'`` scans;
+  * ``GraphService._import_graph_json`` on a graph.json of the same
+    size: cold import, unchanged re-import and a re-import with ~1% of
+    nodes renamed/removed/added (``--churn``);
+  * with ``--memory-sizes``, peak RSS of importing graph.json files of
+    each size — streamed from disk vs ``json.loads`` of the whole file —
+    each in a fresh child process.
+
+Runs in-process against ``services/prism-service`` — no MCP service
+needed. Does not touch any real project data.
+
+Usage:
+    python benchmarks/graph/run.py --nodes 50000 --edges 500000
+    python benchmarks/graph/run.py --memory-sizes 20000,100000,400000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+SERVICE_ROOT = REPO_ROOT / "services" / "prism-service"
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+
+_WORDS = [
+    "parse", "render", "token", "session", "handler", "config", "index",
+    "query", "cache", "loader", "writer", "graph", "vector", "schema",
+    "client", "server", "request", "response", "stream", "buffer",
+]
+
+# Hybrid-search style queries: _graph_search keeps tokens longer than 3
+# chars and issues up to eight per query.
+_SEARCH_QUERIES = [
+    "how does the session handler refresh its cache",
+    "where is the graph schema loader configured",
+    "stream buffer writer flush behaviour",
+    "query vector index request response",
+]
+
+
+def synthetic_graph(
+    n_nodes: int, n_edges: int, seed: int = 7,
+) -> tuple[list[str], list[tuple[int, int, str]]]:
+    """Return (entity names, [(src, tgt, relation)]) with skewed in-degree.
+
+    Targets are drawn with a squared-uniform bias so a few "utility"
+    nodes collect most inbound edges, like real call graphs.
+    """
+    rng = random.Random(seed)
+    names = [f"{_WORDS[i % len(_WORDS)]}_{_WORDS[(i // 7) % len(_WORDS)]}_{i}"
+             for i in range(n_nodes)]
+    edges: set[tuple[int, int]] = set()
+    while len(edges) < n_edges:
+        src = rng.randrange(n_nodes)
+        tgt = int((rng.random() ** 2) * n_nodes)
+        if src != tgt:
+            edges.add((src, tgt))
+    return names, [(s, t, "calls") for s, t in edges]
+
+
+def seed_graph_db(brain: Any, names: list[str],
+                  edges: list[tuple[int, int, str]]) -> None:
+    conn = brain._graph
+    conn.executemany(
+        "INSERT INTO entities (id, name, kind, file, line) "
+        "VALUES (?, ?, 'function', ?, 1)",
+        [(i + 1, n, f"mod_{i % 997}.py") for i, n in enumerate(names)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO relationships (source_id, target_id, relation) "
+        "VALUES (?, ?, ?)",
+        [(s + 1, t + 1, rel) for s, t, rel in edges],
+    )
+    conn.commit()
+    brain.invalidate_graph_cache()
+
+
+def graph_json(names: list[str], edges: list[tuple[int, int, str]],
+               n_communities: int = 50) -> dict[str, Any]:
+    """Shape the synthetic graph like graphify's ``graph.json``."""
+    return {
+        "nodes": [
+            {"id": f"n{i}", "label": name, "source_file": f"mod_{i % 997}.py",
+             "source_location": f"L{i % 400 + 1}", "file_type": "code",
+             "community": i % n_communities}
+            for i, name in enumerate(names)
+        ],
+        "links": [
+            {"source": f"n{s}", "target": f"n{t}", "relation": rel,
+             "confidence": "EXTRACTED"}
+            for s, t, rel in edges
+        ],
+    }
+
+
+def churn(data: dict[str, Any], fraction: float, seed: int = 11) -> dict[str, Any]:
+    """Rename, drop and add ~``fraction`` of nodes each (plus their edges)."""
+    rng = random.Random(seed)
+    nodes = [dict(n) for n in data["nodes"]]
+    k = max(1, int(len(nodes) * fraction))
+    for node in rng.sample(nodes, k):
+        node["label"] += "_v2"
+    dropped = {n["id"] for n in rng.sample(nodes, k)}
+    nodes = [n for n in nodes if n["id"] not in dropped]
+    nodes += [{"id": f"new{i}", "label": f"added_{i}", "source_file": "new.py",
+               "file_type": "code", "community": 0} for i in range(k)]
+    links = [lk for lk in data["links"]
+             if lk["source"] not in dropped and lk["target"] not in dropped]
+    links += [{"source": f"new{i}", "target": nodes[i]["id"],
+               "relation": "calls"} for i in range(k)]
+    return {"nodes": nodes, "links": links}
+
+
+def run_import(data: dict[str, Any], fraction: float,
+               work_dir: Path) -> dict[str, Any]:
+    """Time cold, unchanged and churned imports into a fresh graph.db."""
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    Brain(
+        brain_db=str(work_dir / "import-brain.db"),
+        graph_db=str(work_dir / "import-graph.db"),
+        scores_db=str(work_dir / "import-scores.db"),
+    )
+    svc = GraphService(project_data_dir=str(work_dir / "import-proj"),
+                       graph_db_path=str(work_dir / "import-graph.db"))
+
+    def once(payload: dict[str, Any]) -> dict[str, Any]:
+        t0 = time.perf_counter()
+        res = svc._import_graph_json(
+            payload, {"imported_entities": 0, "imported_relationships": 0},
+        )
+        return {
+            "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "timings_ms": res.get("timings_ms"),
+            "entities_diff": res.get("entities_diff"),
+            "relationships_diff": res.get("relationships_diff"),
+        }
+
+    return {
+        "cold": once(data),
+        "unchanged": once(data),
+        "churn": once(churn(data, fraction)),
+        "churn_fraction": fraction,
+    }
+
+
+def write_graph_json(path: Path, n_nodes: int, n_edges: int) -> int:
+    """Write a synthetic graph.json of the given size; returns its bytes."""
+    from app.services.graph_json import GraphJsonWriter
+
+    names, edges = synthetic_graph(n_nodes, n_edges)
+    data = graph_json(names, edges)
+    del names, edges
+    with GraphJsonWriter(path) as writer:
+        writer.member("directed", True)
+        writer.member("multigraph", False)
+        writer.member("graph", {})
+        writer.begin_array("nodes")
+        for node in data["nodes"]:
+            writer.append(node)
+        writer.begin_array("links")
+        for link in data["links"]:
+            writer.append(link)
+    return path.stat().st_size
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM resets on exec; ru_maxrss on Linux survives it and would
+    # report the parent's peak from building the synthetic graph.
+    try:
+        with open("/proc/self/status", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def import_child(path: Path, mode: str, work_dir: Path) -> dict[str, Any]:
+    """Import ``path`` into a fresh graph.db in this process and report
+    peak RSS. ``mode`` is ``stream`` or ``loads`` (whole-file parse)."""
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    Brain(
+        brain_db=str(work_dir / "brain.db"),
+        graph_db=str(work_dir / "graph.db"),
+        scores_db=str(work_dir / "scores.db"),
+    )
+    svc = GraphService(project_data_dir=str(work_dir / "proj"),
+                       graph_db_path=str(work_dir / "graph.db"))
+    baseline = _peak_rss_mb()
+    t0 = time.perf_counter()
+    source: Any = path
+    if mode == "loads":
+        source = json.loads(path.read_text(encoding="utf-8"))
+    svc._import_graph_json(
+        source, {"imported_entities": 0, "imported_relationships": 0},
+    )
+    return {
+        "mode": mode,
+        "import_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_memory(sizes: list[int], edges_per_node: int,
+               work_dir: Path) -> list[dict[str, Any]]:
+    """Peak RSS of graph.json import by size, one child process per run."""
+    rows = []
+    for n_nodes in sizes:
+        size_dir = work_dir / f"mem-{n_nodes}"
+        size_dir.mkdir(parents=True, exist_ok=True)
+        path = size_dir / "graph.json"
+        n_edges = n_nodes * edges_per_node
+        row: dict[str, Any] = {
+            "nodes": n_nodes, "edges": n_edges,
+            "graph_json_mb": round(write_graph_json(path, n_nodes, n_edges)
+                                   / 2**20, 1),
+        }
+        for mode in ("stream", "loads"):
+            mode_dir = size_dir / mode
+            mode_dir.mkdir(exist_ok=True)
+            proc = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()),
+                 "--import-child", str(path), "--mode", mode,
+                 "--work-dir", str(mode_dir)],
+                capture_output=True, text=True, check=True,
+            )
+            row[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+        rows.append(row)
+    return rows
+
+
+def _bench(fn, iterations: int) -> dict[str, Any]:
+    samples: list[float] = []
+    last: Any = None
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        last = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "result_count": len(last) if hasattr(last, "__len__") else None,
+    }
+
+
+def run_traversals(brain: Any, probes: list[str], depth: int,
+                   limit: int, iterations: int) -> dict[str, Any]:
+    """Time the graph API for every probe entity on the current path."""
+    def each(fn):
+        return lambda: [r for p in probes for r in fn(p)]
+    return {
+        "call_chain": _bench(
+            each(lambda p: brain.call_chain(p, depth=depth, limit=limit)),
+            iterations),
+        "find_references": _bench(
+            each(lambda p: brain.find_references(p, limit=limit)),
+            iterations),
+        "graph_query": _bench(
+            each(lambda p: brain.graph_query(p, limit=limit)), iterations),
+    }
+
+
+def run(n_nodes: int, n_edges: int, depth: int, limit: int,
+        iterations: int, work_dir: Path,
+        churn_fraction: float = 0.01) -> dict[str, Any]:
+    from app.engines.brain_engine import Brain
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    brain = Brain(
+        brain_db=str(work_dir / "brain.db"),
+        graph_db=str(work_dir / "graph.db"),
+        scores_db=str(work_dir / "scores.db"),
+    )
+    names, edges = synthetic_graph(n_nodes, n_edges)
+    t0 = time.perf_counter()
+    seed_graph_db(brain, names, edges)
+    seed_ms = (time.perf_counter() - t0) * 1000
+
+    probes = names[:: max(1, n_nodes // 10)][:10]
+
+    t0 = time.perf_counter()
+    brain._graph_adjacency()
+    load_ms = (time.perf_counter() - t0) * 1000
+    csr = run_traversals(brain, probes, depth, limit, iterations)
+    csr_paths = _bench(
+        lambda: [brain.shortest_path(probes[0], p) for p in probes[1:]],
+        iterations,
+    )
+
+    search_fts = _bench(
+        lambda: [r for q in _SEARCH_QUERIES for r in brain._graph_search(q, 20)],
+        iterations,
+    )
+    fts_enabled = bool(brain._entity_fts)
+
+    brain._graph_adjacency = lambda: None  # type: ignore[method-assign]
+    sql = run_traversals(brain, probes, depth, limit, iterations)
+    brain._entity_fts = False
+    search_like = _bench(
+        lambda: [r for q in _SEARCH_QUERIES for r in brain._graph_search(q, 20)],
+        iterations,
+    )
+
+    graph_import = run_import(graph_json(names, edges), churn_fraction,
+                              work_dir)
+
+    return {
+        "nodes": n_nodes,
+        "edges": len(edges),
+        "depth": depth,
+        "limit": limit,
+        "probes": len(probes),
+        "seed_ms": round(seed_ms, 1),
+        "csr_load_ms": round(load_ms, 1),
+        "csr": csr,
+        "csr_shortest_path": csr_paths,
+        "sql": sql,
+        "entity_fts_enabled": fts_enabled,
+        "graph_search_fts": search_fts,
+        "graph_search_like": search_like,
+        "graph_json_import": graph_import,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nodes", type=int, default=20_000)
+    ap.add_argument("--edges", type=int, default=200_000)
+    ap.add_argument("--depth", type=int, default=4)
+    ap.add_argument("--limit", type=int, default=500)
+    ap.add_argument("--iterations", type=int, default=5)
+    ap.add_argument("--churn", type=float, default=0.01,
+                    help="fraction of nodes changed for the re-import run")
+    ap.add_argument("--memory-sizes", default="",
+                    help="comma-separated node counts for the peak-RSS "
+                         "import benchmark (skips the latency runs)")
+    ap.add_argument("--edges-per-node", type=int, default=3)
+    ap.add_argument("--output", type=Path)
+    ap.add_argument("--import-child", type=Path, help=argparse.SUPPRESS)
+    ap.add_argument("--mode", default="stream", help=argparse.SUPPRESS)
+    ap.add_argument("--work-dir", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.import_child:
+        print(json.dumps(import_child(args.import_child, args.mode,
+                                      args.work_dir)))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="prism-graph-bench-") as tmp:
+        if args.memory_sizes:
+            sizes = [int(x) for x in args.memory_sizes.split(",") if x.strip()]
+            result: Any = {"import_peak_memory": run_memory(
+                sizes, args.edges_per_node, Path(tmp))}
+        else:
+            result = run(args.nodes, args.edges, args.depth, args.limit,
+                         max(1, args.iterations), Path(tmp), args.churn)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""Micro-benchmark for the PRISM expertise store (MemoryService).
+
+Seeds N synthetic expertise entries spread over D domains as mulch
+``{domain}.jsonl`` files, then times, for the SQLite-backed
+``MemoryService`` and for a faithful copy of the old JSONL-as-store
+logic (read and rewrite the whole domain file per store and per
+recalled entry):
+
+  * the one-shot JSONL import when memory.db is first opened;
+  * ``store`` of a new entry (dedup scan included), median and p95;
+  * ``recall`` of five entries from one domain (keyword path, stats
+    update included), median and p95;
+  * ``get_entry`` by id, served from the in-memory index (SQLite only);
+  * the write-behind recall-stats flush and JSONL export of the touched
+    domains.
+
+Runs in-process against ``services/prism-service`` — no MCP service
+needed. Works in a scratch directory.
+
+Usage:
+    python benchmarks/memory/run.py --entries 10000 --domains 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+SERVICE_ROOT = REPO_ROOT / "services" / "prism-service"
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+
+_WORDS = [
+    "cache", "retry", "timeout", "schema", "migration", "cursor", "token",
+    "session", "index", "queue", "worker", "batch", "lock", "commit",
+    "graph", "vector", "parser", "render", "config", "deploy", "rollback",
+    "header", "payload", "stream", "buffer", "client", "server", "hook",
+]
+
+_QUERIES = [
+    "retry timeout queue", "schema migration rollback", "cursor token session",
+    "graph vector index", "stream buffer payload", "deploy config hook",
+]
+
+
+def synthetic_entries(n: int, domains: int, seed: int = 7) -> list[dict]:
+    """Entries with distinct names and low pairwise description overlap."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        words = rng.sample(_WORDS, 6)
+        out.append({
+            "id": f"mx-{i:06x}",
+            "type": rng.choice(["pattern", "convention", "failure", "decision"]),
+            "name": f"{words[0]}-{words[1]}-{i}",
+            "description": f"{' '.join(words)} rule {i} "
+                           f"{rng.getrandbits(48):012x}",
+            "classification": "tactical",
+            "domain": f"d{i % domains}",
+            "status": "active",
+            "importance": rng.randint(1, 10),
+            "recorded_at": "2026-01-01T00:00:00+00:00",
+        })
+    return out
+
+
+def write_jsonl(expertise_dir: Path, entries: list[dict]) -> None:
+    expertise_dir.mkdir(parents=True, exist_ok=True)
+    by_domain: dict[str, list[str]] = {}
+    for e in entries:
+        by_domain.setdefault(e["domain"], []).append(json.dumps(e))
+    for domain, lines in by_domain.items():
+        (expertise_dir / f"{domain}.jsonl").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8")
+
+
+class LegacyJsonlStore:
+    """The pre-SQLite MemoryService write and recall paths, trimmed to
+    what the timings exercise."""
+
+    def __init__(self, expertise_dir: Path) -> None:
+        self._dir = expertise_dir
+
+    def _read(self, domain: str) -> list[dict]:
+        path = self._dir / f"{domain}.jsonl"
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in
+                path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def _write(self, domain: str, entries: list[dict]) -> None:
+        lines = [json.dumps(e) for e in entries]
+        (self._dir / f"{domain}.jsonl").write_text(
+            "\n".join(lines) + "\n" if lines else "", encoding="utf-8")
+
+    def store(self, domain: str, name: str, description: str) -> dict:
+        now = datetime.now(timezone.utc).isoformat()
+        entries = self._read(domain)
+        superseded = next((e for e in entries if e.get("status") == "active"
+                           and not e.get("invalid_at")
+                           and e.get("name") == name), None)
+        if superseded is None:
+            for e in entries:
+                if e.get("status") != "active" or e.get("invalid_at"):
+                    continue
+                if SequenceMatcher(None, e.get("description", "").lower(),
+                                   description.lower()).ratio() > 0.85:
+                    superseded = e
+                    break
+        if superseded is not None:
+            superseded["invalid_at"] = now
+            superseded["status"] = "archived"
+        entry = {"id": f"mx-new{len(entries)}", "name": name,
+                 "description": description, "domain": domain,
+                 "status": "active", "recorded_at": now, "valid_at": now}
+        entries.append(entry)
+        self._write(domain, entries)
+        return entry
+
+    def recall(self, query: str, domain: str, limit: int = 5) -> list[dict]:
+        words = set(query.lower().split())
+        scored = []
+        for e in self._read(domain):
+            if e.get("status") != "active":
+                continue
+            text = set(f"{e['name'].replace('-', ' ')} "
+                       f"{e['description']}".lower().split())
+            score = len(words & text)
+            if score:
+                scored.append((score, e))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        hits = [e for _, e in scored[:limit * 2]][:limit]
+        now = datetime.now(timezone.utc).isoformat()
+        for hit in hits:  # one full read + rewrite per recalled entry
+            entries = self._read(domain)
+            for e in entries:
+                if e["id"] == hit["id"]:
+                    e["recall_count"] = e.get("recall_count", 0) + 1
+                    e["last_recalled"] = now
+                    break
+            self._write(domain, entries)
+        return hits
+
+
+def _timed(fn: Callable[[int], Any], iterations: int) -> dict[str, Any]:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1,
+                                    int(len(samples) * 0.95))], 3),
+    }
+
+
+def run(n_entries: int, n_domains: int, iterations: int) -> dict[str, Any]:
+    from app.services.memory_service import MemoryService
+
+    entries = synthetic_entries(n_entries, n_domains)
+    rng = random.Random(3)
+
+    def new_text(i: int) -> tuple[str, str, str]:
+        words = rng.sample(_WORDS, 6)
+        return (f"d{i % n_domains}", f"bench-{i}",
+                f"{' '.join(words)} fresh {rng.getrandbits(64):016x}")
+
+    result: dict[str, Any] = {"entries": n_entries, "domains": n_domains,
+                              "iterations": iterations}
+    with tempfile.TemporaryDirectory(prefix="prism-memory-bench-") as tmp:
+        legacy_dir = Path(tmp) / "legacy" / "expertise"
+        write_jsonl(legacy_dir, entries)
+        legacy = LegacyJsonlStore(legacy_dir)
+        result["legacy_jsonl"] = {
+            "store": _timed(lambda i: legacy.store(*new_text(i)), iterations),
+            "recall": _timed(lambda i: legacy.recall(
+                _QUERIES[i % len(_QUERIES)], f"d{i % n_domains}"), iterations),
+        }
+
+        mulch = Path(tmp) / "sqlite"
+        write_jsonl(mulch / "expertise", entries)
+        t0 = time.perf_counter()
+        svc = MemoryService(str(mulch), export_delay=3600)
+        import_ms = (time.perf_counter() - t0) * 1000
+        sqlite_result = {
+            "import_ms": round(import_ms, 3),
+            "store": _timed(lambda i: svc.store(
+                *new_text(i), type="pattern", classification="tactical"),
+                iterations),
+            "recall": _timed(lambda i: svc.recall(
+                _QUERIES[i % len(_QUERIES)], domain=f"d{i % n_domains}"),
+                iterations),
+            "get_entry": _timed(lambda i: svc.get_entry(
+                f"mx-{(i * 7919) % n_entries:06x}"), iterations),
+        }
+        t0 = time.perf_counter()
+        svc.flush_recalls()
+        svc.flush_export()
+        sqlite_result["export_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        sqlite_result["stored_entries"] = sum(
+            s["total"] for s in svc.domain_stats().values())
+        result["sqlite"] = sqlite_result
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000)
+    parser.add_argument("--domains", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    result = run(args.entries, max(1, args.domains), max(1, args.iterations))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+"""Micro-benchmark for LL-06 similar-task lookup at 50k tasks.
+
+Seeds N synthetic tasks (default 50,000) with clustered float32
+embeddings (default 384 dimensions, MiniLM's width) and times the
+top-20 neighbour query behind ``Brain.best_prompt(similar_to_task_id=...)``:
+
+  * ``legacy`` — a faithful copy of the old ``_similar_task_ids``:
+    decode every BLOB with ``np.frombuffer(...).tolist()`` and compute
+    cosines in Python (``--legacy-iterations`` samples, each takes
+    seconds);
+  * ``cold`` — the first query against a fresh ``TaskVectors`` cache
+    (loads and normalizes the matrix);
+  * ``warm`` — later queries, one matrix-vector product and an
+    ``argpartition``;
+  * ``store`` — ``TaskService._store_embedding``, which now also patches
+    the cached matrix, followed by a query that must not reload.
+
+Neighbour ids and cosines are checked against the legacy loop. Runs
+in-process against ``services/prism-service`` — no MCP service needed.
+Works in a scratch directory.
+
+Usage:
+    python benchmarks/similarity/run.py --tasks 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+SERVICE_ROOT = REPO_ROOT / "services" / "prism-service"
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+K = 20
+
+
+def synthetic_embeddings(n: int, dim: int, clusters: int = 50,
+                         seed: int = 11):
+    """``n`` float32 vectors scattered around ``clusters`` centres."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, n)
+    noise = rng.standard_normal((n, dim)).astype(np.float32) * 0.6
+    return centres[labels] + noise
+
+
+def seed(svc, vectors) -> list[str]:
+    ids = [f"t{i:06d}" for i in range(len(vectors))]
+    svc._db.executemany(
+        "INSERT INTO tasks (id, title, created_at, embedding) "
+        "VALUES (?, ?, '2025-01-01T00:00:00+00:00', ?)",
+        [(tid, f"task {tid}", v.tobytes()) for tid, v in zip(ids, vectors)],
+    )
+    svc._db.commit()
+    return ids
+
+
+def legacy_similar(conn: sqlite3.Connection, query_id: str,
+                   k: int = K) -> list[tuple[str, float]]:
+    """The old pure-Python ``_similar_task_ids``."""
+    import numpy as np
+
+    def decode(blob):
+        return np.frombuffer(blob, dtype=np.float32).tolist() if blob else None
+
+    row = conn.execute("SELECT embedding FROM tasks WHERE id=?",
+                       (query_id,)).fetchone()
+    q_vec = decode(row[0]) if row else None
+    if not q_vec:
+        return []
+    q_norm = math.sqrt(sum(x * x for x in q_vec)) or 1.0
+    out = []
+    for tid, blob in conn.execute(
+        "SELECT id, embedding FROM tasks WHERE id != ? AND embedding IS NOT NULL",
+        (query_id,),
+    ).fetchall():
+        v = decode(blob)
+        if not v or len(v) != len(q_vec):
+            continue
+        dot = sum(a * b for a, b in zip(q_vec, v))
+        n = math.sqrt(sum(x * x for x in v)) or 1.0
+        out.append((tid, dot / (q_norm * n)))
+    out.sort(key=lambda t: t[1], reverse=True)
+    return out[:k]
+
+
+def _timed(fn: Callable[[int], Any], iterations: int) -> dict[str, Any]:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1,
+                                    int(len(samples) * 0.95))], 3),
+    }
+
+
+def run(n_tasks: int, dim: int, iterations: int,
+        legacy_iterations: int = 2, verify: int = 3) -> dict[str, Any]:
+    from app.engines.brain_engine import _similar_task_ids
+    from app.engines.task_vectors import TaskVectors, task_vectors_for
+    from app.services.task_service import TaskService
+
+    vectors = synthetic_embeddings(n_tasks + iterations, dim)
+    extra = vectors[n_tasks:]
+    result: dict[str, Any] = {"tasks": n_tasks, "dim": dim, "k": K}
+    with tempfile.TemporaryDirectory(prefix="prism-similar-bench-") as tmp:
+        path = str(Path(tmp) / "tasks.db")
+        svc = TaskService(path)
+        ids = seed(svc, vectors[:n_tasks])
+        conn = sqlite3.connect(path)
+        cache = task_vectors_for(path)
+        step = max(1, n_tasks // max(1, iterations))
+        queries = [ids[(i * step) % n_tasks] for i in range(iterations)]
+
+        def cold(i: int) -> None:
+            _similar_task_ids(conn, queries[i], K, TaskVectors())
+
+        result["cold"] = _timed(cold, min(3, iterations))
+        _similar_task_ids(conn, queries[0], K, cache)
+
+        # Same neighbours, same cosines, as the loop being replaced.
+        agree = True
+        for q in queries[:verify]:
+            want = legacy_similar(conn, q)
+            got = _similar_task_ids(conn, q, K, cache)
+            agree &= [t for t, _ in got] == [t for t, _ in want]
+            agree &= all(abs(a - b) < 1e-4
+                         for (_, a), (_, b) in zip(got, want))
+        result["agreement"] = agree
+
+        result["legacy"] = _timed(
+            lambda i: legacy_similar(conn, queries[i % iterations]),
+            legacy_iterations)
+        result["warm"] = _timed(
+            lambda i: _similar_task_ids(conn, queries[i], K, cache),
+            iterations)
+
+        gen = cache._gen
+
+        def store(i: int) -> None:
+            svc._embed_fn = lambda text: extra[i].tobytes()
+            svc._store_embedding(ids[i], "t", "")
+            _similar_task_ids(conn, ids[i], K, cache)
+
+        result["store"] = _timed(store, iterations)
+        result["store_reloads"] = int(cache._gen != gen + iterations)
+        svc._writer.flush()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--legacy-iterations", type=int, default=2)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    result = run(max(2, args.tasks), max(1, args.dim),
+                 max(1, args.iterations), max(1, args.legacy_iterations))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
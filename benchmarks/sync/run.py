@@ -7,19 +7,33 @@ eligible files, then hash only files whose metadata changed).
 This does not mutate the working tree. It is intended to validate whether
 incremental-indexing work should start with a file metadata cache, a Merkle
 tree, or neither.
+
+With ``--protocol-files N`` it also compares the two prism_status drift
+protocols on a synthetic N-file manifest in a scratch brain.db: the flat
+``{path: sha256}`` map against the directory Merkle descent the
+SessionStart hook now uses. Reported per scenario (no-op, a few changed
+files): round trips, request/response bytes on the wire and end-to-end
+latency, including the server's sync_status work.
 """
 
 from __future__ import annotations
 
 import argparse
 import hashlib
+import importlib.util
 import json
+import random
 import statistics
 import subprocess
+import sys
+import tempfile
 import time
 from pathlib import Path
 from typing import Any
 
+BENCH_DIR = Path(__file__).resolve().parent
+SERVICE_ROOT = BENCH_DIR.parent.parent / "services" / "prism-service"
+
 SOURCE_EXTS = {
     ".py", ".ts", ".tsx", ".js", ".jsx", ".cs", ".go", ".rs",
     ".java", ".rb", ".php", ".cpp", ".c", ".h", ".hpp",
@@ -185,17 +199,147 @@ def run(root: Path, iterations: int) -> dict[str, Any]:
             lambda: scan_with_metadata_cache(root, files, fake_delta_cache),
             iterations,
         ),
+        "hook_collect": run_hook_collect(root, largest, iterations),
     }
 
 
+def run_hook_collect(root: Path, touched: str,
+                     iterations: int) -> dict[str, Any]:
+    """Time the shipped hook's ``_collect`` with its .prism/sync-cache.
+
+    The cache is redirected to a scratch file so the working tree is
+    left alone. ``one_stat_change`` rewinds one cached mtime, which is
+    what a touch or checkout looks like to the hook; in a git checkout
+    that file is covered by its index blob id without being read.
+    """
+    hook = _load_hook()
+    with tempfile.TemporaryDirectory(prefix="prism-sync-cache-") as tmp:
+        cache_path = Path(tmp) / "sync-cache"
+        hook.CACHE_REL = str(cache_path)  # root / absolute -> absolute
+        workers = hook.HASH_WORKERS
+
+        def cold(n_workers: int):
+            hook.HASH_WORKERS = n_workers
+            cache_path.unlink(missing_ok=True)
+            return hook._collect(root)
+
+        out = {
+            "hash_workers": workers,
+            "cold_serial": _bench(lambda: cold(1), iterations),
+            "cold_pool": _bench(lambda: cold(workers), iterations),
+            "warm_noop": _bench(lambda: hook._collect(root), iterations),
+        }
+        warm = cache_path.read_text(encoding="utf-8")
+
+        def one_stat_change():
+            data = json.loads(warm)
+            if touched in data["files"]:
+                data["files"][touched][1] -= 1
+            cache_path.write_text(json.dumps(data), encoding="utf-8")
+            return hook._collect(root)
+
+        out["one_stat_change"] = _bench(one_stat_change, iterations)
+    return out
+
+
+def synthetic_manifest(n_files: int, seed: int = 11) -> dict[str, str]:
+    """``{path: sha256}`` spread over a monorepo-ish directory tree."""
+    rng = random.Random(seed)
+    out: dict[str, str] = {}
+    for i in range(n_files):
+        depth = rng.choice((2, 3, 3, 4, 4))
+        parts = [f"svc{rng.randrange(12)}"]
+        parts += [f"d{rng.randrange(8)}" for _ in range(depth - 1)]
+        path = "/".join(parts + [f"mod_{i}.py"])
+        out[path] = hashlib.sha256(path.encode()).hexdigest()
+    return out
+
+
+def _load_hook():
+    path = SERVICE_ROOT / "app" / "assets" / "sync_hook.py"
+    spec = importlib.util.spec_from_file_location("prism_sync_hook", path)
+    assert spec is not None and spec.loader is not None
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def run_protocols(n_files: int, changed: int = 5,
+                  iterations: int = 5) -> dict[str, Any]:
+    """Flat map vs Merkle descent against GraphService.sync_status."""
+    if str(SERVICE_ROOT) not in sys.path:
+        sys.path.insert(0, str(SERVICE_ROOT))
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    hook = _load_hook()
+    server_side = synthetic_manifest(n_files)
+    client_delta = dict(server_side)
+    for path in sorted(server_side)[:: max(1, n_files // max(1, changed))][:changed]:
+        client_delta[path] = hashlib.sha256(b"edited" + path.encode()).hexdigest()
+
+    with tempfile.TemporaryDirectory(prefix="prism-sync-bench-") as tmp:
+        tmp_path = Path(tmp)
+        brain_db = str(tmp_path / "brain.db")
+        Brain(brain_db=brain_db, graph_db=str(tmp_path / "graph.db"),
+              scores_db=str(tmp_path / "scores.db"))
+        conn = Brain._connect(brain_db)
+        conn.executemany(
+            "INSERT INTO file_manifest (source_file, file_sha256, chunk_count) "
+            "VALUES (?, ?, 1)", server_side.items(),
+        )
+        conn.commit()
+        conn.close()
+        svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                           graph_db_path=str(tmp_path / "graph.db"))
+
+        def measure(fn) -> dict[str, Any]:
+            samples: list[float] = []
+            for _ in range(iterations):
+                wire = {"rounds": 0, "request_bytes": 0, "response_bytes": 0}
+
+                def call(args: dict) -> dict:
+                    body = json.dumps(args)
+                    wire["rounds"] += 1
+                    wire["request_bytes"] += len(body)
+                    resp = json.dumps(svc.sync_status(brain_db, **json.loads(body)))
+                    wire["response_bytes"] += len(resp)
+                    return json.loads(resp)
+
+                t0 = time.perf_counter()
+                drifted = fn(call)
+                samples.append((time.perf_counter() - t0) * 1000)
+            return {**wire, "drifted": len(drifted),
+                    "median_ms": round(statistics.median(samples), 2)}
+
+        # Warm the server's cached tree once, as a live service would be.
+        svc.sync_status(brain_db, tree={"": ""})
+        result: dict[str, Any] = {"files": n_files, "changed_files": changed}
+        for label, hashes in (("noop", server_side), ("delta", client_delta)):
+            result[label] = {
+                "flat": measure(lambda call: hook._flat_drift(call, hashes)),
+                "merkle": measure(lambda call: hook._tree_drift(call, hashes)),
+            }
+    return result
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--root", type=Path, default=Path.cwd())
     parser.add_argument("--iterations", type=int, default=7)
     parser.add_argument("--output", type=Path)
+    parser.add_argument("--protocol-files", type=int, default=0,
+                        help="also compare flat vs Merkle prism_status on "
+                             "a synthetic manifest of this many files")
+    parser.add_argument("--protocol-changed", type=int, default=5)
     args = parser.parse_args()
 
     result = run(args.root, max(1, args.iterations))
+    if args.protocol_files:
+        result["status_protocol"] = run_protocols(
+            args.protocol_files, args.protocol_changed,
+            max(1, min(args.iterations, 5)),
+        )
     text = json.dumps(result, indent=2)
     print(text)
     if args.output:
@@ -0,0 +1,231 @@
+"""Micro-benchmark for task queries (TaskService) at 100k tasks.
+
+Seeds N synthetic tasks (default 100,000) with dependencies on earlier
+tasks and tags from a small pool, then times, for ``TaskService`` over
+its ``task_deps`` / ``task_tags`` tables and for a faithful copy of the
+old Python filters (load rows, JSON-decode, filter):
+
+  * ``next_task`` — first pending task whose dependencies are all done;
+  * ``list(tag=...)``;
+  * one ``task_list`` page, at the start and deep into the list
+    (keyset ``list_page`` vs loading the full list and slicing);
+  * the follow-up-fix scan of the quality loop (windowed ``list`` vs
+    ``list()`` of every task).
+
+Each pair's answers are checked for equality. Runs in-process against
+``services/prism-service`` — no MCP service needed. Works in a scratch
+directory.
+
+Usage:
+    python benchmarks/tasks/run.py --tasks 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+SERVICE_ROOT = REPO_ROOT / "services" / "prism-service"
+
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
+
+_TAGS = [f"tag{i}" for i in range(20)]
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_tasks(n: int, seed: int = 7) -> list[dict]:
+    """Mostly done history, a pending tail, some blocked on open work."""
+    rng = random.Random(seed)
+    out: list[dict] = []
+    for i in range(n):
+        # Older tasks are mostly done; the newest tenth is mostly open.
+        if i < n * 0.9:
+            status = rng.choices(["done", "blocked", "pending"],
+                                 [0.9, 0.05, 0.05])[0]
+        else:
+            status = rng.choices(["pending", "in_progress", "done"],
+                                 [0.7, 0.2, 0.1])[0]
+        deps = [f"t{rng.randrange(i):06d}" for _ in range(rng.randint(0, 3))
+                if i]
+        out.append({
+            "id": f"t{i:06d}",
+            "title": f"task {i} touching src/mod{i % 500}.py",
+            "status": status,
+            "priority": rng.randint(0, 5),
+            "created_at": (_EPOCH + timedelta(minutes=7 * i)).isoformat(),
+            "dependencies": sorted(set(deps)),
+            "tags": rng.sample(_TAGS, rng.randint(0, 3)),
+        })
+    return out
+
+
+def seed(svc, tasks: list[dict]) -> None:
+    db = svc._db
+    db.executemany(
+        "INSERT INTO tasks (id, title, status, priority, created_at, "
+        "dependencies, tags) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(t["id"], t["title"], t["status"], t["priority"], t["created_at"],
+          json.dumps(t["dependencies"]), json.dumps(t["tags"]))
+         for t in tasks],
+    )
+    db.executemany(
+        "INSERT INTO task_deps (task_id, depends_on) VALUES (?, ?)",
+        [(t["id"], d) for t in tasks for d in t["dependencies"]],
+    )
+    db.executemany(
+        "INSERT INTO task_tags (tag, task_id) VALUES (?, ?)",
+        [(g, t["id"]) for t in tasks for g in t["tags"]],
+    )
+    db.commit()
+    db.execute("ANALYZE")
+
+
+class LegacyTasks:
+    """The old Python-side filters over the same tasks table."""
+
+    def __init__(self, db) -> None:
+        self.db = db
+
+    def list(self, status: str | None = None,
+             tag: str | None = None) -> list[dict]:
+        where, params = ("", ()) if status is None else (
+            " WHERE status = ?", (status,))
+        rows = self.db.execute(
+            f"SELECT * FROM tasks{where} ORDER BY priority DESC, "
+            "created_at ASC, id ASC", params,
+        ).fetchall()
+        tasks = []
+        for r in rows:
+            t = dict(r)
+            t["dependencies"] = json.loads(t["dependencies"])
+            t["tags"] = json.loads(t["tags"])
+            tasks.append(t)
+        if tag is not None:
+            tasks = [t for t in tasks if tag in t["tags"]]
+        return tasks
+
+    def next_task(self) -> str | None:
+        pending = self.list(status="pending")
+        done = {t["id"] for t in self.list(status="done")}
+        for t in pending:
+            if all(dep in done for dep in t["dependencies"]):
+                return t["id"]
+        return None
+
+    def followups(self, since: datetime, until: datetime) -> int:
+        n = 0
+        for t in self.list():
+            created = datetime.fromisoformat(t["created_at"])
+            if since < created <= until and "src/mod7.py" in t["title"]:
+                n += 1
+        return n
+
+
+def _timed(fn: Callable[[int], Any], iterations: int) -> dict[str, Any]:
+    samples = []
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1,
+                                    int(len(samples) * 0.95))], 3),
+    }
+
+
+def run(n_tasks: int, iterations: int, legacy_iterations: int = 5,
+        page_size: int = 50) -> dict[str, Any]:
+    from app.services.scoring_service import detect_followup_fixes
+    from app.services.task_service import TaskService
+
+    tasks = synthetic_tasks(n_tasks)
+    result: dict[str, Any] = {"tasks": n_tasks}
+    with tempfile.TemporaryDirectory(prefix="prism-tasks-bench-") as tmp:
+        svc = TaskService(str(Path(tmp) / "tasks.db"))
+        t0 = time.perf_counter()
+        seed(svc, tasks)
+        result["seed_s"] = round(time.perf_counter() - t0, 3)
+        legacy = LegacyTasks(svc._db)
+
+        # Answers must agree before any timing means anything.
+        got = svc.next_task()
+        agree = {"next_task": (got["task"].id if got else None)
+                 == legacy.next_task()}
+        agree["tag"] = ([t.id for t in svc.list(tag="tag3")]
+                        == [t["id"] for t in legacy.list(tag="tag3")])
+        full = [t["id"] for t in legacy.list()]
+        deep_after = full[len(full) // 2 - 1]
+        page, _ = svc.list_page(limit=page_size, after=deep_after)
+        agree["deep_page"] = ([t.id for t in page]
+                              == full[len(full) // 2:len(full) // 2 + page_size])
+        merged_at = _EPOCH + timedelta(minutes=7 * (n_tasks // 2))
+        now = merged_at + timedelta(days=10)
+        agree["followups"] = (
+            detect_followup_fixes(svc, ["src/mod7.py"], merged_at, now)
+            == legacy.followups(merged_at, now)
+        )
+        result["agreement"] = agree
+
+        result["legacy"] = {
+            "next_task": _timed(lambda i: legacy.next_task(),
+                                legacy_iterations),
+            "list_tag": _timed(lambda i: legacy.list(tag=_TAGS[i % 20]),
+                               legacy_iterations),
+            "page_first": _timed(lambda i: legacy.list()[:page_size],
+                                 legacy_iterations),
+            "page_deep": _timed(
+                lambda i: legacy.list()[len(full) // 2:
+                                        len(full) // 2 + page_size],
+                legacy_iterations),
+            "followups": _timed(lambda i: legacy.followups(merged_at, now),
+                                legacy_iterations),
+        }
+        result["sql"] = {
+            "next_task": _timed(lambda i: svc.next_task(), iterations),
+            "list_tag": _timed(lambda i: svc.list(tag=_TAGS[i % 20]),
+                               iterations),
+            "page_first": _timed(lambda i: svc.list_page(limit=page_size),
+                                 iterations),
+            "page_deep": _timed(lambda i: svc.list_page(
+                limit=page_size, after=deep_after), iterations),
+            "followups": _timed(lambda i: detect_followup_fixes(
+                svc, ["src/mod7.py"], merged_at, now), iterations),
+        }
+        svc._writer.flush()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--legacy-iterations", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    result = run(max(2, args.tasks), max(1, args.iterations),
+                 max(1, args.legacy_iterations), max(1, args.page_size))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_module():
+    path = Path(__file__).resolve().parent.parent / "dedup" / "run.py"
+    spec = importlib.util.spec_from_file_location("dedup_run", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_entries_include_near_duplicates():
+    mod = _load_module()
+    entries = mod.synthetic_entries(400)
+
+    assert len({e.id for e in entries}) == 400
+    repeated = len(entries) - len({e.name for e in entries})
+    assert 5 < repeated < 60
+
+
+def test_run_agrees_with_pairwise_and_reports_timings():
+    mod = _load_module()
+    result = mod.run(150, 10, pairwise_sample=2, verify=60, iterations=2,
+                     legacy_iterations=1)
+
+    gov = result["governance"]
+    assert gov["archived_first_cycle"] > 0
+    assert gov["pairwise_estimated_s"] > 0
+    assert result["agreement"]["missed"] == 0
+    assert result["agreement"]["extra"] == 0
+    for store in ("legacy_scan", "lsh"):
+        assert result["store"][store]["median_ms"] >= 0
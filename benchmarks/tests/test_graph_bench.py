@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_module():
+    path = Path(__file__).resolve().parent.parent / "graph" / "run.py"
+    spec = importlib.util.spec_from_file_location("graph_run", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_graph_is_deterministic_and_loop_free():
+    mod = _load_module()
+    names, edges = mod.synthetic_graph(200, 1000, seed=3)
+    again = mod.synthetic_graph(200, 1000, seed=3)
+
+    assert len(names) == 200
+    assert len(edges) == 1000
+    assert sorted(edges) == sorted(again[1])
+    assert all(s != t for s, t, _ in edges)
+    assert len({(s, t) for s, t, _ in edges}) == len(edges)
+
+
+def test_churn_renames_drops_and_adds():
+    mod = _load_module()
+    names, edges = mod.synthetic_graph(300, 900, seed=3)
+    data = mod.graph_json(names, edges)
+    changed = mod.churn(data, 0.05)
+
+    ids = {n["id"] for n in changed["nodes"]}
+    assert len(changed["nodes"]) == len(data["nodes"])
+    assert sum(n["label"].endswith("_v2") for n in changed["nodes"]) > 0
+    assert all(lk["source"] in ids and lk["target"] in ids
+               for lk in changed["links"])
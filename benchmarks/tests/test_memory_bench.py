@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_module():
+    path = Path(__file__).resolve().parent.parent / "memory" / "run.py"
+    spec = importlib.util.spec_from_file_location("memory_run", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_entries_are_distinct_and_spread():
+    mod = _load_module()
+    entries = mod.synthetic_entries(200, 4)
+
+    assert len({e["id"] for e in entries}) == 200
+    assert len({e["name"] for e in entries}) == 200
+    assert {e["domain"] for e in entries} == {"d0", "d1", "d2", "d3"}
+
+
+def test_run_reports_both_stores_and_keeps_every_entry():
+    mod = _load_module()
+    result = mod.run(300, 3, iterations=3)
+
+    for store in ("legacy_jsonl", "sqlite"):
+        for op in ("store", "recall"):
+            assert result[store][op]["median_ms"] >= 0
+    assert result["sqlite"]["stored_entries"] == 303
+    assert result["sqlite"]["import_ms"] > 0
+    assert result["sqlite"]["get_entry"]["p95_ms"] >= 0
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_module():
+    path = Path(__file__).resolve().parent.parent / "similarity" / "run.py"
+    spec = importlib.util.spec_from_file_location("similarity_run", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_embeddings_have_requested_shape():
+    mod = _load_module()
+    vectors = mod.synthetic_embeddings(300, 16)
+
+    assert vectors.shape == (300, 16)
+    assert str(vectors.dtype) == "float32"
+
+
+def test_run_agrees_with_python_cosine_and_reports_timings():
+    mod = _load_module()
+    result = mod.run(1500, 32, 4, legacy_iterations=1)
+
+    assert result["agreement"] is True
+    assert result["store_reloads"] == 0
+    for key in ("cold", "legacy", "warm", "store"):
+        assert result[key]["median_ms"] >= 0
@@ -39,3 +39,25 @@ def test_metadata_cache_hashes_changed_file(tmp_path):
 
     assert list(changed) == ["sample.py"]
     assert changed["sample.py"] == cache["sample.py"]["sha256"]
+
+
+def test_merkle_protocol_finds_same_drift_with_fewer_bytes():
+    mod = _load_sync_run()
+    result = mod.run_protocols(400, changed=3, iterations=1)
+
+    for label, drifted in (("noop", 0), ("delta", 3)):
+        flat, merkle = result[label]["flat"], result[label]["merkle"]
+        assert flat["drifted"] == merkle["drifted"] == drifted
+        assert merkle["request_bytes"] < flat["request_bytes"]
+    assert result["noop"]["merkle"]["rounds"] == 1
+
+
+def test_hook_collect_bench_leaves_tree_alone(tmp_path):
+    mod = _load_sync_run()
+    (tmp_path / "sample.py").write_text("print('hello')\n", encoding="utf-8")
+
+    result = mod.run_hook_collect(tmp_path, "sample.py", iterations=1)
+
+    for label in ("cold_serial", "cold_pool", "warm_noop", "one_stat_change"):
+        assert result[label]["result_count"] == 1
+    assert not (tmp_path / ".prism").exists()
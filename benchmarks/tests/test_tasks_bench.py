@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_module():
+    path = Path(__file__).resolve().parent.parent / "tasks" / "run.py"
+    spec = importlib.util.spec_from_file_location("tasks_run", path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_tasks_depend_on_earlier_tasks():
+    mod = _load_module()
+    tasks = mod.synthetic_tasks(500)
+
+    ids = [t["id"] for t in tasks]
+    assert len(set(ids)) == 500
+    for t in tasks:
+        assert all(dep < t["id"] for dep in t["dependencies"])
+    assert any(t["status"] == "pending" for t in tasks)
+
+
+def test_run_agrees_with_python_filters_and_reports_timings():
+    mod = _load_module()
+    result = mod.run(2000, 2, legacy_iterations=1, page_size=20)
+
+    assert all(result["agreement"].values())
+    for side in ("legacy", "sql"):
+        for op in ("next_task", "list_tag", "page_first", "page_deep",
+                   "followups"):
+            assert result[side][op]["median_ms"] >= 0
@@ -0,0 +1,726 @@
+#!/usr/bin/env python3
+"""PRISM SessionStart hook — keeps Brain/Graph in sync with disk.
+
+Installed by PRISM version: __PRISM_VERSION__
+
+
+Walks the project source tree (respects .gitignore when git is available),
+hashes each file, asks PRISM via prism_status which files have drifted,
+and pushes the current content of drifted files via prism_refresh. Files
+whose stat is unchanged since the last run (.prism/sync-cache) are not
+read again.
+
+Drift is found with a directory Merkle tree: the hook sends the root
+hash, PRISM answers with its entries for any directory that differs,
+and the hook descends only into mismatching subdirectories. A no-op sync
+is one small round trip instead of a {path: sha256} map of every file.
+Older servers without tree support get the flat map.
+
+Refresh batches are gzip-compressed, and a drifted file whose indexed
+version is still in the git index goes as a line-block delta against
+it. Deltas the server can't apply (it no longer holds that base) come
+back in need_full and are resent whole. Batches go to
+prism_bulk_refresh a couple at a time, backing off while the server
+answers busy; a large drift (a branch switch) is finished by a
+detached background copy of this script so session start isn't held.
+
+Installed by PRISM's prism_install / project_onboard manifest. The hook
+reads its target MCP URL + project slug from .mcp.json at the project
+root, so no hardcoded values live here — one hook works across projects.
+"""
+from __future__ import annotations
+
+import base64
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Which files are synced. app/services/sync_tree keeps the same rules for
+# the server's tree; change both together.
+SOURCE_EXTS = {".py", ".ts", ".tsx", ".js", ".jsx", ".cs", ".go", ".rs",
+               ".java", ".rb", ".php", ".cpp", ".c", ".h", ".hpp",
+               ".md", ".yml", ".yaml", ".toml"}
+SKIP_PARTS = {".git", "node_modules", "__pycache__", ".venv", "venv",
+              "dist", "build", ".tox", ".mypy_cache", ".pytest_cache",
+              ".next", ".nuxt", "target", ".claude"}
+MAX_FILE_BYTES = 300_000
+# Per-file (size, mtime_ns, inode, sha256, git blob) from the last run.
+# The blob is only recorded when the file matched the index at the time
+# it was hashed, so blob -> sha256 is always a true pairing.
+CACHE_REL = ".prism/sync-cache"
+CACHE_VERSION = 2
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+# Refresh upload: files per prism_bulk_refresh call (the server's index
+# batch size), calls in flight, and how long to wait out {busy: true}
+# answers.
+CHUNK_SIZE = 25
+UPLOAD_IN_FLIGHT = 2
+BUSY_RETRIES = 6
+MAX_RETRY_WAIT_S = 30.0
+# PRISM_SYNC_DETACH=auto (default) uploads larger drifts from a
+# background process so session start isn't held up; 1/0 force it.
+DETACH_MIN_FILES = 100
+
+
+def _project_root() -> Path:
+    # Walk up from cwd looking for .mcp.json
+    cur = Path.cwd()
+    for d in [cur, *cur.parents]:
+        if (d / ".mcp.json").exists():
+            return d
+    return cur
+
+
+def _mcp_url_and_project(root: Path) -> tuple[str, str] | None:
+    cfg = root / ".mcp.json"
+    if not cfg.exists():
+        return None
+    try:
+        data = json.loads(cfg.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    servers = (data.get("mcpServers") or {}).values()
+    for s in servers:
+        url = s.get("url", "")
+        if "/mcp" in url:
+            # Split out ?project= query
+            if "project=" in url:
+                base, q = url.split("?", 1)
+                project = [p.split("=", 1)[1] for p in q.split("&")
+                           if p.startswith("project=")][0]
+                return base.rstrip("/"), project
+    return None
+
+
+def _mcp_call(base: str, project: str, tool: str, args: dict) -> dict:
+    url = f"{base}/?project={project}"
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+               "params": {"name": tool, "arguments": args}}
+    req = urllib.request.Request(
+        url, data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json",
+                 "Accept": "application/json, text/event-stream"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=120) as r:
+        raw = r.read().decode()
+        if "text/event-stream" in r.headers.get("Content-Type", ""):
+            for line in raw.splitlines():
+                if line.startswith("data: "):
+                    return json.loads(line[6:])
+        return json.loads(raw)
+
+
+def _parse_result(resp: dict):
+    content = resp.get("result", {}).get("content", [])
+    if not content:
+        return None
+    text = content[0].get("text", "")
+    try:
+        return json.loads(text)
+    except Exception:
+        return text
+
+
+def _git_index(root: Path) -> dict[str, str] | None:
+    """{rel_path: blob id} from the git index, or None if no git repo."""
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-s", "-z"],
+            capture_output=True, timeout=15, check=True,
+        ).stdout
+    except Exception:
+        return None
+    index: dict[str, str] = {}
+    for entry in out.decode("utf-8", "surrogateescape").split("\0"):
+        # "<mode> <blob> <stage>\t<path>"
+        meta, _, path = entry.partition("\t")
+        if path:
+            index[path] = meta.split(" ", 2)[1]
+    return index
+
+
+def _git_dirty(root: Path) -> set[str] | None:
+    """Tracked paths whose worktree content differs from the index.
+
+    Porcelain ``git diff`` re-checks stat-dirty entries by content, so a
+    touched-but-identical file doesn't count (plumbing diff-files would).
+    """
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(root), "diff", "--name-only", "-z",
+             "--no-ext-diff", "--no-renames"],
+            capture_output=True, timeout=15, check=True,
+        ).stdout
+    except Exception:
+        return None
+    return {p.decode("utf-8", "surrogateescape")
+            for p in out.split(b"\0") if p}
+
+
+def _eligible(rel: str) -> bool:
+    # Extension first: it rejects most paths without splitting them.
+    if os.path.splitext(rel)[1] not in SOURCE_EXTS:
+        return False
+    return SKIP_PARTS.isdisjoint(rel.split("/"))
+
+
+def _hash_file(p: str) -> str | None:
+    """Hash the TEXT form (newline-normalized utf-8) so hashes match
+    what the server stores — avoids spurious CRLF-vs-LF drift on Windows."""
+    try:
+        with open(p, encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeError):
+        return None
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load_cache(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION:
+            return data.get("files") or {}
+    except Exception:
+        pass
+    return {}
+
+
+def _save_cache(path: Path, files: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": files},
+                                  separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _collect(root: Path) -> dict[str, tuple[str, str, str | None]]:
+    """Return {rel_path: (sha256, abs_path, git blob)} for source files.
+
+    Only files whose (size, mtime_ns, inode) moved since the last run are
+    read. Of those, a tracked file whose worktree matches the index and
+    whose blob id was hashed before (branch switches, fresh checkouts,
+    touch) reuses that sha256. The rest are hashed on a thread pool.
+    State lives in .prism/sync-cache. Paths stay strings throughout;
+    building a Path per file cost more than the stat calls.
+    """
+    base = os.path.join(str(root), "")
+    cache_path = root / CACHE_REL
+    cache = _load_cache(cache_path)
+    index = _git_index(root)
+    if index:
+        candidates = [rel for rel in index if _eligible(rel)]
+    else:
+        index = {}
+        candidates = []
+        for p in root.rglob("*"):
+            rel = p.relative_to(root).as_posix()
+            if _eligible(rel) and p.is_file():
+                candidates.append(rel)
+    # sha256 of every blob seen before, whatever path it was at.
+    by_blob = {e[4]: e[3] for e in cache.values() if len(e) > 4 and e[4]}
+
+    fresh: dict[str, list] = {}
+    missed: list[tuple[str, list]] = []
+    for rel in candidates:
+        try:
+            info = os.stat(base + rel)
+        except OSError:
+            continue
+        if (not stat.S_ISREG(info.st_mode)
+                or not 0 < info.st_size <= MAX_FILE_BYTES):
+            continue
+        blob = index.get(rel)
+        key = [info.st_size, info.st_mtime_ns, info.st_ino]
+        old = cache.get(rel)
+        if old is not None and old[:3] == key:
+            # Keep the blob old[3] was verified against: the index may
+            # have moved on since without the worktree changing.
+            fresh[rel] = key + [old[3], old[4] if len(old) > 4 else None]
+        else:
+            missed.append((rel, key + [None, blob]))
+
+    # Only ask git which files differ from the index when some stat moved.
+    dirty = (_git_dirty(root)
+             if any(e[4] in by_blob for _, e in missed) else None)
+    to_hash: list[tuple[str, list]] = []
+    for rel, entry in missed:
+        if dirty is not None and entry[4] in by_blob and rel not in dirty:
+            entry[3] = by_blob[entry[4]]
+            fresh[rel] = entry
+        else:
+            to_hash.append((rel, entry))
+
+    if to_hash:
+        workers = min(HASH_WORKERS, len(to_hash))
+        paths = [base + rel for rel, _ in to_hash]
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(_hash_file, paths))
+        else:
+            digests = [_hash_file(p) for p in paths]
+        # Pair the new hashes with their index blobs only for files the
+        # worktree still matches; asked after hashing, so an edit made
+        # meanwhile shows up as dirty rather than as a wrong pairing.
+        changed = (_git_dirty(root) if any(e[4] for _, e in to_hash)
+                   else None)
+        for (rel, entry), sha in zip(to_hash, digests):
+            if sha:
+                entry[3] = sha
+                if changed is None or rel in changed:
+                    entry[4] = None
+                fresh[rel] = entry
+
+    if to_hash or fresh.keys() != cache.keys():
+        _save_cache(cache_path, fresh)
+    return {rel: (e[3], base + rel, index.get(rel))
+            for rel, e in fresh.items()}
+
+
+def _dir_hash(files: dict, dirs: dict) -> str:
+    # Must match app/services/sync_tree.dir_hash on the server.
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"f {name} {files[name]}\n".encode("utf-8"))
+    for name in sorted(dirs):
+        h.update(f"d {name} {dirs[name]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _build_tree(hashes: dict[str, str]) -> dict[str, tuple]:
+    """{dir: (hash, {file: sha}, {subdir: hash})}; the root dir is ""."""
+    files: dict[str, dict] = {"": {}}
+    for path, sha in hashes.items():
+        parent, _, name = path.rpartition("/")
+        entries = files.get(parent)
+        if entries is None:
+            entries = files[parent] = {}
+            # First file in this dir: register any missing ancestors.
+            d = parent
+            while "/" in d:
+                d = d.rpartition("/")[0]
+                if d in files:
+                    break
+                files[d] = {}
+        entries[name] = sha
+    tree: dict[str, tuple] = {}
+    subdirs: dict[str, dict] = {d: {} for d in files}
+    for d in sorted(files, key=lambda p: p.count("/") + bool(p),
+                    reverse=True):
+        h = _dir_hash(files[d], subdirs[d])
+        tree[d] = (h, files[d], subdirs[d])
+        if d:
+            parent, _, name = d.rpartition("/")
+            subdirs[parent][name] = h
+    return tree
+
+
+def _under(tree: dict, d: str) -> list[str]:
+    """Every file path in ``d``'s subtree."""
+    _, files, dirs = tree[d]
+    out = [f"{d}/{n}" if d else n for n in files]
+    for n in dirs:
+        out.extend(_under(tree, f"{d}/{n}" if d else n))
+    return out
+
+
+def _tree_drift(call, hashes: dict[str, str],
+                server_shas: dict[str, str] | None = None
+                ) -> list[str] | None:
+    """Drifted paths via the Merkle protocol; None if the server lacks it.
+
+    ``call(args)`` performs one prism_status round and returns the parsed
+    result. Each round sends the hashes of every directory still in
+    question (one tree level at a time). The server's sha256 for each
+    drifted file it knows is recorded in ``server_shas`` (delta bases).
+    """
+    tree = _build_tree(hashes)
+    pending = {"": tree[""][0]}
+    drifted: list[str] = []
+    while pending:
+        status = call({"tree": pending})
+        if not isinstance(status, dict) or "tree" not in status:
+            return None
+        mismatched = status["tree"].get("mismatched") or {}
+        pending = {}
+        for d, theirs in mismatched.items():
+            if d not in tree:
+                continue
+            _, files, dirs = tree[d]
+            their_files = theirs.get("files") or {}
+            their_dirs = theirs.get("dirs") or {}
+            for name, sha in files.items():
+                if their_files.get(name) != sha:
+                    path = f"{d}/{name}" if d else name
+                    drifted.append(path)
+                    if server_shas is not None and their_files.get(name):
+                        server_shas[path] = their_files[name]
+            for name, h in dirs.items():
+                sub = f"{d}/{name}" if d else name
+                if name not in their_dirs:
+                    drifted.extend(_under(tree, sub))
+                elif their_dirs[name] != h:
+                    pending[sub] = h
+    return sorted(drifted)
+
+
+def _flat_drift(call, hashes: dict[str, str]) -> list[str]:
+    status = call({"file_hashes": hashes})
+    drifted = (status or {}).get("drifted", []) if isinstance(status, dict) else []
+    return [e.get("path") for e in drifted if e.get("path")]
+
+
+def _git_blobs(root: Path, blobs: set[str]) -> dict[str, str]:
+    """{blob id: text} for the given blobs via one ``git cat-file --batch``."""
+    if not blobs:
+        return {}
+    order = sorted(blobs)
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(root), "cat-file", "--batch"],
+            input="".join(f"{b}\n" for b in order).encode(),
+            capture_output=True, timeout=30, check=True,
+        ).stdout
+    except Exception:
+        return {}
+    texts: dict[str, str] = {}
+    pos = 0
+    for blob in order:
+        end = out.find(b"\n", pos)
+        if end < 0:
+            break
+        header = out[pos:end].split(b" ")
+        if len(header) != 3:  # "<blob> missing"
+            pos = end + 1
+            continue
+        size = int(header[2])
+        data = out[end + 1:end + 1 + size]
+        pos = end + 1 + size + 1
+        try:
+            # Same newline normalization as _hash_file's text read.
+            text = data.decode("utf-8")
+        except UnicodeError:
+            continue
+        texts[blob] = text.replace("\r\n", "\n").replace("\r", "\n")
+    return texts
+
+
+def _delta_ops(base: str, new: str) -> list:
+    """Ordered [start, end, text] line blocks turning ``base`` into ``new``."""
+    a = base.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    return [[i1, i2, "".join(b[j1:j2])]
+            for tag, i1, i2, j1, j2 in
+            difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+            if tag != "equal"]
+
+
+def _refresh_args(batch: dict[str, str], bases: dict[str, tuple[str, str]]
+                  ) -> dict:
+    """prism_refresh arguments for ``batch``: deltas where a base is
+    known and smaller, the whole thing gzip'd when that is smaller."""
+    files: dict[str, str] = {}
+    deltas: dict[str, dict] = {}
+    for path, content in batch.items():
+        base = bases.get(path)
+        if base is not None:
+            ops = _delta_ops(base[1], content)
+            if len(json.dumps(ops)) < len(content):
+                deltas[path] = {
+                    "base_sha256": base[0], "ops": ops,
+                    "sha256": hashlib.sha256(
+                        content.encode("utf-8")).hexdigest(),
+                }
+                continue
+        files[path] = content
+    body = json.dumps({"files": files, "deltas": deltas},
+                      separators=(",", ":")).encode("utf-8")
+    packed = base64.b64encode(gzip.compress(body, 6)).decode("ascii")
+    if len(packed) < len(body):
+        return {"encoding": "gzip", "payload": packed}
+    out: dict = {"files": files}
+    if deltas:
+        out["deltas"] = deltas
+    return out
+
+
+def _call_with_backoff(call, args: dict, sleep=time.sleep):
+    """One refresh call, waiting out ``busy`` answers from the server."""
+    for _ in range(BUSY_RETRIES):
+        result = call(args)
+        if not (isinstance(result, dict) and result.get("busy")):
+            return result
+        try:
+            wait = float(result.get("retry_after_s") or 1)
+        except (TypeError, ValueError):
+            wait = 1.0
+        sleep(min(max(wait, 0.0), MAX_RETRY_WAIT_S))
+    raise RuntimeError(f"server still busy after {BUSY_RETRIES} tries")
+
+
+def _refresh(call, batch: dict[str, str],
+             bases: dict[str, tuple[str, str]], sleep=time.sleep) -> int:
+    """Push one batch; resend whole whatever the server couldn't patch."""
+    args = _refresh_args(batch, bases)
+    result = _call_with_backoff(call, args, sleep)
+    if isinstance(result, dict) and "need_full" in result:
+        resend = {p: batch[p] for p in result["need_full"] if p in batch}
+    elif "files" in args and "deltas" not in args:
+        resend = {}
+    else:
+        # Pre-delta server: it saw no `files` and indexed nothing.
+        resend = batch
+    if resend:
+        _call_with_backoff(call, {"files": resend}, sleep)
+    return len(batch)
+
+
+def _upload(call, to_refresh: dict[str, str],
+            bases: dict[str, tuple[str, str]],
+            in_flight: int = UPLOAD_IN_FLIGHT, sleep=time.sleep) -> int:
+    """Push ``to_refresh`` in CHUNK_SIZE batches, ``in_flight`` at a time.
+
+    Each worker builds its batch's deltas while the others wait on the
+    server, so encoding overlaps upload. Returns files refreshed; a
+    batch that fails is logged and skipped.
+    """
+    items = list(to_refresh.items())
+    batches = [dict(items[i:i + CHUNK_SIZE])
+               for i in range(0, len(items), CHUNK_SIZE)]
+
+    def push(i: int) -> int:
+        try:
+            return _refresh(call, batches[i], bases, sleep)
+        except Exception as e:
+            print(f"[prism-sync] prism_bulk_refresh chunk {i} failed: {e!r}",
+                  file=sys.stderr)
+            return 0
+
+    if in_flight <= 1 or len(batches) <= 1:
+        return sum(push(i) for i in range(len(batches)))
+    with ThreadPoolExecutor(max_workers=min(in_flight, len(batches))) as pool:
+        return sum(pool.map(push, range(len(batches))))
+
+
+def _push(root: Path, base: str, project: str,
+          files: dict[str, tuple[str, str, str | None]],
+          drifted: list[str], server_shas: dict[str, str]) -> int:
+    """Re-ingest ``drifted`` files, then queue one graph rebuild."""
+    to_refresh: dict[str, str] = {}
+    for path in drifted:
+        fe = files.get(path)
+        if not fe:
+            continue
+        try:
+            to_refresh[path] = Path(fe[1]).read_text(encoding="utf-8")
+        except Exception:
+            pass
+    if not to_refresh:
+        return 0
+
+    # Delta bases: the index blob of an edited tracked file is usually
+    # exactly what PRISM last indexed; the sha check keeps it honest.
+    blobs = _git_blobs(root, {files[p][2] for p in to_refresh
+                              if p in server_shas and files[p][2]})
+    bases: dict[str, tuple[str, str]] = {}
+    for path in to_refresh:
+        text = blobs.get(files[path][2] or "")
+        if text is not None and hashlib.sha256(
+                text.encode("utf-8")).hexdigest() == server_shas.get(path):
+            bases[path] = (server_shas[path], text)
+
+    def refresh_call(args: dict):
+        # prism_bulk_refresh answers {busy, retry_after_s} when the
+        # server's index queue is full; one chunk per call since
+        # batching happens here.
+        args = dict(args, skip_graph=True, chunk_size=CHUNK_SIZE)
+        return _parse_result(
+            _mcp_call(base, project, "prism_bulk_refresh", args))
+
+    # Batches go with skip_graph=true and one graph_rebuild fires at the
+    # end. Avoids the per-call graphify cost that dominates latency on
+    # larger syncs.
+    refreshed = _upload(refresh_call, to_refresh, bases)
+    if refreshed:
+        try:
+            _mcp_call(base, project, "graph_rebuild", {})
+        except Exception as e:
+            print(
+                f"[prism-sync] graph_rebuild after sync failed: {e!r}",
+                file=sys.stderr,
+            )
+        print(
+            f"[prism-sync] refreshed {refreshed} drifted file(s) in "
+            f"{(len(to_refresh) + CHUNK_SIZE - 1) // CHUNK_SIZE} chunk(s) + "
+            "1 graph_rebuild",
+            file=sys.stderr,
+        )
+    return refreshed
+
+
+def _should_detach(n_files: int) -> bool:
+    mode = os.environ.get("PRISM_SYNC_DETACH", "auto").strip().lower()
+    if mode in ("1", "on", "true", "always"):
+        return True
+    if mode in ("0", "off", "false", "never"):
+        return False
+    return n_files > DETACH_MIN_FILES
+
+
+def _detach(root: Path, drifted: list[str],
+            server_shas: dict[str, str]) -> bool:
+    """Hand the upload to a background copy of this script.
+
+    The drift answer is spooled to .prism/ so the child doesn't repeat
+    the prism_status rounds; its output goes to .prism/sync-upload.log.
+    Returns False if the child couldn't be started.
+    """
+    state = root / ".prism"
+    spool = state / f"sync-upload-{os.getpid()}.json"
+    try:
+        state.mkdir(parents=True, exist_ok=True)
+        spool.write_text(json.dumps({"drifted": drifted,
+                                     "server_shas": server_shas}),
+                         encoding="utf-8")
+        if os.name == "nt":
+            # DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP
+            kwargs: dict = {"creationflags": 0x00000008 | 0x00000200}
+        else:
+            kwargs = {"start_new_session": True}
+        with open(state / "sync-upload.log", "ab") as log:
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__),
+                 "--upload", str(spool)],
+                cwd=str(root), stdin=subprocess.DEVNULL, stdout=log,
+                stderr=log, close_fds=True, **kwargs,
+            )
+        return True
+    except Exception as e:
+        print(f"[prism-sync] could not detach upload ({e!r}); "
+              "uploading in the foreground", file=sys.stderr)
+        try:
+            spool.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def _finish_upload(spool: Path) -> int:
+    """Background half of _detach: upload what the spool lists."""
+    try:
+        job = json.loads(spool.read_text(encoding="utf-8"))
+    except Exception:
+        return 1
+    try:
+        root = _project_root()
+        cfg = _mcp_url_and_project(root)
+        if cfg is None:
+            return 0
+        _push(root, *cfg, _collect(root), job.get("drifted") or [],
+              job.get("server_shas") or {})
+    finally:
+        try:
+            spool.unlink()
+        except OSError:
+            pass
+    return 0
+
+
+def main() -> int:
+    if len(sys.argv) == 3 and sys.argv[1] == "--upload":
+        return _finish_upload(Path(sys.argv[2]))
+
+    root = _project_root()
+    cfg = _mcp_url_and_project(root)
+    if cfg is None:
+        # No .mcp.json — user hasn't opted in. Silent skip.
+        return 0
+    base, project = cfg
+
+    files = _collect(root)
+    if not files:
+        return 0
+
+    hashes = {path: fe[0] for path, fe in files.items()}
+
+    def status_call(args: dict):
+        return _parse_result(_mcp_call(base, project, "prism_status", args))
+
+    server_shas: dict[str, str] = {}
+    try:
+        drifted = _tree_drift(status_call, hashes, server_shas)
+        if drifted is None:
+            drifted = _flat_drift(status_call, hashes)
+    except Exception as e:
+        print(f"[prism-sync] could not reach {base} ({e!r}); skipping",
+              file=sys.stderr)
+        return 0
+
+    if not drifted:
+        return 0
+    if _should_detach(len(drifted)) and _detach(root, drifted, server_shas):
+        print(f"[prism-sync] uploading {len(drifted)} drifted file(s) in "
+              "the background (.prism/sync-upload.log)", file=sys.stderr)
+    else:
+        _push(root, base, project, files, drifted, server_shas)
+
+    # LL-10: SessionStart reflection check. If a consolidation
+    # candidate is ready, emit hookSpecificOutput.additionalContext so
+    # Claude sees the brief on its first turn and can delegate to the
+    # prism-reflect sub-agent. Silent no-op when nothing is pending.
+    # SessionStart hooks receive a small JSON payload on stdin; extract
+    # session_id so janitor_check can rate-limit and so the emitted
+    # additionalContext can be linked to this session.
+    session_id = ""
+    try:
+        import json as _json
+        import sys as _sys
+        session_id = (
+            _json.loads(_sys.stdin.read() or "{}").get("session_id", "")
+        )
+    except Exception:
+        pass
+    if session_id:
+        try:
+            chk_resp = _mcp_call(
+                base, project, "janitor_check", {"session_id": session_id},
+            )
+            payload = _parse_result(chk_resp) or {}
+            if payload.get("ready") and payload.get("brief"):
+                brief = payload["brief"]
+                additional = (
+                    f"PRISM reflection pending: candidate "
+                    f"{brief.get('candidate_id', '?')}. Spawn the "
+                    f"`prism-reflect` subagent using the brief below — "
+                    f"call `janitor_check` if you need the live version, "
+                    f"submit via `janitor_submit`. Brief: "
+                    f"{json.dumps(brief)[:6000]}"
+                )
+                print(json.dumps({
+                    "hookSpecificOutput": {
+                        "additionalContext": additional,
+                    },
+                }))
+        except Exception as e:
+            print(
+                f"[prism-sync] janitor_check failed: {e!r}",
+                file=sys.stderr,
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,6 +28,80 @@ DRIFT_INTERVAL_SECONDS = int(
     os.environ.get("PRISM_DRIFT_INTERVAL", "1800"),  # 30 min default
 )
 
+# File watcher — inotify on PRISM_PROJECT_DIR feeds changed paths to
+# the indexer once events have been quiet for the debounce window (or
+# after the max delay under a steady stream). The drift timer's git
+# poll stays on as the fallback and safety net. off disables.
+WATCH_ENABLED = os.environ.get("PRISM_WATCH", "on").strip().lower() != "off"
+WATCH_DEBOUNCE_SECONDS = float(os.environ.get("PRISM_WATCH_DEBOUNCE", "2"))
+WATCH_MAX_DELAY_SECONDS = float(
+    os.environ.get("PRISM_WATCH_MAX_DELAY", "30"),
+)
+
+# Graph rebuild cadence — graph_rebuild re-runs graphify only over staged
+# files changed since the last run and merges the result; every Nth run
+# (or when more than the given fraction of staged files changed) is a
+# full pass that also re-runs Leiden community detection. 1 restores the
+# always-full behaviour.
+GRAPH_FULL_REBUILD_EVERY = int(
+    os.environ.get("PRISM_GRAPH_FULL_REBUILD_EVERY", "10"),
+)
+GRAPH_INCREMENTAL_MAX_CHANGED = float(
+    os.environ.get("PRISM_GRAPH_INCREMENTAL_MAX_CHANGED", "0.25"),
+)
+
+# graph_rebuild requests wait this long before running; requests that
+# arrive in the window (or while a rebuild runs) coalesce into one job.
+GRAPH_REBUILD_DEBOUNCE_SECONDS = float(
+    os.environ.get("PRISM_GRAPH_REBUILD_DEBOUNCE", "2"),
+)
+
+# graph_rebuild(wait=true) and prism_sync block on their job for at most
+# this long, then answer with the job id so the caller can poll status.
+GRAPH_REBUILD_WAIT_TIMEOUT_SECONDS = float(
+    os.environ.get("PRISM_GRAPH_REBUILD_WAIT_TIMEOUT", "600"),
+)
+
+# prism_refresh / prism_bulk_refresh enqueue onto a per-project indexing
+# queue. The worker indexes this many files per batch; bulk submissions
+# that would push the queue past the cap get {busy, retry_after_s}.
+INDEX_BATCH_SIZE = int(os.environ.get("PRISM_INDEX_BATCH_SIZE", "25"))
+INDEX_QUEUE_MAX_FILES = int(
+    os.environ.get("PRISM_INDEX_QUEUE_MAX_FILES", "20000"),
+)
+# A waiting refresh (wait=true) blocks on its job for at most this long,
+# then answers with the job's current status so the caller can poll.
+INDEX_WAIT_TIMEOUT_SECONDS = float(
+    os.environ.get("PRISM_INDEX_WAIT_TIMEOUT", "600"),
+)
+
+# Expertise entries live in memory.db; the mulch {domain}.jsonl files are
+# rewritten this long after a domain's first change (0 = immediately).
+MEMORY_EXPORT_DELAY_SECONDS = float(
+    os.environ.get("PRISM_MEMORY_EXPORT_DELAY", "2"),
+)
+
+# Recall stats (recall_count, last_recalled, recall_log rows) are buffered
+# and written in one batch this long after the first recall, or as soon
+# as this many recalled entries are waiting (0 seconds = immediately).
+MEMORY_RECALL_FLUSH_SECONDS = float(
+    os.environ.get("PRISM_MEMORY_RECALL_FLUSH", "1"),
+)
+MEMORY_RECALL_FLUSH_BATCH = int(
+    os.environ.get("PRISM_MEMORY_RECALL_BATCH", "256"),
+)
+
+# Telemetry retention — recall_log, searches and search_feedback rows
+# older than this are rolled up into daily aggregates and deleted, this
+# many rows per transaction, on each governance cycle. 0 keeps raw rows
+# forever.
+TELEMETRY_RETENTION_DAYS = int(
+    os.environ.get("PRISM_TELEMETRY_RETENTION_DAYS", "90"),
+)
+TELEMETRY_RETENTION_BATCH = int(
+    os.environ.get("PRISM_TELEMETRY_RETENTION_BATCH", "5000"),
+)
+
 # Quality timer (LL-04) — how often to score merged tasks against git
 # truth. 6h default so the 14d durability window has time to accumulate
 # revert/churn/follow-up signals. 0 disables.
@@ -19,10 +19,14 @@ import re
 import sqlite3
 import subprocess
 import sys
+import threading
 import warnings
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.engines.task_vectors import TaskVectors
 
 # ---------------------------------------------------------------------------
 # Exceptions
@@ -97,42 +101,21 @@ def _similar_task_ids(
     tasks_conn: sqlite3.Connection,
     query_task_id: str,
     k: int = 20,
+    vectors: Optional["TaskVectors"] = None,
 ) -> list[tuple[str, float]]:
     """Return the top-k task_ids by cosine similarity to ``query_task_id``.
 
     Excludes the query task itself. Returns ``[(task_id, cosine), ...]``
     sorted by cosine descending. Tasks without an embedding (or with a
-    mismatched-dim embedding) are skipped.
+    mismatched-dim embedding) are skipped. ``vectors`` is the cached
+    matrix for ``tasks_conn``'s database; without one the embeddings
+    are loaded for this call only.
     """
-    import math
-    row = tasks_conn.execute(
-        "SELECT embedding FROM tasks WHERE id=?", (query_task_id,)
-    ).fetchone()
-    if row is None:
-        return []
-    q_blob = row[0] if not hasattr(row, "keys") else row["embedding"]
-    q_vec = decode_task_embedding(q_blob)
-    if not q_vec:
-        return []
-    q_norm = math.sqrt(sum(x * x for x in q_vec)) or 1.0
-
-    out: list[tuple[str, float]] = []
-    for r in tasks_conn.execute(
-        "SELECT id, embedding FROM tasks "
-        "WHERE id != ? AND embedding IS NOT NULL",
-        (query_task_id,),
-    ).fetchall():
-        tid = r[0] if not hasattr(r, "keys") else r["id"]
-        blob = r[1] if not hasattr(r, "keys") else r["embedding"]
-        v = decode_task_embedding(blob)
-        if not v or len(v) != len(q_vec):
-            continue
-        dot = sum(a * b for a, b in zip(q_vec, v))
-        n = math.sqrt(sum(x * x for x in v)) or 1.0
-        sim = dot / (q_norm * n)
-        out.append((tid, sim))
-    out.sort(key=lambda t: t[1], reverse=True)
-    return out[:k]
+    from app.engines.task_vectors import TaskVectors
+
+    if vectors is None:
+        vectors = TaskVectors()
+    return vectors.top_k(tasks_conn, query_task_id, k)
 
 
 # ---------------------------------------------------------------------------
@@ -498,10 +481,112 @@ def _detect_structural_query(query: str) -> tuple[Optional[str], Optional[str]]:
     return None, None
 
 
+# ---------------------------------------------------------------------------
+# Entity-name trigram index (graph.db)
+# ---------------------------------------------------------------------------
+
+def _init_entity_fts(conn: sqlite3.Connection) -> bool:
+    """Create the ``entities_fts`` trigram index over entity name + label.
+
+    ``_graph_search`` matches query tokens as substrings of entity names.
+    ``idx_ent_name`` can't serve ``LIKE '%tok%'``, so each token used to
+    cost a full scan of ``entities``. An external-content FTS5 table
+    with the trigram tokenizer answers the same substring match from an
+    index. Triggers keep it in sync with every writer (``_index_graph``,
+    ``GraphService._import_graph_json``, ``index_doc`` entities), the
+    same way ``docs_fts`` tracks ``docs``.
+
+    Also adds the graphify ``label`` column if missing, since the
+    triggers reference it. Returns False when this SQLite build lacks
+    FTS5 trigram support (< 3.34) — callers fall back to LIKE scans.
+    Safe to call repeatedly.
+    """
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(entities)")}
+    if not cols:
+        return False
+    if "label" not in cols:
+        try:
+            conn.execute("ALTER TABLE entities ADD COLUMN label TEXT")
+        except sqlite3.OperationalError:
+            pass
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'entities_fts'"
+    ).fetchone() is not None
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(
+                name,
+                label,
+                content='entities',
+                content_rowid='id',
+                tokenize='trigram'
+            );
+            CREATE TRIGGER IF NOT EXISTS entities_fts_ai
+            AFTER INSERT ON entities BEGIN
+                INSERT INTO entities_fts(rowid, name, label)
+                    VALUES (new.id, new.name, new.label);
+            END;
+            CREATE TRIGGER IF NOT EXISTS entities_fts_ad
+            AFTER DELETE ON entities BEGIN
+                INSERT INTO entities_fts(entities_fts, rowid, name, label)
+                    VALUES ('delete', old.id, old.name, old.label);
+            END;
+            CREATE TRIGGER IF NOT EXISTS entities_fts_au
+            AFTER UPDATE OF name, label ON entities BEGIN
+                INSERT INTO entities_fts(entities_fts, rowid, name, label)
+                    VALUES ('delete', old.id, old.name, old.label);
+                INSERT INTO entities_fts(rowid, name, label)
+                    VALUES (new.id, new.name, new.label);
+            END;
+        """)
+        if not exists:
+            # Existing graph.db from before the index — backfill once.
+            conn.execute("INSERT INTO entities_fts(entities_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
 # ---------------------------------------------------------------------------
 # Brain class
 # ---------------------------------------------------------------------------
 
+# Daily rollups for apply_retention(); {rows} selects one batch of ids.
+_SEARCH_ROLLUP_SQL = """
+INSERT INTO search_daily (day, searches, empty, latency_ms_total,
+                          latency_ms_max)
+SELECT substr(ts, 1, 10), COUNT(*), SUM(COALESCE(n_results, 0) = 0),
+       SUM(COALESCE(latency_ms, 0)), MAX(COALESCE(latency_ms, 0))
+FROM searches WHERE id IN ({rows})
+GROUP BY substr(ts, 1, 10)
+ON CONFLICT (day) DO UPDATE SET
+    searches = searches + excluded.searches,
+    empty = empty + excluded.empty,
+    latency_ms_total = latency_ms_total + excluded.latency_ms_total,
+    latency_ms_max = MAX(latency_ms_max, excluded.latency_ms_max)
+"""
+_FEEDBACK_ROLLUP_SQL = """
+INSERT INTO feedback_daily (day, doc_id, up, down)
+SELECT substr(ts, 1, 10), doc_id, SUM(signal = 'up'), SUM(signal = 'down')
+FROM search_feedback WHERE id IN ({rows})
+GROUP BY substr(ts, 1, 10), doc_id
+ON CONFLICT (day, doc_id) DO UPDATE SET
+    up = up + excluded.up,
+    down = down + excluded.down
+"""
+# Per-doc up/down over raw feedback rows and rollups; {where} narrows.
+_FEEDBACK_SQL = """
+SELECT doc_id, day, SUM(up) AS up, SUM(down) AS down FROM (
+    SELECT doc_id, substr(ts, 1, 10) AS day, signal = 'up' AS up,
+           signal = 'down' AS down
+    FROM search_feedback WHERE 1 {where}
+    UNION ALL
+    SELECT doc_id, day, up, down FROM feedback_daily WHERE 1 {where}
+) GROUP BY doc_id, day
+"""
+
+
 class Brain:
     """3-index hybrid knowledge store: FTS5 BM25 + sqlite-vec + GraphRAG."""
 
@@ -598,15 +683,33 @@ class Brain:
 
         self._check_db_integrity()
         self.vector_enabled = _try_enable_vector(self._brain)
+        # Counts and timings from the last purge / incremental reindex.
+        self.last_purge_stats: dict = {}
+        self.last_reindex_stats: dict = {}
+        # File and record counts from the last ingest of .mulch /
+        # .overstory logs (skipped = not re-read thanks to a checkpoint).
+        self.last_ingest_stats: dict = {}
 
         self._init_brain_schema()
         self._init_graph_schema()
         self._init_scores_schema()
 
+        # CSR snapshot of graph.db for traversals; created on first use
+        # by _graph_adjacency() so CLI use without the app package works.
+        self._adjacency = None
+        # searches.id handed out before the fire-and-forget insert lands.
+        self._search_id_lock = threading.Lock()
+        # Reserved, not yet used searches.id range; see _next_search_id.
+        self._search_id_next = 1
+        self._search_id_end = 0
+
     @staticmethod
     def _connect(path: str) -> sqlite3.Connection:
         conn = sqlite3.connect(path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        # Lets apply_retention() hand pages back; new files only, and it
+        # must precede the WAL switch.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.execute("PRAGMA journal_mode=WAL")
         # Register identifier-expander so FTS5 triggers can call it.
         # Deterministic: same input always yields same output (pure fn).
@@ -620,6 +723,29 @@ class Brain:
             conn.create_function("expand_identifiers", 1, _expand_identifiers)
         return conn
 
+    def _submit_write(self, path: str, conn: sqlite3.Connection, fn,
+                      *, wait: bool = True):
+        """Run ``fn(conn)`` through the shared writer for ``path``.
+
+        Without the app package (CLI use) ``fn`` runs on ``conn`` and
+        commits inline, as every write used to.
+        """
+        try:
+            from app.engines.write_executor import writer_for
+        except ImportError:
+            result = fn(conn)
+            conn.commit()
+            return result
+        return writer_for(path, connect=self._connect).submit(fn, wait=wait)
+
+    def flush_writes(self) -> None:
+        """Wait for queued fire-and-forget writes (search logs) to land."""
+        try:
+            from app.engines.write_executor import writer_for
+        except ImportError:
+            return
+        writer_for(self._brain_db_path, connect=self._connect).flush()
+
     def _check_db_integrity(self) -> None:
         """Run PRAGMA integrity_check on each DB. Raise BrainCorruptError if any fails."""
         for label, conn in (
@@ -722,6 +848,109 @@ class Brain:
                 ON search_feedback(search_id);
             CREATE INDEX IF NOT EXISTS idx_sf_doc
                 ON search_feedback(doc_id);
+            CREATE INDEX IF NOT EXISTS idx_sf_ts
+                ON search_feedback(ts);
+            -- Read position per append-only ingest file (.mulch expertise,
+            -- .overstory logs): the file as last seen, the byte offset
+            -- consumed, records before it and a hash of those bytes —
+            -- all of them for .mulch files, the first and last 4 KiB for
+            -- logs (Brain._prefix_digest).
+            CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                records INTEGER NOT NULL,
+                prefix_sha256 TEXT NOT NULL
+            );
+            -- Daily rollups of searches / search_feedback rows past the
+            -- retention window (apply_retention).
+            CREATE TABLE IF NOT EXISTS search_daily (
+                day TEXT PRIMARY KEY,
+                searches INTEGER DEFAULT 0,
+                empty INTEGER DEFAULT 0,
+                latency_ms_total INTEGER DEFAULT 0,
+                latency_ms_max INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS feedback_daily (
+                day TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                up INTEGER DEFAULT 0,
+                down INTEGER DEFAULT 0,
+                PRIMARY KEY (day, doc_id)
+            );
+            -- One row per indexed source file: whole-file sha256 (what the
+            -- SessionStart hook hashes), its utf-8 size, chunk count, and
+            -- whether the file is staged for graphify. prism_status diffs
+            -- against this instead of per-chunk docs.content_hash.
+            CREATE TABLE IF NOT EXISTS file_manifest (
+                source_file TEXT PRIMARY KEY,
+                file_sha256 TEXT,
+                chunk_count INTEGER NOT NULL DEFAULT 0,
+                staged INTEGER NOT NULL DEFAULT 0,
+                indexed_at TEXT,
+                size_bytes INTEGER
+            );
+            -- Running totals over file_manifest so status counts are a
+            -- single-row read; kept exact by the triggers below.
+            -- ``generation`` bumps whenever a file's hash set changes so
+            -- the sync Merkle tree knows when to rebuild.
+            CREATE TABLE IF NOT EXISTS file_manifest_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                files INTEGER NOT NULL DEFAULT 0,
+                staged INTEGER NOT NULL DEFAULT 0,
+                generation INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT OR IGNORE INTO file_manifest_totals (id) VALUES (0);
+        """)
+        totals_cols = {
+            row[1] for row in self._brain.execute(
+                "PRAGMA table_info(file_manifest_totals)"
+            )
+        }
+        if "generation" not in totals_cols:
+            self._brain.execute(
+                "ALTER TABLE file_manifest_totals "
+                "ADD COLUMN generation INTEGER NOT NULL DEFAULT 0"
+            )
+        manifest_cols = {
+            row[1] for row in self._brain.execute(
+                "PRAGMA table_info(file_manifest)"
+            )
+        }
+        if "size_bytes" not in manifest_cols:
+            # NULL until the file is next indexed (size unknown).
+            self._brain.execute(
+                "ALTER TABLE file_manifest ADD COLUMN size_bytes INTEGER"
+            )
+        self._brain.executescript("""
+            DROP TRIGGER IF EXISTS file_manifest_ai;
+            DROP TRIGGER IF EXISTS file_manifest_ad;
+            DROP TRIGGER IF EXISTS file_manifest_au;
+            CREATE TRIGGER file_manifest_ai
+            AFTER INSERT ON file_manifest BEGIN
+                UPDATE file_manifest_totals
+                   SET files = files + 1,
+                       staged = staged + new.staged,
+                       generation = generation + 1
+                 WHERE id = 0;
+            END;
+            CREATE TRIGGER file_manifest_ad
+            AFTER DELETE ON file_manifest BEGIN
+                UPDATE file_manifest_totals
+                   SET files = files - 1,
+                       staged = staged - old.staged,
+                       generation = generation + 1
+                 WHERE id = 0;
+            END;
+            CREATE TRIGGER file_manifest_au
+            AFTER UPDATE OF file_sha256, staged ON file_manifest BEGIN
+                UPDATE file_manifest_totals
+                   SET staged = staged - old.staged + new.staged,
+                       generation = generation
+                           + (old.file_sha256 IS NOT new.file_sha256)
+                 WHERE id = 0;
+            END;
         """)
         # Migrate existing DBs: add chunk metadata columns if missing
         _meta_cols = [
@@ -743,6 +972,7 @@ class Brain:
                     self._brain.commit()
                 except sqlite3.OperationalError:
                     pass
+        self._backfill_file_manifest()
 
         if self.vector_enabled:
             # Discover the model's native embedding dimension at startup so
@@ -762,6 +992,68 @@ class Brain:
             except Exception:
                 self.vector_enabled = False
 
+    def _backfill_file_manifest(self) -> None:
+        """Seed file_manifest from docs once, for DBs indexed before it existed.
+
+        The whole-file hash comes from the ``::__file__`` / ``::main`` row
+        when it carries a full sha256; anything else (truncated hashes from
+        the local ingest path, entity-only chunking) stays NULL and reads
+        as drifted until the file is refreshed. ``staged`` starts at 0 —
+        GraphService reconciles it against the staging dir.
+        """
+        if self._brain.execute(
+            "SELECT 1 FROM index_meta WHERE key = 'file_manifest'"
+        ).fetchone():
+            return
+        self._brain.execute("""
+            INSERT OR IGNORE INTO file_manifest
+                (source_file, file_sha256, chunk_count, indexed_at)
+            SELECT source_file,
+                   MAX(CASE WHEN (id LIKE '%::__file__' OR id LIKE '%::main')
+                             AND length(content_hash) = 64
+                            THEN content_hash END),
+                   COUNT(*), MAX(indexed_at)
+              FROM docs
+             WHERE source_file IS NOT NULL
+             GROUP BY source_file
+        """)
+        self._brain.execute(
+            "INSERT OR REPLACE INTO index_meta (key, value) "
+            "VALUES ('file_manifest', '1')"
+        )
+        self._brain.commit()
+
+    def _record_file_manifest(
+        self,
+        source_file: str,
+        content: str,
+        staged: Optional[bool] = None,
+    ) -> None:
+        """Upsert one file_manifest row after its chunks are written.
+
+        ``staged=None`` keeps the current flag — the local ingest path
+        never stages for graphify. The caller commits.
+        """
+        import hashlib
+        data = content.encode("utf-8")
+        self._brain.execute(
+            "INSERT INTO file_manifest "
+            "(source_file, file_sha256, chunk_count, staged, indexed_at, "
+            " size_bytes) "
+            "VALUES (?, ?, (SELECT COUNT(*) FROM docs WHERE source_file = ?), "
+            "        ?, ?, ?) "
+            "ON CONFLICT(source_file) DO UPDATE SET "
+            "  file_sha256 = excluded.file_sha256, "
+            "  chunk_count = excluded.chunk_count, "
+            "  staged = COALESCE(?, staged), "
+            "  indexed_at = excluded.indexed_at, "
+            "  size_bytes = excluded.size_bytes",
+            (source_file, hashlib.sha256(data).hexdigest(),
+             source_file, int(bool(staged)),
+             datetime.now(timezone.utc).isoformat(), len(data),
+             None if staged is None else int(staged)),
+        )
+
     def _init_graph_schema(self) -> None:
         self._graph.executescript("""
             CREATE TABLE IF NOT EXISTS entities (
@@ -782,6 +1074,7 @@ class Brain:
             CREATE INDEX IF NOT EXISTS idx_rel_src ON relationships(source_id);
             CREATE INDEX IF NOT EXISTS idx_rel_tgt ON relationships(target_id);
         """)
+        self._entity_fts = _init_entity_fts(self._graph)
 
     def _init_scores_schema(self) -> None:
         self._scores.executescript("""
@@ -1042,9 +1335,18 @@ class Brain:
         )
         self._brain.commit()
 
-    def _purge_deleted(self) -> int:
+    # Purge stats fan out over a thread pool past this many sources
+    # (PRISM_PURGE_STAT_WORKERS, default 8; 1 = serial).
+    _PURGE_PARALLEL_MIN = 256
+
+    def _purge_deleted(self, root: Optional[str] = None) -> int:
         """Remove DB entries for files that no longer exist or are excluded.
 
+        Stats each distinct source_file once (not once per chunk row),
+        in parallel for large indexes, and drops everything in one
+        set-based transaction. Counts and timings land in
+        ``last_purge_stats`` for the drift log line.
+
         Safety: if ZERO indexed source files are reachable from this
         process, the project directory is likely not mounted (common in
         service-mode containers). A 100%-purge decision in that case
@@ -1054,27 +1356,45 @@ class Brain:
         """
         import os as _os
         import sys as _sys
-        rows = self._brain.execute(
-            "SELECT id, source_file FROM docs WHERE source_file IS NOT NULL"
-        ).fetchall()
-        if not rows:
+        import time as _time
+        t0 = _time.perf_counter()
+        sources = [r[0] for r in self._brain.execute(
+            "SELECT DISTINCT source_file FROM docs "
+            "WHERE source_file IS NOT NULL"
+        )]
+        self.last_purge_stats = {"checked": len(sources), "purged": 0,
+                                 "stat_ms": 0.0, "delete_ms": 0.0}
+        if not sources:
             return 0
-        to_purge: list[str] = []
-        reachable = 0
-        for row in rows:
-            sf = row["source_file"]
-            exists = Path(sf).exists()
-            if exists:
-                reachable += 1
-                if not self._should_index(sf):
-                    to_purge.append(sf)
-            else:
-                to_purge.append(sf)
-        if to_purge and reachable == 0:
+
+        def exists(sf: str) -> bool:
+            return (Path(root, sf) if root else Path(sf)).exists()
+
+        try:
+            workers = int(_os.environ.get("PRISM_PURGE_STAT_WORKERS", "8"))
+        except ValueError:
+            workers = 8
+        if workers > 1 and len(sources) >= self._PURGE_PARALLEL_MIN:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                found = list(pool.map(exists, sources, chunksize=64))
+        else:
+            found = [exists(sf) for sf in sources]
+        t1 = _time.perf_counter()
+        self.last_purge_stats["stat_ms"] = round((t1 - t0) * 1000, 1)
+
+        # .mulch expertise files aren't indexable sources, but while they
+        # exist their records belong to the checkpointed log ingest.
+        tracked = {r[0] for r in self._brain.execute(
+            "SELECT path FROM ingest_checkpoints")}
+        to_purge = [sf for sf, ok in zip(sources, found)
+                    if not ok or (not self._should_index(sf)
+                                  and sf not in tracked)]
+        if to_purge and not any(found):
             if _os.environ.get("PRISM_PURGE_FORCE", "").strip() != "1":
                 print(
-                    f"[purge-skip] {len(to_purge)}/{len(rows)} rows look "
-                    f"missing but no indexed file is reachable — "
+                    f"[purge-skip] {len(to_purge)}/{len(sources)} sources "
+                    f"look missing but no indexed file is reachable — "
                     f"skipping purge (project likely unmounted). Set "
                     f"PRISM_PURGE_FORCE=1 to override.",
                     file=_sys.stderr,
@@ -1082,24 +1402,53 @@ class Brain:
                 return 0
         if to_purge:
             self._remove_entries_by_source(to_purge)
+        self.last_purge_stats["purged"] = len(to_purge)
+        self.last_purge_stats["delete_ms"] = round(
+            (_time.perf_counter() - t1) * 1000, 1)
         return len(to_purge)
 
     def _remove_entries_by_source(self, files: list[str]) -> None:
-        for filepath in files:
-            rows = self._brain.execute(
-                "SELECT id FROM docs WHERE source_file = ?", (filepath,)
-            ).fetchall()
-            for row in rows:
-                doc_id = row["id"]
-                if self.vector_enabled:
-                    try:
-                        self._brain.execute(
-                            "DELETE FROM docs_vec WHERE doc_id = ?", (doc_id,)
-                        )
-                    except Exception:
-                        pass
-                self._brain.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
-        self._brain.commit()
+        """Drop every docs / docs_vec / file_manifest / ingest checkpoint
+        row for ``files``.
+
+        Set-based deletes keyed off a TEMP table, committed once.
+        """
+        files = list(dict.fromkeys(f for f in files if f))
+        if not files:
+            return
+        conn = self._brain
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _purge_sources "
+            "(source_file TEXT PRIMARY KEY)"
+        )
+        conn.execute("DELETE FROM _purge_sources")
+        conn.executemany(
+            "INSERT OR IGNORE INTO _purge_sources VALUES (?)",
+            ((f,) for f in files),
+        )
+        if self.vector_enabled:
+            try:
+                conn.execute(
+                    "DELETE FROM docs_vec WHERE doc_id IN ("
+                    "  SELECT id FROM docs WHERE source_file IN "
+                    "  (SELECT source_file FROM _purge_sources))"
+                )
+            except Exception:
+                pass
+        conn.execute(
+            "DELETE FROM docs WHERE source_file IN "
+            "(SELECT source_file FROM _purge_sources)"
+        )
+        conn.execute(
+            "DELETE FROM file_manifest WHERE source_file IN "
+            "(SELECT source_file FROM _purge_sources)"
+        )
+        conn.execute(
+            "DELETE FROM ingest_checkpoints WHERE path IN "
+            "(SELECT source_file FROM _purge_sources)"
+        )
+        conn.execute("DELETE FROM _purge_sources")
+        conn.commit()
 
     # ------------------------------------------------------------------
     # Chunking helpers
@@ -1772,10 +2121,11 @@ class Brain:
                 })
         return out
 
-    def _index_files(self, files: list[str]) -> None:
+    def _index_files(self, files: list[str], root: Optional[str] = None) -> None:
         for filepath in files:
             try:
-                content = Path(filepath).read_text(encoding="utf-8", errors="replace")
+                disk = Path(root, filepath) if root else Path(filepath)
+                content = disk.read_text(encoding="utf-8", errors="replace")
                 domain = Path(filepath).suffix.lstrip(".")
                 chunks = self._chunk_source_file(filepath, content)
                 for chunk in chunks:
@@ -1787,6 +2137,8 @@ class Brain:
                         line_start=chunk["line_start"],
                         line_end=chunk["line_end"],
                     )
+                self._record_file_manifest(filepath, content)
+                self._brain.commit()
             except (IOError, OSError):
                 pass
 
@@ -1832,7 +2184,7 @@ class Brain:
                     )
                 except Exception:
                     pass
-        self._brain.commit()
+        # Committed by the caller once per file / batch, not per chunk.
 
         if source_file:
             self._index_graph(source_file, content)
@@ -1883,6 +2235,7 @@ class Brain:
                 )
 
         self._graph.commit()
+        self.invalidate_graph_cache()
 
     @staticmethod
     def _extract_entities_treesitter(
@@ -2345,10 +2698,20 @@ class Brain:
         results: list[dict] = []
         for token in tokens[:8]:
             try:
-                rows = self._graph.execute(
-                    "SELECT DISTINCT file FROM entities WHERE name LIKE ? LIMIT ?",
-                    (f"%{token}%", limit),
-                ).fetchall()
+                if self._entity_fts:
+                    # Trigram phrase match == case-insensitive substring
+                    # on name or label, served by entities_fts.
+                    rows = self._graph.execute(
+                        "SELECT DISTINCT e.file AS file FROM entities_fts f "
+                        "JOIN entities e ON e.id = f.rowid "
+                        "WHERE entities_fts MATCH ? LIMIT ?",
+                        (f'"{token}"', limit),
+                    ).fetchall()
+                else:
+                    rows = self._graph.execute(
+                        "SELECT DISTINCT file FROM entities WHERE name LIKE ? LIMIT ?",
+                        (f"%{token}%", limit),
+                    ).fetchall()
                 for row in rows:
                     f = row["file"]
                     if f and f not in seen:
@@ -2362,6 +2725,18 @@ class Brain:
         self, entity_name: str, relation: Optional[str], limit: int
     ) -> list[dict]:
         try:
+            adj = self._graph_adjacency()
+            if adj is not None:
+                node = adj.lookup(entity_name)
+                if node is None:
+                    return []
+                out: list[dict] = []
+                for nb, _ in adj.edges(node, relation=relation):
+                    if len(out) >= limit:
+                        break
+                    if adj.files[nb]:
+                        out.append({"doc_id": adj.files[nb], "score": 1.0})
+                return out
             ent = self._graph.execute(
                 "SELECT id FROM entities WHERE name = ? LIMIT 1", (entity_name,)
             ).fetchone()
@@ -2386,6 +2761,25 @@ class Brain:
         except Exception:
             return []
 
+    def _graph_adjacency(self):
+        """Return the project's CSR graph snapshot, or None without NumPy.
+
+        Every traversal goes through this; the SQL joins in each caller
+        remain as the fallback path.
+        """
+        if self._adjacency is None:
+            try:
+                from app.engines.graph_adjacency import AdjacencyCache
+            except ImportError:
+                return None
+            self._adjacency = AdjacencyCache()
+        return self._adjacency.get(self._graph)
+
+    def invalidate_graph_cache(self) -> None:
+        """Drop the CSR snapshot after writing graph.db via ``_graph``."""
+        if self._adjacency is not None:
+            self._adjacency.invalidate()
+
     # ------------------------------------------------------------------
     # Public search API
     # ------------------------------------------------------------------
@@ -2623,9 +3017,11 @@ class Brain:
     ) -> Optional[int]:
         """Persist one search event to the ``searches`` table.
 
-        Returns the new row id (used by search() to stamp each result with a
-        ``search_id`` so feedback can be tied back later). Silent on failure —
-        observability must never break retrieval.
+        Returns the row id (used by search() to stamp each result with a
+        ``search_id`` so feedback can be tied back later). The id comes
+        from a reserved block and the insert is fire-and-forget through
+        the writer, so only one search per block waits on a commit.
+        Silent on failure — observability must never break retrieval.
         """
         try:
             import json as _json
@@ -2639,24 +3035,74 @@ class Brain:
                 }
                 for r in results
             ])
-            cur = self._brain.execute(
-                "INSERT INTO searches (query, domain, domains, mode, rerank, "
-                "context_prefix, chunk_agg, limit_requested, n_results, "
-                "latency_ms, final_top) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    query, domain,
-                    _json.dumps(domains) if domains else None,
-                    mode, rerank or "off",
-                    1 if context_prefix else 0,
-                    1 if chunk_agg else 0,
-                    limit_requested, len(results), latency_ms, final_top,
-                ),
+            row = (
+                query, domain,
+                _json.dumps(domains) if domains else None,
+                mode, rerank or "off",
+                1 if context_prefix else 0,
+                1 if chunk_agg else 0,
+                limit_requested, len(results), latency_ms, final_top,
             )
-            self._brain.commit()
-            return cur.lastrowid
+            search_id = self._next_search_id()
+
+            def write(conn: sqlite3.Connection) -> None:
+                conn.execute(
+                    "INSERT INTO searches (id, query, domain, domains, mode, "
+                    "rerank, context_prefix, chunk_agg, limit_requested, "
+                    "n_results, latency_ms, final_top) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (search_id, *row),
+                )
+
+            self._submit_write(self._brain_db_path, self._brain, write,
+                               wait=False)
+            return search_id
         except Exception:
             return None
 
+    # searches.id values reserved per write transaction.
+    _SEARCH_ID_BLOCK = 256
+
+    def _next_search_id(self) -> int:
+        """A ``searches.id`` no other process or Brain can hand out.
+
+        Ids come from blocks of ``_SEARCH_ID_BLOCK`` reserved by moving
+        the table's AUTOINCREMENT high-water mark (sqlite_sequence) past
+        them in a write transaction. Other Brains reserve after it and
+        plain inserts number after it, while explicit ids at or below
+        it leave it alone — so the id returned to the caller is the id
+        its row lands under.
+        """
+        with self._search_id_lock:
+            if self._search_id_next > self._search_id_end:
+                block = self._SEARCH_ID_BLOCK
+
+                def reserve(conn: sqlite3.Connection) -> int:
+                    seq = conn.execute(
+                        "SELECT seq FROM sqlite_sequence WHERE name = 'searches'"
+                    ).fetchone()
+                    last = conn.execute(
+                        "SELECT MAX(id) FROM searches"
+                    ).fetchone()[0] or 0
+                    start = max(last, seq[0] if seq else 0) + 1
+                    if seq:
+                        conn.execute(
+                            "UPDATE sqlite_sequence SET seq = ? "
+                            "WHERE name = 'searches'", (start + block - 1,))
+                    else:
+                        conn.execute(
+                            "INSERT INTO sqlite_sequence (name, seq) "
+                            "VALUES ('searches', ?)", (start + block - 1,))
+                    return start
+
+                start = self._submit_write(self._brain_db_path, self._brain,
+                                           reserve)
+                self._search_id_next = start
+                self._search_id_end = start + block - 1
+            search_id = self._search_id_next
+            self._search_id_next += 1
+            return search_id
+
     def get_recent_searches(self, limit: int = 50) -> list[dict]:
         """Return the last ``limit`` search events, newest first.
 
@@ -2664,6 +3110,7 @@ class Brain:
         from the ``search_feedback`` table so the UI can surface sentiment
         without a second round-trip.
         """
+        self.flush_writes()
         try:
             rows = self._brain.execute(
                 "SELECT s.id, s.ts, s.query, s.domain, s.domains, s.mode, "
@@ -2673,10 +3120,10 @@ class Brain:
                 "    AS up_count, "
                 "COALESCE(SUM(CASE WHEN f.signal='down' THEN 1 ELSE 0 END), 0) "
                 "    AS down_count "
-                "FROM searches s "
+                "FROM (SELECT * FROM searches ORDER BY id DESC LIMIT ?) s "
                 "LEFT JOIN search_feedback f ON f.search_id = s.id "
                 "GROUP BY s.id "
-                "ORDER BY s.id DESC LIMIT ?",
+                "ORDER BY s.id DESC",
                 (int(limit),),
             ).fetchall()
         except Exception:
@@ -2698,14 +3145,15 @@ class Brain:
         """
         if signal not in ("up", "down"):
             return None
-        try:
-            cur = self._brain.execute(
+        def write(conn: sqlite3.Connection) -> int:
+            return conn.execute(
                 "INSERT INTO search_feedback (search_id, doc_id, signal, note) "
                 "VALUES (?, ?, ?, ?)",
                 (int(search_id), doc_id, signal, note),
-            )
-            self._brain.commit()
-            return cur.lastrowid
+            ).lastrowid
+
+        try:
+            return self._submit_write(self._brain_db_path, self._brain, write)
         except Exception:
             return None
 
@@ -2729,40 +3177,34 @@ class Brain:
     ) -> dict:
         """Return a net signal per doc_id for the consumption layer.
 
-        net = SUM(up) - SUM(down), clamped to [-cap, +cap]. Rows older
-        than ``decay_days`` get weight 0.3 so ancient feedback decays
-        rather than dominating. Silent on error — retrieval must keep
-        working even if feedback data is weird.
+        net = SUM(up) - SUM(down), clamped to [-cap, +cap]. Feedback
+        from days more than ``decay_days`` ago gets weight 0.3 so ancient
+        feedback decays rather than dominating; rolled-up days count the
+        same as raw rows. Silent on error — retrieval must keep working
+        even if feedback data is weird.
         """
         if not doc_ids:
             return {}
         try:
             placeholders = ",".join("?" * len(doc_ids))
             rows = self._brain.execute(
-                f"SELECT doc_id, signal, ts FROM search_feedback "
-                f"WHERE doc_id IN ({placeholders})",
-                list(doc_ids),
+                _FEEDBACK_SQL.format(where=f"AND doc_id IN ({placeholders})"),
+                list(doc_ids) * 2,
             ).fetchall()
         except Exception:
             return {}
         if not rows:
             return {}
-        from datetime import datetime, timezone
-        now = datetime.now(timezone.utc)
+        today = datetime.now(timezone.utc).date()
         out: dict[str, float] = {}
         for r in rows:
             try:
-                ts = datetime.fromisoformat(
-                    (r["ts"] or "").replace(" ", "T")
-                )
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-                age_days = (now - ts).days
+                age_days = (today - datetime.fromisoformat(r["day"]).date()).days
             except Exception:
                 age_days = 0
             w = 0.3 if age_days > decay_days else 1.0
-            delta = w if r["signal"] == "up" else (-w if r["signal"] == "down" else 0)
-            out[r["doc_id"]] = out.get(r["doc_id"], 0.0) + delta
+            out[r["doc_id"]] = (out.get(r["doc_id"], 0.0)
+                                + w * ((r["up"] or 0) - (r["down"] or 0)))
         # Clamp to [-cap, +cap]
         for k in list(out):
             out[k] = max(-cap, min(cap, out[k]))
@@ -2771,27 +3213,110 @@ class Brain:
     def feedback_stats(self) -> dict:
         """Aggregate thumbs up/down counts and per-doc win rates."""
         try:
-            total = self._brain.execute(
-                "SELECT signal, COUNT(*) AS n FROM search_feedback "
-                "GROUP BY signal"
-            ).fetchall()
-            counts = {r["signal"]: r["n"] for r in total}
+            per_doc = (
+                "SELECT doc_id, SUM(down) AS downs, SUM(up) AS ups, "
+                "  SUM(up + down) AS total "
+                f"FROM ({_FEEDBACK_SQL.format(where='')}) GROUP BY doc_id"
+            )
+            counts = self._brain.execute(
+                f"SELECT SUM(ups) AS up, SUM(downs) AS down FROM ({per_doc})"
+            ).fetchone()
             worst = self._brain.execute(
-                "SELECT doc_id, "
-                "  SUM(CASE WHEN signal='down' THEN 1 ELSE 0 END) AS downs, "
-                "  SUM(CASE WHEN signal='up' THEN 1 ELSE 0 END) AS ups, "
-                "  COUNT(*) AS total "
-                "FROM search_feedback GROUP BY doc_id "
-                "HAVING downs > ups ORDER BY downs DESC LIMIT 10"
+                f"{per_doc} HAVING downs > ups ORDER BY downs DESC LIMIT 10"
             ).fetchall()
         except Exception:
             return {"up": 0, "down": 0, "worst": []}
         return {
-            "up": int(counts.get("up", 0)),
-            "down": int(counts.get("down", 0)),
+            "up": int(counts["up"] or 0),
+            "down": int(counts["down"] or 0),
             "worst": [dict(r) for r in worst],
         }
 
+    def search_daily_stats(self, days: int = 30) -> list[dict]:
+        """Per-day search volume and feedback for the last ``days`` days.
+
+        Reads the daily rollups and aggregates the raw rows not yet
+        rolled up, newest day first: ``{day, searches, empty,
+        avg_latency_ms, max_latency_ms, up, down}``.
+        """
+        self.flush_writes()
+        since = f"-{max(0, int(days))} days"
+        try:
+            rows = self._brain.execute(
+                "SELECT day, SUM(searches) AS searches, SUM(empty) AS empty, "
+                "  SUM(latency_total) AS latency_total, "
+                "  MAX(latency_max) AS latency_max FROM ("
+                "  SELECT substr(ts, 1, 10) AS day, COUNT(*) AS searches, "
+                "    SUM(COALESCE(n_results, 0) = 0) AS empty, "
+                "    SUM(COALESCE(latency_ms, 0)) AS latency_total, "
+                "    MAX(COALESCE(latency_ms, 0)) AS latency_max "
+                "  FROM searches WHERE ts >= date('now', ?) "
+                "  GROUP BY substr(ts, 1, 10) "
+                "  UNION ALL "
+                "  SELECT day, searches, empty, latency_ms_total, "
+                "    latency_ms_max FROM search_daily "
+                "  WHERE day >= date('now', ?)"
+                ") GROUP BY day ORDER BY day DESC",
+                (since, since),
+            ).fetchall()
+            feedback = self._brain.execute(
+                "SELECT day, SUM(up) AS up, SUM(down) AS down "
+                f"FROM ({_FEEDBACK_SQL.format(where='')}) "
+                "WHERE day >= date('now', ?) GROUP BY day",
+                (since,),
+            ).fetchall()
+        except Exception:
+            return []
+        signals = {r["day"]: (r["up"] or 0, r["down"] or 0) for r in feedback}
+        out = []
+        for r in rows:
+            up, down = signals.get(r["day"], (0, 0))
+            out.append({
+                "day": r["day"],
+                "searches": r["searches"],
+                "empty": r["empty"] or 0,
+                "avg_latency_ms": round((r["latency_total"] or 0)
+                                        / max(1, r["searches"])),
+                "max_latency_ms": r["latency_max"] or 0,
+                "up": up,
+                "down": down,
+            })
+        return out
+
+    def apply_retention(self, days: int, batch: int = 5000) -> int:
+        """Roll ``searches`` / ``search_feedback`` rows older than ``days``
+        into ``search_daily`` / ``feedback_daily`` and delete them in
+        batches, then vacuum the freed pages.
+
+        Feedback on a rolled-up search stays attached to its doc but no
+        longer to the search row. brain.db files created before
+        incremental auto-vacuum keep their free pages for reuse; they are
+        not converted here since that rewrites the whole index. Returns
+        the number of raw rows removed (0 when ``days`` <= 0 or without
+        the app package).
+        """
+        if days <= 0:
+            return 0
+        try:
+            from app.engines.retention import incremental_vacuum, roll_up
+        except ImportError:
+            return 0
+        self.flush_writes()
+
+        def submit(fn):
+            return self._submit_write(self._brain_db_path, self._brain, fn)
+
+        cutoff = self._brain.execute(
+            "SELECT datetime('now', ?)", (f"-{int(days)} days",),
+        ).fetchone()[0]
+        removed = roll_up(submit, "search_feedback", "ts",
+                          _FEEDBACK_ROLLUP_SQL, cutoff, batch)
+        removed += roll_up(submit, "searches", "ts",
+                           _SEARCH_ROLLUP_SQL, cutoff, batch)
+        if removed:
+            incremental_vacuum(submit)
+        return removed
+
     def _rerank_candidates(
         self, query: str, candidates: list[dict], preset: str,
     ) -> Optional[list[dict]]:
@@ -2905,6 +3430,19 @@ class Brain:
         limit: int = 10,
     ) -> list[dict]:
         """Traverse entity relationships and return related entities."""
+        adj = self._graph_adjacency()
+        if adj is not None:
+            node = adj.lookup(entity)
+            if node is None:
+                return []
+            out: list[dict] = []
+            for nb, rc in adj.edges(node, relation=relation):
+                if len(out) >= limit:
+                    break
+                out.append({"name": adj.names[nb], "kind": adj.kinds[nb],
+                            "file": adj.files[nb],
+                            "relation": adj.relation_name(rc)})
+            return out
         ent_row = self._graph.execute(
             "SELECT id FROM entities WHERE name = ? LIMIT 1", (entity,)
         ).fetchone()
@@ -3001,6 +3539,20 @@ class Brain:
         returned caller names for content.
         """
         try:
+            adj = self._graph_adjacency()
+            if adj is not None:
+                node = adj.lookup(name)
+                if node is None:
+                    return []
+                out: list[dict] = []
+                for nb, rc in adj.edges(node, reverse=True):
+                    if len(out) >= int(limit):
+                        break
+                    out.append({"caller_name": adj.names[nb],
+                                "caller_kind": adj.kinds[nb],
+                                "caller_file": adj.files[nb],
+                                "relation": adj.relation_name(rc)})
+                return out
             tgt = self._graph.execute(
                 "SELECT id FROM entities WHERE name = ? LIMIT 1", (name,),
             ).fetchone()
@@ -3023,14 +3575,37 @@ class Brain:
         entity: str,
         depth: int = 2,
         limit: int = 50,
+        direction: str = "callees",
     ) -> list[dict]:
         """Bounded BFS on the relationships graph starting at ``entity``.
 
         Returns a flat list of edges [{from, to, kind, relation, hop}]
         so the caller can reconstruct either tree or flat views. Hop 0
         is the entity itself; hop 1 is direct callees; etc.
+
+        ``direction="callers"`` walks inbound edges instead (callers of
+        callers). Edges keep caller → callee orientation and ``kind``
+        is the kind of the node reached at that hop.
         """
+        reverse = direction == "callers"
         try:
+            adj = self._graph_adjacency()
+            if adj is not None:
+                node = adj.lookup(entity)
+                if node is None:
+                    return []
+                return [
+                    {"from": adj.names[src], "to": adj.names[tgt],
+                     "kind": adj.kinds[src if reverse else tgt],
+                     "relation": adj.relation_name(rc), "hop": hop}
+                    for src, tgt, rc, hop in adj.bfs(
+                        node, int(depth), int(limit), reverse=reverse,
+                    )
+                ]
+            # SQL fallback: walk relationships by source_id (callees) or
+            # target_id (callers).
+            near, far = (("target_id", "source_id") if reverse
+                         else ("source_id", "target_id"))
             start = self._graph.execute(
                 "SELECT id, name FROM entities WHERE name = ? LIMIT 1",
                 (entity,),
@@ -3045,14 +3620,14 @@ class Brain:
                     break
                 placeholders = ",".join("?" * len(frontier))
                 rows = self._graph.execute(
-                    f"SELECT r.source_id AS src_id, "
-                    f"s.name AS src_name, t.name AS tgt_name, "
-                    f"t.kind AS tgt_kind, t.id AS tgt_id, "
+                    f"SELECT s.name AS src_name, t.name AS tgt_name, "
+                    f"x.kind AS far_kind, r.{far} AS far_id, "
                     f"r.relation AS relation "
                     f"FROM relationships r "
                     f"JOIN entities s ON s.id = r.source_id "
                     f"JOIN entities t ON t.id = r.target_id "
-                    f"WHERE r.source_id IN ({placeholders}) "
+                    f"JOIN entities x ON x.id = r.{far} "
+                    f"WHERE r.{near} IN ({placeholders}) "
                     f"LIMIT ?",
                     (*frontier, int(limit) - len(edges)),
                 ).fetchall()
@@ -3060,30 +3635,175 @@ class Brain:
                 for r in rows:
                     edges.append({
                         "from": r["src_name"], "to": r["tgt_name"],
-                        "kind": r["tgt_kind"], "relation": r["relation"],
+                        "kind": r["far_kind"], "relation": r["relation"],
                         "hop": hop,
                     })
-                    if r["tgt_id"] not in visited:
-                        visited.add(r["tgt_id"])
-                        next_frontier.append(r["tgt_id"])
+                    if r["far_id"] not in visited:
+                        visited.add(r["far_id"])
+                        next_frontier.append(r["far_id"])
                 frontier = next_frontier
             return edges
         except Exception:
             return []
 
+    def shortest_path(
+        self,
+        source: str,
+        target: str,
+        max_depth: int = 6,
+    ) -> list[dict]:
+        """Fewest-hop call path from ``source`` to ``target``.
+
+        Returns the path as edges [{from, to, kind, relation, hop}] in
+        the same shape as call_chain(); empty when either entity is
+        unknown, no path exists within ``max_depth`` hops, or the CSR
+        cache is unavailable.
+        """
+        try:
+            adj = self._graph_adjacency()
+            if adj is None:
+                return []
+            src, tgt = adj.lookup(source), adj.lookup(target)
+            if src is None or tgt is None:
+                return []
+            path = adj.shortest_path(src, tgt, max(1, int(max_depth)))
+            if not path:
+                return []
+            return [
+                {"from": adj.names[a], "to": adj.names[b],
+                 "kind": adj.kinds[b], "relation": adj.relation_name(rc),
+                 "hop": hop}
+                for hop, (a, b, rc) in enumerate(path, start=1)
+            ]
+        except Exception:
+            return []
+
     # ------------------------------------------------------------------
     # Ingest
     # ------------------------------------------------------------------
 
+    def _count_ingest(self, **counts: int) -> None:
+        for key, n in counts.items():
+            self.last_ingest_stats[key] = self.last_ingest_stats.get(key, 0) + n
+
+    # Bytes hashed at each end of a consumed prefix; see _prefix_digest.
+    _CHECKPOINT_WINDOW = 4096
+
+    @classmethod
+    def _prefix_digest(cls, f, offset: int, full: bool = False) -> str:
+        """sha256 of the first and last ``_CHECKPOINT_WINDOW`` bytes of
+        ``f[:offset]`` (the length included), or of all of it when
+        ``full``. The windows catch a rewritten or truncated-and-regrown
+        log at O(1) cost; files that are edited in place need ``full``.
+        """
+        import hashlib
+
+        w = cls._CHECKPOINT_WINDOW
+        h = hashlib.sha256(str(offset).encode())
+        f.seek(0)
+        if full:
+            left = offset
+            while left > 0:
+                block = f.read(min(1 << 20, left))
+                if not block:
+                    break
+                h.update(block)
+                left -= len(block)
+            return h.hexdigest()
+        h.update(f.read(min(w, offset)))
+        if offset > w:
+            f.seek(max(w, offset - w))
+            h.update(f.read(offset - max(w, offset - w)))
+        return h.hexdigest()
+
+    def _read_appended(
+        self, path: Path, full_prefix: bool = False,
+    ) -> Optional[tuple[list[str], int, int, Optional[tuple]]]:
+        """Lines of an append-only ``path`` not consumed at its checkpoint.
+
+        Returns None when size and mtime match the checkpoint (or the
+        file can't be read); otherwise ``(lines, records_before,
+        offset, pending)`` where ``records_before`` counts the records
+        already consumed (0 when the file was rewritten or truncated
+        and is read from the start) and ``pending`` is the checkpoint
+        to pass to :meth:`_save_checkpoint` once the lines are ingested.
+        A grown file whose prefix windows still match is read from the
+        checkpoint offset only; ``full_prefix`` compares the whole
+        consumed prefix instead, for files rewritten in place. A
+        trailing line without a newline is left for the next read unless
+        it is already valid JSON.
+        """
+        key = str(path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        cp = self._brain.execute(
+            "SELECT size, mtime_ns, offset, records, prefix_sha256 "
+            "FROM ingest_checkpoints WHERE path = ?", (key,),
+        ).fetchone()
+        if cp is not None and (cp["size"], cp["mtime_ns"]) == (
+            st.st_size, st.st_mtime_ns,
+        ):
+            self._count_ingest(files_skipped=1, records_skipped=cp["records"])
+            return None
+        try:
+            with path.open("rb") as f:
+                start, records = 0, 0
+                # Same size with a new mtime is a rewrite, not an append.
+                if (cp is not None and cp["size"] < st.st_size
+                        and cp["offset"] <= st.st_size
+                        and self._prefix_digest(f, cp["offset"],
+                                                full_prefix)
+                        == cp["prefix_sha256"]):
+                    start, records = cp["offset"], cp["records"]
+                f.seek(start)
+                data = f.read()
+                size = start + len(data)
+                cut = data.rfind(b"\n") + 1
+                if data[cut:].strip():
+                    try:
+                        json.loads(data[cut:])
+                        cut = len(data)
+                    except ValueError:
+                        pass
+                end = start + cut
+                digest = self._prefix_digest(f, end, full_prefix)
+        except OSError:
+            return None
+        if start:
+            self._count_ingest(files_tailed=1, records_skipped=records)
+        else:
+            self._count_ingest(files_read=1)
+
+        lines = data[:cut].decode("utf-8", errors="replace").splitlines()
+        pending = (key, size, st.st_mtime_ns, end, digest)
+        return lines, records, start, pending
+
+    def _save_checkpoint(self, pending: tuple, records: int) -> None:
+        key, size, mtime_ns, offset, digest = pending
+        self._brain.execute(
+            "INSERT OR REPLACE INTO ingest_checkpoints "
+            "(path, size, mtime_ns, offset, records, prefix_sha256) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, size, mtime_ns, offset, records, digest),
+        )
+
     def _ingest_mulch_expertise(self) -> int:
         """Ingest .mulch/expertise/*.jsonl files into Brain with domain='expertise'.
 
         Each JSONL record is indexed as a separate document. Content is built from
         description, content, and resolution fields (whichever are present).
         The domain name from the filename stem is embedded in the content.
+        Files are tailed from their ingest checkpoint: unchanged files are
+        not read and appended files only parse the new records. Commits
+        every ``INDEX_BATCH_SIZE`` records so a large file doesn't hold
+        the brain.db write lock against searches.
 
         Returns count of newly indexed records.
         """
+        from app.config import INDEX_BATCH_SIZE
+
         expertise_dir = Path(".mulch") / "expertise"
         if not expertise_dir.exists():
             return 0
@@ -3091,10 +3811,12 @@ class Brain:
         count = 0
         for jsonl_file in sorted(expertise_dir.glob("*.jsonl")):
             domain_name = jsonl_file.stem  # e.g. "brain", "cli", "hooks"
-            try:
-                lines = jsonl_file.read_text(encoding="utf-8", errors="replace").splitlines()
-            except (IOError, OSError):
+            # Expertise files are rewritten in place (corrected text
+            # keeps its length), so the whole consumed prefix is checked.
+            appended = self._read_appended(jsonl_file, full_prefix=True)
+            if appended is None:
                 continue
+            lines, records, _, pending = appended
             for raw in lines:
                 raw = raw.strip()
                 if not raw:
@@ -3109,6 +3831,9 @@ class Brain:
                 rec_id = record.get("id") or ""
                 if not rec_id:
                     continue
+                records += 1
+                if records % max(1, INDEX_BATCH_SIZE) == 0:
+                    self._brain.commit()
 
                 doc_id = f"expertise:{domain_name}:{rec_id}"
                 parts: list[str] = [f"[expertise:{domain_name}]"]
@@ -3131,6 +3856,11 @@ class Brain:
                     domain="expertise",
                 ):
                     count += 1
+                    self._count_ingest(records_ingested=1)
+                else:
+                    self._count_ingest(records_unchanged=1)
+            self._save_checkpoint(pending, records)
+            self._brain.commit()
         return count
 
     def _ingest_overstory_logs(self) -> int:
@@ -3139,6 +3869,8 @@ class Brain:
         Each NDJSON file is indexed as one document. Content is built from
         event fields (timestamp, event, agentName, data). Uses source_file=None
         to avoid _purge_deleted() conflicts (.overstory is an excluded path segment).
+        Logs are tailed from their ingest checkpoint: new events are
+        appended to the stored document instead of rebuilding it.
 
         Returns count of newly indexed records.
         """
@@ -3148,10 +3880,27 @@ class Brain:
 
         count = 0
         for ndjson_file in sorted(logs_dir.rglob("*.ndjson")):
-            try:
-                lines = ndjson_file.read_text(encoding="utf-8", errors="replace").splitlines()
-            except (IOError, OSError):
+            doc_id = f"sessions:{ndjson_file}"
+            appended = self._read_appended(ndjson_file)
+            if appended is None:
                 continue
+            lines, records, offset, pending = appended
+            existing = None
+            if offset:
+                existing = self._brain.execute(
+                    "SELECT content FROM docs WHERE id = ?", (doc_id,),
+                ).fetchone()
+                if existing is None and records:
+                    # Document gone since the checkpoint: rebuild it.
+                    self._count_ingest(files_tailed=-1, records_skipped=-records)
+                    self._brain.execute(
+                        "DELETE FROM ingest_checkpoints WHERE path = ?",
+                        (str(ndjson_file),),
+                    )
+                    appended = self._read_appended(ndjson_file)
+                    if appended is None:
+                        continue
+                    lines, records, offset, pending = appended
 
             events = []
             for raw in lines:
@@ -3165,12 +3914,17 @@ class Brain:
                 except json.JSONDecodeError:
                     continue
 
+            records += len(events)
             if not events:
+                self._save_checkpoint(pending, records)
+                self._brain.commit()
                 continue
 
             # Build searchable content from event fields
-            rel = str(ndjson_file)
-            parts: list[str] = [f"[sessions] {ndjson_file.parent.name} {ndjson_file.stem}"]
+            if existing is not None:
+                parts: list[str] = [existing["content"]]
+            else:
+                parts = [f"[sessions] {ndjson_file.parent.name} {ndjson_file.stem}"]
             for event in events:
                 ts = event.get("timestamp", "")[:19]
                 ev = event.get("event", "")
@@ -3188,13 +3942,19 @@ class Brain:
                 if line_parts:
                     parts.append(" ".join(line_parts))
 
-            doc_id = f"sessions:{rel}"
             content = "\n".join(parts)
             # source_file=None: .overstory is excluded from _should_index(), so
             # passing the real path would cause _purge_deleted() to remove this entry.
             if self._ingest_single(doc_id, content, source_file=None, domain="sessions"):
                 count += 1
+                self._count_ingest(records_ingested=len(events))
+            else:
+                self._count_ingest(records_unchanged=len(events))
+            self._save_checkpoint(pending, records)
+            # Per file, so searches aren't blocked behind the whole pass.
+            self._brain.commit()
 
+        self._brain.commit()
         return count
 
     def ingest(self, sources: list[str]) -> int:
@@ -3218,6 +3978,8 @@ class Brain:
                         line_end=chunk["line_end"],
                     ):
                         count += 1
+                self._record_file_manifest(source, content)
+                self._brain.commit()
             elif p.is_dir():
                 for child in p.rglob("*"):
                     if child.is_file() and self._should_index(str(child)):
@@ -3236,52 +3998,68 @@ class Brain:
                                     line_end=chunk["line_end"],
                                 ):
                                     count += 1
+                            self._record_file_manifest(rel, content)
+                            self._brain.commit()
                         except (IOError, OSError):
                             pass
+        self.last_ingest_stats = {}
         count += self._ingest_mulch_expertise()
         count += self._ingest_overstory_logs()
         self._purge_deleted()
         self._update_last_index_timestamp()
         return count
 
-    def incremental_reindex(self) -> int:
-        """Re-index only files changed since last index. Returns count reindexed."""
+    def incremental_reindex(self, root: Optional[str] = None) -> int:
+        """Re-index only files changed since last index. Returns count reindexed.
+
+        The polling path: one ``git status --porcelain=v2 -z`` in ``root``
+        (the process cwd when None) lists modified, added, renamed and
+        untracked files against HEAD. A file watcher feeding
+        :meth:`reindex_paths` makes this a periodic safety net. Counts and
+        timings go to ``last_reindex_stats``.
+        """
+        import time as _time
+        t0 = _time.perf_counter()
         try:
-            changed_out = subprocess.run(
-                ["git", "diff", "--name-only", "--diff-filter=ACMRD", "HEAD"],
-                capture_output=True, text=True,
-            ).stdout.strip()
-            deleted_out = subprocess.run(
-                ["git", "diff", "--name-only", "--diff-filter=D", "HEAD"],
-                capture_output=True, text=True,
-            ).stdout.strip()
-            untracked_out = subprocess.run(
-                ["git", "ls-files", "--others", "--exclude-standard"],
-                capture_output=True, text=True,
-            ).stdout.strip()
-        except (FileNotFoundError, subprocess.SubprocessError):
-            changed_out, deleted_out, untracked_out = "", "", ""
-
-        changed = changed_out.split("\n") if changed_out else []
-        deleted = deleted_out.split("\n") if deleted_out else []
-        untracked = untracked_out.split("\n") if untracked_out else []
-
-        # Remove entries for explicitly deleted files
-        deleted_indexed = [f for f in deleted if f]
-        if deleted_indexed:
-            self._remove_entries_by_source(deleted_indexed)
-
-        to_index = [
-            f for f in changed + untracked
-            if f and self._should_index(f) and Path(f).exists()
-        ]
+            out = subprocess.run(
+                ["git", "status", "--porcelain=v2", "-z",
+                 "--untracked-files=all"],
+                capture_output=True, cwd=root,
+            ).stdout
+        except (FileNotFoundError, OSError, subprocess.SubprocessError):
+            out = b""
+        changed, deleted = _parse_porcelain_v2(out)
+
+        n = self.reindex_paths(changed + deleted, root=root)
+        self._purge_deleted(root=root)
+        self._update_last_index_timestamp()
+        self.last_reindex_stats = dict(
+            self.last_purge_stats, reindexed=n,
+            total_ms=round((_time.perf_counter() - t0) * 1000, 1),
+        )
+        return n
 
+    def reindex_paths(self, paths: list[str], root: Optional[str] = None) -> int:
+        """Re-index ``paths`` (relative to ``root``) as they are on disk now.
+
+        Paths that no longer exist lose their entries; indexable ones that
+        do are re-chunked. Returns the count re-indexed.
+        """
+        base = Path(root) if root else None
+        gone: list[str] = []
+        to_index: list[str] = []
+        for f in dict.fromkeys(p for p in paths if p):
+            disk = base / f if base is not None else Path(f)
+            if not disk.exists():
+                gone.append(f)
+            elif self._should_index(f):
+                to_index.append(f)
+
+        if gone:
+            self._remove_entries_by_source(gone)
         if to_index:
             self._remove_entries_by_source(to_index)
-            self._index_files(to_index)
-
-        self._purge_deleted()
-        self._update_last_index_timestamp()
+            self._index_files(to_index, root=root)
         return len(to_index)
 
     # ------------------------------------------------------------------
@@ -3351,8 +4129,11 @@ class Brain:
         """LL-06 core — rank variants by CUPED-weighted quality on the
         top-k cosine-similar past tasks. Returns None when no variant
         has crossed the sample threshold (caller falls back)."""
+        from app.engines.task_vectors import task_vectors_for
+
         neighbors = _similar_task_ids(
             self._tasks, task_id, k=self._SIMILAR_TASK_K,
+            vectors=task_vectors_for(self._tasks_db_path),
         )
         # Drop neighbors below the similarity floor so cross-cluster
         # tasks with high quality don't dominate via the weighted mean.
@@ -3433,43 +4214,46 @@ class Brain:
         score = self._compute_psp_score(persona, step_id, metrics)
         ts = metrics.get("timestamp") or datetime.now(timezone.utc).isoformat()
 
-        self._scores.execute(
-            "INSERT OR REPLACE INTO prompt_scores "
-            "(prompt_id, persona, step_id, score, tokens_used, context_tokens, "
-            " duration_s, retries, difficulty, tests_passed, coverage_pct, "
-            " traceability_pct, gate_passed, probe_accuracy, timestamp) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (
-                prompt_id, persona, step_id, score,
-                metrics.get("tokens_used"), metrics.get("context_tokens"),
-                metrics.get("duration_s"), metrics.get("retries"),
-                metrics.get("difficulty"), metrics.get("tests_passed"),
-                metrics.get("coverage_pct"), metrics.get("traceability_pct"),
-                metrics.get("gate_passed"), metrics.get("probe_accuracy"), ts,
-            ),
-        )
-        agg = self._scores.execute(
-            "SELECT avg_score, total_runs FROM score_aggregates "
-            "WHERE prompt_id = ? AND persona = ? AND step_id = ?",
-            (prompt_id, persona, step_id),
-        ).fetchone()
-        if agg is None:
-            self._scores.execute(
-                "INSERT INTO score_aggregates "
-                "(prompt_id, persona, step_id, avg_score, total_runs) "
-                "VALUES (?, ?, ?, ?, 1)",
-                (prompt_id, persona, step_id, score),
+        # Score row and running aggregate in one transaction.
+        def write(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT OR REPLACE INTO prompt_scores "
+                "(prompt_id, persona, step_id, score, tokens_used, context_tokens, "
+                " duration_s, retries, difficulty, tests_passed, coverage_pct, "
+                " traceability_pct, gate_passed, probe_accuracy, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    prompt_id, persona, step_id, score,
+                    metrics.get("tokens_used"), metrics.get("context_tokens"),
+                    metrics.get("duration_s"), metrics.get("retries"),
+                    metrics.get("difficulty"), metrics.get("tests_passed"),
+                    metrics.get("coverage_pct"), metrics.get("traceability_pct"),
+                    metrics.get("gate_passed"), metrics.get("probe_accuracy"), ts,
+                ),
             )
-        else:
-            n = agg["total_runs"] + 1
-            new_avg = (agg["avg_score"] * agg["total_runs"] + score) / n
-            self._scores.execute(
-                "UPDATE score_aggregates "
-                "SET avg_score = ?, total_runs = ?, last_updated = datetime('now') "
+            agg = conn.execute(
+                "SELECT avg_score, total_runs FROM score_aggregates "
                 "WHERE prompt_id = ? AND persona = ? AND step_id = ?",
-                (new_avg, n, prompt_id, persona, step_id),
-            )
-        self._scores.commit()
+                (prompt_id, persona, step_id),
+            ).fetchone()
+            if agg is None:
+                conn.execute(
+                    "INSERT INTO score_aggregates "
+                    "(prompt_id, persona, step_id, avg_score, total_runs) "
+                    "VALUES (?, ?, ?, ?, 1)",
+                    (prompt_id, persona, step_id, score),
+                )
+            else:
+                n = agg["total_runs"] + 1
+                new_avg = (agg["avg_score"] * agg["total_runs"] + score) / n
+                conn.execute(
+                    "UPDATE score_aggregates "
+                    "SET avg_score = ?, total_runs = ?, last_updated = datetime('now') "
+                    "WHERE prompt_id = ? AND persona = ? AND step_id = ?",
+                    (new_avg, n, prompt_id, persona, step_id),
+                )
+
+        self._submit_write(self._scores_db_path, self._scores, write)
 
         outcomes_file = Path(self._scores_db_path).parent / "outcomes.jsonl"
         record = {"prompt_id": prompt_id, "persona": persona, "step_id": step_id,
@@ -3607,6 +4391,43 @@ class Brain:
 # CLI entrypoint
 # ---------------------------------------------------------------------------
 
+def _parse_porcelain_v2(out: bytes) -> tuple[list[str], list[str]]:
+    """``(changed, deleted)`` paths from ``git status --porcelain=v2 -z``.
+
+    Ordinary (``1``), renamed/copied (``2``, followed by the original
+    path as its own NUL-terminated field), unmerged (``u``) and untracked
+    (``?``) entries count as changed unless their XY status has a ``D``;
+    a rename's original path counts as deleted.
+    """
+    changed: list[str] = []
+    deleted: list[str] = []
+    fields = out.decode("utf-8", "surrogateescape").split("\0")
+    i = 0
+    while i < len(fields):
+        entry = fields[i]
+        i += 1
+        if not entry:
+            continue
+        kind = entry[0]
+        if kind == "?":
+            changed.append(entry[2:])
+            continue
+        # Header fields before the path: 1 -> 8, 2 -> 9, u -> 10.
+        n_fields = {"1": 8, "2": 9, "u": 10}.get(kind)
+        if n_fields is None:
+            continue
+        parts = entry.split(" ", n_fields)
+        if len(parts) <= n_fields:
+            continue
+        path = parts[n_fields]
+        (deleted if "D" in parts[1] else changed).append(path)
+        if kind == "2":
+            if i < len(fields) and parts[8].startswith("R"):
+                deleted.append(fields[i])
+            i += 1
+    return changed, deleted
+
+
 def _cli_source_dirs() -> list[str]:
     """Return source directories to index, mirroring brain_bootstrap logic.
 
@@ -3639,6 +4460,12 @@ def _cmd_init(brain: "Brain") -> int:
     else:
         mode = "BM25+GraphRAG"
     print(f"Brain: indexed {count} documents from {len(sources)} source(s) (mode: {mode})")
+    st = brain.last_ingest_stats
+    if st:
+        print(f"Brain: mulch/overstory records ingested "
+              f"{st.get('records_ingested', 0)}, unchanged "
+              f"{st.get('records_unchanged', 0)}, skipped via checkpoint "
+              f"{st.get('records_skipped', 0)}")
     return 0
 
 
@@ -0,0 +1,275 @@
+"""In-memory CSR adjacency over graph.db for multi-hop traversals.
+
+The Brain graph API used to issue one SQL join per hop (``call_chain``
+ran a fresh ``IN (...)`` query per BFS level). On graphs with ~500k
+edges deep chains took seconds. This module snapshots ``entities`` and
+``relationships`` into compressed-sparse-row arrays — forward and
+reverse — plus a name → node dict, so every traversal is pure array
+indexing after a single load.
+
+Lifecycle:
+  * Loaded lazily on the first traversal for a project.
+  * Invalidated explicitly by writers that share the Brain's graph
+    connection (``Brain._index_graph``, ``BrainService.index_doc``), and
+    implicitly via ``PRAGMA data_version`` for writers on other
+    connections (``GraphService.rebuild`` → ``_import_graph_json``).
+
+NumPy is required; callers treat ``AdjacencyCache.get`` returning
+``None`` as "fall back to SQL".
+
+[Used by: app.engines.brain_engine.Brain graph API]
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Iterator, Optional
+
+
+class GraphAdjacency:
+    """Immutable CSR snapshot of one project's graph.db.
+
+    Nodes are dense indices ``0..n-1`` in entity-id order. ``names``,
+    ``kinds`` and ``files`` are parallel lists; relation strings are
+    interned into ``relations`` and edges carry the integer code.
+    """
+
+    def __init__(
+        self,
+        entity_ids: list[int],
+        names: list[str],
+        kinds: list[str],
+        files: list[str],
+        edge_src: list[int],
+        edge_tgt: list[int],
+        edge_rel: list[Optional[str]],
+    ) -> None:
+        import numpy as np
+
+        self.names = names
+        self.kinds = kinds
+        self.files = files
+        n = len(entity_ids)
+        self.n_nodes = n
+
+        # First occurrence wins so lookups match the old
+        # ``WHERE name = ? LIMIT 1`` (lowest rowid via idx_ent_name).
+        self._by_name: dict[str, int] = {}
+        for idx, name in enumerate(names):
+            self._by_name.setdefault(name, idx)
+
+        rel_codes: dict[Optional[str], int] = {}
+        codes = [rel_codes.setdefault(r, len(rel_codes)) for r in edge_rel]
+        self.relations: list[Optional[str]] = list(rel_codes)
+        self._rel_code = rel_codes
+
+        ids = np.asarray(entity_ids, dtype=np.int64)
+        src_ids = np.asarray(edge_src, dtype=np.int64)
+        tgt_ids = np.asarray(edge_tgt, dtype=np.int64)
+        rel = np.asarray(codes, dtype=np.int32)
+
+        # Map entity ids -> dense indices; drop edges whose endpoint row
+        # no longer exists (relationships has no enforced FK).
+        src = np.searchsorted(ids, src_ids)
+        tgt = np.searchsorted(ids, tgt_ids)
+        ok = (src < n) & (tgt < n)
+        ok[ok] &= (ids[src[ok]] == src_ids[ok]) & (ids[tgt[ok]] == tgt_ids[ok])
+        src, tgt, rel = src[ok], tgt[ok], rel[ok]
+        self.n_edges = int(src.size)
+
+        self._fwd_ptr, self._fwd_idx, self._fwd_rel = _csr(src, tgt, rel, n)
+        self._rev_ptr, self._rev_idx, self._rev_rel = _csr(tgt, src, rel, n)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> "GraphAdjacency":
+        """Read the full graph from ``conn`` in two sequential scans."""
+        ent = conn.execute(
+            "SELECT id, name, kind, file FROM entities ORDER BY id"
+        ).fetchall()
+        rel = conn.execute(
+            "SELECT source_id, target_id, relation FROM relationships"
+        ).fetchall()
+        return cls(
+            [r[0] for r in ent], [r[1] for r in ent],
+            [r[2] for r in ent], [r[3] for r in ent],
+            [r[0] for r in rel], [r[1] for r in rel], [r[2] for r in rel],
+        )
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self._by_name.get(name)
+
+    def relation_name(self, code: int) -> Optional[str]:
+        return self.relations[code]
+
+    def edges(
+        self,
+        node: int,
+        *,
+        reverse: bool = False,
+        relation: Optional[str] = None,
+    ) -> Iterator[tuple[int, int]]:
+        """Yield ``(neighbor, relation_code)`` for one node.
+
+        Forward edges are node → callee; ``reverse=True`` walks
+        caller → node instead.
+        """
+        if reverse:
+            ptr, idx, rel = self._rev_ptr, self._rev_idx, self._rev_rel
+        else:
+            ptr, idx, rel = self._fwd_ptr, self._fwd_idx, self._fwd_rel
+        lo, hi = int(ptr[node]), int(ptr[node + 1])
+        if lo == hi:
+            return
+        want: Optional[int] = None
+        if relation is not None:
+            want = self._rel_code.get(relation)
+            if want is None:
+                return
+        for nb, rc in zip(idx[lo:hi].tolist(), rel[lo:hi].tolist()):
+            if want is None or rc == want:
+                yield nb, rc
+
+    # ------------------------------------------------------------------
+    # Traversals
+    # ------------------------------------------------------------------
+
+    def bfs(
+        self,
+        start: int,
+        depth: int,
+        limit: int,
+        *,
+        reverse: bool = False,
+    ) -> list[tuple[int, int, int, int]]:
+        """Bounded BFS returning ``(src, tgt, relation_code, hop)`` edges.
+
+        Every edge out of a frontier node is reported (including edges
+        into already-visited nodes) until ``limit`` is reached; only
+        unvisited nodes join the next frontier. Edge direction is always
+        caller → callee, so reverse walks report ``(caller, node, ...)``.
+        """
+        visited = {start}
+        frontier = [start]
+        out: list[tuple[int, int, int, int]] = []
+        for hop in range(1, max(1, int(depth)) + 1):
+            if not frontier or len(out) >= limit:
+                break
+            nxt: list[int] = []
+            for node in frontier:
+                for nb, rc in self.edges(node, reverse=reverse):
+                    if len(out) >= limit:
+                        break
+                    out.append((nb, node, rc, hop) if reverse
+                               else (node, nb, rc, hop))
+                    if nb not in visited:
+                        visited.add(nb)
+                        nxt.append(nb)
+                if len(out) >= limit:
+                    break
+            frontier = nxt
+        return out
+
+    def shortest_path(
+        self,
+        source: int,
+        target: int,
+        max_depth: int,
+    ) -> Optional[list[tuple[int, int, int]]]:
+        """Fewest-hop directed path ``source`` → ``target``.
+
+        Level-synchronous BFS: each hop expands the whole frontier with
+        one vectorised gather over the CSR arrays. Returns the path as
+        ``[(src, tgt, relation_code), ...]`` (empty when source ==
+        target) or ``None`` when no path exists within ``max_depth``.
+        """
+        import numpy as np
+
+        if source == target:
+            return []
+        parent = np.full(self.n_nodes, -1, dtype=np.int64)
+        via = np.zeros(self.n_nodes, dtype=np.int32)
+        parent[source] = source
+        frontier = np.asarray([source], dtype=np.int64)
+        for _ in range(max_depth):
+            lo, hi = self._fwd_ptr[frontier], self._fwd_ptr[frontier + 1]
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                return None
+            pos = (np.repeat(hi - np.cumsum(counts), counts)
+                   + np.arange(total))
+            nbrs = self._fwd_idx[pos].astype(np.int64)
+            src = np.repeat(frontier, counts)
+            fresh = parent[nbrs] < 0
+            nbrs, src, rels = nbrs[fresh], src[fresh], self._fwd_rel[pos][fresh]
+            nbrs, first = np.unique(nbrs, return_index=True)
+            parent[nbrs] = src[first]
+            via[nbrs] = rels[first]
+            if parent[target] >= 0:
+                path: list[tuple[int, int, int]] = []
+                cur = target
+                while cur != source:
+                    prev = int(parent[cur])
+                    path.append((prev, cur, int(via[cur])))
+                    cur = prev
+                path.reverse()
+                return path
+            frontier = nbrs
+        return None
+
+
+def _csr(src, tgt, rel, n: int):
+    """Sort edges by (src, tgt) and return ``(indptr, indices, relations)``."""
+    import numpy as np
+
+    order = np.lexsort((tgt, src))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    if src.size:
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, tgt[order].astype(np.int32), rel[order]
+
+
+class AdjacencyCache:
+    """Lazily (re)loaded :class:`GraphAdjacency` for one graph connection.
+
+    Thread-safe: concurrent traversals share one snapshot; the first
+    caller after an invalidation pays the reload.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._adj: Optional[GraphAdjacency] = None
+        self._data_version: Optional[int] = None
+        self._dirty = True
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale — call after writing through the
+        same connection passed to :meth:`get` (``data_version`` only
+        moves for commits made by *other* connections)."""
+        self._dirty = True
+
+    def get(self, conn: sqlite3.Connection) -> Optional[GraphAdjacency]:
+        """Return a current snapshot, or ``None`` when NumPy is missing."""
+        try:
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error:
+            version = None
+        with self._lock:
+            if (self._adj is not None and not self._dirty
+                    and version == self._data_version):
+                return self._adj
+            try:
+                # Clear before loading so an invalidate() racing with the
+                # load leaves the cache dirty for the next caller.
+                self._dirty = False
+                self._adj = GraphAdjacency.load(conn)
+                self._data_version = version
+            except ImportError:
+                self._dirty = True
+                return None
+            return self._adj
@@ -0,0 +1,144 @@
+"""MinHash/LSH candidate index for near-duplicate text.
+
+Duplicate checks used to compare every pair of entries with
+``difflib.SequenceMatcher`` — quadratic per domain on the governance
+timer, linear per ``MemoryService.store``. :class:`NearDupIndex` keeps a
+MinHash signature of each text's byte 3-grams in LSH buckets
+(32 bands of 3 rows), so a lookup only returns keys that share a
+bucket with the query. Callers then confirm candidates with
+:func:`similar`, which is the same ``SequenceMatcher`` ratio test as
+before behind its cheap upper bounds, so the threshold semantics are
+unchanged; LSH only decides which pairs get compared.
+
+LSH is approximate: with these band settings about 0.1% of pairs at
+ratio >= 0.85 share no bucket and are never compared. Indexes holding at
+most ``EXACT_SCAN_MAX`` keys skip LSH and return every key, so small
+domains — where a miss is most visible and a full scan costs little —
+get the exact pairwise result; larger ones accept the rare miss.
+
+Signatures use NumPy when it is installed and plain Python otherwise.
+
+[Used by: app.services.memory_service (store dedup),
+app.services.governance (duplicate rule)]
+"""
+
+from __future__ import annotations
+
+import random
+from difflib import SequenceMatcher
+from typing import Hashable, Iterable, Optional
+
+_PRIME = (1 << 31) - 1
+_NUM_PERM = 96
+_BANDS = 32
+_ROWS = _NUM_PERM // _BANDS
+_SHINGLE = 3
+# Indexes this small return every key as a candidate (no LSH misses).
+EXACT_SCAN_MAX = 64
+
+_rng = random.Random(0x5EED)
+_A = [_rng.randrange(1, _PRIME) for _ in range(_NUM_PERM)]
+_B = [_rng.randrange(0, _PRIME) for _ in range(_NUM_PERM)]
+
+try:
+    import numpy as _np
+
+    _A_NP = _np.array(_A, dtype=_np.uint64)[:, None]
+    _B_NP = _np.array(_B, dtype=_np.uint64)[:, None]
+except ImportError:  # pragma: no cover — NumPy is in requirements.txt
+    _np = None
+
+
+def _normalize(text: str) -> bytes:
+    data = " ".join(text.lower().split()).encode("utf-8")
+    return data.ljust(_SHINGLE)  # short texts still get one shingle
+
+
+def signature(text: str) -> tuple[int, ...]:
+    """MinHash signature of ``text`` (case and whitespace folded).
+
+    Each byte 3-gram is packed into a 24-bit integer, which the
+    universal hashes ``(a*x + b) mod p`` take directly.
+    """
+    data = _normalize(text)
+    if _np is not None:
+        b = _np.frombuffer(data, dtype=_np.uint8).astype(_np.uint64)
+        grams = _np.unique((b[:-2] << 16) | (b[1:-1] << 8) | b[2:])
+        return tuple(((_A_NP * grams[None, :] + _B_NP) % _PRIME)
+                     .min(axis=1).tolist())
+    grams = {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2]
+             for i in range(len(data) - 2)}
+    return tuple(min((a * x + b) % _PRIME for x in grams)
+                 for a, b in zip(_A, _B))
+
+
+def _bands(sig: tuple[int, ...]) -> list[tuple[int, ...]]:
+    return [sig[i * _ROWS:(i + 1) * _ROWS] for i in range(_BANDS)]
+
+
+def similar(a: str, b: str, threshold: float, *, strict: bool = False) -> bool:
+    """``SequenceMatcher(None, a, b).ratio() >= threshold`` (``>`` when
+    ``strict``), skipping the full ratio when an upper bound rules it out."""
+    sm = SequenceMatcher(None, a, b)
+    for ratio in (sm.real_quick_ratio, sm.quick_ratio, sm.ratio):
+        r = ratio()
+        if r < threshold or (strict and r == threshold):
+            return False
+    return True
+
+
+class NearDupIndex:
+    """LSH buckets over MinHash signatures, keyed by caller ids.
+
+    Not thread-safe; owners guard it with their own lock.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: list[dict[tuple[int, ...], set]] = [
+            {} for _ in range(_BANDS)
+        ]
+        self._sigs: dict[Hashable, tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._sigs
+
+    def add(self, key: Hashable, text: str,
+            sig: Optional[tuple[int, ...]] = None) -> None:
+        """Index ``text`` under ``key``, replacing any earlier text."""
+        self.discard(key)
+        sig = sig or signature(text)
+        self._sigs[key] = sig
+        for band, bucket in zip(_bands(sig), self._buckets):
+            bucket.setdefault(band, set()).add(key)
+
+    def discard(self, key: Hashable) -> None:
+        sig = self._sigs.pop(key, None)
+        if sig is None:
+            return
+        for band, bucket in zip(_bands(sig), self._buckets):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band]
+
+    def candidates(self, text: str,
+                   sig: Optional[tuple[int, ...]] = None) -> set:
+        """Keys sharing at least one LSH bucket with ``text``, or every
+        key while the index holds at most ``EXACT_SCAN_MAX``."""
+        if len(self._sigs) <= EXACT_SCAN_MAX:
+            return set(self._sigs)
+        sig = sig or signature(text)
+        found: set = set()
+        for band, bucket in zip(_bands(sig), self._buckets):
+            keys = bucket.get(band)
+            if keys:
+                found |= keys
+        return found
+
+    def update(self, items: Iterable[tuple[Hashable, str]]) -> None:
+        for key, text in items:
+            self.add(key, text)
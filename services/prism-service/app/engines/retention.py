@@ -0,0 +1,116 @@
+"""Retention for append-only telemetry tables: roll up, delete, vacuum.
+
+``recall_log`` (recall_log.db) and ``searches`` / ``search_feedback``
+(brain.db) gained a row per recall, search and thumbs and were never
+trimmed, so every aggregate over them got slower with the project's
+age. Owners now call :func:`roll_up` on a timer:
+
+  * rows older than the cutoff are folded into a daily aggregate table
+    by the owner's ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``
+    statement, whose ``{rows}`` placeholder selects one batch (the
+    oldest ids, up to a bound fixed before the batch runs);
+  * the same batch is deleted in the same transaction, so a row is
+    counted in the rollup or in the raw table, never both or neither;
+  * batches commit one at a time, so other writers interleave.
+
+:func:`incremental_vacuum` then hands the freed pages back to the file
+system. It only works on databases in ``auto_vacuum = INCREMENTAL``
+mode, which owners request before creating their tables; older files
+are converted with a one-time ``VACUUM`` only where the owner asks for
+it (the caller knows whether the file is small enough).
+
+``submit`` is a ``WriteExecutor.submit``-style callable: it runs
+``fn(conn)`` in a transaction on the database's write connection and
+returns the result. Stdlib only, like the rest of app.engines.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable
+
+Submit = Callable[[Callable[[sqlite3.Connection], Any]], Any]
+
+# Pages freed per write transaction, so one vacuum can't hold the
+# writer for long (4 KiB pages: ~40 MiB).
+_VACUUM_PAGES = 10_000
+
+
+def roll_up(
+    submit: Submit,
+    table: str,
+    ts_column: str,
+    rollup_sql: str,
+    cutoff: str,
+    batch: int,
+) -> int:
+    """Fold rows of ``table`` with ``ts_column < cutoff`` into a rollup
+    and delete them, ``batch`` rows per transaction, lowest ids first.
+
+    Each batch is pinned by its largest id before either statement
+    runs, so the rollup and the delete see the same rows whatever plan
+    SQLite picks for them. ``cutoff`` must be in the column's own
+    timestamp format. Returns the number of raw rows removed.
+    """
+    batch = max(1, int(batch))
+    last = (f"SELECT MAX(id) FROM (SELECT id FROM {table} "
+            f"WHERE {ts_column} < ? ORDER BY id LIMIT {batch})")
+    rows = f"SELECT id FROM {table} WHERE {ts_column} < ? AND id <= ?"
+    insert = rollup_sql.format(rows=rows)
+
+    def step(conn: sqlite3.Connection) -> int:
+        bound = conn.execute(last, (cutoff,)).fetchone()[0]
+        if bound is None:
+            return 0
+        conn.execute(insert, (cutoff, bound))
+        return conn.execute(f"DELETE FROM {table} WHERE id IN ({rows})",
+                            (cutoff, bound)).rowcount
+
+    removed = 0
+    while True:
+        n = submit(step)
+        removed += n
+        if n < batch:
+            return removed
+
+
+def incremental_vacuum(submit: Submit, path: str = "",
+                       convert: bool = False) -> int:
+    """Release free pages to the file system; returns pages released.
+
+    A database not in incremental mode is left alone unless ``convert``
+    is set, in which case it is switched over with one full ``VACUUM``
+    on a connection of its own (``path``), outside the writer.
+    """
+    def mode(conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+    if submit(mode) != 2:
+        if not convert or not path:
+            return 0
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            freed = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        return freed
+
+    def release(conn: sqlite3.Connection) -> int:
+        # Each step of the pragma frees one page; Python's execute()
+        # only takes the first step, so step it one page at a time.
+        freed = 0
+        while freed < _VACUUM_PAGES and conn.execute(
+            "PRAGMA freelist_count"
+        ).fetchone()[0]:
+            conn.execute("PRAGMA incremental_vacuum(1)")
+            freed += 1
+        return freed
+
+    total = 0
+    while True:
+        freed = submit(release)
+        total += freed
+        if freed < _VACUUM_PAGES:
+            return total
@@ -0,0 +1,214 @@
+"""Cached, normalized task-embedding matrix for LL-06 similar-task lookup.
+
+``Brain.best_prompt(similar_to_task_id=...)`` used to decode every
+``tasks.embedding`` BLOB into a Python list and compute cosines in pure
+Python on each call. :class:`TaskVectors` keeps the embeddings as
+L2-normalized float32 matrices instead — one per embedding dimension,
+since tasks embedded by a different model never compare — so a top-k
+query is one matrix-vector product and an ``argpartition``.
+
+Lifecycle:
+  * Loaded lazily on the first query for a tasks.db.
+  * ``TaskService._store_embedding`` patches the row it just wrote in
+    place (:meth:`TaskVectors.put`).
+  * Every write to ``tasks.embedding`` — from any connection or process,
+    including direct SQL — bumps ``task_meta.embedding_gen`` through the
+    triggers in :data:`EMBEDDING_GEN_TRIGGERS_SQL`. A query that finds a
+    generation the cache didn't see reloads; databases without the
+    counter are reloaded on every query.
+
+NumPy is required.
+
+[Used by: app.engines.brain_engine._similar_task_ids,
+ app.services.task_service.TaskService]
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+_GEN_KEY = "embedding_gen"
+
+_BUMP_GEN = (
+    "INSERT INTO task_meta (key, value) VALUES ('embedding_gen', 1) "
+    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1;"
+)
+
+# Created by TaskService after the ``embedding`` column migration.
+EMBEDDING_GEN_TRIGGERS_SQL = f"""
+CREATE TRIGGER IF NOT EXISTS tasks_embedding_ins AFTER INSERT ON tasks
+WHEN NEW.embedding IS NOT NULL
+BEGIN {_BUMP_GEN} END;
+CREATE TRIGGER IF NOT EXISTS tasks_embedding_upd
+AFTER UPDATE OF id, embedding ON tasks
+WHEN OLD.embedding IS NOT NEW.embedding
+  OR (OLD.id != NEW.id AND NEW.embedding IS NOT NULL)
+BEGIN {_BUMP_GEN} END;
+CREATE TRIGGER IF NOT EXISTS tasks_embedding_del AFTER DELETE ON tasks
+WHEN OLD.embedding IS NOT NULL
+BEGIN {_BUMP_GEN} END;
+"""
+
+
+def embedding_gen(conn: sqlite3.Connection) -> Optional[int]:
+    """``task_meta.embedding_gen``, or None when the database has no
+    ``task_meta`` table (a tasks.db TaskService never opened)."""
+    try:
+        row = conn.execute(
+            "SELECT value FROM task_meta WHERE key = ?", (_GEN_KEY,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return int(row[0]) if row else 0
+
+
+class _Block:
+    """Normalized rows of one embedding dimension, grown by doubling."""
+
+    def __init__(self, dim: int) -> None:
+        import numpy as np
+
+        self.ids: list[str] = []
+        self.matrix = np.zeros((16, dim), dtype=np.float32)
+
+    def add(self, task_id: str, vec) -> int:
+        import numpy as np
+
+        row = len(self.ids)
+        if row == self.matrix.shape[0]:
+            grown = np.zeros((row * 2, self.matrix.shape[1]), dtype=np.float32)
+            grown[:row] = self.matrix
+            self.matrix = grown
+        self.matrix[row] = vec
+        self.ids.append(task_id)
+        return row
+
+    def remove(self, row: int) -> Optional[str]:
+        """Drop ``row`` by moving the last row into it; returns the id
+        of the moved task (None when ``row`` was last)."""
+        last = len(self.ids) - 1
+        moved = None
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.matrix[row] = self.matrix[last]
+        self.ids.pop()
+        return moved
+
+
+def _normalized(blob: Optional[bytes]):
+    """Decode a packed float32 BLOB to a unit vector; None if unusable.
+
+    Zero vectors stay zero (cosine 0 against everything), matching the
+    old ``norm or 1.0`` guard.
+    """
+    import numpy as np
+
+    if not blob or len(blob) % 4:
+        return None
+    vec = np.frombuffer(blob, dtype=np.float32)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class TaskVectors:
+    """Embedding matrices for one tasks.db, kept in step with its
+    ``embedding_gen`` counter."""
+
+    # Generation meaning "reload before the next query".
+    _STALE = -1
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._gen: Optional[int] = self._STALE
+        self._blocks: dict[int, _Block] = {}
+        self._where: dict[str, tuple[int, int]] = {}
+
+    def _load(self, conn: sqlite3.Connection, gen: Optional[int]) -> None:
+        self._blocks = {}
+        self._where = {}
+        for task_id, blob in conn.execute(
+            "SELECT id, embedding FROM tasks WHERE embedding IS NOT NULL"
+        ):
+            self._add(task_id, _normalized(blob))
+        self._gen = gen
+
+    def _add(self, task_id: str, vec) -> None:
+        if vec is None:
+            return
+        dim = int(vec.shape[0])
+        block = self._blocks.get(dim)
+        if block is None:
+            block = self._blocks[dim] = _Block(dim)
+        self._where[task_id] = (dim, block.add(task_id, vec))
+
+    def _remove(self, task_id: str) -> None:
+        loc = self._where.pop(task_id, None)
+        if loc is None:
+            return
+        dim, row = loc
+        moved = self._blocks[dim].remove(row)
+        if moved is not None:
+            self._where[moved] = (dim, row)
+
+    def put(self, task_id: str, blob: Optional[bytes],
+            gen: Optional[int]) -> None:
+        """Apply one embedding write that moved the counter to ``gen``.
+
+        Only patched in place when the cache was current just before the
+        write; otherwise the next query reloads.
+        """
+        with self._lock:
+            if gen is None or self._gen is None or gen != self._gen + 1:
+                self._gen = self._STALE
+                return
+            self._remove(task_id)
+            self._add(task_id, _normalized(blob))
+            self._gen = gen
+
+    def top_k(
+        self,
+        conn: sqlite3.Connection,
+        task_id: str,
+        k: int,
+    ) -> list[tuple[str, float]]:
+        """``[(task_id, cosine), ...]`` for the ``k`` tasks most similar
+        to ``task_id``, cosine descending, excluding the task itself."""
+        import numpy as np
+
+        with self._lock:
+            gen = embedding_gen(conn)
+            if gen is None or gen != self._gen:
+                self._load(conn, gen)
+            loc = self._where.get(task_id)
+            if loc is None or k <= 0:
+                return []
+            dim, row = loc
+            block = self._blocks[dim]
+            n = len(block.ids)
+            sims = block.matrix[:n] @ block.matrix[row]
+            sims[row] = -np.inf
+            k = min(k, n - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top], kind="stable")]
+            return [(block.ids[i], s)
+                    for i, s in zip(top.tolist(), sims[top].tolist())]
+
+
+_VECTORS: dict[str, TaskVectors] = {}
+_VECTORS_LOCK = threading.Lock()
+
+
+def task_vectors_for(path: str) -> TaskVectors:
+    """The shared cache for the tasks.db at ``path``."""
+    key = os.path.realpath(path)
+    with _VECTORS_LOCK:
+        vectors = _VECTORS.get(key)
+        if vectors is None:
+            vectors = _VECTORS[key] = TaskVectors()
+        return vectors
@@ -0,0 +1,235 @@
+"""Single-writer executor with group commit, one per database file.
+
+Writes used to commit one at a time from whichever request thread made
+them, on connections shared across threads: a search log, a recall row
+and a task-history row each paid their own fsync on the caller's hot
+path. :class:`WriteExecutor` funnels them through one writer thread:
+
+  * Callers :meth:`~WriteExecutor.submit` a closure ``fn(conn)``.
+  * The writer collects everything queued within
+    ``PRISM_WRITE_GROUP_MS`` (default 2ms), runs each closure in its
+    own SAVEPOINT and commits the group once.
+  * A failing closure rolls back only its own savepoint; the rest of
+    the group still commits.
+  * ``wait=True`` returns the closure's result after the commit (or
+    raises its exception). ``wait=False`` is fire-and-forget for
+    telemetry, and failures are logged to stderr.
+
+Closures get the writer's own connection and must not commit. Readers
+keep their connections; WAL lets them run alongside the writer. Call
+:meth:`~WriteExecutor.flush` before a read that must see fire-and-forget
+writes. The thread starts on demand and exits, closing its connection,
+after a second of idleness. :func:`writer_for` hands out one executor
+per database path, so every engine and service over the same file
+shares a writer.
+
+Stdlib only, like the rest of app.engines.
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+WriteFn = Callable[[sqlite3.Connection], Any]
+
+_GROUP_WINDOW_S = float(os.environ.get("PRISM_WRITE_GROUP_MS", "2")) / 1000.0
+_MAX_GROUP = 512
+_IDLE_EXIT_S = 1.0
+
+
+def _default_connect(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+
+class WriteExecutor:
+    """Owns the write connection to one SQLite file."""
+
+    def __init__(
+        self,
+        path: str,
+        connect: Optional[Callable[[str], sqlite3.Connection]] = None,
+        window_s: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self._connect = connect or _default_connect
+        self._window_s = _GROUP_WINDOW_S if window_s is None else window_s
+        self._cond = threading.Condition()
+        self._queue: collections.deque = collections.deque()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._worker: Optional[threading.Thread] = None
+        self._in_group = False
+        self.stats = {"writes": 0, "commits": 0, "errors": 0,
+                      "largest_group": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, fn: WriteFn, *, wait: bool = True) -> Any:
+        """Run ``fn(conn)`` in the next group commit.
+
+        With ``wait`` (the default) blocks until the group is committed
+        and returns ``fn``'s result. Otherwise returns None at once.
+        """
+        if threading.current_thread() is self._worker:
+            return fn(self._conn)  # nested submit: join the running group
+        fut: Optional[Future] = Future() if wait else None
+        with self._cond:
+            self._queue.append((fn, fut))
+            self._ensure_worker()
+            self._cond.notify_all()
+        return None if fut is None else fut.result()
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Block until every write submitted so far is committed."""
+        if threading.current_thread() is self._worker:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_group:
+                remaining = (None if deadline is None
+                             else deadline - time.monotonic())
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, daemon=True,
+                name=f"db-writer:{os.path.basename(self.path)}",
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    self._cond.wait(_IDLE_EXIT_S)
+                if not self._queue:
+                    self._close()
+                    self._worker = None
+                    self._cond.notify_all()
+                    return
+                # Let concurrent writers join the group.
+                deadline = time.monotonic() + self._window_s
+                while len(self._queue) < _MAX_GROUP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                n = min(len(self._queue), _MAX_GROUP)
+                group = [self._queue.popleft() for _ in range(n)]
+                self._in_group = True
+            try:
+                self._commit_group(group)
+            finally:
+                with self._cond:
+                    self._in_group = False
+                    self._cond.notify_all()
+
+    def _open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = self._connect(self.path)
+            # Transactions are explicit: BEGIN / SAVEPOINT / COMMIT below.
+            conn.isolation_level = None
+            self._conn = conn
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+            self._conn = None
+
+    def _commit_group(self, group: list) -> None:
+        done: list[tuple[Optional[Future], Any, Optional[BaseException]]] = []
+        committed = False
+        try:
+            conn = self._open()
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, fut in group:
+                conn.execute("SAVEPOINT w")
+                try:
+                    result = fn(conn)
+                except Exception as e:  # noqa: BLE001 — handed to the caller
+                    conn.execute("ROLLBACK TO w")
+                    conn.execute("RELEASE w")
+                    done.append((fut, None, e))
+                else:
+                    conn.execute("RELEASE w")
+                    done.append((fut, result, None))
+            conn.execute("COMMIT")
+            committed = True
+        except sqlite3.Error as e:
+            # BEGIN or COMMIT failed (locked past the timeout, disk
+            # full): nothing in the group landed.
+            try:
+                if self._conn is not None and self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            done = [(fut, None, e) for _, fut in group]
+        failed = 0
+        for fut, result, err in done:
+            if err is not None:
+                failed += 1
+                if fut is None:
+                    print(f"[db-writer] {self.path}: write failed: {err!r}",
+                          file=sys.stderr, flush=True)
+                else:
+                    fut.set_exception(err)
+            elif fut is not None:
+                fut.set_result(result)
+        with self._cond:
+            self.stats["writes"] += len(group)
+            self.stats["errors"] += failed
+            self.stats["commits"] += int(committed)
+            self.stats["largest_group"] = max(self.stats["largest_group"],
+                                              len(group))
+
+
+# ---------------------------------------------------------------------------
+# Registry — one executor per database file in this process.
+# ---------------------------------------------------------------------------
+
+_WRITERS: dict[str, WriteExecutor] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def writer_for(
+    path: str,
+    connect: Optional[Callable[[str], sqlite3.Connection]] = None,
+) -> WriteExecutor:
+    """The shared executor for ``path``; ``connect`` is used on creation."""
+    key = os.path.realpath(path)
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = WriteExecutor(path, connect=connect)
+            _WRITERS[key] = writer
+        return writer
+
+
+@atexit.register
+def _flush_all() -> None:
+    # Fire-and-forget writes still queued at shutdown.
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.flush(timeout=5.0)
@@ -7,7 +7,9 @@ from nicegui import ui, app
 
 from app.config import (DATA_DIR, PROJECT_DIR, PROJECTS_DIR,
                          UI_PORT, MCP_PORT, GOVERNANCE_INTERVAL_SECONDS,
-                         DRIFT_INTERVAL_SECONDS, QUALITY_INTERVAL_SECONDS)
+                         DRIFT_INTERVAL_SECONDS, QUALITY_INTERVAL_SECONDS,
+                         WATCH_ENABLED, WATCH_DEBOUNCE_SECONDS,
+                         WATCH_MAX_DELAY_SECONDS)
 
 # Ensure base directories exist
 PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -36,13 +38,19 @@ def start_governance_timer():
         time.sleep(GOVERNANCE_INTERVAL_SECONDS)
 
 
+def _source_root():
+    """The mounted project directory, or None to use the process cwd."""
+    return str(PROJECT_DIR) if PROJECT_DIR.is_dir() else None
+
+
 def start_drift_timer():
     """Walk every project, reindex drifted docs on a cadence.
 
     ``prism_status`` already exposes drift; this loop acts on it. Any
     project whose Brain.incremental_reindex returns >0 gets its
     reindexed count logged so ops can see the loop is earning its keep.
-    PRISM_DRIFT_INTERVAL=0 disables entirely.
+    With the file watcher running this is the safety net for anything
+    it missed. PRISM_DRIFT_INTERVAL=0 disables entirely.
     """
     import sys as _sys
     import time
@@ -60,10 +68,18 @@ def start_drift_timer():
             for pid in get_all_projects():
                 try:
                     ctx = get_project(pid)
-                    n = ctx.brain_svc.incremental_reindex()
-                    if n:
+                    n = ctx.brain_svc.incremental_reindex(
+                        root=_source_root(),
+                    )
+                    st = ctx.brain_svc.last_reindex_stats()
+                    if n or st.get("purged"):
                         print(
-                            f"[drift] {pid}: reindexed {n} drifted file(s)",
+                            f"[drift] {pid}: reindexed {n} drifted file(s), "
+                            f"purged {st.get('purged', 0)}/"
+                            f"{st.get('checked', 0)} source(s) in "
+                            f"{st.get('total_ms', 0)}ms (stat "
+                            f"{st.get('stat_ms', 0)}ms, delete "
+                            f"{st.get('delete_ms', 0)}ms)",
                             file=_sys.stderr,
                         )
                 except Exception as e:
@@ -74,6 +90,50 @@ def start_drift_timer():
         time.sleep(DRIFT_INTERVAL_SECONDS)
 
 
+def start_file_watcher():
+    """Reindex changed files as inotify reports them (PRISM_WATCH).
+
+    Debounced batches of paths go to every project's
+    ``reindex_paths``; a batch of None (queue overflow, watch limit)
+    runs a full ``incremental_reindex`` instead. Where inotify is
+    unavailable the drift timer's polling is all there is.
+    """
+    import sys as _sys
+    root = _source_root()
+    if not WATCH_ENABLED or root is None:
+        return
+    from app.engines.brain_engine import Brain
+    from app.project_context import get_project, get_all_projects
+    from app.services.file_watcher import FileWatcher
+
+    def on_change(paths):
+        for pid in get_all_projects():
+            try:
+                svc = get_project(pid).brain_svc
+                if paths is None:
+                    n = svc.incremental_reindex(root=root)
+                else:
+                    n = svc.reindex_paths(sorted(paths), root=root)
+                if n:
+                    print(f"[watch] {pid}: reindexed {n} changed file(s)",
+                          file=_sys.stderr)
+            except Exception as e:
+                print(f"Watch reindex error ({pid}): {e}", file=_sys.stderr)
+
+    watcher = FileWatcher(
+        root, on_change,
+        skip_dirs=Brain._EXCLUDED_PATH_SEGMENTS,
+        debounce=WATCH_DEBOUNCE_SECONDS,
+        max_delay=WATCH_MAX_DELAY_SECONDS,
+    )
+    if watcher.start():
+        print(f"File watcher on {root} ({watcher.watched_dirs} dirs)",
+              file=_sys.stderr)
+    else:
+        print(f"File watcher unavailable for {root}; polling only",
+              file=_sys.stderr)
+
+
 def start_quality_timer():
     """Score merged tasks against git truth on a cadence (LL-04).
 
@@ -139,6 +199,7 @@ async def startup():
         threading.Thread(target=start_mcp_server, daemon=True).start()
         threading.Thread(target=start_governance_timer, daemon=True).start()
         threading.Thread(target=start_drift_timer, daemon=True).start()
+        start_file_watcher()
         threading.Thread(target=start_quality_timer, daemon=True).start()
     except Exception as e:
         print(f"Startup error: {e}")
@@ -14,6 +14,46 @@ from mcp.types import Tool, TextContent
 # Tool definitions
 # ---------------------------------------------------------------------------
 
+# Shared by prism_refresh / prism_bulk_refresh.
+_REFRESH_DELTAS_SCHEMA = {
+    "type": "object",
+    "description": (
+        "{path: {base_sha256, ops, sha256?}}. ops are ordered "
+        "[start, end, text] triples replacing lines [start, end) of the "
+        "content whose sha256 is base_sha256 (lines keep their endings). "
+        "sha256, when given, must match the patched result."
+    ),
+    "additionalProperties": {"type": "object"},
+}
+_REFRESH_ENCODING_SCHEMA = {
+    "type": "string",
+    "enum": ["gzip", "zstd"],
+    "description": "Compression of `payload`. Default gzip.",
+}
+_REFRESH_PAYLOAD_SCHEMA = {
+    "type": "string",
+    "description": (
+        "base64 of a compressed JSON object {files?, deltas?}, merged "
+        "with the plain arguments."
+    ),
+}
+_REFRESH_PRIORITY_SCHEMA = {
+    "type": "string",
+    "enum": ["interactive", "bulk"],
+    "description": (
+        "Queue priority; interactive jobs are indexed before bulk ones. "
+        "Default: interactive for prism_refresh of up to "
+        "PRISM_INDEX_BATCH_SIZE files, bulk otherwise."
+    ),
+}
+_REFRESH_WAIT_SCHEMA = {
+    "type": "boolean",
+    "description": (
+        "Block until the job is indexed (default true). false returns "
+        "{job_id, status: queued} at once."
+    ),
+}
+
 TOOLS: list[Tool] = [
     Tool(
         name="brain_search",
@@ -177,8 +217,9 @@ TOOLS: list[Tool] = [
             "Bounded BFS over the call graph starting at ``entity``. "
             "Returns a flat edge list [{from, to, kind, relation, hop}] "
             "so you can reconstruct 'what does this entity transitively "
-            "call'. Use to understand flow without Reading multiple "
-            "files."
+            "call'. Pass direction='callers' for the reverse walk "
+            "('who transitively calls this'). Use to understand flow "
+            "without Reading multiple files."
         ),
         inputSchema={
             "type": "object",
@@ -187,10 +228,32 @@ TOOLS: list[Tool] = [
                 "depth": {"type": "integer", "default": 2,
                           "description": "max hops (default 2)"},
                 "limit": {"type": "integer", "default": 50},
+                "direction": {"type": "string",
+                              "enum": ["callees", "callers"],
+                              "default": "callees"},
             },
             "required": ["entity"],
         },
     ),
+    Tool(
+        name="brain_shortest_path",
+        description=(
+            "Fewest-hop call path from ``source`` to ``target`` over the "
+            "graph. Returns the path as an edge list "
+            "[{from, to, kind, relation, hop}] (same shape as "
+            "brain_call_chain), or [] when no path exists within "
+            "max_depth hops. Answers 'how does A end up calling B'."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "source": {"type": "string"},
+                "target": {"type": "string"},
+                "max_depth": {"type": "integer", "default": 6},
+            },
+            "required": ["source", "target"],
+        },
+    ),
     Tool(
         name="record_session_outcome",
         description=(
@@ -408,10 +471,29 @@ TOOLS: list[Tool] = [
             "Rebuild the code knowledge graph for this project using graphify "
             "(tree-sitter AST pass, Leiden community detection, rationale "
             "extraction). Operates on source files staged via prior "
-            "brain_index_doc calls. LLM-free, runs locally. Returns counts of "
+            "brain_index_doc calls. LLM-free, runs locally. Only files changed "
+            "since the last rebuild are re-extracted; every few runs a full "
+            "pass re-clusters communities.\n\n"
+            "Runs as a background job: returns {job_id, status: queued} "
+            "immediately. Requests within the debounce window, or while a "
+            "rebuild is running, coalesce into one follow-up run. Progress "
+            "and the last run's duration show up under `graph_rebuild` in "
+            "prism_status. Pass wait=true to block and get the counts of "
             "nodes, edges, communities, and imported entities/relationships."
         ),
-        inputSchema={"type": "object", "properties": {}},
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "full": {
+                    "type": "boolean",
+                    "description": "Force a full graphify pass over every staged file (fresh community detection). Default false.",
+                },
+                "wait": {
+                    "type": "boolean",
+                    "description": "Block until the job finishes and return its summary. Default false.",
+                },
+            },
+        },
     ),
     Tool(
         name="prism_status",
@@ -421,7 +503,13 @@ TOOLS: list[Tool] = [
             "`stale` flag with `reasons`. If called with `file_hashes` "
             "({path: sha256}), also returns precise `drifted: [...]` list "
             "with reason `missing` or `content_changed` for each path that "
-            "doesn't match Brain. Called by the SessionStart hook."
+            "doesn't match Brain. With `tree` ({dir: hash} of a directory "
+            "Merkle tree) instead, returns `tree.mismatched`: the server's "
+            "entries for each directory that differs, so the caller can "
+            "descend only into changed subtrees. `graph_rebuild` reports the rebuild "
+            "job state (running stage, queued job, last duration); "
+            "`index_queue` the indexing queue (see prism_index_status). Called "
+            "by the SessionStart hook."
         ),
         inputSchema={
             "type": "object",
@@ -434,6 +522,17 @@ TOOLS: list[Tool] = [
                                    "detection.",
                     "additionalProperties": {"type": "string"},
                 },
+                "tree": {
+                    "type": "object",
+                    "description": "Optional {dir: hash} map (root is \"\") "
+                                   "of directory Merkle hashes to compare. "
+                                   "A directory hash is sha256 over its "
+                                   "sorted `f <name> <sha256>` lines, then "
+                                   "`d <name> <hash>` lines. Covers only "
+                                   "files the sync hook hashes (see "
+                                   "app.services.sync_tree.eligible).",
+                    "additionalProperties": {"type": "string"},
+                },
             },
         },
     ),
@@ -449,17 +548,27 @@ TOOLS: list[Tool] = [
     Tool(
         name="prism_refresh",
         description=(
-            "Batch-ingest a map of {path: content}. Blocks until all "
-            "chunks are in brain.db and (when skip_graph is false) the "
-            "graph has been rebuilt — when this call returns, the files "
-            "ARE queryable via brain_search and (unless you skipped) "
-            "brain_graph / brain_find_references.\n\n"
+            "Batch-ingest a map of {path: content}. Files go onto the "
+            "project's indexing queue as one job (`job_id`); a path "
+            "already queued takes the new content instead of being "
+            "indexed twice. Small refreshes run at `interactive` "
+            "priority, ahead of bulk loads. By default the call blocks "
+            "until the job is in brain.db — when it returns, the files "
+            "ARE queryable via brain_search; wait=false returns at once "
+            "(poll prism_index_status). Unless skip_graph is set, a "
+            "graph rebuild job is queued when the files are indexed and "
+            "returned as `graph_job`; brain_graph / "
+            "brain_find_references catch up when it finishes (see "
+            "prism_status.graph_rebuild).\n\n"
             "Set skip_graph=true on every call of a bulk loader except "
-            "the last, then call graph_rebuild once at the end. Graph "
-            "rebuild walks the whole staging dir per call and dominates "
-            "latency (~100s even for one file on a ~100-file project); "
-            "amortizing it across a batch is the difference between "
-            "'usable bulk ingest' and '30 hours wall-clock'."
+            "the last, then call graph_rebuild once at the end. Queued "
+            "rebuilds coalesce, but skipping avoids graphify runs over "
+            "half-loaded staging dirs.\n\n"
+            "Large or mostly-unchanged batches can go as `deltas` "
+            "(line-block edits against the content last indexed, checked "
+            "by base_sha256) and/or a gzip/zstd `payload`. Deltas whose "
+            "base the server no longer holds come back in `need_full`; "
+            "resend those paths whole."
         ),
         inputSchema={
             "type": "object",
@@ -469,6 +578,9 @@ TOOLS: list[Tool] = [
                     "description": "{path: content} map for bulk re-ingest.",
                     "additionalProperties": {"type": "string"},
                 },
+                "deltas": _REFRESH_DELTAS_SCHEMA,
+                "encoding": _REFRESH_ENCODING_SCHEMA,
+                "payload": _REFRESH_PAYLOAD_SCHEMA,
                 "domain": {
                     "type": "string",
                     "description": "Default domain for files without a per-path override. Default 'code'.",
@@ -477,8 +589,9 @@ TOOLS: list[Tool] = [
                     "type": "boolean",
                     "description": "When true, index the files but skip the per-call graph_rebuild. Call graph_rebuild once at the end of a bulk load. Default false.",
                 },
+                "priority": _REFRESH_PRIORITY_SCHEMA,
+                "wait": _REFRESH_WAIT_SCHEMA,
             },
-            "required": ["files"],
         },
     ),
     Tool(
@@ -488,16 +601,21 @@ TOOLS: list[Tool] = [
             "and automatic graph rebuild at the end. Use this instead of "
             "rolling chunking on the client: callers stop needing to "
             "tune chunk_size to the server's behavior.\n\n"
-            "Semantics: splits files into batches of `chunk_size` "
-            "(default 25), indexes each batch with skip_graph=true, "
-            "runs graph_rebuild once at the end unless skip_graph is "
-            "set. Blocks until complete, same contract as prism_refresh. "
+            "Semantics: enqueues the files as one `bulk` priority job "
+            "on the project's indexing queue, which indexes them in "
+            "batches behind any interactive refreshes, then queues one "
+            "graph_rebuild job unless skip_graph is set. Blocks until "
+            "indexing completes unless wait=false, same contract as "
+            "prism_refresh. `chunk_size` is accepted for older clients "
+            "and only shapes `chunks_processed`. "
             "Supports cancellation via prism_cancel_pending.\n\n"
-            "Backpressure: when `PRISM_MAX_CONCURRENT_REFRESH` other "
-            "refreshes are in flight (default 2), returns "
-            "{busy: true, in_flight: N, retry_after_s: 30} instead of "
-            "queuing. Clients should back off rather than pile more work "
-            "onto a saturated server."
+            "Backpressure: when the queue would grow past "
+            "`PRISM_INDEX_QUEUE_MAX_FILES` files, returns "
+            "{busy: true, queued_files: N, retry_after_s: S} (S from "
+            "the queue's ETA) instead of queuing. Clients should back "
+            "off rather than pile more work onto a saturated server.\n\n"
+            "Accepts the same `deltas` / `encoding` / `payload` forms as "
+            "prism_refresh, with `need_full` in the result."
         ),
         inputSchema={
             "type": "object",
@@ -506,27 +624,48 @@ TOOLS: list[Tool] = [
                     "type": "object",
                     "additionalProperties": {"type": "string"},
                 },
+                "deltas": _REFRESH_DELTAS_SCHEMA,
+                "encoding": _REFRESH_ENCODING_SCHEMA,
+                "payload": _REFRESH_PAYLOAD_SCHEMA,
                 "domain": {"type": "string"},
                 "chunk_size": {"type": "integer",
                                  "description": "default 25"},
                 "skip_graph": {"type": "boolean",
                                 "description": "skip final graph_rebuild; default false"},
+                "priority": _REFRESH_PRIORITY_SCHEMA,
+                "wait": _REFRESH_WAIT_SCHEMA,
+            },
+        },
+    ),
+    Tool(
+        name="prism_index_status",
+        description=(
+            "Indexing queue state for this project: queued files "
+            "(and how many are interactive), the running batch, recent "
+            "throughput in files/s, an ETA for the backlog, and the "
+            "active jobs. With `job_id` (from prism_refresh / "
+            "prism_bulk_refresh), returns that job's progress — indexed, "
+            "superseded by a newer refresh, failed, pending — and its "
+            "own ETA."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string"},
             },
-            "required": ["files"],
         },
     ),
     Tool(
         name="prism_cancel_pending",
         description=(
-            "Request cancellation of an in-flight prism_refresh for the "
-            "current project. The request is consumed at the next "
-            "unit-of-work boundary inside the refresh loop (between "
-            "files) — files that have already been indexed stay "
-            "indexed, the remaining batch is skipped, and the graph "
-            "rebuild is skipped. Returns {cancelled_requested: bool}. "
-            "One cancel per one refresh; subsequent refreshes start "
+            "Cancel queued and running refresh jobs for the current "
+            "project. Queued files are dropped and the running batch "
+            "stops at the next file boundary — files that have already "
+            "been indexed stay indexed, and cancelled jobs skip their "
+            "graph rebuild. Returns {cancelled_requested: bool, "
+            "dropped_files: N}. Refreshes submitted afterwards start "
             "clean. Use together with prism_status.indexing_in_flight "
-            "to confirm the refresh actually ended."
+            "to confirm the jobs actually ended."
         ),
         inputSchema={"type": "object", "properties": {}},
     ),
@@ -793,6 +932,14 @@ TOOLS: list[Tool] = [
                 "assigned_agent": {"type": "string", "description": "Filter by assigned agent"},
                 "tag": {"type": "string", "description": "Filter by tag"},
                 "story_file": {"type": "string", "description": "Filter by story file"},
+                "limit": {
+                    "type": "integer",
+                    "description": "Page size; returns {tasks, next_after} instead of a plain list",
+                },
+                "after": {
+                    "type": "string",
+                    "description": "next_after from the previous page",
+                },
             },
         },
     ),
@@ -1058,6 +1205,8 @@ change between calls. Cache it.
 - **`graph_rebuild()`** — run graphify (tree-sitter AST + Leiden clusters).
   Populates entities and relationships with confidence scores and community
   IDs. **Call once at the end of a bulk-ingest batch**, not per file.
+  Returns a job id immediately (`wait=true` blocks); repeated calls
+  coalesce into one run. Watch `prism_status.graph_rebuild` for progress.
 
 ## Memory (long-term expertise)
 - `memory_store(domain, name, description, type, classification, evidence?,
@@ -1075,7 +1224,7 @@ change between calls. Cache it.
 ## Tasks
 - `task_create(title, description?, priority?, dependencies?, tags?,
   story_file?, assigned_agent?)` — new task.
-- `task_list(status?, assigned_agent?, tag?, story_file?)` — filtered list.
+- `task_list(status?, assigned_agent?, tag?, story_file?, limit?, after?)` — filtered list; with `limit`, one page plus `next_after`.
 - `task_next()` — highest-priority unblocked task.
 - `task_update(id, status?, priority?, assigned_agent?, blocked_reason?)` —
   mutate.
@@ -1233,285 +1382,6 @@ def _prism_guide(section: str | None) -> str:
 from app.__version__ import PRISM_VERSION, PRISM_VERSION_NOTES
 
 
-_HOOK_SCRIPT = r'''#!/usr/bin/env python3
-"""PRISM SessionStart hook — keeps Brain/Graph in sync with disk.
-
-Installed by PRISM version: __PRISM_VERSION__
-
-
-Walks the project source tree (respects .gitignore when git is available),
-hashes each file, asks PRISM via prism_status which files have drifted,
-and pushes the current content of drifted files via prism_refresh.
-
-Installed by PRISM's prism_install / project_onboard manifest. The hook
-reads its target MCP URL + project slug from .mcp.json at the project
-root, so no hardcoded values live here — one hook works across projects.
-"""
-from __future__ import annotations
-
-import hashlib
-import json
-import os
-import subprocess
-import sys
-import urllib.request
-from pathlib import Path
-
-SOURCE_EXTS = {".py", ".ts", ".tsx", ".js", ".jsx", ".cs", ".go", ".rs",
-               ".java", ".rb", ".php", ".cpp", ".c", ".h", ".hpp",
-               ".md", ".yml", ".yaml", ".toml"}
-SKIP_PARTS = {".git", "node_modules", "__pycache__", ".venv", "venv",
-              "dist", "build", ".tox", ".mypy_cache", ".pytest_cache",
-              ".next", ".nuxt", "target", ".claude"}
-MAX_FILE_BYTES = 300_000
-
-
-def _project_root() -> Path:
-    # Walk up from cwd looking for .mcp.json
-    cur = Path.cwd()
-    for d in [cur, *cur.parents]:
-        if (d / ".mcp.json").exists():
-            return d
-    return cur
-
-
-def _mcp_url_and_project(root: Path) -> tuple[str, str] | None:
-    cfg = root / ".mcp.json"
-    if not cfg.exists():
-        return None
-    try:
-        data = json.loads(cfg.read_text(encoding="utf-8"))
-    except Exception:
-        return None
-    servers = (data.get("mcpServers") or {}).values()
-    for s in servers:
-        url = s.get("url", "")
-        if "/mcp" in url:
-            # Split out ?project= query
-            if "project=" in url:
-                base, q = url.split("?", 1)
-                project = [p.split("=", 1)[1] for p in q.split("&")
-                           if p.startswith("project=")][0]
-                return base.rstrip("/"), project
-    return None
-
-
-def _mcp_call(base: str, project: str, tool: str, args: dict) -> dict:
-    url = f"{base}/?project={project}"
-    payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
-               "params": {"name": tool, "arguments": args}}
-    req = urllib.request.Request(
-        url, data=json.dumps(payload).encode(),
-        headers={"Content-Type": "application/json",
-                 "Accept": "application/json, text/event-stream"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=120) as r:
-        raw = r.read().decode()
-        if "text/event-stream" in r.headers.get("Content-Type", ""):
-            for line in raw.splitlines():
-                if line.startswith("data: "):
-                    return json.loads(line[6:])
-        return json.loads(raw)
-
-
-def _parse_result(resp: dict):
-    content = resp.get("result", {}).get("content", [])
-    if not content:
-        return None
-    text = content[0].get("text", "")
-    try:
-        return json.loads(text)
-    except Exception:
-        return text
-
-
-def _git_tracked(root: Path) -> set[str] | None:
-    """Return set of git-tracked relative paths, or None if no git repo."""
-    try:
-        out = subprocess.run(
-            ["git", "-C", str(root), "ls-files"],
-            capture_output=True, text=True, timeout=15, check=True,
-        ).stdout
-        return {line.strip() for line in out.splitlines() if line.strip()}
-    except Exception:
-        return None
-
-
-def _should_skip(path: Path, root: Path) -> bool:
-    rel_parts = path.relative_to(root).parts
-    if any(p in SKIP_PARTS for p in rel_parts):
-        return True
-    if path.suffix not in SOURCE_EXTS:
-        return True
-    try:
-        sz = path.stat().st_size
-    except OSError:
-        return True
-    if sz == 0 or sz > MAX_FILE_BYTES:
-        return True
-    return False
-
-
-def _hash_file(p: Path) -> str | None:
-    """Hash the TEXT form (newline-normalized utf-8) so hashes match
-    what the server stores — avoids spurious CRLF-vs-LF drift on Windows."""
-    try:
-        text = p.read_text(encoding="utf-8")
-    except (OSError, UnicodeError):
-        return None
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-
-def _collect(root: Path) -> dict[str, tuple[str, Path]]:
-    """Return {rel_path: (sha256, abs_path)} for source files under root."""
-    out: dict[str, tuple[str, Path]] = {}
-    tracked = _git_tracked(root)
-    if tracked:
-        for rel in tracked:
-            p = root / rel
-            if not p.is_file() or _should_skip(p, root):
-                continue
-            sha = _hash_file(p)
-            if sha:
-                out[rel.replace("\\", "/")] = (sha, p)
-    else:
-        for p in root.rglob("*"):
-            if not p.is_file() or _should_skip(p, root):
-                continue
-            sha = _hash_file(p)
-            if sha:
-                out[p.relative_to(root).as_posix()] = (sha, p)
-    return out
-
-
-def main() -> int:
-    root = _project_root()
-    cfg = _mcp_url_and_project(root)
-    if cfg is None:
-        # No .mcp.json — user hasn't opted in. Silent skip.
-        return 0
-    base, project = cfg
-
-    files = _collect(root)
-    if not files:
-        return 0
-
-    hashes = {path: sha for path, (sha, _) in files.items()}
-    try:
-        resp = _mcp_call(base, project, "prism_status",
-                         {"file_hashes": hashes})
-    except Exception as e:
-        print(f"[prism-sync] could not reach {base} ({e!r}); skipping",
-              file=sys.stderr)
-        return 0
-
-    status = _parse_result(resp) or {}
-    drifted = status.get("drifted", []) or []
-    if not drifted:
-        return 0
-
-    # Re-ingest drifted files
-    to_refresh: dict[str, str] = {}
-    for entry in drifted:
-        path = entry.get("path")
-        if not path:
-            continue
-        fe = files.get(path)
-        if not fe:
-            continue
-        try:
-            to_refresh[path] = fe[1].read_text(encoding="utf-8")
-        except Exception:
-            pass
-    if not to_refresh:
-        return 0
-
-    # Chunked refresh: push files in batches of CHUNK_SIZE with
-    # skip_graph=true, then fire one graph_rebuild at the end. Avoids
-    # the per-call graphify cost that dominates latency on larger syncs.
-    CHUNK_SIZE = 25
-    items = list(to_refresh.items())
-    refreshed = 0
-    for i in range(0, len(items), CHUNK_SIZE):
-        batch = dict(items[i:i + CHUNK_SIZE])
-        try:
-            _mcp_call(
-                base, project, "prism_refresh",
-                {"files": batch, "skip_graph": True},
-            )
-            refreshed += len(batch)
-        except Exception as e:
-            print(
-                f"[prism-sync] prism_refresh chunk {i // CHUNK_SIZE} "
-                f"failed: {e!r}", file=sys.stderr,
-            )
-    if refreshed:
-        try:
-            _mcp_call(base, project, "graph_rebuild", {})
-        except Exception as e:
-            print(
-                f"[prism-sync] graph_rebuild after sync failed: {e!r}",
-                file=sys.stderr,
-            )
-        print(
-            f"[prism-sync] refreshed {refreshed} drifted file(s) in "
-            f"{(len(items) + CHUNK_SIZE - 1) // CHUNK_SIZE} chunk(s) + "
-            "1 graph_rebuild",
-            file=sys.stderr,
-        )
-
-    # LL-10: SessionStart reflection check. If a consolidation
-    # candidate is ready, emit hookSpecificOutput.additionalContext so
-    # Claude sees the brief on its first turn and can delegate to the
-    # prism-reflect sub-agent. Silent no-op when nothing is pending.
-    # SessionStart hooks receive a small JSON payload on stdin; extract
-    # session_id so janitor_check can rate-limit and so the emitted
-    # additionalContext can be linked to this session.
-    session_id = ""
-    try:
-        import json as _json
-        import sys as _sys
-        session_id = (
-            _json.loads(_sys.stdin.read() or "{}").get("session_id", "")
-        )
-    except Exception:
-        pass
-    if session_id:
-        try:
-            chk_resp = _mcp_call(
-                base, project, "janitor_check", {"session_id": session_id},
-            )
-            payload = _parse_result(chk_resp) or {}
-            if payload.get("ready") and payload.get("brief"):
-                brief = payload["brief"]
-                additional = (
-                    f"PRISM reflection pending: candidate "
-                    f"{brief.get('candidate_id', '?')}. Spawn the "
-                    f"`prism-reflect` subagent using the brief below — "
-                    f"call `janitor_check` if you need the live version, "
-                    f"submit via `janitor_submit`. Brief: "
-                    f"{json.dumps(brief)[:6000]}"
-                )
-                print(json.dumps({
-                    "hookSpecificOutput": {
-                        "additionalContext": additional,
-                    },
-                }))
-        except Exception as e:
-            print(
-                f"[prism-sync] janitor_check failed: {e!r}",
-                file=sys.stderr,
-            )
-
-    return 0
-
-
-if __name__ == "__main__":
-    sys.exit(main())
-'''
-
-
 def _load_asset(filename: str) -> str:
     """Read a shipped hook script from ``services/prism-service/app/assets/``.
 
@@ -1527,6 +1397,7 @@ def _load_asset(filename: str) -> str:
         return ""
 
 
+_HOOK_SCRIPT = _load_asset("sync_hook.py")
 _FEEDBACK_HOOK_SCRIPT = _load_asset("feedback_signal_hook.py")
 _STOP_HOOK_SCRIPT = _load_asset("stop_record_hook.py")
 _SUBAGENT_HOOK_SCRIPT = _load_asset("subagent_record_hook.py")
@@ -1723,53 +1594,57 @@ def _install_manifest(project_id: str) -> dict:
 
 
 # ---------------------------------------------------------------------------
-# Indexer in-flight tracking — exposed via prism_status (#15 observability).
-# Bumped when a request is actively inside prism_refresh's synchronous
-# index/graph work, so a concurrent prism_status call can report
-# indexing_in_flight=True without scanning state.
+# prism_refresh payload decoding — see app/services/refresh_payload.py.
 # ---------------------------------------------------------------------------
-import threading as _th
-
-_INDEXING_LOCK = _th.Lock()
-_INDEXING_IN_FLIGHT: dict[str, int] = {}  # project_id -> in-flight request count
-
-
-def _indexing_begin(project_id: str) -> None:
-    with _INDEXING_LOCK:
-        _INDEXING_IN_FLIGHT[project_id] = (
-            _INDEXING_IN_FLIGHT.get(project_id, 0) + 1
-        )
 
+def _refresh_files(ctx, arguments: dict) -> tuple[dict[str, str], list[str]]:
+    """{path: content} to index, plus delta paths the client must resend."""
+    from app.services import refresh_payload
 
-def _indexing_end(project_id: str) -> None:
-    with _INDEXING_LOCK:
-        n = _INDEXING_IN_FLIGHT.get(project_id, 0) - 1
-        if n <= 0:
-            _INDEXING_IN_FLIGHT.pop(project_id, None)
-        else:
-            _INDEXING_IN_FLIGHT[project_id] = n
+    files, deltas = refresh_payload.decode(arguments)
+    return refresh_payload.resolve(files, deltas, ctx.brain_svc.stored_content)
 
 
-def indexing_in_flight(project_id: str) -> int:
-    with _INDEXING_LOCK:
-        return int(_INDEXING_IN_FLIGHT.get(project_id, 0))
+async def _enqueue_refresh(ctx, arguments: dict, files: dict,
+                           priority: str, reason: str) -> dict:
+    """Submit ``files`` to the index queue; wait for the job unless
+    ``wait`` is false. Returns the job record or the busy answer; a job
+    still unfinished after ``INDEX_WAIT_TIMEOUT_SECONDS`` (or no longer
+    tracked) comes back as its current status instead."""
+    import asyncio as _aio
 
+    from app.config import INDEX_WAIT_TIMEOUT_SECONDS
 
-# Cancellation flag per project. Set by prism_cancel_pending, consumed
-# at the next unit-of-work boundary inside prism_refresh. Pop-on-read
-# so a single cancel request cancels a single in-flight refresh.
-_CANCEL_FLAGS: dict[str, bool] = {}
-
-
-def request_cancel(project_id: str) -> None:
-    with _INDEXING_LOCK:
-        _CANCEL_FLAGS[project_id] = True
-
-
-def check_and_clear_cancel(project_id: str) -> bool:
-    """Return True exactly once if a cancel was requested; clear it."""
-    with _INDEXING_LOCK:
-        return bool(_CANCEL_FLAGS.pop(project_id, False))
+    job = ctx.index_jobs.submit(
+        files,
+        domain=arguments.get("domain") or "code",
+        priority=arguments.get("priority") or priority,
+        skip_graph=bool(arguments.get("skip_graph", False)),
+        reason=reason,
+    )
+    if job.get("busy") or not arguments.get("wait", True):
+        return job
+    record = await _aio.to_thread(ctx.index_jobs.wait, job["job_id"],
+                                  INDEX_WAIT_TIMEOUT_SECONDS)
+    summary = {"job_id": job["job_id"], "coalesced": job["coalesced"]}
+    if record is None:
+        current = ctx.index_jobs.status(job["job_id"])
+        summary["status"] = current.get("status") or "unknown"
+        summary["wait_timed_out"] = True
+        if current.get("eta_s") is not None:
+            summary["eta_s"] = current["eta_s"]
+        return summary
+    summary["status"] = record.get("status")
+    summary["refreshed_files"] = record.get("indexed", 0)
+    summary["superseded_files"] = record.get("superseded", 0)
+    summary["failed_files"] = record.get("failed", 0)
+    if record.get("status") == "cancelled":
+        summary["cancelled"] = True
+    if record.get("graph_job"):
+        summary["graph_job"] = record["graph_job"]
+    else:
+        summary["graph_skipped"] = True
+    return summary
 
 
 # ---------------------------------------------------------------------------
@@ -2101,6 +1976,15 @@ BEGIN NOW with Step 0. Do not ask the user for permission — execute the steps.
                 entity=arguments["entity"],
                 depth=arguments.get("depth", 2),
                 limit=arguments.get("limit", 50),
+                direction=arguments.get("direction", "callees"),
+            )
+            return [TextContent(type="text", text=_json(results))]
+
+        if name == "brain_shortest_path":
+            results = brain_svc.shortest_path(
+                source=arguments["source"],
+                target=arguments["target"],
+                max_depth=arguments.get("max_depth", 6),
             )
             return [TextContent(type="text", text=_json(results))]
 
@@ -2216,130 +2100,95 @@ BEGIN NOW with Step 0. Do not ask the user for permission — execute the steps.
             return [TextContent(type="text", text=_json(results))]
 
         if name == "graph_rebuild":
+            import asyncio as _aio
             ctx = get_project(project_id)
-            summary = ctx.graph_svc.rebuild(
-                brain_db_path=str(ctx._data_dir / "brain.db")
+            job = ctx.graph_jobs.request(
+                full=bool(arguments.get("full", False)),
+                reason="graph_rebuild",
             )
-            return [TextContent(type="text", text=_json(summary))]
+            if arguments.get("wait"):
+                from app.config import GRAPH_REBUILD_WAIT_TIMEOUT_SECONDS
+                record = await _aio.to_thread(
+                    ctx.graph_jobs.wait, job["job_id"],
+                    GRAPH_REBUILD_WAIT_TIMEOUT_SECONDS,
+                )
+                summary = dict((record or {}).get("summary") or {})
+                summary["job_id"] = job["job_id"]
+                summary["duration_s"] = (record or {}).get("duration_s")
+                if record is None:
+                    summary["wait_timed_out"] = True
+                    summary["graph_rebuild"] = ctx.graph_jobs.status()
+                return [TextContent(type="text", text=_json(summary))]
+            return [TextContent(type="text", text=_json(job))]
 
         if name == "prism_status":
             ctx = get_project(project_id)
             status = ctx.graph_svc.sync_status(
                 brain_db_path=str(ctx._data_dir / "brain.db"),
                 file_hashes=arguments.get("file_hashes"),
+                tree=arguments.get("tree"),
             )
             # #15(c) observability: operators can tell when indexer is busy
-            # without scanning logs. indexing_in_flight counts concurrent
-            # prism_refresh calls currently inside their CPU-bound work.
-            n = indexing_in_flight(project_id)
+            # without scanning logs. indexing_in_flight counts refresh
+            # jobs still queued or running.
+            n = ctx.index_jobs.active_jobs()
             status["indexing_in_flight"] = n
             status["indexer_busy"] = bool(n)
+            status["index_queue"] = ctx.index_jobs.status()
+            status["graph_rebuild"] = ctx.graph_jobs.status()
             return [TextContent(type="text", text=_json(status))]
 
         if name == "prism_refresh":
             import asyncio as _aio
+            from app.config import INDEX_BATCH_SIZE
             ctx = get_project(project_id)
-            files = arguments.get("files") or {}
-            default_domain = arguments.get("domain") or "code"
-            skip_graph = bool(arguments.get("skip_graph", False))
-            _indexing_begin(project_id)
-            indexed = 0
-            cancelled = False
-            try:
-                for path, content in files.items():
-                    if check_and_clear_cancel(project_id):
-                        cancelled = True
-                        break
-                    if not isinstance(content, str):
-                        continue
-                    # asyncio.to_thread releases the event loop so
-                    # concurrent prism_status / brain_search calls
-                    # don't queue behind this CPU-bound ingest.
-                    await _aio.to_thread(
-                        ctx.brain_svc.index_doc,
-                        path=path, content=content, domain=default_domain,
-                    )
-                    indexed += 1
-                if cancelled:
-                    summary = {"cancelled": True, "graph_skipped": True}
-                elif skip_graph:
-                    summary = {"graph_skipped": True}
-                else:
-                    summary = await _aio.to_thread(
-                        ctx.graph_svc.rebuild,
-                        brain_db_path=str(ctx._data_dir / "brain.db"),
-                    )
-            finally:
-                _indexing_end(project_id)
-            summary["refreshed_files"] = indexed
+            files, need_full = await _aio.to_thread(
+                _refresh_files, ctx, arguments,
+            )
+            priority = ("interactive" if len(files) <= INDEX_BATCH_SIZE
+                        else "bulk")
+            summary = await _enqueue_refresh(
+                ctx, arguments, files, priority, reason="prism_refresh",
+            )
+            summary["need_full"] = need_full
             return [TextContent(type="text", text=_json(summary))]
 
         if name == "prism_bulk_refresh":
             import asyncio as _aio
-            import os as _os
             ctx = get_project(project_id)
-            files = arguments.get("files") or {}
-            default_domain = arguments.get("domain") or "code"
             chunk_size = max(1, int(arguments.get("chunk_size", 25)))
-            skip_graph = bool(arguments.get("skip_graph", False))
-            max_concurrent = int(
-                _os.environ.get("PRISM_MAX_CONCURRENT_REFRESH", "2")
+            files, need_full = await _aio.to_thread(
+                _refresh_files, ctx, arguments,
             )
-            if indexing_in_flight(project_id) >= max_concurrent:
-                return [TextContent(type="text", text=_json({
-                    "busy": True,
-                    "in_flight": indexing_in_flight(project_id),
-                    "max_concurrent": max_concurrent,
-                    "retry_after_s": 30,
-                    "note": "server saturated — back off then retry",
-                }))]
-            _indexing_begin(project_id)
-            indexed = 0
-            cancelled = False
-            chunks = 0
-            try:
-                items = list(files.items())
-                for i in range(0, len(items), chunk_size):
-                    if check_and_clear_cancel(project_id):
-                        cancelled = True
-                        break
-                    batch = items[i:i + chunk_size]
-                    for path, content in batch:
-                        if not isinstance(content, str):
-                            continue
-                        await _aio.to_thread(
-                            ctx.brain_svc.index_doc,
-                            path=path, content=content, domain=default_domain,
-                        )
-                        indexed += 1
-                    chunks += 1
-                if cancelled or skip_graph:
-                    summary = {
-                        "cancelled": cancelled,
-                        "graph_skipped": True,
-                    }
-                else:
-                    summary = await _aio.to_thread(
-                        ctx.graph_svc.rebuild,
-                        brain_db_path=str(ctx._data_dir / "brain.db"),
-                    )
-            finally:
-                _indexing_end(project_id)
-            summary["refreshed_files"] = indexed
-            summary["chunks_processed"] = chunks
-            summary["chunk_size"] = chunk_size
+            summary = await _enqueue_refresh(
+                ctx, arguments, files, "bulk", reason="prism_bulk_refresh",
+            )
+            if "refreshed_files" in summary:
+                summary["chunks_processed"] = -(-summary["refreshed_files"]
+                                                // chunk_size)
+                summary["chunk_size"] = chunk_size
+            summary["need_full"] = need_full
             return [TextContent(type="text", text=_json(summary))]
 
+        if name == "prism_index_status":
+            ctx = get_project(project_id)
+            return [TextContent(type="text", text=_json(
+                ctx.index_jobs.status(arguments.get("job_id")),
+            ))]
+
         if name == "prism_cancel_pending":
-            in_flight = indexing_in_flight(project_id)
+            ctx = get_project(project_id)
+            in_flight = ctx.index_jobs.active_jobs()
             if in_flight:
-                request_cancel(project_id)
+                dropped = ctx.index_jobs.cancel()
                 return [TextContent(type="text", text=_json({
                     "cancelled_requested": True,
+                    "dropped_files": dropped,
                     "indexing_in_flight": in_flight,
                 }))]
             return [TextContent(type="text", text=_json({
                 "cancelled_requested": False,
+                "dropped_files": 0,
                 "indexing_in_flight": 0,
                 "note": "no in-flight refresh to cancel",
             }))]
@@ -2353,7 +2202,18 @@ BEGIN NOW with Step 0. Do not ask the user for permission — execute the steps.
             ctx = get_project(project_id)
             brain_path = str(ctx._data_dir / "brain.db")
             backfilled = ctx.graph_svc.backfill_from_brain(brain_path)
-            summary = ctx.graph_svc.rebuild(brain_db_path=brain_path)
+            # Through the job queue so it can't overlap a queued rebuild;
+            # prism_sync keeps its blocking contract.
+            import asyncio as _aio
+            from app.config import GRAPH_REBUILD_WAIT_TIMEOUT_SECONDS
+            job = ctx.graph_jobs.request(reason="prism_sync")
+            record = await _aio.to_thread(ctx.graph_jobs.wait, job["job_id"],
+                                          GRAPH_REBUILD_WAIT_TIMEOUT_SECONDS)
+            summary = dict((record or {}).get("summary") or {})
+            summary["job_id"] = job["job_id"]
+            if record is None:
+                summary["wait_timed_out"] = True
+                summary["graph_rebuild"] = ctx.graph_jobs.status()
             summary["backfilled_via_sync"] = backfilled
             return [TextContent(type="text", text=_json(summary))]
 
@@ -2511,6 +2371,17 @@ BEGIN NOW with Step 0. Do not ask the user for permission — execute the steps.
             return [TextContent(type="text", text=_json(task))]
 
         if name == "task_list":
+            if arguments.get("limit"):
+                tasks, next_after = task_svc.list_page(
+                    limit=int(arguments["limit"]),
+                    after=arguments.get("after"),
+                    status=arguments.get("status"),
+                    assigned_agent=arguments.get("assigned_agent"),
+                    tag=arguments.get("tag"),
+                    story_file=arguments.get("story_file"),
+                )
+                return [TextContent(type="text", text=_json(
+                    {"tasks": tasks, "next_after": next_after}))]
             tasks = task_svc.list(
                 status=arguments.get("status"),
                 assigned_agent=arguments.get("assigned_agent"),
@@ -62,3 +62,13 @@ class HealthReport:
     # Learning loop stats
     ineffective_flagged: int = 0
     effective_boosted: int = 0
+
+    # Domains with entry changes since the previous cycle
+    dirty_domains: int = 0
+
+    # Telemetry rows rolled up into daily aggregates and deleted
+    telemetry_rolled_up: int = 0
+
+    # Wall time of the cycle and of each rule, in milliseconds
+    cycle_ms: float = 0.0
+    rule_ms: dict[str, float] = field(default_factory=dict)
@@ -24,6 +24,8 @@ class ProjectContext:
         # Lazy service instances
         self._brain_svc = None
         self._graph_svc = None
+        self._graph_jobs = None
+        self._index_jobs = None
         self._task_svc = None
         self._workflow_svc = None
         self._memory_svc = None
@@ -55,6 +57,30 @@ class ProjectContext:
             )
         return self._graph_svc
 
+    @property
+    def graph_jobs(self):
+        # Locked: two schedulers for one project would mean two workers.
+        graph_svc = self.graph_svc
+        with _lock:
+            if self._graph_jobs is None:
+                from app.services.graph_jobs import GraphRebuildJobs
+                self._graph_jobs = GraphRebuildJobs(
+                    graph_svc,
+                    brain_db_path=str(self._data_dir / "brain.db"),
+                )
+        return self._graph_jobs
+
+    @property
+    def index_jobs(self):
+        # Locked for the same reason as graph_jobs: one queue, one worker.
+        brain_svc = self.brain_svc
+        graph_jobs = self.graph_jobs
+        with _lock:
+            if self._index_jobs is None:
+                from app.services.index_jobs import IndexJobs
+                self._index_jobs = IndexJobs(brain_svc, graph_jobs)
+        return self._index_jobs
+
     @property
     def task_svc(self):
         if self._task_svc is None:
@@ -7,6 +7,7 @@ import sqlite3
 import sys
 from typing import Optional
 
+from app.config import TELEMETRY_RETENTION_BATCH, TELEMETRY_RETENTION_DAYS
 from app.engines.brain_engine import _expand_identifiers
 
 
@@ -148,6 +149,20 @@ class BrainService:
             return {"up": 0, "down": 0, "worst": []}
         return self._brain.feedback_stats()
 
+    def search_daily(self, days: int = 30) -> list[dict]:
+        """Per-day search volume, latency and feedback, newest first."""
+        if not self._available or self._brain is None:
+            return []
+        return self._brain.search_daily_stats(days=days)
+
+    def apply_retention(self) -> int:
+        """Roll expired searches / search_feedback rows into daily rollups."""
+        if not self._available or self._brain is None:
+            return 0
+        return self._brain.apply_retention(
+            TELEMETRY_RETENTION_DAYS, TELEMETRY_RETENTION_BATCH,
+        )
+
     def list_docs(
         self, domain: Optional[str] = None, limit: int = 100,
     ) -> list[dict]:
@@ -207,12 +222,23 @@ class BrainService:
 
     def call_chain(
         self, entity: str, depth: int = 2, limit: int = 50,
+        direction: str = "callees",
     ) -> list[dict]:
         """Bounded BFS over the call graph from ``entity``."""
         if not self._available or self._brain is None:
             return []
         return self._brain.call_chain(
-            entity=entity, depth=depth, limit=limit,
+            entity=entity, depth=depth, limit=limit, direction=direction,
+        )
+
+    def shortest_path(
+        self, source: str, target: str, max_depth: int = 6,
+    ) -> list[dict]:
+        """Fewest-hop call path from ``source`` to ``target``."""
+        if not self._available or self._brain is None:
+            return []
+        return self._brain.shortest_path(
+            source=source, target=target, max_depth=max_depth,
         )
 
     def record_session_outcome(
@@ -293,11 +319,29 @@ class BrainService:
             return 0
         return self._brain.ingest(sources)
 
-    def incremental_reindex(self) -> int:
+    def incremental_reindex(self, root: Optional[str] = None) -> int:
         """Re-index changed files. Returns count of updated docs."""
         if not self._available or self._brain is None:
             return 0
-        return self._brain.incremental_reindex()
+        return self._brain.incremental_reindex(root=root)
+
+    def last_reindex_stats(self) -> dict:
+        """Counts + timings of the last incremental_reindex (drift log)."""
+        if not self._available or self._brain is None:
+            return {}
+        return dict(self._brain.last_reindex_stats)
+
+    def last_ingest_stats(self) -> dict:
+        """File / record counts of the last ingest's .mulch and .overstory pass."""
+        if not self._available or self._brain is None:
+            return {}
+        return dict(self._brain.last_ingest_stats)
+
+    def reindex_paths(self, paths: list[str], root: Optional[str] = None) -> int:
+        """Re-index paths a file watcher saw change. Returns count re-indexed."""
+        if not self._available or self._brain is None:
+            return 0
+        return self._brain.reindex_paths(paths, root=root)
 
     def index_doc(
         self,
@@ -314,7 +358,9 @@ class BrainService:
         ``path::main`` (legacy id format preserved for backward-compat).
 
         Replaces any prior chunks for the same source_file so re-indexing
-        leaves no stale rows. Returns the first chunk's doc_id.
+        leaves no stale rows, and upserts the file's ``file_manifest`` row
+        (whole-file sha256, chunk count, staged flag) in the same
+        transaction. Returns the first chunk's doc_id.
         """
         from datetime import datetime, timezone
         import hashlib as _hashlib
@@ -384,8 +430,8 @@ class BrainService:
                 )
             else:
                 indexed_content = chunk_content
-            # Hash RAW chunk content so prism_status drift detection still
-            # lines up with on-disk sha256 when the file is single-chunk.
+            # Hash RAW chunk content (the whole-file hash prism_status diffs
+            # against lives in file_manifest, written below).
             chash = _hashlib.sha256(chunk_content.encode("utf-8")).hexdigest()
 
             # docs.content stores the RAW chunk (with optional contextual
@@ -419,6 +465,19 @@ class BrainService:
                         print(f"index_doc vec insert failed: {e!r}",
                               file=sys.stderr, flush=True)
 
+        # Stage source for graphify's code-graph pass.
+        staged = False
+        graph_svc = getattr(self, "graph_svc", None)
+        if graph_svc is not None:
+            try:
+                staged = graph_svc.stage_doc(path, content)
+            except Exception as e:
+                print(f"index_doc: graph staging failed: {e!r}",
+                      file=sys.stderr, flush=True)
+
+        # Whole-file hash + chunk count for prism_status drift checks,
+        # committed with the chunks so the two never disagree.
+        self._brain._record_file_manifest(path, content, staged=staged)
         brain_conn.commit()
 
         # Index caller-supplied entities into graph.db (unchanged).
@@ -434,17 +493,40 @@ class BrainService:
                         (ent_name, ent_kind, path),
                     )
             graph_conn.commit()
+            self._brain.invalidate_graph_cache()
+
+        return first_doc_id or f"{path}::main"
+
+    def stored_content(self, path: str, sha256: str) -> Optional[str]:
+        """Whole-file content last indexed for `path`, if it hashes to `sha256`.
+
+        The base for prism_refresh deltas. Tries the graphify staging copy
+        (every staged code file), then the ``::__file__`` / ``::main`` rows
+        with their contextual header stripped. Only a hash match counts,
+        so a stale or partial candidate is never returned.
+        """
+        import hashlib as _hashlib
+
+        def matches(text: Optional[str]) -> bool:
+            return text is not None and _hashlib.sha256(
+                text.encode("utf-8")).hexdigest() == sha256
 
-        # Stage source for graphify's code-graph pass (unchanged).
         graph_svc = getattr(self, "graph_svc", None)
         if graph_svc is not None:
-            try:
-                graph_svc.stage_doc(path, content)
-            except Exception as e:
-                print(f"index_doc: graph staging failed: {e!r}",
-                      file=sys.stderr, flush=True)
-
-        return first_doc_id or f"{path}::main"
+            staged = graph_svc.staged_content(path)
+            if matches(staged):
+                return staged
+        if not self._available or self._brain is None:
+            return None
+        rows = self._brain._brain.execute(
+            "SELECT content FROM docs WHERE id IN (?, ?)",
+            (f"{path}::__file__", f"{path}::main"),
+        ).fetchall()
+        for (content,) in rows:
+            for text in (content, content.partition("\n\n")[2]):
+                if matches(text):
+                    return text
+        return None
 
     # ------------------------------------------------------------------
     # Status
@@ -0,0 +1,252 @@
+"""inotify change feed for a mounted project directory.
+
+The drift timer used to find changes by polling git every
+PRISM_DRIFT_INTERVAL seconds (30 min by default), so edits took up to
+that long to reach the index. :class:`FileWatcher` watches the tree with
+inotify instead. It collects changed paths into a set, and once events
+have been quiet for ``debounce`` seconds (or ``max_delay`` has passed
+since the first one) it hands the coalesced batch to ``on_change``.
+
+inotify is Linux-only and goes through ctypes, so there is no extra
+dependency. :meth:`FileWatcher.start` returns False where it is
+unavailable (other platforms, no libc, watch limit reached) and the
+caller keeps polling. A queue overflow, or a watch that can't be added
+later on, hands ``on_change`` None, meaning "rescan everything".
+
+[Used by: app.main]
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# on_change receives relative paths, or None when the watcher lost
+# track and the caller should fall back to a full scan.
+ChangeCallback = Callable[[Optional[set[str]]], None]
+
+
+def _libc():
+    name = ctypes.util.find_library("c")
+    if not name or not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        libc.inotify_init1  # noqa: B018 — raises AttributeError if absent
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                       ctypes.c_uint32]
+    return libc
+
+
+class FileWatcher:
+    """Debounced, coalescing inotify watch over one directory tree."""
+
+    def __init__(
+        self,
+        root: str,
+        on_change: ChangeCallback,
+        skip_dirs: Iterable[str] = (".git",),
+        debounce: float = 2.0,
+        max_delay: float = 30.0,
+    ) -> None:
+        self.root = os.path.abspath(root)
+        self._on_change = on_change
+        self._skip = set(skip_dirs)
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._libc = None
+        self._fd = -1
+        self._dirs: dict[int, str] = {}  # wd -> dir relative to root
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: set[str] = set()
+        self._rescan = False
+        self._first = 0.0
+        self._last = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Watch the tree from a daemon thread. False if inotify can't."""
+        self._libc = _libc()
+        if self._libc is None or not os.path.isdir(self.root):
+            return False
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            return False
+        if not self._add_tree(""):
+            self.close()
+            return False
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"file-watcher:{self.root}")
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.close()
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._dirs.clear()
+
+    @property
+    def watched_dirs(self) -> int:
+        return len(self._dirs)
+
+    # ------------------------------------------------------------------
+    # Watches
+    # ------------------------------------------------------------------
+
+    def _add_dir(self, rel: str) -> bool:
+        path = os.path.join(self.root, rel) if rel else self.root
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path),
+                                          _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # Gone already (ENOENT/ENOTDIR) is fine; anything else —
+            # ENOSPC from max_user_watches — means we're blind there.
+            return err in (errno.ENOENT, errno.ENOTDIR)
+        self._dirs[wd] = rel
+        return True
+
+    def _add_tree(self, rel: str) -> bool:
+        """Watch ``rel`` and every non-skipped directory under it.
+
+        Returns False if a watch couldn't be added; the caller treats the
+        tree as unwatched.
+        """
+        top = os.path.join(self.root, rel) if rel else self.root
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in self._skip]
+            sub = os.path.relpath(dirpath, self.root)
+            if not self._add_dir("" if sub == "." else sub.replace(os.sep, "/")):
+                return False
+        return True
+
+    def _new_files(self, rel: str) -> None:
+        """Queue files already inside a directory that appeared (mkdir -p
+        then write races the watch, and moved-in trees arrive whole)."""
+        top = os.path.join(self.root, rel)
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in self._skip]
+            sub = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            self._pending.update(f"{sub}/{f}" for f in filenames)
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            timeout = self._flush_in()
+            try:
+                ready, _, _ = select.select([self._fd], [], [], timeout)
+            except (OSError, ValueError):
+                return
+            if ready:
+                self._read()
+            if self._due():
+                self._flush()
+
+    def _flush_in(self) -> float:
+        if not self._pending and not self._rescan:
+            return 1.0
+        now = time.monotonic()
+        due = min(self._last + self._debounce, self._first + self._max_delay)
+        return max(0.0, min(1.0, due - now))
+
+    def _due(self) -> bool:
+        if not self._pending and not self._rescan:
+            return False
+        now = time.monotonic()
+        return (now - self._last >= self._debounce
+                or now - self._first >= self._max_delay)
+
+    def _read(self) -> None:
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._rescan = True
+            return
+        now = time.monotonic()
+        if not self._pending and not self._rescan:
+            self._first = now
+        self._last = now
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, pos)
+            raw = buf[pos + _EVENT.size:pos + _EVENT.size + length]
+            pos += _EVENT.size + length
+            self._handle(wd, mask, os.fsdecode(raw.rstrip(b"\0")))
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self._rescan = True
+            return
+        if mask & IN_IGNORED:
+            self._dirs.pop(wd, None)
+            return
+        parent = self._dirs.get(wd)
+        if parent is None or not name:
+            return
+        if name in self._skip:
+            return
+        rel = f"{parent}/{name}" if parent else name
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                if not self._add_tree(rel):
+                    self._rescan = True
+                self._new_files(rel)
+            elif mask & IN_MOVED_FROM:
+                # A tree moved away reports no per-file events. (rm -r
+                # deletes, and reports, the files before the directory.)
+                self._rescan = True
+            return
+        self._pending.add(rel)
+
+    def _flush(self) -> None:
+        batch: Optional[set[str]] = None if self._rescan else self._pending
+        self._pending = set()
+        self._rescan = False
+        try:
+            self._on_change(batch)
+        except Exception as e:
+            print(f"[watch] {self.root}: change handler failed: {e!r}",
+                  file=sys.stderr)
@@ -1,10 +1,19 @@
-"""Governance engine — deterministic rules enforced on a timer."""
+"""Governance engine — deterministic rules enforced on a timer.
+
+A cycle reads MemoryService's change journal and only re-examines
+domains with stores or edits since the previous cycle (budget caps,
+duplicates, conflicts); the time-based rules (TTL, usage decay) find
+their candidates through the recorded_at / last_recalled indexes.
+Status changes are staged and applied in one batched write at the end.
+"""
 
 from __future__ import annotations
 
+import time
+from bisect import bisect_right
+from collections import Counter
 from datetime import datetime, timedelta, timezone
-from difflib import SequenceMatcher
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 
 from app.config import (
     DOMAIN_BUDGET_CAP,
@@ -14,8 +23,15 @@ from app.config import (
     USAGE_ARCHIVE_DAYS,
     USAGE_DECAY_DAYS,
 )
+from app.engines.near_dup import NearDupIndex, signature, similar
 from app.models.memory import HealthReport
 
+_T = TypeVar("_T")
+
+_NEGATION_WORDS = frozenset(
+    {"not", "don't", "dont", "never", "avoid", "shouldn't", "shouldnt"}
+)
+
 
 class GovernanceEngine:
     """Runs deterministic governance rules over expertise, tasks, and brain.
@@ -38,6 +54,17 @@ class GovernanceEngine:
         self._tasks: TaskService = task_service  # type: ignore[assignment]
         self._brain: BrainService = brain_service  # type: ignore[assignment]
         self._cached_report: Optional[HealthReport] = None
+        # Duplicate rule state per domain: the surviving active entries
+        # checked so far ({id: "name description"}) and their LSH index.
+        self._dup_texts: dict[str, dict[str, str]] = {}
+        self._dup_index: dict[str, NearDupIndex] = {}
+        # Change journal cursor (memory write generation) and, during a
+        # cycle, the dirty {domain: entry ids} plus staged status changes
+        # {entry id: (status, domain)}. Outside run_cycle both are None
+        # and a rule looks at every domain and writes at once.
+        self._cursor = -1
+        self._dirty: Optional[dict[str, set[str]]] = None
+        self._staged: Optional[dict[str, tuple[str, str]]] = None
 
     # ------------------------------------------------------------------
     # Main cycle
@@ -47,20 +74,53 @@ class GovernanceEngine:
         """Execute all governance rules and return a health report."""
         report = HealthReport()
         report.last_governance_run = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
 
-        report.archived_this_cycle += self._enforce_ttl()
-        report.archived_this_cycle += self._enforce_budget_caps()
-        report.archived_this_cycle += self._detect_duplicates()
-        report.archived_this_cycle += self._decay_unused()
-        report.stale_brain_docs = self._flag_stale_brain_docs()
-        report.flagged_conflicts = self._detect_conflicts()
-        report.stuck_tasks = self._flag_stuck_tasks()
-        report.domains_near_cap = self._domains_near_cap()
-
-        # Learning loop rules
-        report.ineffective_flagged = self._decay_ineffective()
-        report.effective_boosted = self._boost_effective()
-
+        def timed(rule: str, fn: Callable[[], _T]) -> _T:
+            t0 = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                report.rule_ms[rule] = round(
+                    (time.perf_counter() - t0) * 1000, 3)
+
+        cursor, self._dirty = self._memory.changes_since(self._cursor)
+        self._staged = {}
+        report.dirty_domains = len(self._dirty)
+        try:
+            report.archived_this_cycle += timed("ttl", self._enforce_ttl)
+            report.archived_this_cycle += timed("budget_caps",
+                                                self._enforce_budget_caps)
+            report.archived_this_cycle += timed("duplicates",
+                                                self._detect_duplicates)
+            report.archived_this_cycle += timed("usage_decay",
+                                                self._decay_unused)
+            report.stale_brain_docs = timed("stale_brain_docs",
+                                            self._flag_stale_brain_docs)
+            report.flagged_conflicts = timed("conflicts",
+                                             self._detect_conflicts)
+            report.stuck_tasks = timed("stuck_tasks", self._flag_stuck_tasks)
+            report.domains_near_cap = timed("domains_near_cap",
+                                            self._domains_near_cap)
+
+            # Learning loop rules
+            report.ineffective_flagged = timed("ineffective",
+                                               self._decay_ineffective)
+            report.effective_boosted = timed("effective",
+                                             self._boost_effective)
+
+            report.telemetry_rolled_up = timed("retention",
+                                               self._apply_retention)
+
+            generation = timed("apply", self._apply_staged)
+        finally:
+            self._dirty = None
+            self._staged = None
+        # Our own batched write needn't be re-read next cycle unless
+        # something else was written since the journal was read.
+        self._cursor = generation if generation == cursor + 1 else cursor
+
+        report.cycle_ms = round((time.perf_counter() - started) * 1000, 3)
         self._cached_report = report
         return report
 
@@ -70,6 +130,53 @@ class GovernanceEngine:
             return HealthReport()
         return self._cached_report
 
+    # ------------------------------------------------------------------
+    # Cycle helpers: dirty domains and staged status changes
+    # ------------------------------------------------------------------
+
+    def _domains(self) -> list[str]:
+        """Domains whose entries changed since the last cycle."""
+        if self._dirty is None:
+            return self._memory.list_domains()
+        return sorted(self._dirty)
+
+    def _active_entries(self, domain: str) -> list:
+        """Active entries in a domain, less those staged this cycle."""
+        entries = self._memory.list_entries(domain, status_filter="active")
+        if self._staged:
+            entries = [e for e in entries if e.id not in self._staged]
+        return entries
+
+    def _is_staged(self, entry_id: str) -> bool:
+        return bool(self._staged) and entry_id in self._staged
+
+    def _set_status(self, entry_id: str, domain: str, status: str) -> None:
+        """Stage a status change for the cycle's batched write."""
+        if self._staged is None:
+            self._memory.update_entry(entry_id, status=status)
+        else:
+            self._staged[entry_id] = (status, domain)
+
+    def _apply_staged(self) -> Optional[int]:
+        """Write the cycle's status changes; returns the write generation."""
+        if not self._staged:
+            return None
+        return self._memory.set_statuses(
+            {entry_id: status for entry_id, (status, _) in self._staged.items()}
+        )
+
+    def _stale(self, column: str, cutoff: datetime,
+               domain: Optional[str] = None) -> list:
+        """Active entries whose ``column`` may be older than ``cutoff``.
+
+        The index scan compares ISO strings, so it gets a day of slack
+        for entries written with other UTC offsets; rules re-check the
+        parsed timestamp.
+        """
+        before = (cutoff + timedelta(days=1)).isoformat()
+        return [e for e in self._memory.list_stale(column, before, domain)
+                if not self._is_staged(e.id)]
+
     # ------------------------------------------------------------------
     # Rule: TTL enforcement
     # ------------------------------------------------------------------
@@ -83,8 +190,7 @@ class GovernanceEngine:
             shelf_days = DOMAIN_SHELF_LIFE.get(domain, DOMAIN_SHELF_LIFE["default"])
             cutoff = now - timedelta(days=shelf_days)
 
-            entries = self._memory.list_entries(domain, status_filter="active")
-            for entry in entries:
+            for entry in self._stale("recorded_at", cutoff, domain):
                 if not entry.recorded_at:
                     continue
                 try:
@@ -94,7 +200,7 @@ class GovernanceEngine:
                 except (ValueError, TypeError):
                     continue
                 if recorded < cutoff:
-                    self._memory.update_entry(entry.id, status="archived")
+                    self._set_status(entry.id, entry.domain, "archived")
                     archived += 1
 
         return archived
@@ -107,8 +213,8 @@ class GovernanceEngine:
         """Archive oldest entries when a domain exceeds the budget cap."""
         archived = 0
 
-        for domain in self._memory.list_domains():
-            entries = self._memory.list_entries(domain, status_filter="active")
+        for domain in self._domains():
+            entries = self._active_entries(domain)
             if len(entries) <= DOMAIN_BUDGET_CAP:
                 continue
 
@@ -116,7 +222,7 @@ class GovernanceEngine:
             entries.sort(key=lambda e: e.recorded_at or "")
             excess = len(entries) - DOMAIN_BUDGET_CAP
             for entry in entries[:excess]:
-                self._memory.update_entry(entry.id, status="archived")
+                self._set_status(entry.id, domain, "archived")
                 archived += 1
 
         return archived
@@ -130,27 +236,52 @@ class GovernanceEngine:
 
         Uses SequenceMatcher ratio on name+description. When a duplicate
         pair is found, the newer entry is archived.
+
+        Survivors of earlier cycles stay in a per-domain MinHash/LSH
+        index, so a cycle only checks new or edited entries, and only
+        against entries sharing an LSH bucket. Small domains are compared
+        exhaustively and match the pairwise loop exactly; in large ones
+        LSH can miss a rare pair (see app.engines.near_dup).
         """
         archived = 0
 
-        for domain in self._memory.list_domains():
-            entries = self._memory.list_entries(domain, status_filter="active")
-            archived_ids: set[str] = set()
+        for domain in self._domains():
+            entries = self._active_entries(domain)
+            order = {e.id: pos for pos, e in enumerate(entries)}
+            texts = {e.id: f"{e.name} {e.description}" for e in entries}
+            seen = self._dup_texts.setdefault(domain, {})
+            index = self._dup_index.setdefault(domain, NearDupIndex())
+
+            # Gone (archived, moved) or edited since last cycle: drop them;
+            # edited ones are re-checked below.
+            for entry_id in [i for i, t in seen.items() if texts.get(i) != t]:
+                index.discard(entry_id)
+                del seen[entry_id]
 
-            for i in range(len(entries)):
-                if entries[i].id in archived_ids:
+            for entry in entries:
+                if entry.id in seen or entry.id not in order:
                     continue
-                text_i = f"{entries[i].name} {entries[i].description}"
-                for j in range(i + 1, len(entries)):
-                    if entries[j].id in archived_ids:
-                        continue
-                    text_j = f"{entries[j].name} {entries[j].description}"
-                    ratio = SequenceMatcher(None, text_i, text_j).ratio()
-                    if ratio >= DUPLICATE_THRESHOLD:
-                        # Archive the newer entry
-                        self._memory.update_entry(entries[j].id, status="archived")
-                        archived_ids.add(entries[j].id)
-                        archived += 1
+                text = texts[entry.id]
+                sig = signature(text)
+                matches = sorted(
+                    (k for k in index.candidates(text, sig)
+                     if similar(seen[k], text, DUPLICATE_THRESHOLD)),
+                    key=order.__getitem__,
+                )
+                if matches and order[matches[0]] < order[entry.id]:
+                    # An older survivor matches: archive this, the newer one
+                    self._set_status(entry.id, domain, "archived")
+                    del order[entry.id]
+                    archived += 1
+                    continue
+                # An edited older entry now matches newer survivors
+                for newer in matches:
+                    self._set_status(newer, domain, "archived")
+                    index.discard(newer)
+                    del seen[newer], order[newer]
+                    archived += 1
+                index.add(entry.id, text, sig)
+                seen[entry.id] = text
 
         return archived
 
@@ -164,30 +295,33 @@ class GovernanceEngine:
         now = datetime.now(timezone.utc)
         archive_cutoff = now - timedelta(days=USAGE_ARCHIVE_DAYS)
 
-        for domain in self._memory.list_domains():
-            entries = self._memory.list_entries(domain, status_filter="active")
-            for entry in entries:
-                if entry.recall_count > 0 and entry.last_recalled:
-                    try:
-                        last = datetime.fromisoformat(entry.last_recalled)
-                        if last.tzinfo is None:
-                            last = last.replace(tzinfo=timezone.utc)
-                    except (ValueError, TypeError):
-                        continue
-                    if last < archive_cutoff:
-                        self._memory.update_entry(entry.id, status="archived")
-                        archived += 1
-                elif entry.recall_count == 0 and entry.recorded_at:
-                    # Never recalled — check if old enough to archive
-                    try:
-                        recorded = datetime.fromisoformat(entry.recorded_at)
-                        if recorded.tzinfo is None:
-                            recorded = recorded.replace(tzinfo=timezone.utc)
-                    except (ValueError, TypeError):
-                        continue
-                    if recorded < archive_cutoff:
-                        self._memory.update_entry(entry.id, status="archived")
-                        archived += 1
+        # Either timestamp past the window makes an entry a candidate
+        candidates = {e.id: e for e in self._stale("recorded_at",
+                                                   archive_cutoff)}
+        candidates.update((e.id, e) for e in self._stale("last_recalled",
+                                                         archive_cutoff))
+        for entry in candidates.values():
+            if entry.recall_count > 0 and entry.last_recalled:
+                try:
+                    last = datetime.fromisoformat(entry.last_recalled)
+                    if last.tzinfo is None:
+                        last = last.replace(tzinfo=timezone.utc)
+                except (ValueError, TypeError):
+                    continue
+                if last < archive_cutoff:
+                    self._set_status(entry.id, entry.domain, "archived")
+                    archived += 1
+            elif entry.recall_count == 0 and entry.recorded_at:
+                # Never recalled — check if old enough to archive
+                try:
+                    recorded = datetime.fromisoformat(entry.recorded_at)
+                    if recorded.tzinfo is None:
+                        recorded = recorded.replace(tzinfo=timezone.utc)
+                except (ValueError, TypeError):
+                    continue
+                if recorded < archive_cutoff:
+                    self._set_status(entry.id, entry.domain, "archived")
+                    archived += 1
 
         return archived
 
@@ -219,34 +353,66 @@ class GovernanceEngine:
         Simple heuristic: if two active entries in the same domain share
         keyword overlap and one contains negation words ('not', "don't",
         'never', 'avoid'), flag them as potential conflicts.
+
+        Pairs come from an inverted index (content token -> entries),
+        built once per domain per cycle: each entry only counts shared
+        tokens with later entries on the other side of the negation
+        split, so pairs without a shared token are never looked at.
+        Returns the number of conflicting pairs; the later entry of each
+        pair is flagged needs_review.
+
+        Pairs of unchanged entries were settled by an earlier cycle, so
+        within a cycle only pairs involving a changed entry are counted.
         """
-        negation_words = {"not", "don't", "dont", "never", "avoid", "shouldn't", "shouldnt"}
         flagged = 0
 
-        for domain in self._memory.list_domains():
-            entries = self._memory.list_entries(domain, status_filter="active")
-            for i in range(len(entries)):
-                words_i = set(f"{entries[i].name} {entries[i].description}".lower().split())
-                has_neg_i = bool(words_i & negation_words)
-
-                for j in range(i + 1, len(entries)):
-                    words_j = set(
-                        f"{entries[j].name} {entries[j].description}".lower().split()
-                    )
-                    has_neg_j = bool(words_j & negation_words)
-
-                    # Only flag when exactly one side has negation
-                    if has_neg_i == has_neg_j:
+        for domain in self._domains():
+            entries = self._active_entries(domain)
+            changed = None if self._dirty is None else self._dirty[domain]
+            contents: list[set[str]] = []
+            negated: list[bool] = []
+            # token -> positions, one index per side of the negation split
+            postings: tuple[dict[str, list[int]], dict[str, list[int]]] = ({}, {})
+            for pos, entry in enumerate(entries):
+                words = set(f"{entry.name} {entry.description}".lower().split())
+                has_neg = bool(words & _NEGATION_WORDS)
+                content = words - _NEGATION_WORDS
+                contents.append(content)
+                negated.append(has_neg)
+                side = postings[has_neg]
+                for token in content:
+                    side.setdefault(token, []).append(pos)
+
+            if changed is None:
+                focus = range(len(entries))
+            else:
+                focus = [pos for pos, e in enumerate(entries) if e.id in changed]
+            in_focus = set(focus)
+
+            to_flag: set[int] = set()
+            for i in focus:
+                # Only pairs where exactly one side has negation
+                opposite = postings[not negated[i]]
+                shared: dict[int, int] = {}
+                for token in contents[i]:
+                    positions = opposite.get(token)
+                    if not positions:
                         continue
-
-                    # Check keyword overlap (excluding common stop words)
-                    content_i = words_i - negation_words
-                    content_j = words_j - negation_words
-                    overlap = content_i & content_j
-                    if len(overlap) >= 2:
-                        self._memory.update_entry(entries[j].id, status="needs_review")
+                    cut = bisect_right(positions, i)
+                    for j in positions[cut:]:
+                        shared[j] = shared.get(j, 0) + 1
+                    # Earlier changed entries count this pair themselves
+                    for j in positions[:cut]:
+                        if j not in in_focus:
+                            shared[j] = shared.get(j, 0) + 1
+                for j, n in shared.items():
+                    if n >= 2:
+                        to_flag.add(max(i, j))
                         flagged += 1
 
+            for j in sorted(to_flag):
+                self._set_status(entries[j].id, domain, "needs_review")
+
         return flagged
 
     # ------------------------------------------------------------------
@@ -297,14 +463,15 @@ class GovernanceEngine:
                 continue  # not enough signal yet
             score = data["score"]
             entry = self._memory.get_entry(entry_id)
-            if entry is None or entry.status != "active":
+            if (entry is None or entry.status != "active"
+                    or self._is_staged(entry_id)):
                 continue
 
             if score <= -0.6:
-                self._memory.update_entry(entry_id, status="archived")
+                self._set_status(entry_id, entry.domain, "archived")
                 flagged += 1
             elif score <= -0.3:
-                self._memory.update_entry(entry_id, status="needs_review")
+                self._set_status(entry_id, entry.domain, "needs_review")
                 flagged += 1
 
         return flagged
@@ -333,7 +500,8 @@ class GovernanceEngine:
                 continue
 
             entry = self._memory.get_entry(entry_id)
-            if entry is None or entry.status != "active":
+            if (entry is None or entry.status != "active"
+                    or self._is_staged(entry_id)):
                 continue
 
             # Bump importance: +1 for >0.5, +2 for >0.8, capped at 10
@@ -345,6 +513,14 @@ class GovernanceEngine:
 
         return boosted
 
+    # ------------------------------------------------------------------
+    # Rule: telemetry retention
+    # ------------------------------------------------------------------
+
+    def _apply_retention(self) -> int:
+        """Roll expired recall_log / searches rows into daily aggregates."""
+        return self._memory.apply_retention() + self._brain.apply_retention()
+
     # ------------------------------------------------------------------
     # Helper: domains near cap
     # ------------------------------------------------------------------
@@ -353,8 +529,9 @@ class GovernanceEngine:
         """Return domains at 80% or more of budget cap."""
         near: list[str] = []
         threshold = int(DOMAIN_BUDGET_CAP * 0.8)
-        for domain in self._memory.list_domains():
-            entries = self._memory.list_entries(domain, status_filter="active")
-            if len(entries) >= threshold:
+        # Entries staged this cycle leave the active count
+        leaving = Counter(domain for _, domain in (self._staged or {}).values())
+        for domain, stats in self._memory.domain_stats().items():
+            if stats["active"] - leaving[domain] >= threshold:
                 near.append(domain)
         return near
@@ -0,0 +1,186 @@
+"""Graph rebuild jobs — debounced, coalescing, one worker per project.
+
+Clients call ``graph_rebuild`` after every sync chunk and ``prism_refresh``
+used to run graphify inline, so concurrent refreshes could start
+overlapping graphify subprocesses on the same staging dir. Rebuilds now go
+through :class:`GraphRebuildJobs`:
+
+  * :meth:`request` returns a job id immediately.
+  * A request waits ``GRAPH_REBUILD_DEBOUNCE_SECONDS`` before it runs;
+    further requests inside that window join the queued job and push
+    the deadline out.
+  * Requests that arrive while a rebuild is running collapse into a
+    single follow-up job.
+  * :meth:`status` reports the running stage, queue depth, and the last
+    run's duration for ``prism_status``.
+
+The worker is a daemon thread started on demand and exits once the queue
+drains, so idle projects cost nothing.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from typing import Any, Optional
+
+from app.config import GRAPH_REBUILD_DEBOUNCE_SECONDS
+
+
+class GraphRebuildJobs:
+    """Per-project rebuild scheduler wrapping ``GraphService.rebuild``."""
+
+    def __init__(self, graph_svc, brain_db_path: str,
+                 debounce_s: Optional[float] = None) -> None:
+        self._graph_svc = graph_svc
+        self._brain_db_path = brain_db_path
+        self._debounce_s = (GRAPH_REBUILD_DEBOUNCE_SECONDS
+                            if debounce_s is None else float(debounce_s))
+        self._cond = threading.Condition()
+        self._queued: Optional[dict] = None
+        self._running: Optional[dict] = None
+        self._last: Optional[dict] = None
+        self._finished: dict[str, dict] = {}
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def request(self, full: bool = False, reason: str = "") -> dict:
+        """Queue a rebuild (or join the queued one); returns the job."""
+        now = time.time()
+        with self._cond:
+            job = self._queued
+            if job is None:
+                job = {
+                    "job_id": uuid.uuid4().hex[:12],
+                    "full": bool(full),
+                    "requested_at": now,
+                    "requests": 0,
+                    "reasons": [],
+                }
+                self._queued = job
+            job["full"] = job["full"] or bool(full)
+            job["requests"] += 1
+            if reason and reason not in job["reasons"]:
+                job["reasons"].append(reason)
+            job["due_at"] = now + self._debounce_s
+            self._ensure_worker()
+            self._cond.notify_all()
+            return {
+                "job_id": job["job_id"],
+                "status": "queued",
+                "coalesced": job["requests"] > 1,
+                "runs_after": (self._running or {}).get("job_id"),
+                "debounce_s": self._debounce_s,
+            }
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """Block until ``job_id`` finishes; returns its record.
+
+        None when ``timeout`` expires first, or when ``job_id`` is neither
+        queued, running nor in the bounded finished history (unknown, or
+        evicted from it) — such an id would otherwise never finish.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while job_id not in self._finished:
+                if not self._pending(job_id):
+                    return None
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._finished[job_id]
+
+    def status(self) -> dict:
+        """Snapshot for prism_status: {state, running, queued, last}."""
+        now = time.time()
+        with self._cond:
+            running = queued = None
+            if self._running is not None:
+                r = self._running
+                running = {
+                    "job_id": r["job_id"],
+                    "stage": r.get("stage"),
+                    "full": r["full"],
+                    "elapsed_s": round(now - r["started_at"], 1),
+                }
+            if self._queued is not None:
+                q = self._queued
+                queued = {
+                    "job_id": q["job_id"],
+                    "requests": q["requests"],
+                    "starts_in_s": round(max(0.0, q["due_at"] - now), 1),
+                }
+            state = ("running" if running else "queued" if queued else "idle")
+            return {"state": state, "running": running, "queued": queued,
+                    "last": dict(self._last) if self._last else None}
+
+    def _pending(self, job_id: str) -> bool:
+        return any(job is not None and job["job_id"] == job_id
+                   for job in (self._queued, self._running))
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="graph-rebuild", daemon=True,
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    job = self._queued
+                    if job is None:
+                        self._worker = None
+                        return
+                    delay = job["due_at"] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                self._queued = None
+                job["started_at"] = time.time()
+                job["stage"] = "starting"
+                self._running = job
+            self._execute(job)
+
+    def _execute(self, job: dict) -> None:
+        def progress(stage: str) -> None:
+            with self._cond:
+                job["stage"] = stage
+
+        record: dict[str, Any] = {"job_id": job["job_id"],
+                                  "requests": job["requests"]}
+        try:
+            summary = self._graph_svc.rebuild(
+                brain_db_path=self._brain_db_path,
+                full=job["full"],
+                progress=progress,
+            )
+            record["status"] = "failed" if summary.get("error") else "done"
+            record["summary"] = summary
+        except Exception as e:  # noqa: BLE001 — keep the worker alive
+            record["status"] = "failed"
+            record["summary"] = {"error": repr(e)}
+        finished = time.time()
+        record["finished_at"] = finished
+        record["duration_s"] = round(finished - job["started_at"], 2)
+        record["mode"] = record["summary"].get("mode")
+        if record["summary"].get("error"):
+            record["error"] = str(record["summary"]["error"])[:500]
+        with self._cond:
+            self._running = None
+            self._last = {k: v for k, v in record.items() if k != "summary"}
+            self._finished[job["job_id"]] = record
+            # Bounded history for wait(); an evicted id reads as unknown.
+            while len(self._finished) > 32:
+                self._finished.pop(next(iter(self._finished)))
+            self._cond.notify_all()
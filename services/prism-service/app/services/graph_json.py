@@ -0,0 +1,217 @@
+"""Streaming reader/writer for graphify's graph.json.
+
+graph.json is a single JSON object (networkx node-link layout: ``nodes``,
+``links`` plus a few small members). On large monorepos it runs to
+hundreds of MB, and ``json.loads`` of it — plus the dicts built on top —
+peaked at several GB of RSS during import. These helpers walk the
+document in fixed-size chunks and decode one array element at a time,
+so memory stays bounded by the largest single node or link.
+
+  * :func:`iter_array` — yield the elements of one top-level array.
+  * :func:`read_members` — decode every *other* top-level member
+    (skipping the big arrays element-wise).
+  * :class:`GraphJsonWriter` — write a graph.json incrementally.
+
+[Used by: app.services.graph_service]
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+_CHUNK = 1 << 20
+_WS = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_DELIMS = frozenset(",:]} \t\n\r")
+
+
+class _Reader:
+    """Forward-only cursor over a JSON file with a sliding text buffer."""
+
+    def __init__(self, fh, chunk: int = _CHUNK) -> None:
+        self._fh = fh
+        self._chunk = chunk
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._fh.read(self._chunk)
+        if not data:
+            self._eof = True
+            return False
+        # Drop the consumed prefix so the buffer stays ~one chunk long.
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace char ('' at EOF), without consuming it."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        got = self.peek()
+        if got != char:
+            raise ValueError(f"graph.json: expected {char!r}, got {got!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete JSON value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut by the chunk edge ("12" of "12.5e3") decodes
+            # fine on its own — only trust it when a delimiter follows.
+            if ((end == len(self._buf) or self._buf[end] not in _DELIMS)
+                    and not self._eof and self._fill()):
+                continue
+            self._pos = end
+            return obj
+
+    def elements(self) -> Iterator[Any]:
+        """Yield the elements of the array at the cursor, consuming it."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            nxt = self.peek()
+            self._pos += 1
+            if nxt == "]":
+                return
+            if nxt != ",":
+                raise ValueError(f"graph.json: expected ',' or ']', got {nxt!r}")
+
+    def members(self) -> Iterator[str]:
+        """Yield top-level keys; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            nxt = self.peek()
+            self._pos += 1
+            if nxt == "}":
+                return
+            if nxt != ",":
+                raise ValueError(f"graph.json: expected ',' or '}}', got {nxt!r}")
+
+    def skip(self) -> None:
+        """Consume the value at the cursor; arrays are skipped per element."""
+        if self.peek() == "[":
+            for _ in self.elements():
+                pass
+        else:
+            self.value()
+
+
+def iter_array(path: Path | str, key: str,
+               chunk: int = _CHUNK) -> Iterator[Any]:
+    """Yield the elements of top-level array ``key`` (nothing if absent)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        reader = _Reader(fh, chunk)
+        for name in reader.members():
+            if name == key and reader.peek() == "[":
+                yield from reader.elements()
+                return
+            reader.skip()
+
+
+def read_members(path: Path | str, skip: tuple[str, ...] = ("nodes", "links"),
+                 chunk: int = _CHUNK) -> dict:
+    """Decode all top-level members except ``skip`` (walked, not built)."""
+    out: dict = {}
+    with open(path, "r", encoding="utf-8") as fh:
+        reader = _Reader(fh, chunk)
+        for name in reader.members():
+            if name in skip:
+                reader.skip()
+            else:
+                out[name] = reader.value()
+    return out
+
+
+class GraphJsonWriter:
+    """Write a graph.json object member by member.
+
+    Arrays are opened with :meth:`begin_array`, filled one element at a
+    time with :meth:`append`, and closed by the next member or
+    :meth:`close`. Writes go to ``<path>.tmp`` and replace ``path`` on a
+    clean close, so readers never see a half-written file.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+        self._tmp = self._path.with_suffix(self._path.suffix + ".tmp")
+        self._fh = open(self._tmp, "w", encoding="utf-8")
+        self._fh.write("{")
+        self._members = 0
+        self._in_array: Optional[int] = None
+
+    def _key(self, key: str) -> None:
+        self._end_array()
+        if self._members:
+            self._fh.write(", ")
+        self._fh.write(json.dumps(key) + ": ")
+        self._members += 1
+
+    def _end_array(self) -> None:
+        if self._in_array is not None:
+            self._fh.write("]")
+            self._in_array = None
+
+    def member(self, key: str, value: Any) -> None:
+        self._key(key)
+        self._fh.write(json.dumps(value))
+
+    def begin_array(self, key: str) -> None:
+        self._key(key)
+        self._fh.write("[")
+        self._in_array = 0
+
+    def append(self, item: Any) -> None:
+        if self._in_array:
+            self._fh.write(",\n")
+        self._fh.write(json.dumps(item))
+        self._in_array += 1
+
+    def close(self) -> None:
+        self._end_array()
+        self._fh.write("}")
+        self._fh.close()
+        self._tmp.replace(self._path)
+
+    def abort(self) -> None:
+        self._fh.close()
+        try:
+            self._tmp.unlink()
+        except OSError:
+            pass
+
+    def __enter__(self) -> "GraphJsonWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
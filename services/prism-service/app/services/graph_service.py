@@ -16,8 +16,14 @@ Design choices:
     so it survives container restart but is project-isolated.
   * Rebuild is explicit (via MCP tool `graph_rebuild`) rather than per-ingest:
     graphify is cheap on small repos but re-running per doc is wasteful.
+  * Rebuilds are incremental: only staged files changed since the last run
+    are re-extracted and merged into the previous graph.json; a full pass
+    (fresh community detection) runs every GRAPH_FULL_REBUILD_EVERY runs.
   * Tree-sitter fallback in brain_engine remains for projects that haven't
     called graph_rebuild yet.
+  * Import diffs graph.json against graph.db in one transaction (upsert
+    changed rows, delete vanished ones) so readers never see a half-built
+    graph and unchanged entities keep their ids.
 """
 
 from __future__ import annotations
@@ -27,8 +33,13 @@ import shutil
 import sqlite3
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+from app.config import GRAPH_FULL_REBUILD_EVERY, GRAPH_INCREMENTAL_MAX_CHANGED
+from app.services import sync_tree
 
 
 # Map of common source-code suffixes that graphify knows how to parse.
@@ -39,6 +50,14 @@ GRAPHIFY_CODE_SUFFIXES = {
     ".md",  # graphify also picks up heading structure from markdown
 }
 
+# prism_status drift lookups per IN (...) query; stays well under
+# SQLITE_MAX_VARIABLE_NUMBER on old builds (999).
+_DRIFT_BATCH = 500
+
+# Top-level entries of the staging dir that graphify writes, not files
+# staged from the project (graphify-out also holds the cache symlink).
+_STAGING_OUTPUT = frozenset({"graphify-out"})
+
 
 def _graph_schema_migrations(conn: sqlite3.Connection) -> None:
     """Add graphify-specific columns + communities table.
@@ -107,6 +126,11 @@ def _graph_schema_migrations(conn: sqlite3.Connection) -> None:
     except sqlite3.OperationalError:
         pass
 
+    # Trigram index over entity name + label for Brain._graph_search.
+    # Triggers keep it current through the import below.
+    from app.engines.brain_engine import _init_entity_fts
+    _init_entity_fts(conn)
+
 
 # ---------------------------------------------------------------------------
 # Community label derivation
@@ -385,6 +409,11 @@ class GraphService:
         self._staging_dir = self._project_dir / "graphify-src"
         self._staging_dir.mkdir(parents=True, exist_ok=True)
         self._graph_db = graph_db_path
+        # One graphify run per staging dir at a time, whoever calls.
+        self._rebuild_lock = threading.Lock()
+        # (file_manifest generation, value) caches for sync_status.
+        self._sync_tree: Optional[tuple[int, sync_tree.Tree]] = None
+        self._code_count: Optional[tuple[int, int]] = None
 
     # ------------------------------------------------------------------
     # Ingestion: stage doc content to disk for graphify to read
@@ -407,6 +436,16 @@ class GraphService:
         except OSError:
             return False
 
+    def staged_content(self, path: str) -> Optional[str]:
+        """The content last staged for `path`, or None if not staged."""
+        rel = Path(path).as_posix().lstrip("/")
+        if ".." in Path(rel).parts:
+            return None
+        try:
+            return (self._staging_dir / rel).read_text(encoding="utf-8")
+        except (OSError, UnicodeError):
+            return None
+
     def unstage_doc(self, path: str) -> bool:
         rel = Path(path).as_posix().lstrip("/")
         dest = self._staging_dir / rel
@@ -462,7 +501,7 @@ class GraphService:
             rows = []
         finally:
             conn.close()
-        n = 0
+        staged: list[str] = []
         seen: set[str] = set()
         for row in rows:
             path = row["source_file"]
@@ -475,21 +514,147 @@ class GraphService:
                 continue
             seen.add(path)
             if self.stage_doc(path, row["content"] or ""):
-                n += 1
+                staged.append(path)
+        if staged:
+            try:
+                conn = sqlite3.connect(brain_db_path)
+                with conn:
+                    conn.executemany(
+                        "UPDATE file_manifest SET staged = 1 "
+                        "WHERE source_file = ?", ((p,) for p in staged),
+                    )
+                conn.close()
+            except sqlite3.Error:
+                pass
+        return len(staged)
+
+    # ------------------------------------------------------------------
+    # file_manifest.staged bookkeeping. index_doc sets the flag as it
+    # stages; these catch the paths that bypass it (unstage, a wiped
+    # staging dir, manifests backfilled on upgrade).
+    # ------------------------------------------------------------------
+
+    def _mark_staged(self, conn: sqlite3.Connection, rels) -> None:
+        """Set file_manifest.staged to exactly the staged relative paths."""
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS _staged "
+                     "(rel TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM _staged")
+        conn.executemany("INSERT OR IGNORE INTO _staged (rel) VALUES (?)",
+                         ((r,) for r in rels))
+        # stage_doc keys the staging path on the source path minus any
+        # leading '/', so match on the same normalisation.
+        is_staged = "(ltrim(source_file, '/') IN (SELECT rel FROM _staged))"
+        conn.execute(f"UPDATE file_manifest SET staged = {is_staged} "
+                     f"WHERE staged IS NOT {is_staged}")
+        conn.execute(
+            "INSERT OR REPLACE INTO index_meta (key, value) "
+            "VALUES ('file_manifest_staged', datetime('now'))"
+        )
+        conn.commit()
+
+    def _ensure_staged_marked(self, conn: sqlite3.Connection) -> None:
+        """One staging-dir walk the first time a manifest is consulted."""
+        if conn.execute(
+            "SELECT 1 FROM index_meta WHERE key = 'file_manifest_staged'"
+        ).fetchone():
+            return
+        self._mark_staged(conn, (rel for rel, _ in self._staged_files()))
+
+    def _sync_staged_flags(self, brain_db_path: str, rels) -> None:
+        try:
+            conn = sqlite3.connect(brain_db_path)
+            try:
+                self._mark_staged(conn, rels)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _manifest_tree(self, conn: sqlite3.Connection) -> "sync_tree.Tree":
+        """Merkle tree of the manifest files the hook hashes, rebuilt
+        when the manifest generation moves."""
+        # Generation and rows from one read snapshot, so a concurrent
+        # index_doc can't pair a new generation with old rows.
+        conn.execute("BEGIN")
+        try:
+            gen = conn.execute(
+                "SELECT generation FROM file_manifest_totals WHERE id = 0"
+            ).fetchone()[0]
+            cached = self._sync_tree
+            if cached is not None and cached[0] == gen:
+                return cached[1]
+            built = sync_tree.build_tree(
+                (path, sha) for path, sha, size in conn.execute(
+                    "SELECT source_file, file_sha256, size_bytes "
+                    "FROM file_manifest"
+                ) if sync_tree.eligible(path or "", sha, size)
+            )
+        finally:
+            conn.rollback()
+        self._sync_tree = (gen, built)
+        return built
+
+    def _code_files(self, conn: sqlite3.Connection) -> int:
+        """Manifest files with a graphify suffix, recounted per generation."""
+        gen = conn.execute(
+            "SELECT generation FROM file_manifest_totals WHERE id = 0"
+        ).fetchone()[0]
+        cached = self._code_count
+        if cached is not None and cached[0] == gen:
+            return cached[1]
+        # One row per file (not per chunk), suffix-matched in SQL.
+        code_suffix = " OR ".join(
+            "source_file LIKE ?" for _ in GRAPHIFY_CODE_SUFFIXES
+        )
+        n = conn.execute(
+            f"SELECT COUNT(*) FROM file_manifest WHERE {code_suffix}",
+            [f"%{s}" for s in sorted(GRAPHIFY_CODE_SUFFIXES)],
+        ).fetchone()[0]
+        self._code_count = (gen, n)
         return n
 
+    def _compare_tree(self, conn: sqlite3.Connection, tree: dict,
+                      out: dict) -> None:
+        server_tree = self._manifest_tree(conn)
+        out["tree"] = {"root": server_tree[""][0],
+                       "mismatched": sync_tree.compare(server_tree, tree)}
+
+    def _tree_round(self, brain_db_path: str, tree: dict, out: dict) -> dict:
+        try:
+            conn = sqlite3.connect(brain_db_path)
+            try:
+                self._compare_tree(conn, tree, out)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+        return out
+
     def sync_status(self, brain_db_path: str,
-                    file_hashes: dict | None = None) -> dict:
-        """Report whether the graph is in sync with docs. Non-mutating.
+                    file_hashes: dict | None = None,
+                    tree: dict | None = None) -> dict:
+        """Report whether the graph is in sync with docs.
 
-        If `file_hashes` is provided ({path: sha256}), we also compare
-        disk state against Brain's stored content_hash for each path and
-        return a precise `drifted` list:
+        Read-only apart from a one-time staged-flag reconcile the first
+        time a (backfilled) manifest is consulted.
+
+        Counts come from brain.db's ``file_manifest`` (one row per
+        indexed file, running totals in ``file_manifest_totals``) rather
+        than scanning docs chunks or walking the staging dir.
+
+        If `file_hashes` is provided ({path: sha256}), each path is looked
+        up by primary key against the manifest's whole-file sha256 and a
+        precise `drifted` list is returned:
           [{path, reason: 'missing'|'content_changed'}]
         This is the signal the SessionStart hook uses to decide which
         files to re-push via prism_refresh.
+
+        If `tree` is provided ({dir: hash}, see app.services.sync_tree),
+        the directories are compared against a Merkle tree of the
+        manifest instead and ``tree: {root, mismatched}`` is returned;
+        ``mismatched`` carries the server's entries for each directory
+        that differs so the client can diff files and descend.
         """
-        import sqlite3 as _sq3
         try:
             from app.__version__ import PRISM_VERSION as _ver
         except Exception:
@@ -500,26 +665,23 @@ class GraphService:
                      "relationships": 0, "communities": 0,
                      "stale": False, "reasons": [],
                      "drifted": [], "drift_checked": False}
+        b = None
+        if tree and "" not in tree:
+            # Merkle descent round: the caller already has the counts
+            # from its root round and only needs the subtree comparison.
+            return self._tree_round(brain_db_path, tree, out)
         try:
-            b = _sq3.connect(brain_db_path); b.row_factory = _sq3.Row
+            b = sqlite3.connect(brain_db_path)
+            self._ensure_staged_marked(b)
             out["docs"] = b.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
-            out["code_docs"] = sum(1 for r in b.execute(
-                "SELECT source_file FROM docs"
-            ) if (r["source_file"] or "").lower().rsplit(".", 1)[-1]
-               in {s.lstrip(".") for s in GRAPHIFY_CODE_SUFFIXES})
-            b.close()
-        except _sq3.Error:
+            out["staged_files"] = b.execute(
+                "SELECT staged FROM file_manifest_totals WHERE id = 0"
+            ).fetchone()[0]
+            out["code_docs"] = self._code_files(b)
+        except (sqlite3.Error, TypeError):
             pass
         try:
-            out["staged_files"] = sum(
-                1 for p in self._staging_dir.rglob("*")
-                if p.is_file() and "graphify-out" not in p.parts
-                and "cache" not in p.parts
-            )
-        except OSError:
-            pass
-        try:
-            g = _sq3.connect(self._graph_db); g.row_factory = _sq3.Row
+            g = sqlite3.connect(self._graph_db); g.row_factory = sqlite3.Row
             out["entities"] = g.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
             try:
                 out["entities_with_graphify_id"] = g.execute(
@@ -532,12 +694,24 @@ class GraphService:
                     "SELECT COUNT(DISTINCT community) FROM entities "
                     "WHERE community IS NOT NULL"
                 ).fetchone()[0]
-            except _sq3.OperationalError:
+            except sqlite3.OperationalError:
                 pass
             g.close()
-        except _sq3.Error:
+        except sqlite3.Error:
             pass
 
+        if tree and b is not None:
+            try:
+                self._compare_tree(b, tree, out)
+            except sqlite3.Error:
+                pass
+            if "" in out.get("tree", {}).get("mismatched", {}):
+                out["stale"] = True
+                out["reasons"].append(
+                    "directory tree differs from disk — descend into "
+                    "tree.mismatched to find drifted files"
+                )
+
         # Staleness heuristics (count-based fallbacks)
         if out["code_docs"] > 0 and out["staged_files"] == 0:
             out["stale"] = True
@@ -563,25 +737,23 @@ class GraphService:
         # report exactly which files need re-ingestion.
         if file_hashes:
             out["drift_checked"] = True
-            stored: dict[str, str] = {}
+            stored: dict[str, Optional[str]] = {}
+            paths = list(file_hashes)
             try:
-                b = _sq3.connect(brain_db_path); b.row_factory = _sq3.Row
-                for r in b.execute(
-                    "SELECT source_file, content_hash FROM docs "
-                    "WHERE content_hash IS NOT NULL"
-                ):
-                    sf = r["source_file"] or ""
-                    if sf:
-                        stored[sf] = r["content_hash"]
-                b.close()
-            except _sq3.Error:
+                for i in range(0, len(paths), _DRIFT_BATCH):
+                    batch = paths[i:i + _DRIFT_BATCH]
+                    stored.update(b.execute(
+                        "SELECT source_file, file_sha256 FROM file_manifest "
+                        f"WHERE source_file IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ))
+            except (sqlite3.Error, AttributeError):
                 pass
 
             for path, sha in file_hashes.items():
-                got = stored.get(path)
-                if got is None:
+                if path not in stored:
                     out["drifted"].append({"path": path, "reason": "missing"})
-                elif got != sha:
+                elif stored[path] != sha:
                     out["drifted"].append({"path": path, "reason": "content_changed"})
 
             if out["drifted"]:
@@ -591,18 +763,42 @@ class GraphService:
                     f"prism_refresh with their current content"
                 )
 
+        if b is not None:
+            b.close()
         return out
 
-    def rebuild(self, brain_db_path: str | None = None) -> dict:
-        """Run `graphify update <staging>` and import resulting graph.json.
+    def rebuild(self, brain_db_path: str | None = None, *,
+                full: bool = False, progress=None) -> dict:
+        """Run graphify over changed staged files and import the result.
 
         If `brain_db_path` is provided and staging is empty, backfill it from
         the Brain docs table first. Prevents the "stale graph after upgrade"
         case where docs exist but nothing was ever staged for the graph.
 
-        Returns a summary: {nodes, edges, communities, imported_entities,
-        imported_relationships, backfilled}.
+        Staged files are diffed against the manifest of the last successful
+        run (stat first, sha256 only when size/mtime moved):
+          * nothing changed → no graphify run at all (``mode: unchanged``);
+          * a few files changed → graphify runs over just those files in a
+            side directory sharing the main cache, and the result is merged
+            into the previous graph.json (``mode: incremental``);
+          * ``full=True``, no previous graph, too many changes, or
+            ``GRAPH_FULL_REBUILD_EVERY`` incremental runs since the last
+            full pass → whole staging tree, fresh Leiden communities
+            (``mode: full``).
+
+        Runs are serialised per project; ``progress(stage)`` is called as
+        the run moves through scan → graphify → merge → import.
+
+        Returns a summary: {mode, nodes, edges, communities, imported_entities,
+        imported_relationships, backfilled, changed_files, removed_files,
+        entities_diff, relationships_diff, timings_ms}.
         """
+        with self._rebuild_lock:
+            return self._rebuild(brain_db_path, full,
+                                 progress or (lambda _stage: None))
+
+    def _rebuild(self, brain_db_path: str | None, full: bool,
+                 progress) -> dict:
         result: dict = {"nodes": 0, "edges": 0, "communities": 0,
                         "imported_entities": 0, "imported_relationships": 0,
                         "backfilled": 0}
@@ -615,29 +811,251 @@ class GraphService:
             result["message"] = "no staged source files yet"
             return result
 
+        timings = result.setdefault("timings_ms", {})
+        progress("scan")
+        t0 = time.perf_counter()
+        state = self._load_state()
+        previous = state.get("files", {})
+        current = self._scan_staging(previous)
+        changed = sorted(p for p, meta in current.items()
+                         if previous.get(p, [None, None, None])[2] != meta[2])
+        removed = sorted(set(previous) - set(current))
+        timings["scan"] = round((time.perf_counter() - t0) * 1000, 1)
+        result["changed_files"] = len(changed)
+        result["removed_files"] = len(removed)
+        if brain_db_path and (changed or removed):
+            self._sync_staged_flags(brain_db_path, current)
+
+        graph_json_path = self._staging_dir / "graphify-out" / "graph.json"
+        runs = int(state.get("incremental_runs", 0))
+        if (not full and previous and graph_json_path.exists()
+                and not changed and not removed):
+            result["mode"] = "unchanged"
+            result["message"] = "no staged changes since last rebuild"
+            return result
+
+        incremental = (
+            not full and bool(previous) and graph_json_path.exists()
+            and runs + 1 < max(1, GRAPH_FULL_REBUILD_EVERY)
+            and len(changed) + len(removed)
+            <= GRAPH_INCREMENTAL_MAX_CHANGED * max(1, len(current))
+        )
+        progress("graphify")
+        if incremental:
+            data = self._run_incremental(changed, removed, graph_json_path,
+                                         result, progress)
+            runs += 1
+        else:
+            data = self._run_full(graph_json_path, result)
+            runs = 0
+        if data is None:
+            return result
+        result["mode"] = "incremental" if incremental else "full"
+
+        progress("import")
+        try:
+            self._import_graph_json(data, result, brain_db_path)
+        except ValueError as e:
+            result["error"] = f"graph.json parse failed: {e!r}"
+            return result
+        self._save_state({"files": current, "incremental_runs": runs})
+        result["incremental_runs_since_full"] = runs
+        return result
+
+    def _run_full(self, graph_json_path: Path, result: dict) -> Optional[Path]:
+        """graphify over the whole staging tree; returns the graph.json path."""
+        timings = result["timings_ms"]
         # graphify CLI writes graph.json into <target>/graphify-out/ regardless
         # of cwd, so we just pass the staging dir as target.
+        t0 = time.perf_counter()
         proc = subprocess.run(
             ["graphify", "update", str(self._staging_dir)],
             cwd=str(self._project_dir),
             capture_output=True, text=True, timeout=600,
         )
+        timings["graphify"] = round((time.perf_counter() - t0) * 1000, 1)
         if proc.returncode != 0:
             result["error"] = (proc.stderr or proc.stdout or "").strip()[:500]
-            return result
+            return None
 
-        graph_json_path = self._staging_dir / "graphify-out" / "graph.json"
         if not graph_json_path.exists():
             result["error"] = "graphify ran but no graph.json produced"
-            return result
+            return None
+        return graph_json_path
 
+    def _run_incremental(
+        self,
+        changed: list[str],
+        removed: list[str],
+        graph_json_path: Path,
+        result: dict,
+        progress=lambda _stage: None,
+    ) -> Optional[Path]:
+        """graphify over just ``changed``, merged into the last graph.json.
+
+        The side directory keeps its own graphify-out between runs and
+        links ``cache`` to the main one, so graphify's per-file cache stays
+        warm for both passes. The merged graph is streamed back over the
+        main graph.json — the next incremental run and the graph page read
+        it from there.
+        """
+        timings = result["timings_ms"]
+        delta: dict = {"nodes": [], "links": []}
+        if changed:
+            delta_dir = self._project_dir / "graphify-delta"
+            self._prepare_delta_dir(delta_dir, changed)
+            t0 = time.perf_counter()
+            proc = subprocess.run(
+                ["graphify", "update", str(delta_dir)],
+                cwd=str(self._project_dir),
+                capture_output=True, text=True, timeout=600,
+            )
+            timings["graphify"] = round((time.perf_counter() - t0) * 1000, 1)
+            if proc.returncode != 0:
+                result["error"] = (proc.stderr or proc.stdout or "").strip()[:500]
+                return None
+            # Only the changed files — small enough to load whole.
+            delta_json = delta_dir / "graphify-out" / "graph.json"
+            try:
+                delta = json.loads(delta_json.read_text(encoding="utf-8"))
+            except Exception as e:
+                result["error"] = f"delta graph.json parse failed: {e!r}"
+                return None
+            for node in delta.get("nodes", []):
+                node["source_file"] = self._rebase_source(
+                    node.get("source_file", ""), delta_dir,
+                )
+
+        progress("merge")
+        t0 = time.perf_counter()
         try:
-            data = json.loads(graph_json_path.read_text(encoding="utf-8"))
-        except Exception as e:
-            result["error"] = f"graph.json parse failed: {e!r}"
-            return result
+            _merge_graph(
+                graph_json_path, delta, set(changed) | set(removed),
+                lambda sf: self._staged_rel(sf, self._staging_dir),
+            )
+        except (OSError, ValueError) as e:
+            result["error"] = f"graph.json merge failed: {e!r}"
+            return None
+        timings["merge"] = round((time.perf_counter() - t0) * 1000, 1)
+        return graph_json_path
+
+    def _prepare_delta_dir(self, delta_dir: Path, changed: list[str]) -> None:
+        """Populate ``delta_dir`` with exactly the changed staged files."""
+        delta_dir.mkdir(parents=True, exist_ok=True)
+        for child in delta_dir.iterdir():
+            if child.name == "graphify-out":
+                continue
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                try:
+                    child.unlink()
+                except OSError:
+                    pass
+        for rel in changed:
+            dest = delta_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                shutil.copy2(self._staging_dir / rel, dest)
+            except OSError:
+                pass
+        main_cache = self._staging_dir / "graphify-out" / "cache"
+        delta_cache = delta_dir / "graphify-out" / "cache"
+        try:
+            main_cache.mkdir(parents=True, exist_ok=True)
+            if not delta_cache.exists() and not delta_cache.is_symlink():
+                delta_cache.parent.mkdir(parents=True, exist_ok=True)
+                delta_cache.symlink_to(main_cache, target_is_directory=True)
+        except OSError:
+            pass
+
+    def _staged_rel(self, source_file: str, root: Path) -> str:
+        """Map a graphify ``source_file`` to its path relative to ``root``.
+
+        graphify may report absolute paths, paths relative to its cwd
+        (the project dir) or paths relative to the target dir.
+        """
+        if not source_file:
+            return ""
+        p = Path(source_file)
+        for candidate in (p, self._project_dir / p):
+            try:
+                return candidate.relative_to(root).as_posix()
+            except ValueError:
+                continue
+        return p.as_posix()
+
+    def _rebase_source(self, source_file: str, delta_dir: Path) -> str:
+        """Rewrite a delta-run ``source_file`` as the full run would spell it."""
+        if not source_file:
+            return source_file
+        rel = self._staged_rel(source_file, delta_dir)
+        p = Path(source_file)
+        if p.is_absolute():
+            return str(self._staging_dir / rel)
+        try:
+            (self._project_dir / p).relative_to(delta_dir)
+            return (Path(self._staging_dir.name) / rel).as_posix()
+        except ValueError:
+            return rel
+
+    # ------------------------------------------------------------------
+    # Staging manifest — what the last successful rebuild saw
+    # ------------------------------------------------------------------
+
+    @property
+    def _state_path(self) -> Path:
+        return self._project_dir / "graphify-state.json"
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self._state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: dict) -> None:
+        tmp = self._state_path.with_suffix(".json.tmp")
+        try:
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            tmp.replace(self._state_path)
+        except OSError:
+            pass
 
-        return self._import_graph_json(data, result, brain_db_path)
+    def _staged_files(self) -> Iterator[tuple[str, Path]]:
+        """``(rel_path, path)`` for every file staged from the project.
+
+        Exclusions are matched against the path relative to the staging
+        dir, so a data dir under e.g. ``~/.cache`` or a project folder
+        named ``cache`` doesn't hide files.
+        """
+        for p in self._staging_dir.rglob("*"):
+            rel = p.relative_to(self._staging_dir)
+            if rel.parts[0] in _STAGING_OUTPUT or not p.is_file():
+                continue
+            yield rel.as_posix(), p
+
+    def _scan_staging(self, previous: dict) -> dict[str, list]:
+        """``{rel_path: [size, mtime_ns, sha256]}`` for every staged file.
+
+        Files whose size and mtime match ``previous`` reuse its hash;
+        stage_doc rewrites files on every refresh, so a moved mtime alone
+        still gets hashed before counting as a change.
+        """
+        import hashlib
+
+        out: dict[str, list] = {}
+        for rel, p in self._staged_files():
+            try:
+                st = p.stat()
+                prev = previous.get(rel)
+                if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                    out[rel] = prev
+                    continue
+                digest = hashlib.sha256(p.read_bytes()).hexdigest()
+            except OSError:
+                continue
+            out[rel] = [st.st_size, st.st_mtime_ns, digest]
+        return out
 
     # ------------------------------------------------------------------
     # graph.json -> graph.db import
@@ -645,135 +1063,85 @@ class GraphService:
 
     def _import_graph_json(
         self,
-        data: dict,
+        data: "dict | Path",
         result: dict,
         brain_db_path: str | None = None,
     ) -> dict:
-        nodes = data.get("nodes", [])
-        links = data.get("links", [])
-        result["nodes"] = len(nodes)
-        result["edges"] = len(links)
-        result["communities"] = len({n.get("community") for n in nodes
-                                      if n.get("community") is not None})
-
-        # Total degree (in + out) for community label derivation — captures
-        # both "called-by" hubs and "calls-a-lot" orchestrators.
-        in_degree: dict = {}
-        for link in links:
-            src = link.get("source") or link.get("_src")
-            tgt = link.get("target") or link.get("_tgt")
-            if src:
-                in_degree[src] = in_degree.get(src, 0) + 1
-            if tgt:
-                in_degree[tgt] = in_degree.get(tgt, 0) + 1
+        """Diff ``data`` (a graph.json path, streamed, or a parsed dict)
+        into graph.db.
+
+        Nodes and links are staged into TEMP tables in batches while the
+        file is walked element by element; degree and community sizes
+        accumulate in flat arrays keyed by node ordinal. The diff against
+        graph.db is then set-based SQL inside one write transaction, so
+        Python memory stays O(batch) plus one gid -> ordinal map.
+        """
+        if isinstance(data, (str, Path)):
+            from app.services.graph_json import iter_array
+            nodes_iter = lambda: iter_array(data, "nodes")  # noqa: E731
+            links_iter = lambda: iter_array(data, "links")  # noqa: E731
+        else:
+            nodes_iter = lambda: iter(data.get("nodes", []))  # noqa: E731
+            links_iter = lambda: iter(data.get("links", []))  # noqa: E731
 
+        timings = result.setdefault("timings_ms", {})
         conn = sqlite3.connect(self._graph_db)
         conn.row_factory = sqlite3.Row
         try:
             _graph_schema_migrations(conn)
-            # Wipe + re-import: the graph is a full snapshot, not an incremental diff
-            conn.execute("DELETE FROM relationships")
-            conn.execute("DELETE FROM entities")
-
-            # Import nodes → entities. Use graphify's id as the natural key.
-            id_map: dict[str, int] = {}
-            for node in nodes:
-                gid = node.get("id", "")
-                if not gid:
-                    continue
-                label = node.get("label", gid)
-                file_type = node.get("file_type", "")
-                community = node.get("community")
-                source_file = node.get("source_file", "")
-                source_location = node.get("source_location", "")
-                # Derive "kind" from file_type or label for legacy queries
-                kind = file_type or "node"
-                cur = conn.execute(
-                    "INSERT INTO entities "
-                    "(name, kind, file, line, graphify_id, label, file_type, "
-                    " community, source_location) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
-                    "ON CONFLICT(name, file) DO UPDATE SET "
-                    "  kind=excluded.kind, "
-                    "  graphify_id=excluded.graphify_id, "
-                    "  label=excluded.label, "
-                    "  file_type=excluded.file_type, "
-                    "  community=excluded.community, "
-                    "  source_location=excluded.source_location",
-                    (label, kind, source_file, _extract_line(source_location),
-                     gid, label, file_type, community, source_location),
-                )
-                # Retrieve id (RETURNING not universally available pre-3.35)
-                row = conn.execute(
-                    "SELECT id FROM entities WHERE graphify_id = ?", (gid,)
-                ).fetchone()
-                if row:
-                    id_map[gid] = row["id"]
-                    result["imported_entities"] += 1
-
-            # Import links → relationships
-            for link in links:
-                src_gid = link.get("source") or link.get("_src")
-                tgt_gid = link.get("target") or link.get("_tgt")
-                src_id = id_map.get(src_gid)
-                tgt_id = id_map.get(tgt_gid)
-                if src_id is None or tgt_id is None:
-                    continue
-                relation = link.get("relation", "related")
-                confidence = link.get("confidence", "EXTRACTED")
-                confidence_score = float(link.get("confidence_score", 1.0))
-                weight = float(link.get("weight", 1.0))
-                source_location = link.get("source_location", "")
-                try:
-                    conn.execute(
-                        "INSERT OR REPLACE INTO relationships "
-                        "(source_id, target_id, relation, confidence, "
-                        " confidence_score, weight, source_location) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (src_id, tgt_id, relation, confidence,
-                         confidence_score, weight, source_location),
-                    )
-                    result["imported_relationships"] += 1
-                except sqlite3.IntegrityError:
-                    pass
 
-            # -- Derive + persist community labels -----------------------
-            from collections import defaultdict
-            buckets: dict[int, list[dict]] = defaultdict(list)
-            for n in nodes:
-                cid = n.get("community")
-                if cid is not None:
-                    buckets[int(cid)].append(n)
-
-            conn.execute("DELETE FROM communities")
-            labels_out: dict[int, str] = {}
-            for cid, cnodes in buckets.items():
-                label, top_files, top_entities = _derive_community_label(
-                    cnodes, in_degree
-                )
-                # de-duplicate labels across communities by suffixing (N)
-                base = label
-                n_taken = sum(1 for v in labels_out.values() if v == base
-                              or v.startswith(base + " ("))
-                final_label = base if n_taken == 0 else f"{base} ({n_taken + 1})"
-                labels_out[cid] = final_label
-                summary = _derive_community_summary(
-                    top_files, top_entities, brain_db_path,
-                )
-                conn.execute(
+            t0 = time.perf_counter()
+            stats = _stage_graph(conn, nodes_iter(), links_iter())
+            conn.commit()  # TEMP tables only — no lock on graph.db yet
+            result["nodes"] = stats.n_nodes
+            result["edges"] = stats.n_links
+            result["communities"] = len(stats.community_sizes)
+            timings["parse"] = round((time.perf_counter() - t0) * 1000, 1)
+
+            # Community labels depend only on graph.json (+ brain.db for
+            # the summaries) — derive them before taking the write lock.
+            t0 = time.perf_counter()
+            labels_out, community_rows = _community_rows(
+                conn, stats, brain_db_path,
+            )
+            timings["communities"] = round((time.perf_counter() - t0) * 1000, 1)
+
+            # Diff against the current snapshot inside one write
+            # transaction: readers keep seeing the old graph until commit,
+            # and unchanged rows keep their ids (and FTS entries).
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                t0 = time.perf_counter()
+                n_mapped, ent_stats = _sync_entities(conn)
+                t1 = time.perf_counter()
+                rel_stats = _sync_relationships(conn)
+                t2 = time.perf_counter()
+                conn.execute("DELETE FROM communities")
+                conn.executemany(
                     "INSERT OR REPLACE INTO communities "
                     "(id, label, size, top_files, top_entities, summary) "
                     "VALUES (?, ?, ?, ?, ?, ?)",
-                    (cid, final_label, len(cnodes),
-                     json.dumps(top_files), json.dumps(top_entities),
-                     summary),
+                    community_rows,
                 )
-
-            conn.commit()
-            result["community_labels"] = labels_out
+                conn.commit()
+                t3 = time.perf_counter()
+            except BaseException:
+                conn.rollback()
+                raise
         finally:
             conn.close()
 
+        result["imported_entities"] += n_mapped
+        result["imported_relationships"] += rel_stats["total"]
+        result["entities_diff"] = ent_stats
+        result["relationships_diff"] = {
+            k: v for k, v in rel_stats.items() if k != "total"
+        }
+        result["community_labels"] = labels_out
+        timings["entities"] = round((t1 - t0) * 1000, 1)
+        timings["relationships"] = round((t2 - t1) * 1000, 1)
+        timings["commit"] = round((t3 - t2) * 1000, 1)
+
         # Rewrite graphify's graph.html to replace "Community N" with our labels
         self._rewrite_visual_labels(labels_out)
 
@@ -859,6 +1227,11 @@ class GraphService:
             except OSError:
                 pass
         self._staging_dir.mkdir(parents=True, exist_ok=True)
+        # Next rebuild has nothing to diff against — force a full pass.
+        try:
+            self._state_path.unlink()
+        except OSError:
+            pass
 
 
 def _extract_line(source_location: str) -> Optional[int]:
@@ -870,3 +1243,375 @@ def _extract_line(source_location: str) -> Optional[int]:
         return int(s)
     except (ValueError, AttributeError):
         return None
+
+
+# ---------------------------------------------------------------------------
+# Diff-based graph.json import
+# ---------------------------------------------------------------------------
+
+# Rows per executemany batch while staging graph.json into TEMP tables.
+_UPSERT_BATCH = 2000
+
+_ENTITY_COLS = ("name, kind, file, line, label, file_type, community, "
+                "source_location")
+
+
+class _GraphStats:
+    """Per-import aggregates kept in flat arrays, not per-node dicts.
+
+    ``ordinal`` maps graphify id -> node index; ``degree`` is indexed by
+    that ordinal. ``community_sizes`` holds one counter per community.
+    """
+
+    __slots__ = ("ordinal", "degree", "community_sizes", "n_nodes", "n_links")
+
+    def __init__(self) -> None:
+        from array import array
+        self.ordinal: dict[str, int] = {}
+        self.degree = array("I")
+        self.community_sizes: dict = {}
+        self.n_nodes = 0
+        self.n_links = 0
+
+    def get(self, gid: str, default: int = 0) -> int:
+        """dict-style degree lookup for :func:`_derive_community_label`."""
+        idx = self.ordinal.get(gid)
+        return default if idx is None else self.degree[idx]
+
+
+def _stage_graph(conn: sqlite3.Connection, nodes, links) -> _GraphStats:
+    """Stream graph.json nodes/links into TEMP tables ``_gj_nodes`` /
+    ``_gj_links`` in batches and return the accumulated stats."""
+    conn.executescript("""
+        DROP TABLE IF EXISTS temp._gj_nodes;
+        DROP TABLE IF EXISTS temp._gj_links;
+        DROP TABLE IF EXISTS temp._gj_alias;
+        DROP TABLE IF EXISTS temp._gj_edges;
+        CREATE TEMP TABLE _gj_nodes (
+            gid TEXT PRIMARY KEY, seq INTEGER,
+            name TEXT, kind TEXT, file TEXT, line INTEGER, label TEXT,
+            file_type TEXT, community INTEGER, source_location TEXT
+        );
+        CREATE TEMP TABLE _gj_links (
+            src TEXT, tgt TEXT, relation TEXT, confidence TEXT,
+            confidence_score REAL, weight REAL, source_location TEXT
+        );
+    """)
+    stats = _GraphStats()
+    batch: list[tuple] = []
+
+    def flush_nodes() -> None:
+        # First occurrence of a graphify id wins.
+        conn.executemany(
+            "INSERT OR IGNORE INTO _gj_nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        batch.clear()
+
+    for node in nodes:
+        stats.n_nodes += 1
+        cid = node.get("community")
+        if cid is not None:
+            stats.community_sizes[cid] = stats.community_sizes.get(cid, 0) + 1
+        gid = node.get("id", "")
+        if not gid or gid in stats.ordinal:
+            continue
+        stats.ordinal[gid] = len(stats.degree)
+        stats.degree.append(0)
+        label = node.get("label", gid)
+        file_type = node.get("file_type", "")
+        source_location = node.get("source_location", "")
+        batch.append((gid, stats.ordinal[gid], label, file_type or "node",
+                      node.get("source_file", ""),
+                      _extract_line(source_location), label, file_type, cid,
+                      source_location))
+        if len(batch) >= _UPSERT_BATCH:
+            flush_nodes()
+    flush_nodes()
+
+    def flush_links() -> None:
+        conn.executemany(
+            "INSERT INTO _gj_links VALUES (?, ?, ?, ?, ?, ?, ?)", batch,
+        )
+        batch.clear()
+
+    ordinal, degree = stats.ordinal, stats.degree
+    for link in links:
+        stats.n_links += 1
+        src = link.get("source") or link.get("_src")
+        tgt = link.get("target") or link.get("_tgt")
+        # Total degree (in + out) for community label derivation —
+        # captures both "called-by" hubs and "calls-a-lot" orchestrators.
+        for gid in (src, tgt):
+            idx = ordinal.get(gid)
+            if idx is not None:
+                degree[idx] += 1
+        batch.append((src, tgt, link.get("relation", "related"),
+                      link.get("confidence", "EXTRACTED"),
+                      float(link.get("confidence_score", 1.0)),
+                      float(link.get("weight", 1.0)),
+                      link.get("source_location", "")))
+        if len(batch) >= _UPSERT_BATCH:
+            flush_links()
+    flush_links()
+    conn.execute("CREATE INDEX temp._gj_nodes_community "
+                 "ON _gj_nodes(community)")
+    return stats
+
+
+def _community_rows(
+    conn: sqlite3.Connection, stats: _GraphStats, brain_db_path: str | None,
+) -> tuple[dict, list[tuple]]:
+    """Derive one ``communities`` row per community, reading members back
+    from ``_gj_nodes`` one community at a time."""
+    labels_out: dict[int, str] = {}
+    rows: list[tuple] = []
+    for cid in stats.community_sizes:
+        cnodes = [
+            {"id": r[0], "label": r[1], "source_file": r[2]}
+            for r in conn.execute(
+                "SELECT gid, label, file FROM _gj_nodes WHERE community = ? "
+                "ORDER BY seq", (cid,),
+            )
+        ]
+        label, top_files, top_entities = _derive_community_label(
+            cnodes, stats,
+        )
+        # de-duplicate labels across communities by suffixing (N)
+        base = label
+        n_taken = sum(1 for v in labels_out.values() if v == base
+                      or v.startswith(base + " ("))
+        final_label = base if n_taken == 0 else f"{base} ({n_taken + 1})"
+        labels_out[int(cid)] = final_label
+        summary = _derive_community_summary(
+            top_files, top_entities, brain_db_path,
+        )
+        rows.append((int(cid), final_label, stats.community_sizes[cid],
+                     json.dumps(top_files), json.dumps(top_entities),
+                     summary))
+    return labels_out, rows
+
+
+def _sync_entities(conn: sqlite3.Connection) -> tuple[int, dict[str, int]]:
+    """Bring ``entities`` in line with the staged ``_gj_nodes``.
+
+    Inserts new graphify ids, updates changed ones in place, leaves
+    unchanged rows untouched and deletes everything else (vanished nodes
+    plus tree-sitter fallback rows — the graph is a full snapshot).
+    Must run inside the caller's transaction.
+
+    Returns ``(graphify ids resolved, {added, updated, removed})``.
+    """
+    # entities is UNIQUE(name, file): when two graphify ids share a
+    # label + file the first claims the row and the rest alias to it, as
+    # the old sequential ON CONFLICT(name, file) did.
+    # (Individual execute() calls: executescript() would COMMIT the
+    # caller's transaction.)
+    for sql in (
+        "CREATE INDEX temp._gj_nodes_key ON _gj_nodes(name, file, seq)",
+        "CREATE TEMP TABLE _gj_alias (gid TEXT PRIMARY KEY, canonical TEXT)",
+        "INSERT INTO _gj_alias "
+        "  SELECT n.gid, (SELECT c.gid FROM _gj_nodes c "
+        "                 WHERE c.name = n.name AND c.file IS n.file "
+        "                 ORDER BY c.seq LIMIT 1) "
+        "  FROM _gj_nodes n "
+        "  WHERE EXISTS (SELECT 1 FROM _gj_nodes c "
+        "                WHERE c.name = n.name AND c.file IS n.file "
+        "                  AND c.seq < n.seq)",
+        "DELETE FROM _gj_nodes WHERE gid IN (SELECT gid FROM _gj_alias)",
+    ):
+        conn.execute(sql)
+    removed = conn.execute(
+        "DELETE FROM entities WHERE graphify_id IS NULL OR NOT EXISTS "
+        "(SELECT 1 FROM _gj_nodes n WHERE n.gid = entities.graphify_id)"
+    ).rowcount
+    # Park renamed/moved rows on a NULL file first so swaps between
+    # surviving rows cannot trip UNIQUE(name, file) mid-update.
+    conn.execute(
+        "UPDATE entities SET file = NULL WHERE id IN ("
+        "  SELECT e.id FROM entities e JOIN _gj_nodes n "
+        "    ON n.gid = e.graphify_id "
+        "  WHERE e.name IS NOT n.name OR e.file IS NOT n.file)"
+    )
+    updated = conn.execute(
+        "UPDATE entities SET name = n.name, kind = n.kind, file = n.file, "
+        "  line = n.line, label = n.label, file_type = n.file_type, "
+        "  community = n.community, source_location = n.source_location "
+        "FROM _gj_nodes n WHERE n.gid = entities.graphify_id AND ("
+        "  entities.name IS NOT n.name OR entities.kind IS NOT n.kind OR "
+        "  entities.file IS NOT n.file OR entities.line IS NOT n.line OR "
+        "  entities.label IS NOT n.label OR "
+        "  entities.file_type IS NOT n.file_type OR "
+        "  entities.community IS NOT n.community OR "
+        "  entities.source_location IS NOT n.source_location)"
+    ).rowcount
+    added = conn.execute(
+        f"INSERT INTO entities ({_ENTITY_COLS}, graphify_id) "
+        f"SELECT {_ENTITY_COLS}, gid FROM _gj_nodes n "
+        "WHERE NOT EXISTS (SELECT 1 FROM entities e "
+        "                  WHERE e.graphify_id = n.gid) "
+        "ORDER BY seq"
+    ).rowcount
+    mapped = conn.execute(
+        "SELECT (SELECT COUNT(*) FROM _gj_nodes) + "
+        "       (SELECT COUNT(*) FROM _gj_alias)"
+    ).fetchone()[0]
+    return mapped, {"added": added, "updated": updated, "removed": removed}
+
+
+def _sync_relationships(conn: sqlite3.Connection) -> dict[str, int]:
+    """Bring ``relationships`` in line with the staged ``_gj_links``.
+
+    Edges are keyed by ``(source_id, target_id, relation)``; only new or
+    changed edges are written and only vanished ones deleted. Returns
+    ``{total, added, updated, removed}``.
+    """
+    # Resolve graphify ids (through aliases) to entity ids. Later
+    # duplicates win, matching the old INSERT OR REPLACE.
+    conn.execute(
+        "CREATE TEMP TABLE _gj_edges ("
+        "  source_id INTEGER, target_id INTEGER, relation TEXT,"
+        "  confidence TEXT, confidence_score REAL, weight REAL,"
+        "  source_location TEXT,"
+        "  PRIMARY KEY (source_id, target_id, relation))"
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO _gj_edges "
+        "  SELECT s.id, t.id, l.relation, l.confidence, "
+        "         l.confidence_score, l.weight, l.source_location "
+        "  FROM _gj_links l "
+        "  JOIN entities s ON s.graphify_id = COALESCE("
+        "      (SELECT canonical FROM _gj_alias WHERE gid = l.src), l.src) "
+        "  JOIN entities t ON t.graphify_id = COALESCE("
+        "      (SELECT canonical FROM _gj_alias WHERE gid = l.tgt), l.tgt) "
+        "  ORDER BY l.rowid"
+    )
+    match = ("x.source_id = relationships.source_id AND "
+             "x.target_id = relationships.target_id AND "
+             "x.relation IS relationships.relation")
+    removed = conn.execute(
+        "DELETE FROM relationships WHERE NOT EXISTS "
+        f"(SELECT 1 FROM _gj_edges x WHERE {match})"
+    ).rowcount
+    updated = conn.execute(
+        "UPDATE relationships SET confidence = x.confidence, "
+        "  confidence_score = x.confidence_score, weight = x.weight, "
+        "  source_location = x.source_location "
+        f"FROM _gj_edges x WHERE {match} AND ("
+        "  relationships.confidence IS NOT x.confidence OR "
+        "  relationships.confidence_score IS NOT x.confidence_score OR "
+        "  relationships.weight IS NOT x.weight OR "
+        "  relationships.source_location IS NOT x.source_location)"
+    ).rowcount
+    added = conn.execute(
+        "INSERT INTO relationships (source_id, target_id, relation, "
+        "  confidence, confidence_score, weight, source_location) "
+        "SELECT source_id, target_id, relation, confidence, "
+        "  confidence_score, weight, source_location FROM _gj_edges x "
+        "WHERE NOT EXISTS (SELECT 1 FROM relationships r "
+        "  WHERE r.source_id = x.source_id AND r.target_id = x.target_id "
+        "    AND r.relation IS x.relation)"
+    ).rowcount
+    total = conn.execute("SELECT COUNT(*) FROM _gj_edges").fetchone()[0]
+    return {"total": total, "added": added, "updated": updated,
+            "removed": removed}
+
+
+def _merge_graph(
+    path: Path, delta: dict, affected: set[str], rel_of,
+) -> None:
+    """Splice a graphify run over ``affected`` files into graph.json at
+    ``path``, streaming the previous graph so it is never fully loaded.
+
+    Nodes from affected files are replaced by the delta's nodes. Edges
+    between two affected nodes come from the delta; edges crossing into
+    unchanged files are kept from the old graph (the delta run cannot
+    resolve them) until the next full pass, and dropped only when an
+    endpoint vanished. Replaced nodes keep their previous community; new
+    ones take the most common community among their neighbours.
+    """
+    from app.services.graph_json import GraphJsonWriter, iter_array, read_members
+
+    delta_ids = {n.get("id") for n in delta.get("nodes", [])}
+
+    # Pass 1 — which old nodes survive, and old communities of delta ids.
+    kept_ids: set = set()
+    affected_ids: set = set()
+    prev_comm: dict = {}
+    for n in iter_array(path, "nodes"):
+        gid = n.get("id")
+        if gid in delta_ids:
+            prev_comm[gid] = n.get("community")
+        if rel_of(n.get("source_file", "")) in affected:
+            affected_ids.add(gid)
+        else:
+            kept_ids.add(gid)
+    fresh: list[dict] = []
+    for n in delta.get("nodes", []):
+        gid = n.get("id")
+        if gid in kept_ids:
+            continue
+        n = dict(n)
+        n["community"] = prev_comm.get(gid)
+        affected_ids.add(gid)
+        fresh.append(n)
+    ids = kept_ids | {n.get("id") for n in fresh}
+
+    def ends(link: dict) -> tuple:
+        return (link.get("source") or link.get("_src"),
+                link.get("target") or link.get("_tgt"))
+
+    def merged_links():
+        seen: set[tuple] = set()
+        for link in delta.get("links", []):
+            src, tgt = ends(link)
+            key = (src, tgt, link.get("relation", "related"))
+            if src in ids and tgt in ids and key not in seen:
+                seen.add(key)
+                yield link
+        for link in iter_array(path, "links"):
+            src, tgt = ends(link)
+            if (src in ids and tgt in ids
+                    and not (src in affected_ids and tgt in affected_ids)
+                    and (src, tgt, link.get("relation", "related")) not in seen):
+                yield link
+
+    # Pass 2 — neighbour votes for fresh nodes without a community.
+    homeless = {n.get("id") for n in fresh if n["community"] is None}
+    if homeless:
+        comm = {n.get("id"): n.get("community") for n in fresh}
+        need = set()
+        for link in merged_links():
+            src, tgt = ends(link)
+            if src in homeless:
+                need.add(tgt)
+            if tgt in homeless:
+                need.add(src)
+        for n in iter_array(path, "nodes"):
+            if n.get("id") in need and n.get("id") in kept_ids:
+                comm[n.get("id")] = n.get("community")
+        votes: dict = {}
+        for link in merged_links():
+            src, tgt = ends(link)
+            for me, other in ((src, tgt), (tgt, src)):
+                if me in homeless and comm.get(other) is not None:
+                    votes.setdefault(me, _Counter())[comm[other]] += 1
+        for n in fresh:
+            if n.get("id") in votes:
+                n["community"] = votes[n.get("id")].most_common(1)[0][0]
+
+    # Pass 3 — stream the merged document into place (the writer only
+    # replaces ``path`` once every read of it is done).
+    header = read_members(path)
+    with GraphJsonWriter(path) as writer:
+        for key, value in header.items():
+            writer.member(key, value)
+        writer.begin_array("nodes")
+        for n in iter_array(path, "nodes"):
+            if n.get("id") in kept_ids:
+                writer.append(n)
+        for n in fresh:
+            writer.append(n)
+        writer.begin_array("links")
+        for link in merged_links():
+            writer.append(link)
@@ -0,0 +1,402 @@
+"""Indexing jobs — one prioritized, coalescing queue per project.
+
+``prism_refresh`` and ``prism_bulk_refresh`` used to index inline in the
+MCP request, one ``asyncio.to_thread(index_doc)`` hop per file, with a
+flat ``busy`` reply as the only backpressure. They now hand their files
+to :class:`IndexJobs`:
+
+  * :meth:`submit` queues ``{path: content}`` as a job and returns its id.
+  * A path that is already queued keeps its place in line but takes the
+    newest content; the older job counts it as superseded and finishes
+    only once the newer entry has been indexed (or failed, or was
+    cancelled), so a waiter never hears ``done`` before its file is in.
+  * ``interactive`` entries (a single-file refresh while editing) are
+    drained before ``bulk`` ones (onboarding, branch-switch syncs).
+  * The worker takes up to ``INDEX_BATCH_SIZE`` entries per lock hold
+    and indexes them back to back.
+  * :meth:`status` reports queue depth, recent throughput and an ETA,
+    overall or for one job; ``prism_index_status`` serves it.
+
+A job whose files are all indexed requests a graph rebuild unless it was
+submitted with ``skip_graph``. Like the graph scheduler, the worker is a
+daemon thread started on demand that exits once the queue drains.
+
+[Used by: app.mcp.tools, app.project_context]
+"""
+
+from __future__ import annotations
+
+import heapq
+import sys
+import threading
+import time
+import uuid
+from typing import Optional
+
+from app.config import INDEX_BATCH_SIZE, INDEX_QUEUE_MAX_FILES
+
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+# Throughput is an EWMA over batches; this weights the newest batch.
+_RATE_ALPHA = 0.3
+
+
+class IndexJobs:
+    """Per-project indexing queue in front of ``BrainService.index_doc``."""
+
+    def __init__(self, brain_svc, graph_jobs=None,
+                 batch_size: Optional[int] = None,
+                 max_queued: Optional[int] = None) -> None:
+        self._brain_svc = brain_svc
+        self._graph_jobs = graph_jobs
+        self._batch_size = max(1, int(batch_size or INDEX_BATCH_SIZE))
+        self._max_queued = int(max_queued or INDEX_QUEUE_MAX_FILES)
+        self._cond = threading.Condition()
+        # path -> {content, domain, job_id, prio, seq, waiters}; waiters
+        # are the older jobs whose entry for the path this one replaced.
+        self._pending: dict[str, dict] = {}
+        # (prio, seq, path); stale items are skipped when popped.
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = 0
+        self._jobs: dict[str, dict] = {}
+        self._running: Optional[dict] = None
+        self._cancel = False
+        self._rate: Optional[float] = None  # files/s
+        self._indexed_total = 0
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, files: dict[str, str], domain: str = "code",
+               priority: str = "bulk", skip_graph: bool = False,
+               reason: str = "") -> dict:
+        """Queue ``files``; returns the job, or a busy reply for bulk
+        submissions that would push the queue past its cap."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority {priority!r}; expected one "
+                             f"of {', '.join(PRIORITIES)}")
+        prio = PRIORITIES[priority]
+        files = {p: c for p, c in files.items() if isinstance(c, str)}
+        now = time.time()
+        with self._cond:
+            if (prio and self._pending
+                    and len(self._pending) + len(files) > self._max_queued):
+                return {
+                    "busy": True,
+                    "queued_files": len(self._pending),
+                    "max_queued": self._max_queued,
+                    "retry_after_s": self._retry_after(),
+                    "note": "index queue full — back off then retry",
+                }
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "priority": priority,
+                "reason": reason,
+                "skip_graph": bool(skip_graph),
+                "submitted_at": now,
+                "files": len(files),
+                "remaining": set(files),
+                # Superseded paths, until the replacing entry is indexed.
+                "handed_off": set(),
+                "indexed": 0,
+                "superseded": 0,
+                "failed": 0,
+                "status": "queued",
+            }
+            self._jobs[job["job_id"]] = job
+            coalesced = 0
+            for path, content in files.items():
+                old = self._pending.get(path)
+                if old is None:
+                    self._seq += 1
+                    seq = self._seq
+                    waiters: list[str] = []
+                else:
+                    coalesced += 1
+                    self._supersede(old["job_id"], path)
+                    seq = old["seq"]
+                    waiters = old["waiters"] + [old["job_id"]]
+                entry_prio = prio if old is None else min(prio, old["prio"])
+                self._pending[path] = {"content": content, "domain": domain,
+                                       "job_id": job["job_id"],
+                                       "prio": entry_prio, "seq": seq,
+                                       "waiters": waiters}
+                if old is None or entry_prio != old["prio"]:
+                    heapq.heappush(self._heap, (entry_prio, seq, path))
+            if not files:
+                self._finish(job, now)
+            else:
+                self._ensure_worker()
+                self._cond.notify_all()
+            return {
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "priority": priority,
+                "files": len(files),
+                "coalesced": coalesced,
+                "queued_files": len(self._pending),
+            }
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """Block until ``job_id`` finishes; returns its record or None."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job["status"] in ("done", "cancelled"):
+                    return self._snapshot(job, time.time())
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is empty and the worker idle."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._pending or self._running is not None:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def cancel(self) -> int:
+        """Drop every queued file and stop the running batch after its
+        current file. Returns the number of files dropped."""
+        with self._cond:
+            dropped = len(self._pending)
+            for path, entry in self._pending.items():
+                job = self._jobs.get(entry["job_id"])
+                if job is not None:
+                    job["remaining"].discard(path)
+                    job["status"] = "cancelled"
+                self._release_waiters(entry, path, cancelled=True)
+            self._pending.clear()
+            self._heap.clear()
+            if self._running is not None:
+                self._cancel = True
+            now = time.time()
+            for job in self._jobs.values():
+                if job["status"] == "cancelled":
+                    self._settle(job, now)
+            self._cond.notify_all()
+            return dropped
+
+    def active_jobs(self) -> int:
+        with self._cond:
+            return sum(1 for j in self._jobs.values()
+                       if j["status"] in ("queued", "running"))
+
+    def status(self, job_id: Optional[str] = None) -> dict:
+        """Queue snapshot (depth, throughput, ETA), or one job's."""
+        now = time.time()
+        with self._cond:
+            if job_id is not None:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return {"job_id": job_id, "status": "unknown"}
+                out = self._snapshot(job, now)
+                if job["status"] in ("queued", "running"):
+                    out["eta_s"] = self._eta(self._ahead_of(job))
+                return out
+            queued = len(self._pending)
+            interactive = sum(1 for e in self._pending.values()
+                              if e["prio"] == 0)
+            running = None
+            if self._running is not None:
+                running = {
+                    "files": self._running["files"],
+                    "elapsed_s": round(now - self._running["started_at"], 1),
+                }
+            active = [self._snapshot(j, now) for j in self._jobs.values()
+                      if j["status"] in ("queued", "running")]
+            state = ("running" if running else
+                     "queued" if queued else "idle")
+            in_batch = self._running["files"] if self._running else 0
+            return {
+                "state": state,
+                "queued_files": queued,
+                "queued_interactive": interactive,
+                "running": running,
+                "throughput_files_per_s": (round(self._rate, 2)
+                                           if self._rate else None),
+                "eta_s": self._eta(queued + in_batch),
+                "indexed_total": self._indexed_total,
+                "jobs": active[:20],
+            }
+
+    # ------------------------------------------------------------------
+    # Bookkeeping (callers hold self._cond)
+    # ------------------------------------------------------------------
+
+    def _supersede(self, job_id: str, path: str) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job["remaining"].discard(path)
+        job["handed_off"].add(path)
+        job["superseded"] += 1
+
+    def _release_waiters(self, entry: dict, path: str,
+                         cancelled: bool = False) -> None:
+        """The replacing entry for ``path`` is settled: let go of the
+        jobs it superseded."""
+        now = time.time()
+        for job_id in entry["waiters"]:
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            job["handed_off"].discard(path)
+            if cancelled:
+                job["status"] = "cancelled"
+            self._settle(job, now)
+
+    def _settle(self, job: dict, now: float) -> None:
+        """Finish ``job`` once none of its paths is outstanding."""
+        if job["remaining"] or job["handed_off"]:
+            return
+        if job["status"] == "cancelled":
+            job.setdefault("finished_at", now)
+        else:
+            self._finish(job, now)
+
+    def _finish(self, job: dict, now: float) -> None:
+        if job["status"] in ("done", "cancelled"):
+            return
+        job["status"] = "done"
+        job["finished_at"] = now
+        if not job["skip_graph"] and job["indexed"] and self._graph_jobs:
+            try:
+                graph = self._graph_jobs.request(
+                    reason=job["reason"] or "index_job")
+                job["graph_job"] = graph["job_id"]
+            except Exception as e:  # noqa: BLE001 — never wedge the queue
+                print(f"index job {job['job_id']}: graph rebuild request "
+                      f"failed: {e!r}", file=sys.stderr, flush=True)
+        self._prune()
+
+    def _prune(self) -> None:
+        # Bounded history for wait()/status(); only recent ids are polled.
+        finished = [jid for jid, j in self._jobs.items()
+                    if j["status"] in ("done", "cancelled")]
+        for jid in finished[:-64]:
+            self._jobs.pop(jid, None)
+
+    def _snapshot(self, job: dict, now: float) -> dict:
+        out = {k: v for k, v in job.items()
+               if k not in ("remaining", "handed_off")}
+        out["pending"] = len(job["remaining"]) + len(job["handed_off"])
+        end = job.get("finished_at", now)
+        out["elapsed_s"] = round(end - job["submitted_at"], 2)
+        return out
+
+    def _ahead_of(self, job: dict) -> int:
+        """Queued files that drain before ``job``'s last one, plus its own."""
+        mine = [(e["prio"], e["seq"]) for e in self._pending.values()
+                if e["job_id"] == job["job_id"]
+                or job["job_id"] in e["waiters"]]
+        if not mine:
+            return len(job["remaining"]) + len(job["handed_off"])
+        last = max(mine)
+        ahead = sum(1 for e in self._pending.values()
+                    if (e["prio"], e["seq"]) <= last)
+        in_batch = self._running["files"] if self._running else 0
+        return ahead + in_batch
+
+    def _eta(self, files: int) -> Optional[float]:
+        if not files:
+            return 0.0
+        if not self._rate:
+            return None
+        return round(files / self._rate, 2)
+
+    def _retry_after(self) -> int:
+        eta = self._eta(len(self._pending) // 2)
+        return int(min(60, max(1, eta if eta is not None else 30)))
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="index-jobs", daemon=True,
+            )
+            self._worker.start()
+
+    def _take_batch(self) -> list[tuple[str, dict]]:
+        batch: list[tuple[str, dict]] = []
+        while self._heap and len(batch) < self._batch_size:
+            prio, seq, path = heapq.heappop(self._heap)
+            entry = self._pending.get(path)
+            if entry is None or (entry["prio"], entry["seq"]) != (prio, seq):
+                continue  # superseded by a re-prioritised push
+            del self._pending[path]
+            batch.append((path, entry))
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                if not batch:
+                    self._worker = None
+                    self._cond.notify_all()
+                    return
+                started = time.time()
+                self._running = {"files": len(batch), "started_at": started}
+                self._cancel = False
+                for _, entry in batch:
+                    job = self._jobs.get(entry["job_id"])
+                    if job is not None and job["status"] == "queued":
+                        job["status"] = "running"
+                        job.setdefault("started_at", started)
+            done = self._index(batch)
+            finished = time.time()
+            with self._cond:
+                self._running = None
+                if done:
+                    rate = done / max(finished - started, 1e-6)
+                    self._rate = (rate if self._rate is None else
+                                  _RATE_ALPHA * rate
+                                  + (1 - _RATE_ALPHA) * self._rate)
+                self._cond.notify_all()
+
+    def _index(self, batch: list[tuple[str, dict]]) -> int:
+        done = 0
+        for path, entry in batch:
+            with self._cond:
+                cancelled = self._cancel
+            ok = False
+            if not cancelled:
+                try:
+                    self._brain_svc.index_doc(path=path,
+                                              content=entry["content"],
+                                              domain=entry["domain"])
+                    ok = True
+                    done += 1
+                except Exception as e:  # noqa: BLE001 — keep the worker alive
+                    print(f"index job {entry['job_id']}: {path}: {e!r}",
+                          file=sys.stderr, flush=True)
+            with self._cond:
+                self._release_waiters(entry, path, cancelled=cancelled)
+                self._cond.notify_all()
+                job = self._jobs.get(entry["job_id"])
+                if job is None:
+                    continue
+                job["remaining"].discard(path)
+                if ok:
+                    job["indexed"] += 1
+                    self._indexed_total += 1
+                elif cancelled:
+                    job["status"] = "cancelled"
+                else:
+                    job["failed"] += 1
+                self._settle(job, time.time())
+        return done
@@ -1,15 +1,60 @@
-"""Memory service — manages mulch expertise JSONL files with learning loop."""
+"""Memory service — expertise entries with a learning loop.
+
+Entries live in ``memory.db`` (SQLite, indexed on domain, status and
+name). The ``{domain}.jsonl`` files under the mulch expertise directory
+are kept as a write-behind export for mulch compatibility. A changed
+domain is rewritten ``MEMORY_EXPORT_DELAY_SECONDS`` after its first
+change, so a recall that bumps five entries' stats costs one UPDATE
+and, at most, one file rewrite instead of five. Entries found in the
+files but not in memory.db — JSONL from before memory.db existed, or
+lines ``ml record`` (the remember skill) appended since — are imported
+before a domain is read or re-exported, so a rewrite never drops them.
+Each file's size and mtime at the last import or export are kept in
+``jsonl_files``; an unchanged file costs one ``stat``.
+
+Reads go through an in-memory index (id -> entry, domain -> ids) kept
+per service. Every write bumps a generation counter in memory.db in the
+same transaction; the service patches its own writes into the index,
+and a generation it didn't produce (another process, another service
+over the same file) drops the index for a rebuild on the next read.
+
+Stores, edits and status changes also stamp the rows they touch with
+that generation (``changed_gen``), which makes the table its own change
+journal: :meth:`MemoryService.changes_since` lists what was written
+after a cursor, so governance only revisits dirty domains.
+
+Recall bookkeeping is write-behind as well: recall_count bumps and
+recall_log rows show up in the index at once but reach SQLite in one
+batch per ``MEMORY_RECALL_FLUSH_SECONDS`` (or ``MEMORY_RECALL_FLUSH_BATCH``
+entries). Task outcomes recompute effectiveness for every affected entry
+from one aggregate query and write the scores in one batch.
+"""
 
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import secrets
 import sqlite3
-from datetime import datetime, timezone
+import sys
+import threading
+import weakref
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
-
+from typing import Callable, Iterable, Optional
+
+from app.config import (
+    MEMORY_EXPORT_DELAY_SECONDS,
+    MEMORY_RECALL_FLUSH_BATCH,
+    MEMORY_RECALL_FLUSH_SECONDS,
+    TELEMETRY_RETENTION_BATCH,
+    TELEMETRY_RETENTION_DAYS,
+)
+from app.engines.near_dup import NearDupIndex, similar
+from app.engines.retention import incremental_vacuum, roll_up
+from app.engines.write_executor import writer_for
 from app.models.memory import ExpertiseEntry
 
 
@@ -25,29 +70,383 @@ CREATE TABLE IF NOT EXISTS recall_log (
 );
 CREATE INDEX IF NOT EXISTS idx_recall_log_task ON recall_log(task_id);
 CREATE INDEX IF NOT EXISTS idx_recall_log_entry ON recall_log(entry_id);
+CREATE INDEX IF NOT EXISTS idx_recall_log_recalled ON recall_log(recalled_at);
+-- Daily rollup of recall_log rows past the retention window.
+CREATE TABLE IF NOT EXISTS recall_daily (
+    day TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    entry_domain TEXT DEFAULT '',
+    recalls INTEGER DEFAULT 0,
+    positive INTEGER DEFAULT 0,
+    negative INTEGER DEFAULT 0,
+    PRIMARY KEY (day, entry_id)
+);
+"""
+
+_RECALL_ROLLUP_SQL = """
+INSERT INTO recall_daily (day, entry_id, entry_domain, recalls, positive,
+                          negative)
+SELECT substr(recalled_at, 1, 10), entry_id, MAX(entry_domain), COUNT(*),
+       SUM(outcome = 'positive'), SUM(outcome = 'negative')
+FROM recall_log WHERE id IN ({rows})
+GROUP BY substr(recalled_at, 1, 10), entry_id
+ON CONFLICT (day, entry_id) DO UPDATE SET
+    recalls = recalls + excluded.recalls,
+    positive = positive + excluded.positive,
+    negative = negative + excluded.negative
+"""
+
+# Outcome counts per entry over raw rows and rollups; {where} narrows
+# the entries.
+_OUTCOMES_SQL = """
+SELECT entry_id, SUM(positive), SUM(negative) FROM (
+    SELECT entry_id, outcome = 'positive' AS positive,
+           outcome = 'negative' AS negative
+    FROM recall_log WHERE outcome != '' {where}
+    UNION ALL
+    SELECT entry_id, positive, negative
+    FROM recall_daily WHERE positive + negative > 0 {where}
+) GROUP BY entry_id
+"""
+
+# rowid order is insertion order, which is also the JSONL export order.
+_CREATE_EXPERTISE_SQL = """
+CREATE TABLE IF NOT EXISTS expertise (
+    id TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    type TEXT DEFAULT '',
+    name TEXT DEFAULT '',
+    description TEXT DEFAULT '',
+    classification TEXT DEFAULT '',
+    recorded_at TEXT DEFAULT '',
+    outcomes TEXT DEFAULT '[]',
+    evidence TEXT DEFAULT '{}',
+    recall_count INTEGER DEFAULT 0,
+    last_recalled TEXT DEFAULT '',
+    status TEXT DEFAULT 'active',
+    valid_at TEXT DEFAULT '',
+    invalid_at TEXT DEFAULT '',
+    importance INTEGER DEFAULT 5,
+    memory_type TEXT DEFAULT 'semantic',
+    generation INTEGER DEFAULT 1,
+    effectiveness REAL DEFAULT 0.0,
+    changed_gen INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_expertise_domain ON expertise(domain);
+CREATE INDEX IF NOT EXISTS idx_expertise_status ON expertise(status);
+CREATE INDEX IF NOT EXISTS idx_expertise_name ON expertise(domain, name);
+CREATE TABLE IF NOT EXISTS expertise_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+INSERT OR IGNORE INTO expertise_meta (key, value) VALUES ('generation', 0);
+CREATE TABLE IF NOT EXISTS jsonl_files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+# After the changed_gen column is ensured on databases that predate it.
+_CREATE_JOURNAL_SQL = """
+CREATE INDEX IF NOT EXISTS idx_expertise_changed ON expertise(changed_gen);
+CREATE INDEX IF NOT EXISTS idx_expertise_recorded
+    ON expertise(status, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_expertise_recalled
+    ON expertise(status, last_recalled);
 """
 
+_COLUMNS = (
+    "id", "domain", "type", "name", "description", "classification",
+    "recorded_at", "outcomes", "evidence", "recall_count", "last_recalled",
+    "status", "valid_at", "invalid_at", "importance", "memory_type",
+    "generation", "effectiveness",
+)
+_INSERT_SQL = (
+    f"INSERT INTO expertise ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_COLUMNS))})"
+)
+_ACTIVE = "status = 'active' AND COALESCE(invalid_at, '') = ''"
+_GENERATION_SQL = "SELECT value FROM expertise_meta WHERE key = 'generation'"
+_RECORD_JSONL_SQL = ("INSERT OR REPLACE INTO jsonl_files (name, size, mtime_ns) "
+                     "VALUES (?, ?, ?)")
+# store() supersedes an active entry whose description is this similar.
+_STORE_DEDUP_RATIO = 0.85
+# Past this many LSH candidates the plain domain scan is cheaper.
+_MAX_DEDUP_CANDIDATES = 500
+
+
+def _bump_generation(conn: sqlite3.Connection) -> int:
+    """Advance the write generation inside the caller's transaction."""
+    conn.execute("UPDATE expertise_meta SET value = value + 1 "
+                 "WHERE key = 'generation'")
+    return int(conn.execute(_GENERATION_SQL).fetchone()[0])
+
+
+def _is_active(entry: ExpertiseEntry) -> bool:
+    return entry.status == "active" and not entry.invalid_at
+
+
+def _stamp(conn: sqlite3.Connection, ids: Iterable[str]) -> int:
+    """Bump the write generation and record it on the changed rows."""
+    generation = _bump_generation(conn)
+    conn.executemany("UPDATE expertise SET changed_gen = ? WHERE id = ?",
+                     [(generation, i) for i in ids if i])
+    return generation
+
+
+def _copy_entry(entry: ExpertiseEntry) -> ExpertiseEntry:
+    # Callers mutate what they get back; the index keeps its own copy.
+    return replace(entry, outcomes=list(entry.outcomes),
+                   evidence=dict(entry.evidence))
+
+
+class _EntryIndex:
+    """Entries of one memory.db as of write generation ``generation``.
+
+    ``by_domain`` maps each domain to its ids in rowid (insertion) order.
+    ``dups`` holds a near-duplicate index of active descriptions for each
+    domain that store() has deduplicated against, kept current by
+    :meth:`put` and :meth:`drop` once built.
+    """
+
+    def __init__(self, generation: int) -> None:
+        self.generation = generation
+        self.by_id: dict[str, ExpertiseEntry] = {}
+        self.rowids: dict[str, int] = {}
+        self.by_domain: dict[str, dict[str, None]] = {}
+        self.max_rowid = 0
+        self.dups: dict[str, NearDupIndex] = {}
+
+    def dup_index(self, domain: str) -> NearDupIndex:
+        dups = self.dups.get(domain)
+        if dups is None:
+            dups = self.dups[domain] = NearDupIndex()
+            dups.update((e.id, e.description)
+                        for e in self.domain(domain) if _is_active(e))
+        return dups
+
+    def _track_dup(self, old: Optional[ExpertiseEntry],
+                   new: Optional[ExpertiseEntry]) -> None:
+        if (old is not None and new is not None
+                and old.domain == new.domain
+                and old.description == new.description
+                and _is_active(old) == _is_active(new)):
+            return
+        if old is not None and old.domain in self.dups:
+            self.dups[old.domain].discard(old.id)
+        if new is not None and new.domain in self.dups and _is_active(new):
+            self.dups[new.domain].add(new.id, new.description)
+
+    def put(self, rowid: int, entry: ExpertiseEntry) -> None:
+        old = self.by_id.get(entry.id)
+        self.by_id[entry.id] = entry
+        self.rowids[entry.id] = rowid
+        self.max_rowid = max(self.max_rowid, rowid)
+        self._track_dup(old, entry)
+        if old is not None and old.domain == entry.domain:
+            return
+        ids = self.by_domain.setdefault(entry.domain, {})
+        ids[entry.id] = None
+        if old is not None:
+            # Moved between domains: new rows always append, but a moved
+            # one has to take its rowid place in the target domain.
+            self.by_domain.get(old.domain, {}).pop(entry.id, None)
+            self.by_domain[entry.domain] = dict.fromkeys(
+                sorted(ids, key=self.rowids.__getitem__))
+
+    def drop(self, entry_id: str) -> None:
+        old = self.by_id.pop(entry_id, None)
+        self.rowids.pop(entry_id, None)
+        self._track_dup(old, None)
+        if old is not None:
+            self.by_domain.get(old.domain, {}).pop(entry_id, None)
+
+    def domain(self, domain: str) -> list[ExpertiseEntry]:
+        return [self.by_id[i] for i in self.by_domain.get(domain, ())]
+
+
+class _JsonlExporter:
+    """Write-behind export of changed domains to their JSONL files.
+
+    :meth:`mark` records a domain as dirty and arms a timer; when it
+    fires, every dirty domain is rewritten once. A delay of 0 exports
+    inline.
+    """
+
+    def __init__(self, export: Callable[[str], None], delay: float) -> None:
+        self._export = export
+        self._delay = delay
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._dirty: set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+
+    def mark(self, domains: Iterable[str]) -> None:
+        with self._lock:
+            self._dirty.update(d for d in domains if d)
+            if self._delay > 0:
+                if self._timer is None and self._dirty:
+                    self._timer = threading.Timer(self._delay, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        with self._export_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            for domain in sorted(dirty):
+                try:
+                    self._export(domain)
+                except OSError as e:
+                    print(f"[memory] JSONL export of {domain!r} failed: {e!r}",
+                          file=sys.stderr, flush=True)
+
+
+class _RecallBuffer:
+    """Recall stats and recall_log rows waiting for one batched write.
+
+    :meth:`add` returns True once ``batch`` recalled entries are waiting
+    (or the delay is 0); otherwise the first add arms a timer that calls
+    ``flush`` after ``delay``. :meth:`take` hands the batch over.
+    """
+
+    def __init__(self, flush: Callable[[], None], delay: float,
+                 batch: int) -> None:
+        self._flush = flush
+        self._delay = delay
+        self._batch = max(1, batch)
+        self._lock = threading.Lock()
+        # entry id -> [recall count delta, last_recalled, domain]
+        self._stats: dict[str, list] = {}
+        self._log: list[tuple] = []
+        self._waiting = 0
+        self._timer: Optional[threading.Timer] = None
+
+    def add(self, entries: list[ExpertiseEntry], now: str,
+            log_rows: list[tuple]) -> bool:
+        with self._lock:
+            for e in entries:
+                stat = self._stats.setdefault(e.id, [0, "", e.domain])
+                stat[0] += 1
+                stat[1] = max(stat[1], now)
+            self._log.extend(log_rows)
+            self._waiting += len(entries)
+            if self._delay > 0 and self._waiting < self._batch:
+                if self._timer is None:
+                    self._timer = threading.Timer(self._delay, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return False
+            return True
+
+    def overlay(self, entry: ExpertiseEntry) -> None:
+        """Apply not-yet-written stats to an entry read from SQLite."""
+        with self._lock:
+            stat = self._stats.get(entry.id)
+            if stat is not None:
+                entry.recall_count += stat[0]
+                entry.last_recalled = max(entry.last_recalled or "", stat[1])
+
+    def take(self) -> tuple[dict[str, list], list[tuple]]:
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            log, self._log = self._log, []
+            self._waiting = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            return stats, log
+
+    def flush(self) -> None:
+        self._flush()
+
+
+_EXPORTERS: "weakref.WeakSet[_JsonlExporter]" = weakref.WeakSet()
+_RECALL_BUFFERS: "weakref.WeakSet[_RecallBuffer]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_exports() -> None:
+    # Recall stats first: their flush marks domains for export.
+    for buffer in list(_RECALL_BUFFERS):
+        buffer.flush()
+    for exporter in list(_EXPORTERS):
+        exporter.flush()
+
 
 class MemoryService:
-    """Reads and writes expertise entries stored as JSONL files in mulch.
+    """Stores expertise entries in SQLite and exports them to mulch JSONL.
 
-    Each domain has its own ``{domain}.jsonl`` file under the expertise
-    subdirectory of MULCH_DIR.
+    Each domain is exported to its own ``{domain}.jsonl`` file under the
+    expertise subdirectory of MULCH_DIR. Those files are an export: edits
+    made to them after the one-time import are overwritten on the next
+    export of that domain.
 
     The recall_log (SQLite) tracks which entries were recalled during which
     tasks, enabling automatic effectiveness scoring from task outcomes.
+    Rows past the retention window are folded into recall_daily, which
+    effectiveness scoring reads alongside the raw rows.
     """
 
-    def __init__(self, mulch_dir: str, task_svc: object = None) -> None:
+    def __init__(self, mulch_dir: str, task_svc: object = None,
+                 export_delay: Optional[float] = None,
+                 recall_flush_delay: Optional[float] = None) -> None:
         self._dir = Path(mulch_dir) / "expertise"
         self._dir.mkdir(parents=True, exist_ok=True)
         self._task_svc = task_svc
 
         # Recall log DB — operational data, separate from expertise JSONL
         recall_db_path = Path(mulch_dir) / "recall_log.db"
+        self._recall_db_path = str(recall_db_path)
         self._recall_db = sqlite3.connect(str(recall_db_path), check_same_thread=False)
+        # Takes effect on new files only; must precede the WAL switch.
+        self._recall_db.execute("PRAGMA auto_vacuum = INCREMENTAL")
         self._recall_db.execute("PRAGMA journal_mode=WAL")
         self._recall_db.executescript(_CREATE_RECALL_LOG_SQL)
+        # recall_log inserts are fire-and-forget through the writer;
+        # readers of recall_log flush it first.
+        self._recall_writer = writer_for(str(recall_db_path))
+        self._recalls = _RecallBuffer(
+            self._flush_recalls,
+            MEMORY_RECALL_FLUSH_SECONDS if recall_flush_delay is None
+            else recall_flush_delay,
+            MEMORY_RECALL_FLUSH_BATCH,
+        )
+        _RECALL_BUFFERS.add(self._recalls)
+
+        # Expertise store: reads on self._db, writes through the writer.
+        db_path = Path(mulch_dir) / "memory.db"
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_CREATE_EXPERTISE_SQL)
+        if "changed_gen" not in {
+            r[1] for r in self._db.execute("PRAGMA table_info(expertise)")
+        }:
+            self._db.execute("ALTER TABLE expertise "
+                             "ADD COLUMN changed_gen INTEGER DEFAULT 0")
+            self._db.commit()
+        self._db.executescript(_CREATE_JOURNAL_SQL)
+        self._writer = writer_for(str(db_path))
+        self._index_lock = threading.Lock()
+        self._idx: Optional[_EntryIndex] = None
+        self._exporter = _JsonlExporter(
+            self._export_domain,
+            MEMORY_EXPORT_DELAY_SECONDS if export_delay is None
+            else export_delay,
+        )
+        _EXPORTERS.add(self._exporter)
+        self._jsonl_seen: dict[str, tuple[int, int]] = {
+            r[0]: (r[1], r[2]) for r in self._db.execute(
+                "SELECT name, size, mtime_ns FROM jsonl_files")
+        }
+        self._migrate_jsonl()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -111,35 +510,207 @@ class MemoryService:
             "effectiveness": entry.effectiveness,
         }
 
-    def _read_entries(self, domain: str) -> list[ExpertiseEntry]:
-        """Load all entries from a domain file."""
-        path = self._domain_file(domain)
-        if not path.exists():
-            return []
-        entries: list[ExpertiseEntry] = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                entries.append(self._entry_from_dict(data))
-            except json.JSONDecodeError:
-                continue
-        return entries
+    @classmethod
+    def _entry_from_row(cls, row: sqlite3.Row) -> ExpertiseEntry:
+        data = dict(row)
+        data["outcomes"] = json.loads(data["outcomes"] or "[]")
+        data["evidence"] = json.loads(data["evidence"] or "{}")
+        return cls._entry_from_dict(data)
+
+    @classmethod
+    def _entry_to_row(cls, entry: ExpertiseEntry) -> tuple:
+        data = cls._entry_to_dict(entry)
+        data["outcomes"] = json.dumps(data["outcomes"] or [])
+        data["evidence"] = json.dumps(data["evidence"] or {})
+        data["invalid_at"] = data["invalid_at"] or ""
+        return tuple(data[c] for c in _COLUMNS)
+
+    def _select(self, where: str = "", params: tuple = ()) -> list[ExpertiseEntry]:
+        sql = "SELECT * FROM expertise"
+        if where:
+            sql += f" WHERE {where}"
+        rows = self._db.execute(sql + " ORDER BY rowid", params).fetchall()
+        return [self._entry_from_row(r) for r in rows]
+
+    def _index(self) -> _EntryIndex:
+        """The entry index, rebuilt if memory.db moved past it.
+
+        Caller holds ``_index_lock``. The generation is read before the
+        rows, so a write landing in between only costs another rebuild.
+        """
+        generation = int(self._db.execute(_GENERATION_SQL).fetchone()[0])
+        if self._idx is None or self._idx.generation != generation:
+            idx = _EntryIndex(generation)
+            for row in self._db.execute(
+                "SELECT rowid, * FROM expertise ORDER BY rowid"
+            ):
+                entry = self._entry_from_row(row)
+                self._recalls.overlay(entry)
+                idx.put(row[0], entry)
+            self._idx = idx
+        return self._idx
+
+    def _apply_write(self, generation: int, ids: Iterable[str]) -> None:
+        """Patch this service's own committed write into the index."""
+        with self._index_lock:
+            idx = self._idx
+            if idx is None or idx.generation >= generation:
+                return
+            if idx.generation != generation - 1:
+                self._idx = None  # someone else wrote in between
+                return
+            ids = tuple(dict.fromkeys(i for i in ids if i))
+            rows = self._db.execute(
+                f"SELECT rowid, * FROM expertise "
+                f"WHERE id IN ({','.join('?' * len(ids))})", ids,
+            ).fetchall() if ids else []
+            for row in rows:
+                entry = self._entry_from_row(row)
+                self._recalls.overlay(entry)
+                idx.put(row[0], entry)
+            for missing in set(ids) - {row["id"] for row in rows}:
+                idx.drop(missing)
+            idx.generation = generation
+
+    def _dedup_candidates(
+        self, conn: sqlite3.Connection, domain: str, description: str,
+    ) -> list[tuple]:
+        """Active rows in ``domain`` that may be near-duplicates of
+        ``description``, as ``(id, generation, description)`` in rowid
+        order: candidates from the index (every row of a small domain,
+        LSH bucket-mates otherwise) plus rows newer than it (earlier
+        stores in the same write group)."""
+        with self._index_lock:
+            idx = self._index()
+            ids = tuple(idx.dup_index(domain).candidates(description))
+            newest = idx.max_rowid
+        sql = (f"SELECT id, generation, description FROM expertise "
+               f"WHERE domain = ? AND {_ACTIVE}")
+        if len(ids) > _MAX_DEDUP_CANDIDATES:
+            return conn.execute(sql + " ORDER BY rowid", (domain,)).fetchall()
+        return conn.execute(
+            sql + f" AND (rowid > ? OR id IN ({','.join('?' * len(ids))}))"
+            " ORDER BY rowid",
+            (domain, newest, *ids),
+        ).fetchall()
 
-    def _write_entries(self, domain: str, entries: list[ExpertiseEntry]) -> None:
-        """Overwrite a domain file with the given entries."""
-        path = self._domain_file(domain)
-        lines = [json.dumps(self._entry_to_dict(e)) for e in entries]
-        path.write_text("\n".join(lines) + "\n" if lines else "", encoding="utf-8")
+    def _lookup(self, ids: Iterable[str]) -> dict[str, ExpertiseEntry]:
+        """Copies of the indexed entries for ``ids`` that exist."""
+        with self._index_lock:
+            by_id = self._index().by_id
+            return {i: _copy_entry(by_id[i]) for i in ids if i in by_id}
+
+    def _read_entries(self, domain: str) -> list[ExpertiseEntry]:
+        """Load all entries in a domain, in insertion order."""
+        self._sync_jsonl(domain)
+        with self._index_lock:
+            return [_copy_entry(e) for e in self._index().domain(domain)]
 
     def _all_entries(self) -> list[ExpertiseEntry]:
         """Load entries across all domains."""
-        entries: list[ExpertiseEntry] = []
-        for domain in self.list_domains():
-            entries.extend(self._read_entries(domain))
-        return entries
+        self._sync_jsonl()
+        with self._index_lock:
+            return [_copy_entry(e) for e in self._index().by_id.values()]
+
+    @staticmethod
+    def _file_sig(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _export_domain(self, domain: str) -> None:
+        """Rewrite a domain's JSONL export from memory.db (atomically).
+
+        Lines other writers appended are imported first. If the file
+        changes again while the export is written, the import and the
+        export are redone, so the replace only loses a line appended in
+        the instant between the last check and ``os.replace``.
+        """
+        path = self._domain_file(domain)
+        tmp = path.with_name(path.name + ".tmp")
+        for _ in range(5):
+            self._sync_jsonl(domain)
+            seen = self._jsonl_seen.get(path.name)
+            lines = [json.dumps(self._entry_to_dict(e))
+                     for e in self._select("domain = ?", (domain,))]
+            tmp.write_text("\n".join(lines) + "\n" if lines else "",
+                           encoding="utf-8")
+            if self._file_sig(path) == seen:
+                break
+        os.replace(tmp, path)
+        self._record_jsonl({path.name: self._file_sig(path)})
+
+    def _record_jsonl(self, sigs: dict[str, Optional[tuple[int, int]]]) -> None:
+        """Remember files as imported / exported at these stats."""
+        rows = [(name, *sig) for name, sig in sigs.items() if sig]
+
+        def write(conn: sqlite3.Connection) -> None:
+            conn.executemany(_RECORD_JSONL_SQL, rows)
+
+        if rows:
+            self._writer.submit(write)
+        self._jsonl_seen.update({name: sig for name, sig in sigs.items() if sig})
+
+    def flush_export(self) -> None:
+        """Write pending JSONL exports now."""
+        self._exporter.flush()
+
+    def _sync_jsonl(self, domain: Optional[str] = None) -> int:
+        """Import entries from ``{domain}.jsonl`` (every file when
+        ``domain`` is None) whose ids memory.db doesn't have.
+
+        Files whose size and mtime match the last import or export are
+        skipped. Returns entries imported.
+        """
+        paths = ([self._domain_file(domain)] if domain
+                 else sorted(self._dir.glob("*.jsonl")))
+        changed: dict[Path, tuple[int, int]] = {}
+        for path in paths:
+            sig = self._file_sig(path)
+            if sig is not None and self._jsonl_seen.get(path.name) != sig:
+                changed[path] = sig
+        if not changed:
+            return 0
+        rows = []
+        for path in changed:
+            for line in path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = self._entry_from_dict(json.loads(line))
+                except (json.JSONDecodeError, AttributeError):
+                    continue
+                if not entry.id:
+                    continue
+                entry.domain = entry.domain or path.stem
+                rows.append(self._entry_to_row(entry))
+        insert = _INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1)
+
+        def write(conn: sqlite3.Connection) -> list[str]:
+            imported = [row[0] for row in rows
+                        if conn.execute(insert, row).rowcount]
+            if imported:
+                _stamp(conn, imported)
+            conn.executemany(_RECORD_JSONL_SQL,
+                             [(p.name, *sig) for p, sig in changed.items()])
+            return imported
+
+        imported = self._writer.submit(write)
+        self._jsonl_seen.update({p.name: sig for p, sig in changed.items()})
+        return len(imported)
+
+    def _migrate_jsonl(self) -> int:
+        """Import whatever the JSONL files hold that memory.db doesn't:
+        every entry the first time memory.db is opened over an existing
+        mulch dir, and appends made while the service was down."""
+        imported = self._sync_jsonl()
+        if imported:
+            print(f"[memory] imported {imported} expertise entries from "
+                  f"{self._dir} into memory.db", file=sys.stderr, flush=True)
+        return imported
 
     # ------------------------------------------------------------------
     # Public API
@@ -161,44 +732,12 @@ class MemoryService:
         Temporal dedup: if an active entry with the same name or >85%
         description similarity exists, the OLD entry is invalidated
         (invalid_at set) and a NEW entry is created. This preserves
-        history while preventing rot.
+        history while preventing rot. Small domains are compared in
+        full; larger ones only against LSH candidates from the domain's
+        near-duplicate index, which can miss a rare similar pair.
         """
-        from difflib import SequenceMatcher
-
         now = datetime.now(timezone.utc).isoformat()
-        entries = self._read_entries(domain)
-        superseded = None
-
-        # Check for exact name match
-        for existing in entries:
-            if existing.status != "active" or existing.invalid_at:
-                continue
-            if existing.name == name:
-                superseded = existing
-                break
-
-        # Check for high description similarity if no name match
-        if not superseded:
-            for existing in entries:
-                if existing.status != "active" or existing.invalid_at:
-                    continue
-                ratio = SequenceMatcher(
-                    None, existing.description.lower(), description.lower()
-                ).ratio()
-                if ratio > 0.85:
-                    superseded = existing
-                    break
-
-        # Invalidate the old entry (don't delete — preserve history)
-        next_generation = 1
-        if superseded:
-            superseded.invalid_at = now
-            superseded.status = "archived"
-            next_generation = superseded.generation + 1
-
-        # Create new entry with valid_at
         entry = ExpertiseEntry(
-            id=self._generate_id(),
             type=type,
             name=name,
             description=description,
@@ -209,10 +748,49 @@ class MemoryService:
             valid_at=now,
             importance=importance,
             memory_type=memory_type,
-            generation=next_generation,
         )
-        entries.append(entry)
-        self._write_entries(domain, entries)
+
+        # Dedup check and insert in one transaction, so two concurrent
+        # stores of the same fact can't both stay active.
+        def write(conn: sqlite3.Connection) -> tuple[int, Optional[str]]:
+            # Check for exact name match
+            superseded = conn.execute(
+                f"SELECT id, generation FROM expertise "
+                f"WHERE domain = ? AND name = ? AND {_ACTIVE} "
+                f"ORDER BY rowid LIMIT 1",
+                (domain, name),
+            ).fetchone()
+
+            # Check for high description similarity if no name match
+            if not superseded:
+                wanted = description.lower()
+                for row in self._dedup_candidates(conn, domain, description):
+                    if similar((row[2] or "").lower(), wanted,
+                               _STORE_DEDUP_RATIO, strict=True):
+                        superseded = row
+                        break
+
+            # Invalidate the old entry (don't delete — preserve history)
+            entry.generation = 1
+            if superseded:
+                conn.execute(
+                    "UPDATE expertise SET invalid_at = ?, status = 'archived' "
+                    "WHERE id = ?",
+                    (now, superseded[0]),
+                )
+                entry.generation = superseded[1] + 1
+
+            entry.id = self._generate_id()
+            while conn.execute("SELECT 1 FROM expertise WHERE id = ?",
+                               (entry.id,)).fetchone():
+                entry.id = self._generate_id()
+            conn.execute(_INSERT_SQL, self._entry_to_row(entry))
+            superseded_id = superseded[0] if superseded else None
+            return _stamp(conn, (entry.id, superseded_id)), superseded_id
+
+        generation, superseded_id = self._writer.submit(write)
+        self._apply_write(generation, (entry.id, superseded_id))
+        self._exporter.mark([domain])
 
         # Also index into Brain for FTS search
         self._index_in_brain(entry)
@@ -300,9 +878,10 @@ class MemoryService:
         # Update recall stats + log for learning loop
         now = datetime.now(timezone.utc).isoformat()
         current_task_id = self._get_current_task_id()
-        for entry in results[:limit]:
-            self._record_recall_stat(entry, now)
-            self._log_recall(entry, query, now, current_task_id)
+        self._buffer_recalls(results[:limit], now, [
+            (e.id, e.domain, query, now, current_task_id)
+            for e in results[:limit]
+        ])
 
         return results[:limit]
 
@@ -331,21 +910,18 @@ class MemoryService:
         ctx = get_project(project_id)
         hits = ctx.brain_svc.search(or_query, domain="expertise", limit=limit)
 
-        # Hydrate: match Brain doc_ids back to JSONL entries
-        entry_map = {}
-        for e in self._all_entries():
-            entry_map[e.id] = e
-
-        results = []
+        # Hydrate: match Brain doc_ids back to stored entries
+        hit_ids = []
         for hit in hits:
             doc_id = hit.get("doc_id", "")
             # doc_id format: memory/{domain}/{mx-id}::main
             parts = doc_id.replace("::main", "").split("/")
             if len(parts) >= 3:
-                entry_id = parts[-1]
-                if entry_id in entry_map:
-                    results.append(entry_map[entry_id])
-        return results
+                hit_ids.append(parts[-1])
+        if not hit_ids:
+            return []
+        entry_map = self._lookup(hit_ids)
+        return [entry_map[i] for i in hit_ids if i in entry_map]
 
     def _keyword_recall(
         self, query: str, domain: Optional[str], limit: int,
@@ -361,15 +937,20 @@ class MemoryService:
         if not query_words and not query_lower.strip():
             return []
 
-        candidates = self._read_entries(domain) if domain else self._all_entries()
-        candidates = [e for e in candidates if e.status == "active"]
+        self._sync_jsonl(domain)
+        # Score on the bare text fields; copy out only the winners.
+        with self._index_lock:
+            idx = self._index()
+            pool = idx.domain(domain) if domain else idx.by_id.values()
+            candidates = [(e.id, e.name, e.description, e.type, e.domain)
+                          for e in pool if e.status == "active"]
 
-        scored: list[tuple[float, ExpertiseEntry]] = []
-        for entry in candidates:
+        scored: list[tuple[float, str]] = []
+        for entry_id, name, description, etype, edomain in candidates:
             # Include type, domain, and name in searchable text
-            name_text = entry.name.replace("-", " ").replace("/", " ").lower()
-            desc_text = entry.description.lower()
-            full_text = f"{name_text} {desc_text} {entry.type} {entry.domain}"
+            name_text = (name or "").replace("-", " ").replace("/", " ").lower()
+            desc_text = (description or "").lower()
+            full_text = f"{name_text} {desc_text} {etype} {edomain}"
             text_words = set(full_text.split())
 
             # Word overlap (name tokens weighted 2x)
@@ -384,30 +965,76 @@ class MemoryService:
                     score += 0.5  # partial substring match
 
             if score > 0:
-                scored.append((score, entry))
+                scored.append((score, entry_id))
 
         scored.sort(key=lambda x: x[0], reverse=True)
-        return [e for _, e in scored[:limit]]
+        top = [entry_id for _, entry_id in scored[:limit]]
+        if not top:
+            return []
+        found = self._lookup(top)
+        return [found[i] for i in top if i in found]
 
-    def _record_recall_stat(self, entry: ExpertiseEntry, now: str) -> None:
-        """Increment recall_count and last_recalled for an entry."""
-        try:
-            entries = self._read_entries(entry.domain)
+    def _buffer_recalls(
+        self, entries: list[ExpertiseEntry], now: str, log_rows: list[tuple],
+    ) -> None:
+        """Bump recall stats in the index now; write them later in a batch."""
+        if not entries:
+            return
+        with self._index_lock:
+            by_id = self._idx.by_id if self._idx is not None else {}
             for e in entries:
-                if e.id == entry.id:
-                    e.recall_count += 1
-                    e.last_recalled = now
-                    break
-            self._write_entries(entry.domain, entries)
-        except Exception:
-            pass
+                e.recall_count += 1
+                e.last_recalled = now
+                indexed = by_id.get(e.id)
+                if indexed is not None:
+                    indexed.recall_count += 1
+                    indexed.last_recalled = now
+            full = self._recalls.add(entries, now, log_rows)
+        if full:
+            self._flush_recalls()
+
+    def _flush_recalls(self) -> None:
+        """Write buffered recall stats and recall_log rows, one batch each."""
+        stats, log = self._recalls.take()
+        if log:
+            self._recall_writer.submit(
+                lambda conn: conn.executemany(
+                    "INSERT INTO recall_log (entry_id, entry_domain, query, "
+                    "recalled_at, task_id) VALUES (?, ?, ?, ?, ?)",
+                    log,
+                ),
+                wait=False,
+            )
+        if not stats:
+            return
+        rows = [(n, last, entry_id) for entry_id, (n, last, _) in stats.items()]
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.executemany(
+                "UPDATE expertise SET recall_count = recall_count + ?, "
+                "last_recalled = ? WHERE id = ?",
+                rows,
+            )
+            return _bump_generation(conn)
+
+        try:
+            generation = self._writer.submit(write)
+        except sqlite3.Error as e:
+            print(f"[memory] recall stats write failed: {e!r}",
+                  file=sys.stderr, flush=True)
+            return
+        self._apply_write(generation, stats)
+        self._exporter.mark({domain for _, _, domain in stats.values()})
+
+    def flush_recalls(self) -> None:
+        """Write buffered recall stats now."""
+        self._flush_recalls()
 
     def list_domains(self) -> list[str]:
-        """Return domain names derived from .jsonl file names."""
-        domains: list[str] = []
-        for path in sorted(self._dir.glob("*.jsonl")):
-            domains.append(path.stem)
-        return domains
+        """Return the domains that have at least one entry."""
+        return [r[0] for r in self._db.execute(
+            "SELECT DISTINCT domain FROM expertise ORDER BY domain"
+        ).fetchall()]
 
     def list_entries(
         self,
@@ -417,51 +1044,111 @@ class MemoryService:
         status_filter: str = "active",
     ) -> list[ExpertiseEntry]:
         """List entries in a domain with optional filters."""
-        entries = self._read_entries(domain)
-
-        if status_filter:
-            entries = [e for e in entries if e.status == status_filter]
-        if type_filter:
-            entries = [e for e in entries if e.type == type_filter]
-        if classification_filter:
-            entries = [e for e in entries if e.classification == classification_filter]
-
-        return entries
+        self._sync_jsonl(domain)
+        with self._index_lock:
+            return [
+                _copy_entry(e) for e in self._index().domain(domain)
+                if (not status_filter or e.status == status_filter)
+                and (not type_filter or e.type == type_filter)
+                and (not classification_filter
+                     or e.classification == classification_filter)
+            ]
 
     def get_entry(self, entry_id: str) -> Optional[ExpertiseEntry]:
         """Look up a single entry by ID across all domains."""
-        for entry in self._all_entries():
-            if entry.id == entry_id:
-                return entry
-        return None
+        return self._lookup((entry_id,)).get(entry_id)
 
     def update_entry(self, entry_id: str, **kwargs: object) -> Optional[ExpertiseEntry]:
         """Update fields on an existing entry and persist."""
-        for domain in self.list_domains():
-            entries = self._read_entries(domain)
-            for i, entry in enumerate(entries):
-                if entry.id != entry_id:
-                    continue
-                for key, value in kwargs.items():
-                    if hasattr(entry, key) and key != "id":
-                        setattr(entry, key, value)
-                entries[i] = entry
-                self._write_entries(domain, entries)
-                return entry
-        return None
+        entry = self.get_entry(entry_id)
+        if entry is None:
+            return None
+        old_domain = entry.domain
+        changed = []
+        for key, value in kwargs.items():
+            if hasattr(entry, key) and key != "id":
+                setattr(entry, key, value)
+                changed.append(key)
+        if not changed:
+            return entry
+        # Only the named columns: buffered recall stats for this entry
+        # land on top of whatever is written here.
+        values = dict(zip(_COLUMNS, self._entry_to_row(entry)))
+        sql = (f"UPDATE expertise SET {', '.join(f'{c} = ?' for c in changed)}"
+               " WHERE id = ?")
+        params = (*(values[c] for c in changed), entry_id)
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.execute(sql, params)
+            return _stamp(conn, (entry_id,))
+
+        self._apply_write(self._writer.submit(write), (entry_id,))
+        self._exporter.mark({old_domain, entry.domain})
+        return entry
+
+    def set_statuses(self, changes: dict[str, str]) -> Optional[int]:
+        """Apply many ``{entry_id: status}`` changes in one write.
+
+        Returns the write generation, or None when there was nothing to do.
+        """
+        if not changes:
+            return None
+        rows = [(status, entry_id) for entry_id, status in changes.items()]
+
+        def write(conn: sqlite3.Connection) -> int:
+            conn.executemany("UPDATE expertise SET status = ? WHERE id = ?",
+                             rows)
+            return _stamp(conn, changes)
+
+        generation = self._writer.submit(write)
+        self._apply_write(generation, changes)
+        self._exporter.mark({e.domain for e in self._lookup(changes).values()})
+        return generation
+
+    def changes_since(self, cursor: int) -> tuple[int, dict[str, set[str]]]:
+        """Change journal: entries stored, edited or re-statused after
+        write generation ``cursor`` (-1 for all), as
+        ``(current generation, {domain: entry ids})``.
+
+        Recall stats and effectiveness scores don't count as changes.
+        An entry moved between domains is listed under its new one.
+        """
+        generation = int(self._db.execute(_GENERATION_SQL).fetchone()[0])
+        dirty: dict[str, set[str]] = {}
+        for entry_id, domain in self._db.execute(
+            "SELECT id, domain FROM expertise WHERE changed_gen > ?", (cursor,),
+        ):
+            dirty.setdefault(domain, set()).add(entry_id)
+        return generation, dirty
+
+    def list_stale(
+        self, column: str, before: str, domain: Optional[str] = None,
+    ) -> list[ExpertiseEntry]:
+        """Active entries whose ``column`` (``recorded_at`` or
+        ``last_recalled``) is set and sorts before ``before``.
+
+        An index range scan on the ISO timestamps; callers re-check the
+        parsed times, so pass a cutoff with some slack for mixed offsets.
+        """
+        if column not in ("recorded_at", "last_recalled"):
+            raise ValueError(f"not a timestamp column: {column!r}")
+        sql = (f"SELECT id FROM expertise WHERE status = 'active' "
+               f"AND {column} != '' AND {column} < ?")
+        params: tuple = (before,)
+        if domain is not None:
+            sql += " AND domain = ?"
+            params += (domain,)
+        ids = [r[0] for r in self._db.execute(sql + " ORDER BY rowid", params)]
+        found = self._lookup(ids)
+        return [found[i] for i in ids if i in found]
 
     def record_recall(self, entry_id: str) -> None:
         """Increment recall_count and update last_recalled timestamp."""
-        for domain in self.list_domains():
-            entries = self._read_entries(domain)
-            for i, entry in enumerate(entries):
-                if entry.id != entry_id:
-                    continue
-                entry.recall_count += 1
-                entry.last_recalled = datetime.now(timezone.utc).isoformat()
-                entries[i] = entry
-                self._write_entries(domain, entries)
-                return
+        entry = self.get_entry(entry_id)
+        if entry is not None:
+            self._buffer_recalls(
+                [entry], datetime.now(timezone.utc).isoformat(), [],
+            )
 
     # ------------------------------------------------------------------
     # Learning loop — recall logging and outcome correlation
@@ -479,20 +1166,6 @@ class MemoryService:
             pass
         return ""
 
-    def _log_recall(
-        self, entry: ExpertiseEntry, query: str, now: str, task_id: str,
-    ) -> None:
-        """Log a recall event for later outcome correlation."""
-        try:
-            self._recall_db.execute(
-                "INSERT INTO recall_log (entry_id, entry_domain, query, recalled_at, task_id) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (entry.id, entry.domain, query, now, task_id),
-            )
-            self._recall_db.commit()
-        except Exception:
-            pass
-
     def record_outcome(self, task_id: str, outcome: str) -> int:
         """Record task outcome against all recalls for that task.
 
@@ -504,6 +1177,8 @@ class MemoryService:
             return 0
 
         # Update all recall_log rows for this task
+        self._flush_recalls()
+        self._recall_writer.flush()
         cur = self._recall_db.execute(
             "UPDATE recall_log SET outcome = ? WHERE task_id = ? AND outcome = ''",
             (outcome, task_id),
@@ -514,78 +1189,112 @@ class MemoryService:
         if updated == 0:
             return 0
 
-        # Get distinct entry IDs affected
-        rows = self._recall_db.execute(
-            "SELECT DISTINCT entry_id FROM recall_log WHERE task_id = ?",
-            (task_id,),
-        ).fetchall()
-
-        # Recalculate effectiveness for each affected entry
-        for (entry_id,) in rows:
-            self._recalculate_effectiveness(entry_id)
-
+        self._recalculate_effectiveness(task_id)
         return updated
 
-    def _recalculate_effectiveness(self, entry_id: str) -> None:
-        """Recalculate effectiveness score for an entry from its recall_log.
+    def _recalculate_effectiveness(self, task_id: str) -> None:
+        """Recalculate effectiveness for every entry recalled during a task.
 
         Score = (positive_count - negative_count) / total_with_outcome
         Range: -1.0 to +1.0. Entries with no outcomes stay at 0.0.
+        One aggregate query covers all affected entries; changed scores
+        are written in one batch and each touched domain exported once.
         """
         rows = self._recall_db.execute(
-            "SELECT outcome, COUNT(*) FROM recall_log "
-            "WHERE entry_id = ? AND outcome != '' GROUP BY outcome",
-            (entry_id,),
+            _OUTCOMES_SQL.format(
+                where="AND entry_id IN (SELECT DISTINCT entry_id "
+                      "FROM recall_log WHERE task_id = :task)",
+            ),
+            {"task": task_id},
         ).fetchall()
 
-        if not rows:
-            return
-
-        counts = {outcome: count for outcome, count in rows}
-        positive = counts.get("positive", 0)
-        negative = counts.get("negative", 0)
-        total = positive + negative
-
-        if total == 0:
+        scores = {
+            entry_id: round((positive - negative) / (positive + negative), 3)
+            for entry_id, positive, negative in rows
+            if positive + negative
+        }
+        current = self._lookup(scores)
+        by_domain: dict[str, list[tuple[float, str]]] = {}
+        for entry_id, score in scores.items():
+            entry = current.get(entry_id)
+            if entry is not None and entry.effectiveness != score:
+                by_domain.setdefault(entry.domain, []).append((score, entry_id))
+        if not by_domain:
             return
 
-        score = (positive - negative) / total
-
-        # Persist to the JSONL entry
-        entry = self.get_entry(entry_id)
-        if entry:
-            self.update_entry(entry_id, effectiveness=round(score, 3))
+        def write(conn: sqlite3.Connection) -> int:
+            for batch in by_domain.values():
+                conn.executemany(
+                    "UPDATE expertise SET effectiveness = ? WHERE id = ?",
+                    batch,
+                )
+            return _bump_generation(conn)
+
+        self._apply_write(
+            self._writer.submit(write),
+            [entry_id for batch in by_domain.values() for _, entry_id in batch],
+        )
+        self._exporter.mark(by_domain)
 
     def get_effectiveness_scores(self) -> dict[str, dict]:
         """Aggregate effectiveness data for governance.
 
         Returns {entry_id: {positive: N, negative: N, total: N, score: float}}
-        for entries that have at least one outcome.
+        for entries that have at least one outcome. Counts cover the raw
+        recall_log rows plus the daily rollups of expired ones.
         """
-        rows = self._recall_db.execute(
-            "SELECT entry_id, outcome, COUNT(*) FROM recall_log "
-            "WHERE outcome != '' GROUP BY entry_id, outcome"
-        ).fetchall()
+        self._recall_writer.flush()
+        rows = self._recall_db.execute(_OUTCOMES_SQL.format(where="")).fetchall()
 
         scores: dict[str, dict] = {}
-        for entry_id, outcome, count in rows:
-            if entry_id not in scores:
-                scores[entry_id] = {"positive": 0, "negative": 0}
-            scores[entry_id][outcome] = count
-
-        for entry_id, data in scores.items():
-            total = data["positive"] + data["negative"]
-            data["total"] = total
-            data["score"] = round((data["positive"] - data["negative"]) / total, 3) if total else 0.0
+        for entry_id, positive, negative in rows:
+            total = positive + negative
+            if not total:
+                continue
+            scores[entry_id] = {
+                "positive": positive,
+                "negative": negative,
+                "total": total,
+                "score": round((positive - negative) / total, 3),
+            }
 
         return scores
 
+    def apply_retention(self, days: Optional[int] = None,
+                        batch: Optional[int] = None) -> int:
+        """Roll recall_log rows older than ``days`` into recall_daily.
+
+        The raw rows are deleted ``batch`` at a time and the freed pages
+        returned to the file system. Outcomes recorded after a row was
+        rolled up no longer reach it. Returns the number of rows removed.
+        """
+        days = TELEMETRY_RETENTION_DAYS if days is None else days
+        if days <= 0:
+            return 0
+        self._flush_recalls()
+        self._recall_writer.flush()
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        removed = roll_up(
+            self._recall_writer.submit, "recall_log", "recalled_at",
+            _RECALL_ROLLUP_SQL, cutoff,
+            TELEMETRY_RETENTION_BATCH if batch is None else batch,
+        )
+        if removed:
+            # recall_log.db is small next to brain.db: convert old files.
+            incremental_vacuum(self._recall_writer.submit,
+                               self._recall_db_path, convert=True)
+        return removed
+
     def domain_stats(self) -> dict:
         """Return entry counts per domain and archived totals."""
         stats: dict = {}
-        for domain in self.list_domains():
-            entries = self._read_entries(domain)
-            active = sum(1 for e in entries if e.status == "active")
-            archived = sum(1 for e in entries if e.status == "archived")
-            stats[domain] = {"active": active, "archived": archived, "total": len(entries)}
+        for domain, status, n in self._db.execute(
+            "SELECT domain, status, COUNT(*) FROM expertise "
+            "GROUP BY domain, status ORDER BY domain"
+        ).fetchall():
+            row = stats.setdefault(domain,
+                                   {"active": 0, "archived": 0, "total": 0})
+            if status in ("active", "archived"):
+                row[status] = n
+            row["total"] += n
         return stats
@@ -0,0 +1,128 @@
+"""Compressed and delta-encoded payloads for prism_refresh.
+
+The refresh tools used to take only ``files: {path: content}`` as plain
+JSON strings, so a two-line edit to a 20KB module shipped all 20KB.
+They now also accept:
+
+  * ``encoding`` + ``payload``: base64 of a gzip (or zstd, when the
+    ``zstandard`` package is installed) compressed JSON object
+    ``{"files": {...}, "deltas": {...}}``;
+  * ``deltas``: ``{path: {"base_sha256", "ops", "sha256"?}}`` — line-block
+    edits against the content the server last indexed for ``path``.
+    Each op is ``[start, end, text]``: replace base lines
+    ``[start:end)`` (``splitlines(keepends=True)``) with ``text``. Ops are
+    ordered and non-overlapping.
+
+A delta applies only when the server still holds content whose sha256 is
+``base_sha256`` (and, if given, the result hashes to ``sha256``).
+Anything else comes back in ``need_full`` and the client resends that
+file whole.
+
+[Used by: app.mcp.tools]
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+from typing import Callable, Optional
+
+ENCODINGS = ("gzip", "zstd")
+
+
+def _decompress(encoding: str, data: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError(
+                "zstd payloads need the zstandard package; use gzip"
+            ) from None
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"unknown payload encoding {encoding!r}; "
+                     f"expected one of {', '.join(ENCODINGS)}")
+
+
+def decode(arguments: dict) -> tuple[dict[str, str], dict[str, dict]]:
+    """``(files, deltas)`` from plain arguments plus any encoded payload.
+
+    Raises ValueError for an unknown encoding or a payload that doesn't
+    decode to a JSON object.
+    """
+    files = dict(arguments.get("files") or {})
+    deltas = dict(arguments.get("deltas") or {})
+    payload = arguments.get("payload")
+    if payload:
+        encoding = arguments.get("encoding") or "gzip"
+        try:
+            raw = _decompress(encoding, base64.b64decode(payload))
+            body = json.loads(raw)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"could not decode {encoding} payload: {e}") \
+                from None
+        if not isinstance(body, dict):
+            raise ValueError("decoded payload must be a JSON object")
+        files.update(body.get("files") or {})
+        deltas.update(body.get("deltas") or {})
+    return files, deltas
+
+
+def apply_ops(base: str, ops: list) -> Optional[str]:
+    """Apply ``[start, end, text]`` line-block ops; None if they don't fit."""
+    lines = base.splitlines(keepends=True)
+    out: list[str] = []
+    pos = 0
+    for op in ops:
+        if not isinstance(op, (list, tuple)) or len(op) != 3:
+            return None
+        start, end, text = op
+        if (not isinstance(start, int) or not isinstance(end, int)
+                or not isinstance(text, str)
+                or not pos <= start <= end <= len(lines)):
+            return None
+        out.extend(lines[pos:start])
+        out.append(text)
+        pos = end
+    out.extend(lines[pos:])
+    return "".join(out)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def resolve(
+    files: dict[str, str],
+    deltas: dict[str, dict],
+    base_content: Callable[[str, str], Optional[str]],
+) -> tuple[dict[str, str], list[str]]:
+    """Expand ``deltas`` into full contents merged over ``files``.
+
+    ``base_content(path, sha256)`` returns the server's stored content
+    for ``path`` if it hashes to ``sha256``. Returns ``(files, need_full)``;
+    a path sent both whole and as a delta keeps the whole content.
+    """
+    out = {p: c for p, c in files.items() if isinstance(c, str)}
+    need_full: list[str] = []
+    for path, delta in deltas.items():
+        if path in out:
+            continue
+        if not isinstance(delta, dict):
+            need_full.append(path)
+            continue
+        base_sha = delta.get("base_sha256")
+        base = base_content(path, base_sha) if base_sha else None
+        content = apply_ops(base, delta.get("ops") or []) \
+            if base is not None else None
+        expected = delta.get("sha256")
+        if content is None or (expected and _sha(content) != expected):
+            need_full.append(path)
+        else:
+            out[path] = content
+    return out, sorted(need_full)
@@ -282,7 +282,12 @@ def detect_followup_fixes(
 
     merge_file_set = set(merged_files)
     count = 0
-    for t in task_svc.list():
+    # Indexed range on the ISO created_at strings, a day wider on each
+    # side for mixed UTC offsets; the parsed check below is exact.
+    for t in task_svc.list(
+        created_after=(merged_at - timedelta(days=1)).isoformat(),
+        created_before=(until + timedelta(days=1)).isoformat(),
+    ):
         if exclude_task_id and t.id == exclude_task_id:
             continue
         try:
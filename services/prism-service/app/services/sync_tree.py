@@ -0,0 +1,126 @@
+"""Directory Merkle tree over file_manifest for the SessionStart sync.
+
+The hook used to send ``{path: sha256}`` for every tracked file on every
+session start. It now sends directory hashes instead and the two sides
+descend only into directories whose hashes differ:
+
+  * a file leaf is its whole-file sha256 (``file_manifest.file_sha256``);
+  * a directory hash is sha256 over its sorted entries, one line each —
+    ``f <name> <sha>`` for files, then ``d <name> <hash>`` for subdirs;
+  * the root directory is ``""``.
+
+Both sides cover the same files: the hook only hashes paths that pass
+its ``SOURCE_EXTS`` / ``SKIP_PARTS`` / ``MAX_FILE_BYTES`` rules, and the
+server tree leaves out manifest rows that fail them (:func:`eligible`) —
+``.json`` files Brain indexes, backfilled ``.mulch`` sources, empty or
+oversized files — so an in-sync project has equal root hashes.
+
+The hook (app/assets/sync_hook.py) carries its own copy of
+:func:`dir_hash` and of those rules because it runs without this
+package; the two must stay identical.
+
+[Used by: app.services.graph_service]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Iterable, Optional
+
+# The hook's file rules (app/assets/sync_hook.py).
+SOURCE_EXTS = frozenset({
+    ".py", ".ts", ".tsx", ".js", ".jsx", ".cs", ".go", ".rs",
+    ".java", ".rb", ".php", ".cpp", ".c", ".h", ".hpp",
+    ".md", ".yml", ".yaml", ".toml",
+})
+SKIP_PARTS = frozenset({
+    ".git", "node_modules", "__pycache__", ".venv", "venv",
+    "dist", "build", ".tox", ".mypy_cache", ".pytest_cache",
+    ".next", ".nuxt", "target", ".claude",
+})
+MAX_FILE_BYTES = 300_000
+_EMPTY_SHA = hashlib.sha256(b"").hexdigest()
+
+# {dir: (hash, {file_name: sha}, {subdir_name: hash})}
+Tree = dict[str, tuple[str, dict[str, str], dict[str, str]]]
+
+
+def dir_hash(files: dict[str, str], dirs: dict[str, str]) -> str:
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(f"f {name} {files[name]}\n".encode("utf-8"))
+    for name in sorted(dirs):
+        h.update(f"d {name} {dirs[name]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def eligible(path: str, sha: Optional[str], size: Optional[int]) -> bool:
+    """Whether the hook would hash ``path``: a source suffix, no skipped
+    directory, and ``0 < size <= MAX_FILE_BYTES``. Rows indexed before
+    sizes were recorded (``size`` NULL) pass unless their sha is the
+    empty file's."""
+    if os.path.splitext(path)[1] not in SOURCE_EXTS:
+        return False
+    if not SKIP_PARTS.isdisjoint(path.split("/")):
+        return False
+    if size is None:
+        return sha != _EMPTY_SHA
+    return 0 < size <= MAX_FILE_BYTES
+
+
+def build_tree(pairs: Iterable[tuple[str, Optional[str]]]) -> Tree:
+    """Hash every directory of ``(relative_path, sha256)`` pairs.
+
+    Absolute paths and paths escaping the root can't be on the client's
+    side of the tree, so they are left out. A NULL sha (hash unknown)
+    hashes as ``""`` and always reads as drifted.
+    """
+    files: dict[str, dict[str, str]] = {"": {}}
+    for path, sha in pairs:
+        if not path or path.startswith("/") or path[1:2] == ":":
+            continue
+        parts = path.split("/")
+        if ".." in parts or "" in parts:
+            continue
+        parent, _, name = path.rpartition("/")
+        entries = files.get(parent)
+        if entries is None:
+            entries = files[parent] = {}
+            d = parent
+            while "/" in d:
+                d = d.rpartition("/")[0]
+                if d in files:
+                    break
+                files[d] = {}
+        entries[name] = sha or ""
+
+    tree: Tree = {}
+    subdirs: dict[str, dict[str, str]] = {d: {} for d in files}
+    # Deepest first so every child hash exists before its parent's.
+    for d in sorted(files, key=lambda p: p.count("/") + bool(p),
+                    reverse=True):
+        h = dir_hash(files[d], subdirs[d])
+        tree[d] = (h, files[d], subdirs[d])
+        if d:
+            parent, _, name = d.rpartition("/")
+            subdirs[parent][name] = h
+    return tree
+
+
+def compare(tree: Tree, client: dict[str, str]) -> dict[str, dict]:
+    """Server half of one protocol round.
+
+    ``client`` maps directories to the client's hashes. Every directory
+    that doesn't match comes back with the server's entries for it, so
+    the client can diff its files locally and pick the subdirs to ask
+    about next. Directories the server doesn't have come back empty.
+    """
+    out: dict[str, dict] = {}
+    for d, h in client.items():
+        node = tree.get(d)
+        if node is None:
+            out[d] = {"files": {}, "dirs": {}}
+        elif node[0] != h:
+            out[d] = {"files": node[1], "dirs": node[2]}
+    return out
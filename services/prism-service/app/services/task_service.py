@@ -1,4 +1,10 @@
-"""Task service — manages tasks in SQLite."""
+"""Task service — manages tasks in SQLite.
+
+``tasks.dependencies`` and ``tasks.tags`` stay JSON lists (the Task
+model and exports read them), mirrored into ``task_deps`` and
+``task_tags`` rows on every create / update so next_task, tag filters
+and paging are single indexed queries.
+"""
 
 from __future__ import annotations
 
@@ -7,6 +13,12 @@ import sqlite3
 from datetime import datetime, timezone
 from typing import Callable, Optional
 
+from app.engines.task_vectors import (
+    EMBEDDING_GEN_TRIGGERS_SQL,
+    embedding_gen,
+    task_vectors_for,
+)
+from app.engines.write_executor import writer_for
 from app.models.task import Task, TaskHistory
 
 
@@ -45,6 +57,44 @@ CREATE TABLE IF NOT EXISTS task_history (
     timestamp TEXT NOT NULL,
     FOREIGN KEY (task_id) REFERENCES tasks(id)
 );
+
+CREATE TABLE IF NOT EXISTS task_deps (
+    task_id TEXT NOT NULL,
+    depends_on TEXT NOT NULL,
+    PRIMARY KEY (task_id, depends_on)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_task_deps_on ON task_deps(depends_on);
+
+CREATE TABLE IF NOT EXISTS task_tags (
+    tag TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    PRIMARY KEY (tag, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_task_tags_task ON task_tags(task_id);
+
+-- List order (priority DESC, created_at, id), overall and per status.
+CREATE INDEX IF NOT EXISTS idx_tasks_order
+    ON tasks(priority DESC, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_order
+    ON tasks(status, priority DESC, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at);
+
+CREATE TABLE IF NOT EXISTS task_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_ORDER = "ORDER BY priority DESC, created_at ASC, id ASC"
+
+# Pending tasks whose every dependency exists and is done.
+_NEXT_TASK_SQL = f"""
+SELECT * FROM tasks t
+WHERE t.status = 'pending' AND NOT EXISTS (
+    SELECT 1 FROM task_deps d LEFT JOIN tasks dep ON dep.id = d.depends_on
+    WHERE d.task_id = t.id AND (dep.status IS NULL OR dep.status != 'done')
+)
+{_ORDER} LIMIT 1
 """
 
 
@@ -66,6 +116,8 @@ class TaskService:
         self._db.execute("PRAGMA journal_mode=WAL")
         self._db.executescript(_CREATE_TASKS_SQL)
         self._migrate_task_columns()
+        self._db.executescript(EMBEDDING_GEN_TRIGGERS_SQL)
+        self._backfill_links()
         # Optional — when provided, task create/update embeds
         # ``title + "\n" + description`` into ``tasks.embedding`` so
         # LL-06's cosine-similarity retrieval has vectors to work with.
@@ -73,6 +125,10 @@ class TaskService:
         # (e.g. hook smoke tests); create/update still succeeds, the
         # row just lacks an embedding until re-indexed.
         self._embed_fn: Optional[EmbedFn] = embed_fn
+        # task_history rows go through the group-commit writer; history()
+        # flushes it before reading.
+        self._writer = writer_for(db_path)
+        self._vectors = task_vectors_for(db_path)
 
     # ------------------------------------------------------------------
     # LL-03 helper: write an embedding for the given task if we can
@@ -95,6 +151,8 @@ class TaskService:
             "UPDATE tasks SET embedding=? WHERE id=?", (blob, task_id)
         )
         self._db.commit()
+        # Keep LL-06's similarity matrix current without a reload.
+        self._vectors.put(task_id, blob, embedding_gen(self._db))
 
     def _migrate_task_columns(self) -> None:
         """Backfill LL-01 columns on tasks.db files created before the
@@ -115,10 +173,51 @@ class TaskService:
             except sqlite3.OperationalError:
                 pass
 
+    def _backfill_links(self) -> None:
+        """Fill task_deps / task_tags from the JSON columns once, for
+        tasks.db files written before the tables existed."""
+        if self._db.execute(
+            "SELECT 1 FROM task_meta WHERE key = 'links_backfilled'"
+        ).fetchone():
+            return
+        for row in self._db.execute(
+            "SELECT id, dependencies, tags FROM tasks"
+        ).fetchall():
+            self._write_links(row["id"], json.loads(row["dependencies"] or "[]"),
+                              json.loads(row["tags"] or "[]"))
+        self._db.execute(
+            "INSERT INTO task_meta (key, value) VALUES ('links_backfilled', '1')"
+        )
+        self._db.commit()
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _write_links(
+        self,
+        task_id: str,
+        dependencies: Optional[list[str]],
+        tags: Optional[list[str]],
+    ) -> None:
+        """Replace a task's task_deps / task_tags rows (None = leave as is).
+
+        The caller commits, together with the tasks row.
+        """
+        if dependencies is not None:
+            self._db.execute("DELETE FROM task_deps WHERE task_id = ?", (task_id,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO task_deps (task_id, depends_on) "
+                "VALUES (?, ?)",
+                [(task_id, dep) for dep in dependencies],
+            )
+        if tags is not None:
+            self._db.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO task_tags (tag, task_id) VALUES (?, ?)",
+                [(tag, task_id) for tag in tags],
+            )
+
     def _row_to_task(self, row: sqlite3.Row) -> Task:
         """Convert a database row to a Task dataclass."""
         return Task(
@@ -140,14 +239,17 @@ class TaskService:
     def _record_history(
         self, task_id: str, action: str, details: str = "", actor: str = "",
     ) -> None:
-        """Insert an audit row into task_history."""
-        now = datetime.now(timezone.utc).isoformat()
-        self._db.execute(
-            "INSERT INTO task_history (task_id, actor, action, details, timestamp) "
-            "VALUES (?, ?, ?, ?, ?)",
-            (task_id, actor, action, details, now),
+        """Queue an audit row for task_history (fire-and-forget)."""
+        row = (task_id, actor, action, details,
+               datetime.now(timezone.utc).isoformat())
+        self._writer.submit(
+            lambda conn: conn.execute(
+                "INSERT INTO task_history (task_id, actor, action, details, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                row,
+            ),
+            wait=False,
         )
-        self._db.commit()
 
     # ------------------------------------------------------------------
     # CRUD
@@ -195,6 +297,7 @@ class TaskService:
                 json.dumps(task.tags),
             ),
         )
+        self._write_links(task.id, task.dependencies, task.tags)
         self._db.commit()
         self._record_history(task.id, "created", f"title={title!r}")
         # LL-03: embed title+description so LL-06's similarity retrieval
@@ -216,10 +319,85 @@ class TaskService:
         assigned_agent: Optional[str] = None,
         tag: Optional[str] = None,
         story_file: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
     ) -> list[Task]:
-        """List tasks with optional filters."""
+        """List tasks with optional filters.
+
+        ``created_after`` / ``created_before`` compare the ISO
+        ``created_at`` strings (exclusive bounds).
+        """
+        where, params = self._filters(
+            status, assigned_agent, tag, story_file,
+            created_after, created_before,
+        )
+        rows = self._db.execute(
+            f"SELECT * FROM tasks{where} {_ORDER}", params,
+        ).fetchall()
+        return [self._row_to_task(r) for r in rows]
+
+    def list_page(
+        self,
+        limit: int = 50,
+        after: Optional[str] = None,
+        status: Optional[str] = None,
+        assigned_agent: Optional[str] = None,
+        tag: Optional[str] = None,
+        story_file: Optional[str] = None,
+    ) -> tuple[list[Task], Optional[str]]:
+        """One page of :meth:`list`, in the same order.
+
+        Keyset pagination: ``after`` is the id of the last task of the
+        previous page. Returns ``(tasks, next_after)``; ``next_after``
+        is None on the last page.
+        """
+        where, params = self._filters(status, assigned_agent, tag, story_file)
+        limit = max(1, int(limit))
+        if not after:
+            rows = self._page_rows(where, params, "", [], limit + 1)
+        else:
+            anchor = self._db.execute(
+                "SELECT priority, created_at, id FROM tasks WHERE id = ?",
+                (after,),
+            ).fetchone()
+            if anchor is None:
+                return [], None
+            # Two index seeks rather than one OR the planner can only
+            # scan: the rest of the anchor's priority, then lower ones.
+            rows = self._page_rows(
+                where, params, "priority = ? AND (created_at, id) > (?, ?)",
+                [anchor["priority"], anchor["created_at"], anchor["id"]],
+                limit + 1,
+            )
+            if len(rows) <= limit:
+                rows += self._page_rows(
+                    where, params, "priority < ?", [anchor["priority"]],
+                    limit + 1 - len(rows),
+                )
+        tasks = [self._row_to_task(r) for r in rows[:limit]]
+        return tasks, (tasks[-1].id if len(rows) > limit else None)
+
+    def _page_rows(
+        self, where: str, params: list, seek: str, seek_params: list, n: int,
+    ) -> list[sqlite3.Row]:
+        if seek:
+            where += (" AND " if where else " WHERE ") + seek
+        return self._db.execute(
+            f"SELECT * FROM tasks{where} {_ORDER} LIMIT ?",
+            params + seek_params + [n],
+        ).fetchall()
+
+    @staticmethod
+    def _filters(
+        status: Optional[str] = None,
+        assigned_agent: Optional[str] = None,
+        tag: Optional[str] = None,
+        story_file: Optional[str] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+    ) -> tuple[str, list]:
         clauses: list[str] = []
-        params: list[str] = []
+        params: list = []
 
         if status is not None:
             clauses.append("status = ?")
@@ -230,20 +408,18 @@ class TaskService:
         if story_file is not None:
             clauses.append("story_file = ?")
             params.append(story_file)
-
-        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-        rows = self._db.execute(
-            f"SELECT * FROM tasks{where} ORDER BY priority DESC, created_at ASC",
-            params,
-        ).fetchall()
-
-        tasks = [self._row_to_task(r) for r in rows]
-
-        # Tag filtering is done in Python because tags are JSON-encoded
         if tag is not None:
-            tasks = [t for t in tasks if tag in t.tags]
+            clauses.append("id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+        if created_after is not None:
+            clauses.append("created_at > ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
 
-        return tasks
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
 
     def update(self, task_id: str, **kwargs: object) -> Optional[Task]:
         """Update arbitrary fields on a task. Records change history."""
@@ -291,6 +467,11 @@ class TaskService:
                 task.id,
             ),
         )
+        self._write_links(
+            task.id,
+            task.dependencies if "dependencies" in kwargs else None,
+            task.tags if "tags" in kwargs else None,
+        )
         self._db.commit()
         self._record_history(task.id, "updated", "; ".join(changes))
         # LL-03: re-embed only when the title or description changed.
@@ -306,31 +487,15 @@ class TaskService:
     def next_task(self) -> Optional[dict]:
         """Return the highest-priority unblocked pending task.
 
-        Algorithm:
-        1. Fetch all pending tasks.
-        2. Filter out tasks whose dependencies are not all 'done'.
-        3. Sort by priority DESC, created_at ASC.
-        4. Return top result with a reason string.
+        One query walks pending tasks in priority DESC, created_at ASC
+        order and returns the first whose task_deps rows all point at
+        done tasks (a missing dependency blocks), with a reason string.
         """
-        pending = self.list(status="pending")
-        if not pending:
-            return None
-
-        # Build set of done task IDs for dependency checks
-        done_ids = {
-            t.id for t in self.list(status="done")
-        }
-
-        unblocked = [
-            t for t in pending
-            if all(dep in done_ids for dep in t.dependencies)
-        ]
-
-        if not unblocked:
+        row = self._db.execute(_NEXT_TASK_SQL).fetchone()
+        if row is None:
             return None
 
-        # Already sorted by priority DESC, created_at ASC from list()
-        best = unblocked[0]
+        best = self._row_to_task(row)
         reason_parts = [f"priority={best.priority}"]
         if best.assigned_agent:
             reason_parts.append(f"assigned to {best.assigned_agent}")
@@ -346,6 +511,7 @@ class TaskService:
 
     def history(self, task_id: str) -> list[TaskHistory]:
         """Return audit history for a given task."""
+        self._writer.flush()
         rows = self._db.execute(
             "SELECT * FROM task_history WHERE task_id = ? ORDER BY timestamp ASC",
             (task_id,),
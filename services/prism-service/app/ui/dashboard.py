@@ -208,7 +208,8 @@ def _build_health(container, health):
 
         if health.last_governance_run:
             ui.label(
-                f"Last run: {health.last_governance_run}"
+                f"Last run: {health.last_governance_run} "
+                f"({health.cycle_ms:.0f} ms)"
             ).classes("text-xs text-gray-400 mt-3")
 
 
@@ -2,7 +2,8 @@
 
 Lets you answer: why did retrieval miss (or hit) on a given query, which
 stack flags were in effect, and how long did it take. Data comes from
-the ``searches`` table populated by ``Brain.search`` on every call.
+the ``searches`` table populated by ``Brain.search`` on every call; the
+daily history also reads the rollups of rows past the retention window.
 """
 
 import json
@@ -126,6 +127,38 @@ def _build_table(container, rows: list[dict]) -> None:
         ui.table(columns=columns, rows=data, row_key="id").classes("w-full")
 
 
+def _build_daily(container, days: list[dict]) -> None:
+    container.clear()
+    with container:
+        if not days:
+            ui.label("No search history yet.").classes("text-sm text-gray-500")
+            return
+        columns = [
+            {"name": "day", "label": "Day", "field": "day", "align": "left"},
+            {"name": "searches", "label": "Searches", "field": "searches",
+             "align": "right"},
+            {"name": "empty", "label": "Empty", "field": "empty",
+             "align": "right"},
+            {"name": "avg", "label": "Avg latency", "field": "avg",
+             "align": "right"},
+            {"name": "max", "label": "Max latency", "field": "max",
+             "align": "right"},
+            {"name": "up", "label": "👍", "field": "up", "align": "right"},
+            {"name": "down", "label": "👎", "field": "down",
+             "align": "right"},
+        ]
+        data = [{
+            "day": d["day"],
+            "searches": d["searches"],
+            "empty": d["empty"],
+            "avg": f"{d['avg_latency_ms']} ms",
+            "max": f"{d['max_latency_ms']} ms",
+            "up": str(d["up"]) if d["up"] else "",
+            "down": str(d["down"]) if d["down"] else "",
+        } for d in days]
+        ui.table(columns=columns, rows=data, row_key="day").classes("w-full")
+
+
 @ui.page("/retrievals")
 def retrievals_page():
     """Recent brain_search events with per-query details."""
@@ -147,6 +180,11 @@ def retrievals_page():
                 "text-lg font-semibold text-gray-900 mb-4"
             )
             table_box = ui.column().classes("w-full")
+        with ui.card().classes("w-full bg-white shadow-sm rounded-lg p-5"):
+            ui.label("Last 30 days").classes(
+                "text-lg font-semibold text-gray-900 mb-4"
+            )
+            daily_box = ui.column().classes("w-full")
 
     def record(search_id: int, doc_id: str, signal: str):
         """Feedback callback wired to the 👍/👎 buttons."""
@@ -207,6 +245,7 @@ def retrievals_page():
         _build_summary(summary_box, rows)
         _build_rater(rate_box, rows)
         _build_table(table_box, rows)
+        _build_daily(daily_box, _brain_svc().search_daily(days=30))
 
     refresh()
     ui.timer(5.0, refresh)
@@ -0,0 +1,110 @@
+"""Trigram index over graph.db entity names for Brain._graph_search.
+
+_graph_search used to run ``name LIKE '%tok%'`` per query token — a full
+scan of ``entities`` each time. ``entities_fts`` (FTS5, trigram
+tokenizer) now serves the same substring match; triggers keep it in
+sync with every writer.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _brain(tmp_path: Path):
+    from app.engines.brain_engine import Brain
+    b = Brain(
+        brain_db=str(tmp_path / "brain.db"),
+        graph_db=str(tmp_path / "graph.db"),
+        scores_db=str(tmp_path / "scores.db"),
+    )
+    if not b._entity_fts:
+        pytest.skip("SQLite build lacks FTS5 trigram tokenizer")
+    return b
+
+
+def _add(brain, name: str, file: str) -> None:
+    brain._graph.execute(
+        "INSERT INTO entities (name, kind, file) VALUES (?, 'function', ?)",
+        (name, file),
+    )
+    brain._graph.commit()
+
+
+def _files(brain, query: str) -> set[str]:
+    return {r["doc_id"] for r in brain._graph_search(query, 20)}
+
+
+def test_substring_match_is_case_insensitive(tmp_path):
+    brain = _brain(tmp_path)
+    _add(brain, "refreshSessionCache", "session.py")
+    _add(brain, "render_page", "ui.py")
+    assert _files(brain, "where is the session refreshed") == {"session.py"}
+    assert _files(brain, "SESSIONCACHE lookup") == {"session.py"}
+
+
+def test_fts_matches_like_fallback(tmp_path):
+    brain = _brain(tmp_path)
+    for i, name in enumerate(["parseTokens", "tokenize", "TokenStream",
+                              "render", "streamWriter"]):
+        _add(brain, name, f"f{i}.py")
+    query = "token stream writer"
+    fts = _files(brain, query)
+    brain._entity_fts = False
+    assert fts == _files(brain, query)
+    assert fts == {"f0.py", "f1.py", "f2.py", "f4.py"}
+
+
+def test_index_tracks_update_and_delete(tmp_path):
+    brain = _brain(tmp_path)
+    _add(brain, "oldHandlerName", "h.py")
+    brain._graph.execute(
+        "UPDATE entities SET name = 'freshHandler' WHERE name = 'oldHandlerName'"
+    )
+    brain._graph.commit()
+    assert _files(brain, "oldHandler") == set()
+    assert _files(brain, "freshHandler") == {"h.py"}
+    brain._graph.execute("DELETE FROM entities")
+    brain._graph.commit()
+    assert _files(brain, "freshHandler") == set()
+
+
+def test_graphify_import_indexes_labels(tmp_path):
+    from app.services.graph_service import GraphService
+
+    brain = _brain(tmp_path)
+    svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                       graph_db_path=str(tmp_path / "graph.db"))
+    svc._import_graph_json({
+        "nodes": [{"id": "n1", "label": "WidgetFactory",
+                   "source_file": "widgets.py"}],
+        "links": [],
+    }, {"imported_entities": 0, "imported_relationships": 0})
+    assert _files(brain, "widget factory") == {"widgets.py"}
+
+
+def test_existing_graph_db_is_backfilled(tmp_path):
+    """A graph.db written before the index existed gets a one-time
+    rebuild when the Brain next opens it."""
+    conn = sqlite3.connect(str(tmp_path / "graph.db"))
+    conn.executescript("""
+        CREATE TABLE entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+            kind TEXT DEFAULT 'unknown', file TEXT, line INTEGER,
+            UNIQUE(name, file)
+        );
+        INSERT INTO entities (name, file) VALUES ('legacyLoader', 'legacy.py');
+    """)
+    conn.commit()
+    conn.close()
+    brain = _brain(tmp_path)
+    assert _files(brain, "legacyLoader") == {"legacy.py"}
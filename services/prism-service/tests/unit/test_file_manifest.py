@@ -0,0 +1,177 @@
+"""file_manifest: per-file index state behind prism_status.
+
+sync_status used to count code docs by iterating every docs row in
+Python, rglob the staging dir for staged_files, and load every
+(source_file, content_hash) pair to diff against the hook's whole-file
+hashes (which never matched multi-chunk files). index_doc now maintains
+one file_manifest row per file plus running totals; these tests pin
+that bookkeeping and the drift answers built on it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+_PY = (
+    "import os\n\n"
+    "def alpha(x):\n    return x + 1\n\n"
+    "class Beta:\n    def gamma(self):\n        return alpha(2)\n"
+)
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@pytest.fixture
+def brain(tmp_path):
+    from app.services.brain_service import BrainService
+    from app.services.graph_service import GraphService
+
+    svc = BrainService(
+        brain_db=str(tmp_path / "brain.db"),
+        graph_db=str(tmp_path / "graph.db"),
+        scores_db=str(tmp_path / "scores.db"),
+    )
+    svc.graph_svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                                 graph_db_path=str(tmp_path / "graph.db"))
+    return svc
+
+
+def _rows(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "brain.db"))
+    try:
+        return (
+            {r[0]: r[1:] for r in conn.execute(
+                "SELECT source_file, file_sha256, chunk_count, staged "
+                "FROM file_manifest"
+            )},
+            conn.execute(
+                "SELECT files, staged FROM file_manifest_totals"
+            ).fetchone(),
+        )
+    finally:
+        conn.close()
+
+
+def _status(brain, tmp_path, hashes=None):
+    return brain.graph_svc.sync_status(str(tmp_path / "brain.db"),
+                                       file_hashes=hashes)
+
+
+def test_index_doc_maintains_manifest_and_totals(brain, tmp_path):
+    brain.index_doc("pkg/mod.py", _PY)
+    brain.index_doc("notes.txt", "plain prose")
+    rows, totals = _rows(tmp_path)
+
+    conn = sqlite3.connect(str(tmp_path / "brain.db"))
+    chunks = conn.execute(
+        "SELECT COUNT(*) FROM docs WHERE source_file = 'pkg/mod.py'"
+    ).fetchone()[0]
+    conn.close()
+    assert chunks > 1
+    assert rows["pkg/mod.py"] == (_sha(_PY), chunks, 1)
+    assert rows["notes.txt"] == (_sha("plain prose"), 1, 0)
+    assert totals == (2, 1)
+
+    # Re-indexing replaces the row; totals don't double count.
+    brain.index_doc("pkg/mod.py", _PY + "\n# tail\n")
+    rows, totals = _rows(tmp_path)
+    assert rows["pkg/mod.py"][0] == _sha(_PY + "\n# tail\n")
+    assert totals == (2, 1)
+
+    status = _status(brain, tmp_path)
+    assert status["code_docs"] == 1  # files, not chunk rows
+    assert status["staged_files"] == 1
+    assert status["stale"] is False
+
+
+def test_drift_uses_whole_file_hash(brain, tmp_path):
+    brain.index_doc("pkg/mod.py", _PY)
+    brain.index_doc("pkg/other.py", "def x():\n    pass\n")
+    status = _status(brain, tmp_path, {
+        "pkg/mod.py": _sha(_PY),
+        "pkg/other.py": _sha("def x():\n    return 1\n"),
+        "pkg/new.py": _sha("def n(): pass\n"),
+    })
+    assert status["drift_checked"] is True
+    assert sorted((d["path"], d["reason"]) for d in status["drifted"]) == [
+        ("pkg/new.py", "missing"),
+        ("pkg/other.py", "content_changed"),
+    ]
+
+
+def test_drift_lookup_batches_large_inputs(brain, tmp_path):
+    from app.services import graph_service
+
+    brain.index_doc("pkg/mod.py", _PY)
+    hashes = {f"gen/f{i}.py": "0" * 64
+              for i in range(graph_service._DRIFT_BATCH * 2 + 7)}
+    hashes["pkg/mod.py"] = _sha(_PY)
+    status = _status(brain, tmp_path, hashes)
+    assert len(status["drifted"]) == len(hashes) - 1
+
+
+def test_removed_sources_leave_the_manifest(brain, tmp_path):
+    brain.index_doc("pkg/mod.py", _PY)
+    brain.index_doc("pkg/other.py", "def x():\n    pass\n")
+    brain._brain._remove_entries_by_source(["pkg/mod.py"])
+    rows, totals = _rows(tmp_path)
+    assert set(rows) == {"pkg/other.py"}
+    assert totals == (1, 1)
+
+
+def test_existing_index_is_backfilled_and_staging_reconciled(tmp_path):
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    db = str(tmp_path / "brain.db")
+    Brain(brain_db=db, graph_db=str(tmp_path / "graph.db"),
+          scores_db=str(tmp_path / "scores.db"))
+    # Simulate a brain.db indexed before file_manifest existed.
+    conn = Brain._connect(db)  # registers the FTS trigger functions
+    conn.executemany(
+        "INSERT INTO docs (id, source_file, content, content_hash) "
+        "VALUES (?, ?, ?, ?)",
+        [("a.py::__file__", "a.py", "def a(): pass", _sha("def a(): pass")),
+         ("a.py::a", "a.py", "def a(): pass", _sha("fragment")),
+         ("b.md::main", "b.md", "# b", "deadbeefdeadbeef")],
+    )
+    conn.execute("DELETE FROM file_manifest")
+    conn.execute("UPDATE file_manifest_totals SET files = 0, staged = 0")
+    conn.execute("DELETE FROM index_meta WHERE key LIKE 'file_manifest%'")
+    conn.commit()
+    conn.close()
+
+    Brain(brain_db=db, graph_db=str(tmp_path / "graph.db"),
+          scores_db=str(tmp_path / "scores.db"))
+    rows, totals = _rows(tmp_path)
+    assert rows == {"a.py": (_sha("def a(): pass"), 2, 0),
+                    "b.md": (None, 1, 0)}  # truncated hash → unknown
+    assert totals == (2, 0)
+
+    graph = GraphService(project_data_dir=str(tmp_path / "proj"),
+                         graph_db_path=str(tmp_path / "graph.db"))
+    graph.stage_doc("a.py", "def a(): pass")
+    status = graph.sync_status(db, {"a.py": _sha("def a(): pass"),
+                                    "b.md": _sha("# b")})
+    assert status["staged_files"] == 1
+    assert status["drifted"] == [{"path": "b.md",
+                                  "reason": "content_changed"}]
+
+    # unstage_doc bypasses index_doc; the next changed rebuild scan
+    # resyncs the flags from the staging dir.
+    graph.unstage_doc("a.py")
+    graph._sync_staged_flags(db, set())
+    assert _rows(tmp_path)[1] == (2, 0)
@@ -0,0 +1,124 @@
+"""Change feed for incremental_reindex: inotify watcher + git status poll.
+
+incremental_reindex used to run three git commands in the process cwd
+every PRISM_DRIFT_INTERVAL. It now runs one ``git status --porcelain=v2
+-z`` in the mounted project dir, and a FileWatcher feeds debounced
+batches of changed paths to reindex_paths in between.
+"""
+
+from __future__ import annotations
+
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _sources(db: Path) -> set[str]:
+    conn = sqlite3.connect(str(db))
+    try:
+        return {r[0] for r in conn.execute(
+            "SELECT DISTINCT source_file FROM docs")}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def brain(tmp_path):
+    from app.engines.brain_engine import Brain
+
+    return Brain(brain_db=str(tmp_path / "brain.db"),
+                 graph_db=str(tmp_path / "graph.db"),
+                 scores_db=str(tmp_path / "scores.db"))
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_porcelain_poll_in_project_root(tmp_path, brain):
+    from app.engines.brain_engine import _parse_porcelain_v2
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+
+    def git(*args):
+        return subprocess.run(["git", "-C", str(repo), *args], check=True,
+                              capture_output=True).stdout
+
+    for name in ("keep.py", "gone.py", "old name.py", "edit.md"):
+        (repo / name).write_text(f"# {name}\n")
+    git("init", "-q")
+    git("add", ".")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "i")
+    brain.reindex_paths(["keep.py", "gone.py", "old name.py", "edit.md"],
+                        root=str(repo))
+
+    (repo / "edit.md").write_text("# edited\n")
+    git("rm", "-q", "gone.py")
+    git("mv", "old name.py", "new name.py")
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "fresh.py").write_text("x = 1\n")
+
+    changed, deleted = _parse_porcelain_v2(
+        git("status", "--porcelain=v2", "-z", "--untracked-files=all"))
+    assert sorted(changed) == ["edit.md", "new name.py", "pkg/fresh.py"]
+    assert sorted(deleted) == ["gone.py", "old name.py"]
+
+    # The process cwd is not the project: paths resolve against root.
+    assert brain.incremental_reindex(root=str(repo)) == 3
+    assert _sources(tmp_path / "brain.db") == {
+        "keep.py", "edit.md", "new name.py", "pkg/fresh.py"}
+
+
+def test_watcher_coalesces_debounced_batches(tmp_path):
+    from app.services.file_watcher import FileWatcher
+
+    (tmp_path / "src").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    batches: list = []
+    got = threading.Event()
+
+    def on_change(paths):
+        batches.append(paths)
+        got.set()
+
+    watcher = FileWatcher(str(tmp_path), on_change,
+                          skip_dirs={".git", "node_modules"},
+                          debounce=0.3, max_delay=5)
+    if not watcher.start():
+        pytest.skip("inotify unavailable")
+    try:
+        for i in range(3):
+            (tmp_path / "src" / "a.py").write_text(f"a = {i}\n")
+        (tmp_path / "node_modules" / "x.js").write_text("x\n")
+        (tmp_path / "src" / "new" / "deep").mkdir(parents=True)
+        (tmp_path / "src" / "new" / "deep" / "b.py").write_text("b\n")
+        (tmp_path / "src" / "a.py").unlink()
+        assert got.wait(5)
+    finally:
+        watcher.stop()
+    assert batches == [{"src/a.py", "src/new/deep/b.py"}]
+
+
+def test_lost_events_ask_for_a_full_scan(tmp_path):
+    from app.services import file_watcher
+
+    batches: list = []
+    watcher = file_watcher.FileWatcher(str(tmp_path), batches.append)
+    watcher._dirs[1] = ""
+    watcher._handle(1, file_watcher.IN_CLOSE_WRITE, "a.py")
+    watcher._handle(-1, file_watcher.IN_Q_OVERFLOW, "")
+    watcher._flush()
+    watcher._handle(1, file_watcher.IN_MOVED_FROM | file_watcher.IN_ISDIR,
+                    "pkg")
+    watcher._flush()
+    watcher._handle(1, file_watcher.IN_CLOSE_WRITE, "b.py")
+    watcher._flush()
+    assert batches == [None, None, {"b.py"}]
@@ -0,0 +1,142 @@
+"""Governance rules over a real MemoryService.
+
+The conflict rule used to rebuild both word sets for every pair of
+entries in a domain. It now walks an inverted token index; these tests
+pin that it flags exactly what the pairwise loop flagged, and that a
+cycle reports its wall time per rule.
+
+Cycles are incremental: only domains in the memory change journal are
+re-examined, and a cycle's status changes land in one batched write.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.services.governance import GovernanceEngine  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+
+_NEG = {"not", "don't", "dont", "never", "avoid", "shouldn't", "shouldnt"}
+
+
+class _Tasks:
+    def list(self, status=None):
+        return []
+
+
+class _Brain:
+    def status(self):
+        return {"last_reindex": "2026-01-01", "doc_count": 0}
+
+    def apply_retention(self):
+        return 0
+
+
+def _pairwise_conflicts(entries):
+    """The old _detect_conflicts loop: (pair count, ids flagged)."""
+    pairs, flagged = 0, set()
+    for i, a in enumerate(entries):
+        words_a = set(f"{a.name} {a.description}".lower().split())
+        for b in entries[i + 1:]:
+            words_b = set(f"{b.name} {b.description}".lower().split())
+            if bool(words_a & _NEG) == bool(words_b & _NEG):
+                continue
+            if len((words_a - _NEG) & (words_b - _NEG)) >= 2:
+                pairs += 1
+                flagged.add(b.id)
+    return pairs, flagged
+
+
+def test_conflicts_match_pairwise_loop(tmp_path):
+    rng = random.Random(4)
+    vocab = [f"w{i}" for i in range(40)]
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    for i in range(80):
+        words = rng.sample(vocab, rng.randint(2, 6))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1),
+                         rng.choice(sorted(_NEG)))
+        memory.store("api", f"rule-{i}", " ".join(words), "pattern",
+                     "tactical")
+    entries = memory.list_entries("api")
+    pairs, expected = _pairwise_conflicts(entries)
+    assert pairs > 0
+
+    gov = GovernanceEngine(memory, _Tasks(), _Brain())
+    assert gov._detect_conflicts() == pairs
+    flagged = {e.id for e in memory.list_entries("api",
+                                                 status_filter="needs_review")}
+    assert flagged == expected
+
+
+def test_cycle_reports_timings(tmp_path):
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    memory.store("api", "a", "never retry writes", "pattern", "tactical")
+    memory.store("api", "b", "retry writes twice", "pattern", "tactical")
+
+    gov = GovernanceEngine(memory, _Tasks(), _Brain())
+    report = gov.run_cycle()
+    assert report.flagged_conflicts == 1
+    assert {"ttl", "duplicates", "conflicts", "effective"} <= set(report.rule_ms)
+    assert report.cycle_ms >= sum(report.rule_ms.values()) > 0
+    assert gov.get_health_report() is report
+
+
+def test_cycle_only_revisits_dirty_domains(tmp_path, monkeypatch):
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    memory.store("api", "a", "never retry writes", "pattern", "tactical")
+    memory.store("api", "b", "retry writes twice", "pattern", "tactical")
+    memory.store("ui", "c", "use the grid layout", "pattern", "tactical")
+
+    gov = GovernanceEngine(memory, _Tasks(), _Brain())
+    assert gov.run_cycle().dirty_domains == 2
+
+    listed = []
+    real_list = memory.list_entries
+    monkeypatch.setattr(memory, "list_entries",
+                        lambda d, **kw: listed.append(d) or real_list(d, **kw))
+    report = gov.run_cycle()
+    assert report.dirty_domains == 0 and listed == []
+
+    late = memory.store("ui", "d", "avoid the grid layout", "pattern",
+                        "tactical")
+    report = gov.run_cycle()
+    assert report.dirty_domains == 1 and set(listed) == {"ui"}
+    assert report.flagged_conflicts == 1
+    assert memory.get_entry(late.id).status == "needs_review"
+    assert memory.get_entry(memory.list_entries("api")[0].id).status == "active"
+
+
+def test_cycle_status_changes_land_in_one_write(tmp_path, monkeypatch):
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    old = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
+    expired = []
+    for topic in ("queues", "retries", "schemas", "logging", "auth"):
+        entry = memory.store("api", topic, f"how we handle {topic}",
+                             "pattern", "tactical")
+        memory.update_entry(entry.id, recorded_at=old)
+        expired.append(entry.id)
+    fresh = memory.store("api", "fresh", "recent note", "pattern", "tactical")
+    memory.store("api", "neg", "never cache tokens", "pattern", "tactical")
+    memory.store("api", "pos", "cache tokens daily", "pattern", "tactical")
+
+    stale = memory.list_stale("recorded_at", old[:10] + "T23:59")
+    assert [e.id for e in stale] == expired
+
+    submits = []
+    real_submit = memory._writer.submit
+    monkeypatch.setattr(memory._writer, "submit",
+                        lambda fn, **kw: submits.append(fn) or real_submit(fn, **kw))
+    report = GovernanceEngine(memory, _Tasks(), _Brain()).run_cycle()
+    assert report.archived_this_cycle == 5 and report.flagged_conflicts == 1
+    assert len(submits) == 1
+    assert all(memory.get_entry(i).status == "archived" for i in expired)
+    assert memory.get_entry(fresh.id).status == "active"
@@ -0,0 +1,180 @@
+"""CSR adjacency cache for Brain graph traversals.
+
+call_chain / find_references / graph_query / _traverse_graph now read
+an in-memory CSR snapshot of graph.db instead of joining per hop. These
+tests pin parity with the SQL path, the new reverse-BFS and
+shortest-path queries, and cache invalidation for both same-connection
+and other-connection writers.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+pytest.importorskip("numpy")
+
+
+def _brain(tmp_path: Path):
+    from app.engines.brain_engine import Brain
+    return Brain(
+        brain_db=str(tmp_path / "brain.db"),
+        graph_db=str(tmp_path / "graph.db"),
+        scores_db=str(tmp_path / "scores.db"),
+    )
+
+
+# main -> parse -> tokenize
+#      -> render -> tokenize
+# cli  -> main
+_EDGES = [
+    ("main", "parse", "calls"),
+    ("main", "render", "calls"),
+    ("parse", "tokenize", "calls"),
+    ("render", "tokenize", "calls"),
+    ("cli", "main", "calls"),
+    ("main", "util", "imports"),
+]
+
+
+def _seed(brain) -> None:
+    names = ["cli", "main", "parse", "render", "tokenize", "util"]
+    for n in names:
+        brain._graph.execute(
+            "INSERT INTO entities (name, kind, file, line) VALUES (?, ?, ?, 1)",
+            (n, "function", f"{n}.py"),
+        )
+    ids = {r["name"]: r["id"] for r in brain._graph.execute(
+        "SELECT id, name FROM entities"
+    )}
+    for s, t, rel in _EDGES:
+        brain._graph.execute(
+            "INSERT INTO relationships (source_id, target_id, relation) "
+            "VALUES (?, ?, ?)",
+            (ids[s], ids[t], rel),
+        )
+    brain._graph.commit()
+    brain.invalidate_graph_cache()
+
+
+def _sql_only(brain, monkeypatch):
+    monkeypatch.setattr(brain, "_graph_adjacency", lambda: None)
+
+
+def _key(edges):
+    return sorted((e["from"], e["to"], e["relation"], e["hop"]) for e in edges)
+
+
+def test_call_chain_matches_sql_path(tmp_path, monkeypatch):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    csr = brain.call_chain("main", depth=3, limit=50)
+    _sql_only(brain, monkeypatch)
+    sql = brain.call_chain("main", depth=3, limit=50)
+    assert _key(csr) == _key(sql)
+    assert ("parse", "tokenize", "calls", 2) in _key(csr)
+
+
+def test_find_references_and_graph_query_match_sql(tmp_path, monkeypatch):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    refs = brain.find_references("tokenize")
+    q = brain.graph_query("main", relation="calls")
+    trav = brain._traverse_graph("main", "imports", 10)
+    _sql_only(brain, monkeypatch)
+    assert sorted(map(str, refs)) == sorted(
+        map(str, brain.find_references("tokenize"))
+    )
+    assert sorted(map(str, q)) == sorted(
+        map(str, brain.graph_query("main", relation="calls"))
+    )
+    assert trav == brain._traverse_graph("main", "imports", 10)
+    assert {r["caller_name"] for r in refs} == {"parse", "render"}
+
+
+def test_call_chain_limit_is_respected(tmp_path):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    assert len(brain.call_chain("main", depth=5, limit=2)) == 2
+
+
+def test_reverse_call_chain_walks_callers_of_callers(tmp_path):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    edges = brain.call_chain("tokenize", depth=3, direction="callers")
+    hops = {(e["from"], e["hop"]) for e in edges}
+    assert ("parse", 1) in hops and ("render", 1) in hops
+    assert ("main", 2) in hops
+    assert ("cli", 3) in hops
+    # Orientation stays caller -> callee.
+    assert all(e["to"] != "cli" for e in edges)
+
+
+def test_reverse_call_chain_matches_sql_path(tmp_path, monkeypatch):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    csr = brain.call_chain("tokenize", depth=3, direction="callers")
+    _sql_only(brain, monkeypatch)
+    sql = brain.call_chain("tokenize", depth=3, direction="callers")
+    assert _key(sql) == _key(csr) and ("cli", "main", "calls", 3) in _key(sql)
+    assert sorted(e["kind"] for e in sql) == sorted(e["kind"] for e in csr)
+
+
+def test_shortest_path(tmp_path):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    path = brain.shortest_path("cli", "tokenize")
+    assert [e["from"] for e in path] == ["cli", "main", "parse"]
+    assert path[-1]["to"] == "tokenize"
+    assert [e["hop"] for e in path] == [1, 2, 3]
+    assert brain.shortest_path("tokenize", "cli") == []
+    assert brain.shortest_path("cli", "tokenize", max_depth=2) == []
+
+
+def test_same_connection_write_invalidates(tmp_path):
+    brain = _brain(tmp_path)
+    _seed(brain)
+    assert brain.find_references("new_caller") == []
+    before = brain.call_chain("cli", depth=1)
+    assert len(before) == 1
+    brain._graph.execute(
+        "INSERT INTO entities (name, kind, file) VALUES ('extra', 'function', 'x.py')"
+    )
+    brain._graph.execute(
+        "INSERT INTO relationships (source_id, target_id, relation) "
+        "SELECT c.id, e.id, 'calls' FROM entities c, entities e "
+        "WHERE c.name = 'cli' AND e.name = 'extra'"
+    )
+    brain._graph.commit()
+    brain.invalidate_graph_cache()
+    assert len(brain.call_chain("cli", depth=1)) == 2
+
+
+def test_graph_service_import_invalidates_via_data_version(tmp_path):
+    """GraphService writes graph.db through its own connection; the
+    Brain's cached snapshot must notice without explicit wiring."""
+    from app.services.graph_service import GraphService
+
+    brain = _brain(tmp_path)
+    _seed(brain)
+    assert brain.call_chain("alpha") == []
+
+    svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                       graph_db_path=str(tmp_path / "graph.db"))
+    svc._import_graph_json({
+        "nodes": [
+            {"id": "a", "label": "alpha", "source_file": "a.py"},
+            {"id": "b", "label": "beta", "source_file": "b.py"},
+        ],
+        "links": [{"source": "a", "target": "b", "relation": "calls"}],
+    }, {"imported_entities": 0, "imported_relationships": 0})
+
+    edges = brain.call_chain("alpha")
+    assert [(e["from"], e["to"]) for e in edges] == [("alpha", "beta")]
@@ -0,0 +1,184 @@
+"""Diff-based graph.json -> graph.db import.
+
+GraphService._import_graph_json used to wipe entities + relationships and
+re-insert row by row, so readers saw an empty graph mid-import. It now
+diffs against the stored snapshot in one transaction: unchanged rows
+keep their ids, changed rows update in place, vanished rows are deleted.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _service(tmp_path: Path):
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    Brain(
+        brain_db=str(tmp_path / "brain.db"),
+        graph_db=str(tmp_path / "graph.db"),
+        scores_db=str(tmp_path / "scores.db"),
+    )
+    return GraphService(project_data_dir=str(tmp_path / "proj"),
+                        graph_db_path=str(tmp_path / "graph.db"))
+
+
+def _import(svc, nodes, links):
+    return svc._import_graph_json(
+        {"nodes": nodes, "links": links},
+        {"imported_entities": 0, "imported_relationships": 0},
+    )
+
+
+def _node(gid, label, file, **extra):
+    return {"id": gid, "label": label, "source_file": file, **extra}
+
+
+def _rows(tmp_path: Path):
+    conn = sqlite3.connect(str(tmp_path / "graph.db"))
+    try:
+        ents = {r[1]: (r[0], r[2], r[3]) for r in conn.execute(
+            "SELECT id, graphify_id, name, file FROM entities"
+        )}
+        rels = set(conn.execute(
+            "SELECT s.graphify_id, t.graphify_id, r.relation "
+            "FROM relationships r "
+            "JOIN entities s ON s.id = r.source_id "
+            "JOIN entities t ON t.id = r.target_id"
+        ))
+        n_rels = conn.execute("SELECT COUNT(*) FROM relationships").fetchone()[0]
+    finally:
+        conn.close()
+    return ents, rels, n_rels
+
+
+_NODES = [
+    _node("a", "alpha", "a.py", community=0),
+    _node("b", "beta", "b.py", community=0),
+    _node("c", "gamma", "c.py", community=1),
+]
+_LINKS = [
+    {"source": "a", "target": "b", "relation": "calls"},
+    {"source": "b", "target": "c", "relation": "calls"},
+]
+
+
+def test_reimport_keeps_ids_and_writes_nothing(tmp_path):
+    svc = _service(tmp_path)
+    _import(svc, _NODES, _LINKS)
+    before, _, _ = _rows(tmp_path)
+    result = _import(svc, _NODES, _LINKS)
+    after, rels, _ = _rows(tmp_path)
+    assert before == after
+    assert result["imported_entities"] == 3
+    assert result["imported_relationships"] == 2
+    assert result["entities_diff"] == {"added": 0, "updated": 0, "removed": 0}
+    assert result["relationships_diff"] == {"added": 0, "updated": 0,
+                                            "removed": 0}
+    assert {"entities", "relationships", "commit"} <= set(result["timings_ms"])
+    assert rels == {("a", "b", "calls"), ("b", "c", "calls")}
+
+
+def test_vanished_nodes_and_edges_are_deleted(tmp_path):
+    svc = _service(tmp_path)
+    _import(svc, _NODES, _LINKS)
+    before, _, _ = _rows(tmp_path)
+    result = _import(
+        svc,
+        [_NODES[0], _NODES[1], _node("d", "delta", "d.py")],
+        [{"source": "a", "target": "b", "relation": "calls"},
+         {"source": "a", "target": "d", "relation": "imports"}],
+    )
+    after, rels, n_rels = _rows(tmp_path)
+    assert set(after) == {"a", "b", "d"}
+    assert after["a"][0] == before["a"][0]
+    assert rels == {("a", "b", "calls"), ("a", "d", "imports")}
+    assert n_rels == 2  # no dangling edges into the removed node
+    assert result["entities_diff"] == {"added": 1, "updated": 0, "removed": 1}
+    assert result["relationships_diff"] == {"added": 1, "updated": 0,
+                                            "removed": 1}
+
+
+def test_renames_update_in_place_including_swaps(tmp_path):
+    svc = _service(tmp_path)
+    _import(svc, _NODES, _LINKS)
+    before, _, _ = _rows(tmp_path)
+    # a and b swap labels: both (name, file) slots are taken mid-update.
+    result = _import(svc, [
+        _node("a", "beta", "b.py"),
+        _node("b", "alpha", "a.py"),
+        _NODES[2],
+    ], _LINKS)
+    after, rels, _ = _rows(tmp_path)
+    assert after["a"] == (before["a"][0], "beta", "b.py")
+    assert after["b"] == (before["b"][0], "alpha", "a.py")
+    assert result["entities_diff"]["updated"] == 2
+    assert rels == {("a", "b", "calls"), ("b", "c", "calls")}
+
+
+def test_tree_sitter_rows_are_replaced_by_snapshot(tmp_path):
+    svc = _service(tmp_path)
+    conn = sqlite3.connect(str(tmp_path / "graph.db"))
+    conn.execute("INSERT INTO entities (name, kind, file) "
+                 "VALUES ('alpha', 'function', 'a.py')")
+    conn.execute("INSERT INTO entities (name, kind, file) "
+                 "VALUES ('stale', 'function', 'old.py')")
+    conn.commit()
+    conn.close()
+    _import(svc, _NODES, _LINKS)
+    after, _, _ = _rows(tmp_path)
+    assert set(after) == {"a", "b", "c"}
+
+
+def test_duplicate_label_and_file_alias_to_one_row(tmp_path):
+    svc = _service(tmp_path)
+    result = _import(svc, [
+        _node("x1", "dup", "d.py"),
+        _node("x2", "dup", "d.py"),
+        _node("y", "other", "o.py"),
+    ], [{"source": "x2", "target": "y", "relation": "calls"}])
+    after, _, n_rels = _rows(tmp_path)
+    assert set(after) == {"x1", "y"}
+    assert result["imported_entities"] == 3
+    assert n_rels == 1
+
+
+def test_failed_import_leaves_old_graph(tmp_path, monkeypatch):
+    from app.services import graph_service
+
+    svc = _service(tmp_path)
+    _import(svc, _NODES, _LINKS)
+    before = _rows(tmp_path)
+
+    def boom(*_args, **_kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(graph_service, "_sync_relationships", boom)
+    try:
+        _import(svc, [_node("z", "zeta", "z.py")], [])
+    except RuntimeError:
+        pass
+    assert _rows(tmp_path) == before
+
+
+def test_large_batch_crosses_upsert_chunks(tmp_path):
+    from app.services.graph_service import _UPSERT_BATCH
+
+    svc = _service(tmp_path)
+    n = _UPSERT_BATCH * 2 + 7
+    nodes = [_node(f"n{i}", f"fn_{i}", f"m{i % 13}.py") for i in range(n)]
+    links = [{"source": f"n{i}", "target": f"n{i + 1}", "relation": "calls"}
+             for i in range(n - 1)]
+    result = _import(svc, nodes, links)
+    assert result["imported_entities"] == n
+    assert result["imported_relationships"] == n - 1
+    after, _, n_rels = _rows(tmp_path)
+    assert len(after) == n and n_rels == n - 1
@@ -0,0 +1,200 @@
+"""Incremental graphify runs scoped to changed staged files.
+
+GraphService.rebuild used to run ``graphify update`` over the whole
+staging tree every time. It now diffs staged files against the manifest
+of the last successful run, re-extracts only the changed ones in a side
+directory and merges the result into the previous graph.json; a full
+pass (fresh communities) runs on a configurable cadence.
+
+graphify itself is replaced by a tiny fake: every ``def NAME`` line is a
+node, every ``NAME -> OTHER`` line an edge (only resolved when OTHER is
+in the same run, like graphify's cross-file pass).
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _fake_graphify(calls: list):
+    def run(cmd, cwd=None, **_kwargs):
+        target = Path(cmd[2])
+        files = sorted(
+            p for p in target.rglob("*")
+            if p.is_file() and "graphify-out" not in p.parts
+        )
+        calls.append((target.name,
+                      [p.relative_to(target).as_posix() for p in files]))
+        nodes, pending = [], []
+        for p in files:
+            for line in p.read_text().splitlines():
+                if line.startswith("def "):
+                    name = line[4:].strip()
+                    nodes.append({"id": name, "label": name,
+                                  "source_file": str(p), "community": 7})
+                elif "->" in line:
+                    src, tgt = (s.strip() for s in line.split("->"))
+                    pending.append((src, tgt))
+        ids = {n["id"] for n in nodes}
+        links = [{"source": s, "target": t, "relation": "calls"}
+                 for s, t in pending if s in ids and t in ids]
+        out = target / "graphify-out"
+        out.mkdir(parents=True, exist_ok=True)
+        (out / "graph.json").write_text(
+            json.dumps({"nodes": nodes, "links": links})
+        )
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+    return run
+
+
+@pytest.fixture
+def svc(tmp_path, monkeypatch):
+    from app.engines.brain_engine import Brain
+    from app.services import graph_service
+
+    Brain(
+        brain_db=str(tmp_path / "brain.db"),
+        graph_db=str(tmp_path / "graph.db"),
+        scores_db=str(tmp_path / "scores.db"),
+    )
+    calls: list = []
+    monkeypatch.setattr(graph_service.subprocess, "run", _fake_graphify(calls))
+    monkeypatch.setattr(graph_service, "GRAPH_INCREMENTAL_MAX_CHANGED", 1.0)
+    service = graph_service.GraphService(
+        project_data_dir=str(tmp_path / "proj"),
+        graph_db_path=str(tmp_path / "graph.db"),
+    )
+    service.calls = calls
+    return service
+
+
+def _stage_base(svc):
+    svc.stage_doc("pkg/a.py", "def alpha\nalpha -> beta\n")
+    svc.stage_doc("pkg/b.py", "def beta\nbeta -> gamma\n")
+    svc.stage_doc("pkg/c.py", "def gamma\n")
+
+
+def _edges(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "graph.db"))
+    try:
+        return set(conn.execute(
+            "SELECT s.name, t.name FROM relationships r "
+            "JOIN entities s ON s.id = r.source_id "
+            "JOIN entities t ON t.id = r.target_id"
+        ))
+    finally:
+        conn.close()
+
+
+def test_first_rebuild_is_full_then_unchanged_skips_graphify(svc):
+    _stage_base(svc)
+    first = svc.rebuild()
+    assert first["mode"] == "full"
+    assert first["changed_files"] == 3
+    assert svc.calls[-1] == ("graphify-src", ["pkg/a.py", "pkg/b.py", "pkg/c.py"])
+
+    # Re-staging identical content bumps mtimes but not hashes.
+    _stage_base(svc)
+    again = svc.rebuild()
+    assert again["mode"] == "unchanged"
+    assert len(svc.calls) == 1
+
+
+def test_changed_file_is_reextracted_alone_and_merged(svc, tmp_path):
+    _stage_base(svc)
+    svc.rebuild()
+    svc.stage_doc("pkg/c.py", "def gamma\ndef delta\ngamma -> delta\n")
+    result = svc.rebuild()
+
+    assert result["mode"] == "incremental"
+    assert result["changed_files"] == 1
+    assert svc.calls[-1] == ("graphify-delta", ["pkg/c.py"])
+    # Cross-file edge b -> c survives although the delta run only saw c.
+    assert _edges(tmp_path) == {("alpha", "beta"), ("beta", "gamma"),
+                                ("gamma", "delta")}
+    merged = json.loads(
+        (svc._staging_dir / "graphify-out" / "graph.json").read_text()
+    )
+    delta = next(n for n in merged["nodes"] if n["id"] == "delta")
+    assert delta["source_file"] == str(svc._staging_dir / "pkg" / "c.py")
+    assert delta["community"] == 7  # inherited from its neighbour
+
+
+def test_removed_file_drops_nodes_without_graphify(svc, tmp_path):
+    _stage_base(svc)
+    svc.rebuild()
+    svc.unstage_doc("pkg/c.py")
+    result = svc.rebuild()
+    assert result["mode"] == "incremental"
+    assert result["removed_files"] == 1
+    assert len(svc.calls) == 1
+    assert _edges(tmp_path) == {("alpha", "beta")}
+
+
+def test_full_pass_cadence_and_force(svc, monkeypatch):
+    from app.services import graph_service
+
+    monkeypatch.setattr(graph_service, "GRAPH_FULL_REBUILD_EVERY", 2)
+    _stage_base(svc)
+    svc.rebuild()
+    svc.stage_doc("pkg/a.py", "def alpha\n")
+    assert svc.rebuild()["mode"] == "incremental"
+    svc.stage_doc("pkg/a.py", "def alpha\nalpha -> gamma\n")
+    assert svc.rebuild()["mode"] == "full"
+    svc.stage_doc("pkg/a.py", "def alpha\n")
+    assert svc.rebuild(full=True)["mode"] == "full"
+
+
+def test_too_many_changes_fall_back_to_full(svc, monkeypatch):
+    from app.services import graph_service
+
+    monkeypatch.setattr(graph_service, "GRAPH_INCREMENTAL_MAX_CHANGED", 0.25)
+    _stage_base(svc)
+    svc.rebuild()
+    svc.stage_doc("pkg/a.py", "def alpha\n")
+    svc.stage_doc("pkg/b.py", "def beta\n")
+    assert svc.rebuild()["mode"] == "full"
+
+
+def test_failed_incremental_run_keeps_manifest(svc, monkeypatch):
+    from app.services import graph_service
+
+    _stage_base(svc)
+    svc.rebuild()
+    svc.stage_doc("pkg/c.py", "def gamma\ndef delta\n")
+    monkeypatch.setattr(
+        graph_service.subprocess, "run",
+        lambda cmd, **_k: subprocess.CompletedProcess(cmd, 1, "", "boom"),
+    )
+    assert svc.rebuild()["error"] == "boom"
+    monkeypatch.setattr(graph_service.subprocess, "run",
+                        _fake_graphify(svc.calls))
+    retry = svc.rebuild()
+    assert retry["mode"] == "incremental" and retry["changed_files"] == 1
+
+
+def test_scan_ignores_cache_dirs_outside_graphify_output(tmp_path):
+    from app.services import graph_service
+
+    service = graph_service.GraphService(
+        project_data_dir=str(tmp_path / "cache" / "proj"),
+        graph_db_path=str(tmp_path / "graph.db"),
+    )
+    service.stage_doc("pkg/a.py", "def alpha\n")
+    service.stage_doc("cache/util.py", "def util\n")
+    out = service._staging_dir / "graphify-out" / "cache"
+    out.mkdir(parents=True)
+    (out / "entry.json").write_text("{}")
+
+    assert sorted(service._scan_staging({})) == ["cache/util.py", "pkg/a.py"]
@@ -0,0 +1,147 @@
+"""Debounced, coalescing graph rebuild jobs.
+
+graph_rebuild / prism_refresh used to run graphify inline, so concurrent
+callers overlapped subprocesses on one staging dir. They now enqueue on
+a per-project GraphRebuildJobs; these tests drive it with a fake
+GraphService so timing is deterministic.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+class _FakeGraph:
+    def __init__(self, hold: threading.Event | None = None) -> None:
+        self.calls: list[bool] = []
+        self.active = 0
+        self.max_active = 0
+        self.started = threading.Event()
+        self._hold = hold
+        self._lock = threading.Lock()
+
+    def rebuild(self, brain_db_path=None, *, full=False, progress=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.calls.append(full)
+        progress("graphify")
+        self.started.set()
+        if self._hold is not None:
+            self._hold.wait(5)
+        with self._lock:
+            self.active -= 1
+        return {"mode": "full" if full else "incremental", "nodes": 3}
+
+
+def _jobs(graph, debounce_s=0.05):
+    from app.services.graph_jobs import GraphRebuildJobs
+    return GraphRebuildJobs(graph, brain_db_path="unused", debounce_s=debounce_s)
+
+
+def test_requests_in_debounce_window_coalesce():
+    graph = _FakeGraph()
+    jobs = _jobs(graph)
+    first = jobs.request()
+    second = jobs.request(full=True)
+    assert second["job_id"] == first["job_id"]
+    assert second["coalesced"] is True
+    record = jobs.wait(first["job_id"], timeout=5)
+    assert record["status"] == "done"
+    assert record["requests"] == 2
+    assert graph.calls == [True]  # full flags OR together
+
+
+def test_requests_during_run_collapse_into_one_follow_up():
+    hold = threading.Event()
+    graph = _FakeGraph(hold)
+    jobs = _jobs(graph, debounce_s=0.0)
+    running = jobs.request()
+    assert graph.started.wait(5)
+    status = jobs.status()
+    assert status["state"] == "running"
+    assert status["running"]["stage"] == "graphify"
+
+    follow = [jobs.request() for _ in range(5)]
+    assert len({j["job_id"] for j in follow}) == 1
+    assert follow[0]["runs_after"] == running["job_id"]
+    assert jobs.status()["queued"]["requests"] == 5
+
+    hold.set()
+    assert jobs.wait(follow[0]["job_id"], timeout=5)["status"] == "done"
+    assert len(graph.calls) == 2
+    assert graph.max_active == 1
+
+
+def test_status_reports_last_duration_and_failure():
+    class Boom:
+        def rebuild(self, **_kwargs):
+            raise RuntimeError("graphify exploded")
+
+    jobs = _jobs(Boom(), debounce_s=0.0)
+    assert jobs.status() == {"state": "idle", "running": None,
+                             "queued": None, "last": None}
+    job = jobs.request()
+    record = jobs.wait(job["job_id"], timeout=5)
+    assert record["status"] == "failed"
+    last = jobs.status()["last"]
+    assert last["job_id"] == job["job_id"]
+    assert "graphify exploded" in last["error"]
+    assert last["duration_s"] >= 0
+
+
+def test_worker_restarts_after_draining():
+    graph = _FakeGraph()
+    jobs = _jobs(graph, debounce_s=0.0)
+    jobs.wait(jobs.request()["job_id"], timeout=5)
+    deadline = time.time() + 5
+    while jobs._worker is not None and time.time() < deadline:
+        time.sleep(0.01)
+    jobs.wait(jobs.request()["job_id"], timeout=5)
+    assert len(graph.calls) == 2
+
+
+def test_wait_on_unknown_or_evicted_job_returns_none():
+    graph = _FakeGraph()
+    jobs = _jobs(graph, debounce_s=0.0)
+    assert jobs.wait("no-such-job") is None
+    first = jobs.request()["job_id"]
+    assert jobs.wait(first, timeout=5)["status"] == "done"
+    for _ in range(32):
+        jobs.wait(jobs.request()["job_id"], timeout=5)
+    assert first not in jobs._finished
+    assert jobs.wait(first) is None  # no timeout: must not block forever
+
+    hold = threading.Event()
+    jobs = _jobs(_FakeGraph(hold), debounce_s=0.0)
+    running = jobs.request()["job_id"]
+    assert jobs.wait(running, timeout=0.05) is None
+    hold.set()
+    assert jobs.wait(running, timeout=5)["status"] == "done"
+
+
+def test_graph_service_serialises_direct_rebuilds(tmp_path, monkeypatch):
+    """Direct callers (UI button, tests) share the per-project lock."""
+    from app.services import graph_service
+
+    svc = graph_service.GraphService(
+        project_data_dir=str(tmp_path / "proj"),
+        graph_db_path=str(tmp_path / "graph.db"),
+    )
+    inside = []
+
+    def fake(*_args, **_kwargs):
+        inside.append(svc._rebuild_lock.locked())
+        return {}
+
+    monkeypatch.setattr(svc, "_rebuild", fake)
+    svc.rebuild()
+    assert inside == [True]
@@ -0,0 +1,171 @@
+"""Streaming graph.json import.
+
+rebuild used to ``json.loads`` graph.json and build per-node dicts over
+the whole document. The import now walks the file element by element
+(app.services.graph_json), stages rows into TEMP tables in batches and
+diffs in SQL. These tests pin the reader against ``json`` on awkward
+chunk boundaries and the streamed import against the in-memory one.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+_DOC = {
+    "directed": True,
+    "graph": {"name": "g", "nested": [1, {"q": "a\"b"}]},
+    "links": [{"source": f"n{i}", "target": f"n{(i * 7) % 40}",
+               "relation": "calls", "weight": 0.5 + i / 1000}
+              for i in range(60)],
+    "nodes": [{"id": f"n{i}", "label": f"fn_{i}☃",
+               "source_file": f"pkg/m{i % 5}.py", "source_location": f"L{i}",
+               "community": i % 3}
+              for i in range(40)],
+    "version": 12345.5e3,
+}
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 5, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_reader_matches_json_module(tmp_path, chunk, indent):
+    from app.services.graph_json import iter_array, read_members
+
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(_DOC, indent=indent), encoding="utf-8")
+    assert list(iter_array(path, "nodes", chunk)) == _DOC["nodes"]
+    assert list(iter_array(path, "links", chunk)) == _DOC["links"]
+    assert list(iter_array(path, "hyperedges", chunk)) == []
+    assert read_members(path, chunk=chunk) == {
+        k: v for k, v in _DOC.items() if k not in ("nodes", "links")
+    }
+
+
+def test_writer_round_trips(tmp_path):
+    from app.services.graph_json import GraphJsonWriter
+
+    path = tmp_path / "graph.json"
+    with GraphJsonWriter(path) as w:
+        w.member("directed", True)
+        w.begin_array("nodes")
+        for n in _DOC["nodes"]:
+            w.append(n)
+        w.begin_array("links")
+    assert json.loads(path.read_text()) == {
+        "directed": True, "nodes": _DOC["nodes"], "links": [],
+    }
+    assert not path.with_suffix(".json.tmp").exists()
+
+
+def _service(tmp_path: Path, name: str):
+    from app.engines.brain_engine import Brain
+    from app.services.graph_service import GraphService
+
+    Brain(
+        brain_db=str(tmp_path / f"{name}-brain.db"),
+        graph_db=str(tmp_path / f"{name}.db"),
+        scores_db=str(tmp_path / f"{name}-scores.db"),
+    )
+    return GraphService(project_data_dir=str(tmp_path / name),
+                        graph_db_path=str(tmp_path / f"{name}.db"))
+
+
+def _dump(db: Path):
+    conn = sqlite3.connect(str(db))
+    try:
+        return (
+            sorted(conn.execute(
+                "SELECT graphify_id, name, file, line, community FROM entities"
+            )),
+            sorted(conn.execute(
+                "SELECT s.graphify_id, t.graphify_id, r.relation, r.weight "
+                "FROM relationships r "
+                "JOIN entities s ON s.id = r.source_id "
+                "JOIN entities t ON t.id = r.target_id"
+            )),
+            sorted(conn.execute("SELECT id, label, size FROM communities")),
+        )
+    finally:
+        conn.close()
+
+
+def test_streamed_import_matches_in_memory_import(tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(_DOC), encoding="utf-8")
+    streamed = _service(tmp_path, "streamed")._import_graph_json(
+        path, {"imported_entities": 0, "imported_relationships": 0},
+    )
+    loaded = _service(tmp_path, "loaded")._import_graph_json(
+        json.loads(path.read_text()),
+        {"imported_entities": 0, "imported_relationships": 0},
+    )
+    assert _dump(tmp_path / "streamed.db") == _dump(tmp_path / "loaded.db")
+    for key in ("nodes", "edges", "communities", "imported_entities",
+                "imported_relationships", "community_labels"):
+        assert streamed[key] == loaded[key]
+    assert streamed["communities"] == 3
+
+
+def test_readers_see_old_graph_until_commit(tmp_path, monkeypatch):
+    from app.services import graph_service
+
+    svc = _service(tmp_path, "g")
+    svc._import_graph_json(
+        {"nodes": [{"id": "a", "label": "alpha", "source_file": "a.py"}],
+         "links": []},
+        {"imported_entities": 0, "imported_relationships": 0},
+    )
+    seen: list = []
+    original = graph_service._sync_relationships
+
+    def observe(conn):
+        # Entities are already rewritten on the importer's connection...
+        assert conn.in_transaction
+        reader = sqlite3.connect(str(tmp_path / "g.db"))
+        try:
+            seen.extend(r[0] for r in reader.execute(
+                "SELECT name FROM entities ORDER BY name"
+            ))
+        finally:
+            reader.close()
+        return original(conn)
+
+    monkeypatch.setattr(graph_service, "_sync_relationships", observe)
+    t = threading.Thread(target=svc._import_graph_json, args=(
+        {"nodes": [{"id": "b", "label": "beta", "source_file": "b.py"}],
+         "links": []},
+        {"imported_entities": 0, "imported_relationships": 0},
+    ))
+    t.start()
+    t.join(10)
+    # ...but another connection still saw the previous snapshot.
+    assert seen == ["alpha"]
+    assert [r[1] for r in _dump(tmp_path / "g.db")[0]] == ["beta"]
+
+
+def test_truncated_graph_json_leaves_graph_untouched(tmp_path):
+    svc = _service(tmp_path, "g")
+    svc._import_graph_json(
+        {"nodes": [{"id": "a", "label": "alpha", "source_file": "a.py"}],
+         "links": []},
+        {"imported_entities": 0, "imported_relationships": 0},
+    )
+    before = _dump(tmp_path / "g.db")
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(_DOC)[:-200], encoding="utf-8")
+    with pytest.raises(ValueError):
+        svc._import_graph_json(
+            path, {"imported_entities": 0, "imported_relationships": 0},
+        )
+    assert _dump(tmp_path / "g.db") == before
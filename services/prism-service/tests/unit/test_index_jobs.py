@@ -0,0 +1,198 @@
+"""Indexing queue: coalescing, interactive-before-bulk, batches, ETA.
+
+prism_refresh used to index inline in the request, so a bulk onboarding
+load delayed a one-file refresh behind it and a path refreshed twice was
+indexed twice. Refreshes now go through IndexJobs; these tests pin the
+ordering, coalescing and reporting against a fake BrainService.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.services.index_jobs import IndexJobs  # noqa: E402
+
+
+class _Brain:
+    """Records index_doc calls; blocks on ``gate`` once it is cleared."""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls: list[tuple[str, str]] = []
+        self.delay = delay
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def index_doc(self, path, content, domain="code"):
+        self.entered.set()
+        self.gate.wait(5)
+        time.sleep(self.delay)
+        if content == "boom":
+            raise RuntimeError("bad file")
+        self.calls.append((path, content))
+
+
+class _Graph:
+    def __init__(self):
+        self.reasons: list[str] = []
+
+    def request(self, full=False, reason=""):
+        self.reasons.append(reason)
+        return {"job_id": f"g{len(self.reasons)}"}
+
+
+def _hold(brain):
+    """Park the worker inside index_doc so submissions pile up."""
+    brain.gate.clear()
+    brain.entered.clear()
+
+
+def test_resubmitted_path_keeps_latest_content():
+    brain, graph = _Brain(), _Graph()
+    jobs = IndexJobs(brain, graph, batch_size=10)
+    _hold(brain)
+    blocker = jobs.submit({"busy.py": "x"}, priority="bulk")
+    assert brain.entered.wait(5)
+
+    first = jobs.submit({"a.py": "v1", "b.py": "b"}, priority="bulk")
+    second = jobs.submit({"a.py": "v2"}, priority="bulk", reason="edit")
+    assert second["coalesced"] == 1
+    brain.gate.set()
+
+    one = jobs.wait(first["job_id"], timeout=5)
+    two = jobs.wait(second["job_id"], timeout=5)
+    assert jobs.wait(blocker["job_id"], timeout=5)["status"] == "done"
+    assert (one["indexed"], one["superseded"]) == (1, 1)
+    assert (two["indexed"], two["superseded"]) == (1, 0)
+    assert [c for c in brain.calls if c[0] == "a.py"] == [("a.py", "v2")]
+    assert two["graph_job"] and "edit" in graph.reasons
+
+
+def test_superseded_job_finishes_after_the_newer_entry_is_indexed():
+    brain, graph = _Brain(), _Graph()
+    jobs = IndexJobs(brain, graph, batch_size=10)
+    _hold(brain)
+    jobs.submit({"busy.py": "x"}, priority="bulk", skip_graph=True)
+    assert brain.entered.wait(5)
+
+    first = jobs.submit({"a.py": "v1"}, priority="bulk")
+    second = jobs.submit({"a.py": "v2"}, priority="bulk")
+    third = jobs.submit({"a.py": "v3"}, priority="bulk", reason="edit")
+    # Every path of the first two jobs was taken over, but nothing of
+    # theirs is indexed yet: they must not report done.
+    assert jobs.wait(first["job_id"], timeout=0.2) is None
+    assert jobs.status(second["job_id"])["status"] == "queued"
+    assert jobs.status(first["job_id"])["pending"] == 1
+    assert graph.reasons == []
+    brain.gate.set()
+
+    for job in (first, second):
+        record = jobs.wait(job["job_id"], timeout=5)
+        assert record["status"] == "done"
+        assert (record["indexed"], record["superseded"]) == (0, 1)
+        assert ("a.py", "v3") in brain.calls
+    assert jobs.wait(third["job_id"], timeout=5)["indexed"] == 1
+    assert graph.reasons == ["edit"]
+
+
+def test_interactive_jumps_ahead_of_bulk_in_batches():
+    brain = _Brain()
+    jobs = IndexJobs(brain, None, batch_size=4)
+    _hold(brain)
+    jobs.submit({"warm.py": "w"}, priority="bulk")
+    assert brain.entered.wait(5)
+
+    bulk = jobs.submit({f"bulk/{i}.py": str(i) for i in range(10)},
+                       priority="bulk", skip_graph=True)
+    edit = jobs.submit({"edit.py": "e"}, priority="interactive")
+    # A bulk path refreshed interactively moves up with it.
+    jobs.submit({"bulk/9.py": "hot"}, priority="interactive")
+    assert jobs.status()["queued_interactive"] == 2
+    brain.gate.set()
+
+    assert jobs.wait(bulk["job_id"], timeout=5)["status"] == "done"
+    assert jobs.wait(edit["job_id"], timeout=5)["indexed"] == 1
+    order = [p for p, _ in brain.calls]
+    assert order[:3] == ["warm.py", "bulk/9.py", "edit.py"]
+    assert order[3:] == [f"bulk/{i}.py" for i in range(9)]
+    assert dict(brain.calls)["bulk/9.py"] == "hot"
+
+
+def test_status_reports_throughput_eta_and_failures():
+    brain = _Brain(delay=0.005)
+    jobs = IndexJobs(brain, None, batch_size=5)
+    job = jobs.submit({f"f{i}.py": ("boom" if i == 3 else "ok")
+                       for i in range(12)}, skip_graph=True)
+    record = jobs.wait(job["job_id"], timeout=5)
+    assert (record["indexed"], record["failed"], record["pending"]) == (11, 1, 0)
+    assert "graph_job" not in record
+
+    idle = jobs.status()
+    assert idle["state"] == "idle" and idle["eta_s"] == 0.0
+    assert idle["throughput_files_per_s"] > 0
+    assert idle["indexed_total"] == 11
+
+    _hold(brain)
+    jobs.submit({"p.py": "p"})
+    assert brain.entered.wait(5)
+    waiting = jobs.submit({f"q{i}.py": "q" for i in range(4)})
+    busy = jobs.status(waiting["job_id"])
+    assert busy["status"] == "queued" and busy["pending"] == 4
+    assert busy["eta_s"] > 0
+    assert jobs.status()["state"] == "running"
+    assert jobs.status("nope")["status"] == "unknown"
+    brain.gate.set()
+    assert jobs.drain(timeout=5)
+
+
+def test_full_queue_answers_busy_and_cancel_drops_pending():
+    brain = _Brain()
+    jobs = IndexJobs(brain, _Graph(), batch_size=2, max_queued=5)
+    _hold(brain)
+    running = jobs.submit({"r.py": "r", "s.py": "s"})
+    assert brain.entered.wait(5)
+    queued = jobs.submit({f"b{i}.py": "b" for i in range(4)})
+
+    busy = jobs.submit({f"c{i}.py": "c" for i in range(4)}, priority="bulk")
+    assert busy["busy"] and busy["queued_files"] == 4
+    assert 1 <= busy["retry_after_s"] <= 60
+    # Interactive refreshes are never turned away.
+    assert "job_id" in jobs.submit({"hot.py": "h"}, priority="interactive")
+
+    assert jobs.cancel() == 5
+    brain.gate.set()
+    assert jobs.wait(queued["job_id"], timeout=5)["status"] == "cancelled"
+    # The file already being indexed finishes; the rest of its batch doesn't.
+    cancelled = jobs.wait(running["job_id"], timeout=5)
+    assert cancelled["status"] == "cancelled" and "graph_job" not in cancelled
+    assert jobs.drain(timeout=5)
+    assert brain.calls == [("r.py", "r")] and jobs.active_jobs() == 0
+
+
+def test_waiting_refresh_times_out_with_the_jobs_status(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+
+    import app.config
+    from app.mcp.tools import _enqueue_refresh
+
+    brain = _Brain()
+    jobs = IndexJobs(brain, _Graph(), batch_size=10)
+    _hold(brain)
+    monkeypatch.setattr(app.config, "INDEX_WAIT_TIMEOUT_SECONDS", 0.05)
+    out = asyncio.run(_enqueue_refresh(
+        SimpleNamespace(index_jobs=jobs), {}, {"a.py": "x"},
+        "interactive", "test"))
+    assert out["wait_timed_out"] is True
+    assert out["status"] in ("queued", "running")
+    assert "refreshed_files" not in out and "graph_skipped" not in out
+    brain.gate.set()
+    assert jobs.wait(out["job_id"], timeout=5)["status"] == "done"
@@ -0,0 +1,205 @@
+"""Checkpointed ingestion of .mulch expertise and .overstory logs.
+
+Brain.ingest used to re-read every expertise JSONL and session NDJSON
+file and run each record through _ingest_single. Files now carry a
+checkpoint (size, mtime, consumed offset): unchanged files are skipped
+and appended files are tailed, with the same documents as a full read.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.engines.brain_engine import Brain  # noqa: E402
+
+
+def _brain(root: Path, name: str) -> Brain:
+    return Brain(brain_db=str(root / f"{name}.db"),
+                 graph_db=str(root / f"{name}-graph.db"),
+                 scores_db=str(root / f"{name}-scores.db"))
+
+
+def _append(path: Path, *records: dict) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def _docs(brain: Brain) -> dict:
+    return {r["id"]: r["content"] for r in brain._brain.execute(
+        "SELECT id, content FROM docs WHERE domain IN ('expertise', 'sessions')"
+    )}
+
+
+def test_unchanged_files_skipped_and_appends_tailed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    expertise = tmp_path / ".mulch" / "expertise" / "api.jsonl"
+    log = tmp_path / ".overstory" / "logs" / "agent-1" / "session.ndjson"
+    expertise.parent.mkdir(parents=True)
+    log.parent.mkdir(parents=True)
+    _append(expertise, *({"id": f"mx-{i}", "name": f"rule {i}",
+                          "description": f"keep handlers pure {i}"}
+                         for i in range(3)))
+    _append(log, {"timestamp": "2026-10-01T10:00:00", "event": "start",
+                  "agentName": "builder"},
+            {"timestamp": "2026-10-01T10:01:00", "event": "tool",
+             "data": {"toolName": "Edit"}})
+
+    brain = _brain(tmp_path, "brain")
+    assert brain.ingest([]) == 4
+    st = brain.last_ingest_stats
+    assert st["files_read"] == 2 and st["records_ingested"] == 5
+
+    calls = []
+    real = brain._ingest_single
+    monkeypatch.setattr(brain, "_ingest_single",
+                        lambda *a, **kw: calls.append(a[0]) or real(*a, **kw))
+    assert brain.ingest([]) == 0 and calls == []
+    st = brain.last_ingest_stats
+    assert st["files_skipped"] == 2 and st["records_skipped"] == 5
+    assert st.get("records_ingested", 0) == 0
+
+    _append(expertise, {"id": "mx-3", "name": "rule 3",
+                        "description": "log every retry"})
+    with log.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"timestamp": "2026-10-01T10:02:00",
+                            "event": "stop"}) + "\n")
+        f.write('{"timestamp": "2026-10-01T10:03')  # still being written
+    assert brain.ingest([]) == 2
+    st = brain.last_ingest_stats
+    assert st["files_tailed"] == 2 and st["records_skipped"] == 5
+    assert st["records_ingested"] == 2
+    session_doc = f"sessions:{Path('.overstory/logs/agent-1/session.ndjson')}"
+    assert calls == ["expertise:api:mx-3", session_doc]
+
+    with log.open("a", encoding="utf-8") as f:
+        f.write(':00", "event": "resume"}\n')
+    assert brain.ingest([]) == 1
+
+    fresh = _brain(tmp_path, "fresh")
+    fresh.ingest([])
+    assert _docs(brain) == _docs(fresh)
+
+    # A rewrite (not an append) is read in full again.
+    expertise.write_text(json.dumps({"id": "mx-0", "name": "rule 0",
+                                     "description": "changed"}) + "\n",
+                         encoding="utf-8")
+    assert brain.ingest([]) == 1
+    assert brain.last_ingest_stats["files_read"] == 1
+    assert "changed" in _docs(brain)["expertise:api:mx-0"]
+
+    # Deleting the file purges its records and its checkpoint.
+    expertise.unlink()
+    monkeypatch.setenv("PRISM_PURGE_FORCE", "1")  # nothing else indexed
+    brain.ingest([])
+    assert "expertise:api:mx-0" not in _docs(brain)
+    assert brain._brain.execute(
+        "SELECT COUNT(*) FROM ingest_checkpoints WHERE path = ?",
+        (str(Path(".mulch/expertise/api.jsonl")),)).fetchone()[0] == 0
+
+
+def test_tailing_reads_only_the_appended_bytes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log = tmp_path / ".overstory" / "logs" / "agent-1" / "session.ndjson"
+    log.parent.mkdir(parents=True)
+    _append(log, *({"timestamp": "2026-10-01T10:00:00", "event": f"note {i}",
+                    "data": {"text": "x" * 5000}} for i in range(200)))
+    brain = _brain(tmp_path, "brain")
+    brain.ingest([])
+
+    read = []
+    real_open = Path.open
+
+    class _Counting:
+        def __init__(self, f):
+            self._f = f
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self._f.close()
+
+        def seek(self, pos):
+            return self._f.seek(pos)
+
+        def read(self, n=-1):
+            data = self._f.read(n)
+            read.append(len(data))
+            return data
+
+    def counting_open(self, mode="r", *args, **kwargs):
+        f = real_open(self, mode, *args, **kwargs)
+        return _Counting(f) if mode == "rb" else f
+
+    monkeypatch.setattr(Path, "open", counting_open)
+    _append(log, {"timestamp": "2026-10-01T10:05:00", "event": "stop"})
+    assert brain.ingest([]) == 1
+    assert brain.last_ingest_stats["files_tailed"] == 1
+    assert 0 < sum(read) < 20_000 < log.stat().st_size
+
+    # A same-length edit inside the head window is still a rewrite.
+    monkeypatch.setattr(Path, "open", real_open)
+    text = log.read_text(encoding="utf-8")
+    log.write_text(text.replace("note 0", "NOTE 0", 1) + "\n",
+                   encoding="utf-8")
+    brain.ingest([])
+    assert brain.last_ingest_stats["files_read"] == 1
+
+
+def test_expertise_edited_in_place_and_appended_is_reread(tmp_path,
+                                                          monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    expertise = tmp_path / ".mulch" / "expertise" / "api.jsonl"
+    expertise.parent.mkdir(parents=True)
+    _append(expertise, *({"id": f"mx-{i}", "name": f"rule {i}",
+                          "description": f"note {i} " + "x" * 5000}
+                         for i in range(20)))
+    brain = _brain(tmp_path, "brain")
+    brain.ingest([])
+
+    # Same-length fix in the middle, outside both 4 KiB windows, plus
+    # an appended record in the same change.
+    text = expertise.read_text(encoding="utf-8")
+    expertise.write_text(text.replace("note 10 ", "NOTE 10 ", 1),
+                         encoding="utf-8")
+    _append(expertise, {"id": "mx-new", "name": "rule new",
+                        "description": "appended"})
+    brain.ingest([])
+    assert brain.last_ingest_stats["files_read"] == 1
+    docs = _docs(brain)
+    assert "NOTE 10" in docs["expertise:api:mx-10"]
+    assert "appended" in docs["expertise:api:mx-new"]
+
+
+def test_ingest_commits_in_batches(tmp_path, monkeypatch):
+    """The write lock is released per log file and every batch of
+    expertise records, not held for the whole pass."""
+    import app.config
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.config, "INDEX_BATCH_SIZE", 10)
+    expertise = tmp_path / ".mulch" / "expertise" / "api.jsonl"
+    expertise.parent.mkdir(parents=True)
+    _append(expertise, *({"id": f"mx-{i}", "name": f"rule {i}",
+                          "description": f"note {i}"} for i in range(35)))
+    for agent in ("a", "b", "c"):
+        log = tmp_path / ".overstory" / "logs" / agent / "session.ndjson"
+        log.parent.mkdir(parents=True)
+        _append(log, {"timestamp": "2026-10-01T10:00:00", "event": "start"})
+    brain = _brain(tmp_path, "brain")
+
+    statements = []
+    brain._brain.set_trace_callback(statements.append)
+    brain._ingest_mulch_expertise()
+    assert statements.count("COMMIT") >= 4
+    statements.clear()
+    brain._ingest_overstory_logs()
+    assert statements.count("COMMIT") >= 3
@@ -0,0 +1,222 @@
+"""Expertise entries in memory.db, with JSONL as a write-behind export.
+
+MemoryService used to treat each {domain}.jsonl as the store and rewrote
+the whole file on every store, update and recalled entry. Entries now
+live in SQLite; these tests pin the one-shot import of existing files,
+dedup on store, one statement per recall, and the export format.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.services.memory_service import MemoryService  # noqa: E402
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(l) for l in path.read_text().splitlines() if l]
+
+
+@pytest.fixture
+def mulch(tmp_path):
+    return tmp_path / "mulch"
+
+
+def test_existing_jsonl_is_imported_once(mulch):
+    exp = mulch / "expertise"
+    exp.mkdir(parents=True)
+    legacy = [{"id": f"mx-00000{i}", "name": f"n{i}", "description": f"d{i}",
+               "domain": "api", "status": "active", "recall_count": i}
+              for i in range(3)]
+    (exp / "api.jsonl").write_text(
+        "\n".join(json.dumps(r) for r in legacy) + "\nnot json\n")
+    (exp / "ops.jsonl").write_text(json.dumps(
+        {"id": "mx-0000ff", "name": "x", "status": "archived"}) + "\n")
+
+    svc = MemoryService(str(mulch), export_delay=0)
+    assert svc.list_domains() == ["api", "ops"]
+    assert [e.id for e in svc.list_entries("api")] == [r["id"] for r in legacy]
+    assert svc.get_entry("mx-000002").recall_count == 2
+    assert svc.domain_stats()["ops"] == {"active": 0, "archived": 1, "total": 1}
+
+    # Later edits to the export don't re-import.
+    (exp / "api.jsonl").write_text("")
+    again = MemoryService(str(mulch), export_delay=0)
+    assert len(again.list_entries("api")) == 3
+
+
+def test_lines_appended_after_startup_survive_export(mulch):
+    svc = MemoryService(str(mulch), export_delay=0)
+    kept = svc.store("api", "n0", "first entry", "pattern", "tactical")
+    path = mulch / "expertise" / "api.jsonl"
+    # What ``ml record`` does: append to the export behind our back.
+    with path.open("a") as f:
+        f.write(json.dumps({"id": "mx-abc123", "name": "recorded",
+                            "description": "appended by ml record",
+                            "domain": "api", "status": "active"}) + "\n")
+
+    svc.store("api", "n1", "second entry", "pattern", "tactical")
+    ids = [r["id"] for r in _lines(path)]
+    assert kept.id in ids and "mx-abc123" in ids
+    assert svc.get_entry("mx-abc123").name == "recorded"
+
+    # Appends seen on a read, too, and by a service started later.
+    with path.open("a") as f:
+        f.write(json.dumps({"id": "mx-abc124", "name": "later"}) + "\n")
+    assert "mx-abc124" in [e.id for e in svc.list_entries("api")]
+    assert MemoryService(str(mulch), export_delay=0).get_entry("mx-abc124")
+
+
+def test_store_supersedes_and_exports(mulch):
+    svc = MemoryService(str(mulch), export_delay=0)
+    first = svc.store("api", "retry-policy", "Retry idempotent calls twice",
+                      "convention", "tactical", evidence={"pr": 1})
+    second = svc.store("api", "retry-policy", "Retry idempotent calls 3x",
+                       "convention", "tactical")
+    similar = svc.store("api", "other-name", "Retry idempotent calls 3x!",
+                        "convention", "tactical")
+    assert (second.generation, similar.generation) == (2, 3)
+
+    old = svc.get_entry(first.id)
+    assert old.status == "archived" and old.invalid_at
+    assert [e.id for e in svc.list_entries("api")] == [similar.id]
+
+    exported = _lines(mulch / "expertise" / "api.jsonl")
+    assert [r["id"] for r in exported] == [first.id, second.id, similar.id]
+    assert exported[0]["evidence"] == {"pr": 1}
+    assert set(exported[0]) == set(MemoryService._entry_to_dict(first))
+
+
+def _seed_recallable(svc):
+    for i, text in enumerate([
+        "pagination cursor must be opaque base64",
+        "never expose offsets; pagination uses a cursor",
+        "cursor tokens expire after ten minutes",
+        "clients echo the cursor verbatim on the next page request",
+        "a missing cursor starts pagination from the newest item",
+        "unrelated note about logging formats",
+    ]):
+        svc.store("api", f"rule-{i}", text, "pattern", "tactical",
+                  importance=i)
+
+
+def _recall_log(svc):
+    svc._recall_writer.flush()
+    return svc._recall_db.execute(
+        "SELECT entry_id, task_id, outcome FROM recall_log ORDER BY id"
+    ).fetchall()
+
+
+def test_recall_stats_are_written_behind_in_one_batch(mulch, monkeypatch):
+    svc = MemoryService(str(mulch), export_delay=60, recall_flush_delay=60)
+    _seed_recallable(svc)
+    exports = []
+    monkeypatch.setattr(svc, "_export_domain", exports.append)
+    svc._exporter._export = svc._export_domain
+
+    submits = []
+    real = svc._writer.submit
+    monkeypatch.setattr(svc._writer, "submit",
+                        lambda fn, **kw: submits.append(fn) or real(fn, **kw))
+    got = svc.recall("pagination cursor", domain="api", limit=5)
+    again = svc.recall("pagination cursor", domain="api", limit=5)
+    assert len(got) == 5 and submits == [] and _recall_log(svc) == []
+    # Visible at once through the index, before anything is written.
+    assert all(svc.get_entry(e.id).recall_count == 2 for e in got)
+    assert [e.recall_count for e in again] == [2] * 5
+
+    svc.flush_recalls()
+    assert len(submits) == 1 and len(_recall_log(svc)) == 10
+    svc._idx = None  # rebuilt from SQLite: same counts
+    assert all(svc.get_entry(e.id).recall_count == 2 for e in got)
+    assert exports == []  # write-behind: nothing exported yet
+
+    svc.update_entry(got[0].id, importance=9)
+    svc.flush_export()
+    assert exports == ["api"]
+
+
+def test_outcome_rescores_affected_entries_in_one_write(mulch, monkeypatch):
+    class Tasks:
+        current = "t-1"
+
+        def list(self, status):
+            return [type("T", (), {"id": self.current})()]
+
+    tasks = Tasks()
+    svc = MemoryService(str(mulch), task_svc=tasks, export_delay=60,
+                        recall_flush_delay=60)
+    _seed_recallable(svc)
+    svc.store("ops", "deploy", "deploys need a cursor freeze window",
+              "pattern", "tactical")
+    first = svc.recall("cursor")
+    tasks.current = "t-2"
+    second = svc.recall("cursor")
+    assert {e.domain for e in first} == {"api", "ops"}
+
+    submits = []
+    real = svc._writer.submit
+    monkeypatch.setattr(svc._writer, "submit",
+                        lambda fn, **kw: submits.append(fn) or real(fn, **kw))
+    assert svc.record_outcome("t-1", "positive") == 5
+    assert len(submits) == 2  # the buffered recall stats, then the scores
+    assert svc.record_outcome("t-2", "negative") == 5
+    assert len(submits) == 3
+    assert {e.id for e in second} == {e.id for e in first}
+    assert all(svc.get_entry(e.id).effectiveness == 0.0 for e in first)
+
+    assert svc.record_outcome("t-2", "negative") == 0
+    scores = svc.get_effectiveness_scores()
+    assert scores[first[0].id] == {"positive": 1, "negative": 1,
+                                   "total": 2, "score": 0.0}
+
+
+def test_update_moves_entry_between_domain_exports(mulch):
+    svc = MemoryService(str(mulch), export_delay=0)
+    e = svc.store("api", "n", "d", "pattern", "tactical")
+    assert svc.update_entry(e.id, domain="ops", id="ignored").id == e.id
+    assert _lines(mulch / "expertise" / "api.jsonl") == []
+    assert [r["id"] for r in _lines(mulch / "expertise" / "ops.jsonl")] == [e.id]
+    assert svc.update_entry("mx-missing", importance=1) is None
+
+
+def test_index_follows_own_writes_without_rebuilding(mulch):
+    svc = MemoryService(str(mulch), export_delay=60)
+    a = svc.store("api", "a", "alpha rule", "pattern", "tactical")
+    assert svc.get_entry(a.id).name == "a"
+    idx = svc._idx
+
+    b = svc.store("api", "a", "alpha rule, revised", "pattern", "tactical")
+    svc.update_entry(b.id, domain="ops", importance=8)
+    svc.recall("alpha", domain="ops")
+    assert svc._idx is idx  # patched in place, never reloaded
+    assert svc.get_entry(a.id).status == "archived"
+    assert svc.get_entry(b.id).recall_count == 1
+    assert [e.id for e in svc.list_entries("ops")] == [b.id]
+
+    # Callers get copies; mutating one leaves the index alone.
+    svc.get_entry(b.id).evidence["x"] = 1
+    assert svc.get_entry(b.id).evidence == {}
+
+
+def test_index_rebuilds_after_a_foreign_write(mulch):
+    svc = MemoryService(str(mulch), export_delay=60)
+    other = MemoryService(str(mulch), export_delay=60)
+    e = svc.store("api", "n", "first text", "pattern", "tactical")
+    assert other.get_entry(e.id).importance == 5
+    stale = other._idx
+
+    svc.update_entry(e.id, importance=2)
+    late = svc.store("api", "m", "second text", "pattern", "tactical")
+    assert other.get_entry(e.id).importance == 2
+    assert other._idx is not stale
+    assert [x.id for x in other.list_entries("api")] == [e.id, late.id]
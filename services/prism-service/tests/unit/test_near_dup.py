@@ -0,0 +1,134 @@
+"""MinHash/LSH near-duplicate detection for expertise entries.
+
+Governance compared every pair of active entries per domain with
+SequenceMatcher each cycle, and store() scanned the whole domain. Both
+now ask a NearDupIndex for candidates and confirm with the same ratio
+test; these tests pin that the outcome matches the pairwise loop.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.config import DUPLICATE_THRESHOLD  # noqa: E402
+from app.engines.near_dup import NearDupIndex, similar  # noqa: E402
+from app.services.governance import GovernanceEngine  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+
+_rng = random.Random(3)
+_WORDS = ["".join(_rng.choice(string.ascii_lowercase)
+                  for _ in range(_rng.randint(3, 9))) for _ in range(400)]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14)))
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(max(1, len(chars) // 25)):
+        chars[rng.randrange(len(chars))] = rng.choice("xyz ")
+    return "".join(chars)
+
+
+def test_index_candidates_cover_similar_pairs():
+    rng = random.Random(5)
+    index = NearDupIndex()
+    pairs = []
+    for i in range(300):
+        base = _text(rng)
+        index.add(i, base)
+        pairs.append((i, _mutate(rng, base)))
+    for i, near in pairs:
+        assert i in index.candidates(near)
+    index.discard(0)
+    assert 0 not in index and len(index) == 299
+    assert 0 not in index.candidates(pairs[0][1])
+
+    assert similar("abcd", "abcd", 1.0)
+    assert not similar("abcd", "abcd", 1.0, strict=True)
+    assert not similar("abcd", "wxyz", 0.1)
+
+
+def _pairwise_survivors(entries):
+    """The old _detect_duplicates loop, returning ids left active."""
+    archived = set()
+    for i, a in enumerate(entries):
+        if a.id in archived:
+            continue
+        for b in entries[i + 1:]:
+            if b.id in archived:
+                continue
+            if SequenceMatcher(None, f"{a.name} {a.description}",
+                               f"{b.name} {b.description}"
+                               ).ratio() >= DUPLICATE_THRESHOLD:
+                archived.add(b.id)
+    return [e.id for e in entries if e.id not in archived]
+
+
+def test_governance_matches_pairwise_and_only_checks_new(tmp_path,
+                                                         monkeypatch):
+    rng = random.Random(11)
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    for i in range(40):
+        base = _text(rng)
+        # Bypass store()'s own dedup so governance has work to do.
+        memory.store("api", f"rule-{i}", base, "pattern", "tactical")
+        if i % 4 == 0:
+            memory.store("api", f"rule-{i}b", f"x{i}", "pattern", "tactical")
+            near = memory.list_entries("api")[-1]
+            memory.update_entry(near.id, description=_mutate(rng, base))
+
+    expected = _pairwise_survivors(memory.list_entries("api"))
+    gov = GovernanceEngine(memory, None, None)
+    archived = gov._detect_duplicates()
+    survivors = [e.id for e in memory.list_entries("api")]
+    assert survivors == expected and archived == 50 - len(expected) > 0
+
+    calls = []
+    import app.services.governance as governance
+    monkeypatch.setattr(governance, "similar",
+                        lambda *a, **kw: calls.append(a) or similar(*a, **kw))
+    assert gov._detect_duplicates() == 0 and calls == []
+
+    late = memory.store("api", "late", "x", "pattern", "tactical")
+    first = memory.get_entry(survivors[0])
+    memory.update_entry(late.id, name=first.name,
+                        description=first.description + "!")
+    assert gov._detect_duplicates() == 1
+    assert memory.get_entry(late.id).status == "archived"
+    # Only the edited entry is checked (against the whole small domain).
+    late_text = f"{first.name} {first.description}!"
+    assert calls and all(c[1] == late_text for c in calls)
+
+
+# ratio 0.885, yet the two signatures share no LSH band.
+_LSH_MISS = ("alghfnmdm wfy lmhfji ytkzrzg oizioj hka mhhk uoggzqg",
+             "alghfnmdm zfy ymhfj  ytkzrygyoizioj hkazmhhk uoggzqg")
+
+
+def test_small_domains_are_compared_exhaustively(tmp_path):
+    from app.engines.near_dup import EXACT_SCAN_MAX
+
+    old, new = _LSH_MISS
+    assert SequenceMatcher(None, old, new).ratio() > 0.85
+    index = NearDupIndex()
+    index.add("old", old)
+    assert "old" in index.candidates(new)
+    rng = random.Random(13)
+    index.update((i, _text(rng)) for i in range(EXACT_SCAN_MAX))
+    assert "old" not in index.candidates(new)  # LSH alone misses it
+
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    first = memory.store("api", "first", old, "pattern", "tactical")
+    memory.store("api", "second", new, "pattern", "tactical")
+    assert memory.get_entry(first.id).status == "archived"
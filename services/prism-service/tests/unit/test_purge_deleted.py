@@ -0,0 +1,104 @@
+"""_purge_deleted: one stat per source file, set-based deletes.
+
+The purge used to stat ``source_file`` once per docs row (20+ times for
+a chunked module) and delete docs / docs_vec one doc_id at a time. It
+now stats DISTINCT source_file values (on a thread pool for large
+indexes) and drops all their rows in one transaction.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _module(i: int) -> str:
+    return "".join(f"def f{i}_{j}(x):\n    return x + {j}\n\n"
+                   for j in range(30))
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    from app.engines.brain_engine import Brain
+
+    root = tmp_path / "proj"
+    (root / "pkg").mkdir(parents=True)
+    files = [f"pkg/m{i}.py" for i in range(6)] + ["README.md"]
+    for i, rel in enumerate(files):
+        (root / rel).write_text(_module(i), encoding="utf-8")
+    brain = Brain(brain_db=str(tmp_path / "brain.db"),
+                  graph_db=str(tmp_path / "graph.db"),
+                  scores_db=str(tmp_path / "scores.db"))
+    brain.reindex_paths(files, root=str(root))
+    return brain, root, files
+
+
+def _rows(brain) -> tuple[set[str], set[str]]:
+    docs = {r[0] for r in brain._brain.execute(
+        "SELECT DISTINCT source_file FROM docs")}
+    manifest = {r[0] for r in brain._brain.execute(
+        "SELECT source_file FROM file_manifest")}
+    return docs, manifest
+
+
+def test_purge_stats_each_source_once(indexed):
+    brain, root, files = indexed
+    rows = brain._brain.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    assert rows > 3 * len(files)
+
+    (root / "pkg" / "m1.py").unlink()
+    (root / "pkg" / "m4.py").unlink()
+    assert brain._purge_deleted(root=str(root)) == 2
+    stats = brain.last_purge_stats
+    assert stats["checked"] == len(files)
+    assert stats["purged"] == 2
+    assert {"stat_ms", "delete_ms"} <= set(stats)
+
+    expected = set(files) - {"pkg/m1.py", "pkg/m4.py"}
+    assert _rows(brain) == (expected, expected)
+
+
+def test_parallel_stat_matches_serial(indexed, monkeypatch):
+    brain, root, files = indexed
+    monkeypatch.setattr(brain, "_PURGE_PARALLEL_MIN", 1)
+    monkeypatch.setenv("PRISM_PURGE_STAT_WORKERS", "4")
+    (root / "README.md").unlink()
+    assert brain._purge_deleted(root=str(root)) == 1
+    expected = set(files) - {"README.md"}
+    assert _rows(brain) == (expected, expected)
+
+
+def test_unmounted_project_is_not_wiped(indexed, tmp_path):
+    brain, _, files = indexed
+    assert brain._purge_deleted(root=str(tmp_path / "elsewhere")) == 0
+    assert _rows(brain)[0] == set(files)
+
+
+def test_removal_is_set_based(indexed):
+    brain, _, files = indexed
+    conn = brain._brain
+    calls: list[str] = []
+
+    class Counting:
+        def __getattr__(self, name):
+            return getattr(conn, name)
+
+        def execute(self, sql, *args):
+            calls.append(sql)
+            return conn.execute(sql, *args)
+
+    brain._brain = Counting()
+    try:
+        brain._remove_entries_by_source(files[:5] + files[:2])
+    finally:
+        brain._brain = conn
+    # Same handful of statements however many files / chunk rows.
+    assert len(calls) <= 6
+    assert _rows(brain)[0] == set(files[5:])
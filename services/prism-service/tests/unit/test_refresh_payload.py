@@ -0,0 +1,234 @@
+"""prism_refresh payloads: gzip/zstd encoding and line-block deltas.
+
+The SessionStart hook and prism_bulk_refresh used to ship every drifted
+file whole as a plain JSON string. Batches can now be compressed, and a
+file whose indexed version the client still has (the git index blob)
+goes as a delta checked against the server's stored content by sha256.
+These tests pin the decoding, the base lookup and the fallback, and
+measure wire bytes for a typical edit session.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import importlib.util
+import json
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _hook():
+    path = _SERVICE_ROOT / "app" / "assets" / "sync_hook.py"
+    spec = importlib.util.spec_from_file_location("prism_sync_hook", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _module(i: int, n_funcs: int = 40) -> str:
+    body = [f'"""Module {i}."""\n', "import os\n", "\n"]
+    for f in range(n_funcs):
+        body.append(f"\ndef func_{i}_{f}(x, y={f}):\n"
+                    f"    total = x + y * {f}\n"
+                    f"    return os.path.join(str(total), 'f{f}')\n")
+    return "".join(body)
+
+
+@pytest.fixture
+def brain(tmp_path):
+    from app.services.brain_service import BrainService
+    from app.services.graph_service import GraphService
+
+    svc = BrainService(brain_db=str(tmp_path / "brain.db"),
+                       graph_db=str(tmp_path / "graph.db"),
+                       scores_db=str(tmp_path / "scores.db"))
+    svc.graph_svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                                 graph_db_path=str(tmp_path / "graph.db"))
+    return svc
+
+
+def _server(brain):
+    """prism_refresh's decode/resolve/index path, with wire byte counts."""
+    from app.mcp.tools import _refresh_files
+
+    class Ctx:
+        brain_svc = brain
+
+    calls: list[int] = []
+
+    def call(args):
+        args = json.loads(json.dumps(args))
+        calls.append(len(json.dumps(args)))
+        files, need_full = _refresh_files(Ctx, args)
+        for path, content in files.items():
+            brain.index_doc(path, content)
+        return {"refreshed_files": len(files), "need_full": need_full}
+
+    return call, calls
+
+
+def test_decode_merges_compressed_payload():
+    from app.services import refresh_payload
+
+    body = json.dumps({"files": {"b.py": "b = 2\n"},
+                       "deltas": {"c.py": {"base_sha256": "0", "ops": []}}})
+    files, deltas = refresh_payload.decode({
+        "files": {"a.py": "a = 1\n"},
+        "encoding": "gzip",
+        "payload": base64.b64encode(gzip.compress(body.encode())).decode(),
+    })
+    assert files == {"a.py": "a = 1\n", "b.py": "b = 2\n"}
+    assert list(deltas) == ["c.py"]
+
+    with pytest.raises(ValueError, match="unknown payload encoding"):
+        refresh_payload.decode({"encoding": "brotli", "payload": "AA=="})
+    with pytest.raises(ValueError, match="could not decode"):
+        refresh_payload.decode({"payload": "bm90IGd6aXA="})
+
+
+def test_zstd_needs_the_optional_package():
+    from app.services import refresh_payload
+
+    try:
+        import zstandard
+    except ImportError:
+        with pytest.raises(ValueError, match="zstandard"):
+            refresh_payload.decode({"encoding": "zstd", "payload": "AA=="})
+        return
+    body = json.dumps({"files": {"a.py": "a = 1\n"}}).encode()
+    packed = zstandard.ZstdCompressor().compress(body)
+    files, _ = refresh_payload.decode({
+        "encoding": "zstd", "payload": base64.b64encode(packed).decode(),
+    })
+    assert files == {"a.py": "a = 1\n"}
+
+
+def test_hook_ops_round_trip_through_apply():
+    from app.services.refresh_payload import apply_ops
+
+    hook = _hook()
+    rng = random.Random(3)
+    base = _module(0)
+    for _ in range(25):
+        lines = base.splitlines(keepends=True)
+        for _ in range(rng.randint(1, 4)):
+            i = rng.randrange(len(lines) + 1)
+            kind = rng.choice(("insert", "delete", "replace"))
+            if kind == "insert":
+                lines.insert(i, f"# note {rng.random()}\n")
+            elif lines and i < len(lines):
+                if kind == "delete":
+                    del lines[i]
+                else:
+                    lines[i] = "    pass\n"
+        new = "".join(lines).rstrip("\n")  # exercise a missing final newline
+        assert apply_ops(base, hook._delta_ops(base, new)) == new
+
+    assert apply_ops("a\nb\n", [[1, 0, "x"]]) is None  # end before start
+    assert apply_ops("a\nb\n", [[1, 2, "x\n"], [0, 1, "y\n"]]) is None
+    assert apply_ops("a\nb\n", [[0, 3, ""]]) is None
+
+
+def test_deltas_apply_against_stored_content(brain):
+    from app.services import refresh_payload
+
+    big = _module(1)                     # staged, multi-chunk, has __file__
+    small = "def tiny():\n    return 1\n"
+    prose = "# Notes\n\nfirst\nsecond\n"
+    for path, text in (("pkg/big.py", big), ("pkg/small.py", small),
+                       ("docs/notes.md", prose)):
+        brain.index_doc(path, text)
+        assert brain.stored_content(path, _sha(text)) == text
+    assert brain.stored_content("pkg/big.py", _sha("other")) is None
+
+    hook = _hook()
+    new_prose = prose.replace("second", "second, edited")
+    deltas = {
+        "docs/notes.md": {"base_sha256": _sha(prose),
+                          "ops": hook._delta_ops(prose, new_prose),
+                          "sha256": _sha(new_prose)},
+        # Base the server doesn't hold: resent whole.
+        "pkg/big.py": {"base_sha256": _sha(big + "# old\n"),
+                       "ops": [[0, 0, "# x\n"]]},
+        # Patched result doesn't match the client's hash.
+        "pkg/small.py": {"base_sha256": _sha(small), "ops": [[0, 0, "#\n"]],
+                         "sha256": _sha("something else")},
+        "pkg/new.py": {"base_sha256": _sha(""), "ops": []},
+    }
+    files, need_full = refresh_payload.resolve(
+        {"keep.py": "k = 1\n"}, deltas, brain.stored_content,
+    )
+    assert files == {"keep.py": "k = 1\n", "docs/notes.md": new_prose}
+    assert need_full == ["pkg/big.py", "pkg/new.py", "pkg/small.py"]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_edit_session_bytes_and_fallback(tmp_path, brain):
+    """Ten ~4KB modules, two lines edited in each: the hook's refresh
+    batch is a small fraction of the plain {path: content} map, a base
+    the server lost is resent whole, and every file ends up indexed
+    with its edited content."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+
+    def git(*args):
+        subprocess.run(["git", "-C", str(repo), *args], check=True,
+                       capture_output=True)
+
+    committed = {f"src/m{i}.py": _module(i) for i in range(10)}
+    for rel, text in committed.items():
+        (repo / rel).parent.mkdir(parents=True, exist_ok=True)
+        (repo / rel).write_text(text, encoding="utf-8")
+        brain.index_doc(rel, text)
+    git("init", "-q")
+    git("add", "src")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "i")
+
+    edited = {}
+    for i, (rel, text) in enumerate(committed.items()):
+        new = text.replace(f"y * {i}\n", f"y * {i} + 1\n")
+        new = new.replace('"""\n', '"""\n# edited\n', 1)
+        edited[rel] = new
+        (repo / rel).write_text(new, encoding="utf-8")
+    hook = _hook()
+    def status(args):
+        return json.loads(json.dumps(brain.graph_svc.sync_status(
+            str(tmp_path / "brain.db"), **args)))
+
+    files = hook._collect(repo)
+    theirs: dict[str, str] = {}
+    drifted = hook._tree_drift(status, {p: fe[0] for p, fe in files.items()},
+                               theirs)
+    assert drifted == sorted(edited)
+    blobs = hook._git_blobs(repo, {files[p][2] for p in drifted})
+    bases = {p: (theirs[p], blobs[files[p][2]]) for p in drifted
+             if _sha(blobs[files[p][2]]) == theirs[p]}
+    assert set(bases) == set(edited)
+    # Another client re-indexes one file before this batch lands.
+    brain.index_doc("src/m9.py", committed["src/m9.py"] + "# drifted\n")
+
+    call, calls = _server(brain)
+    assert hook._refresh(call, edited, bases) == len(edited)
+
+    plain = len(json.dumps({"files": edited, "skip_graph": True}))
+    sent = sum(calls)
+    assert len(calls) == 2          # batch + the one need_full resend
+    assert sent < plain * 0.25, (sent, plain)
+    for rel, text in edited.items():
+        assert brain.stored_content(rel, _sha(text)) == text
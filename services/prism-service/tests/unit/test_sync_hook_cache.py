@@ -0,0 +1,155 @@
+"""SessionStart hook scan: stat cache, git blob reuse, parallel hashing.
+
+The hook's ``_collect`` used to read and sha256 every eligible file
+serially on every session start. It now keeps ``.prism/sync-cache``
+keyed by (size, mtime_ns, inode), reuses hashes for files whose git
+blob it has seen before, and hashes the rest on a thread pool.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+
+
+def _hook():
+    path = _SERVICE_ROOT / "app" / "assets" / "sync_hook.py"
+    spec = importlib.util.spec_from_file_location("prism_sync_hook", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write(root: Path, rel: str, text: str) -> None:
+    p = root / rel
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture
+def hook(monkeypatch):
+    mod = _hook()
+    mod.hashed = []
+    original = mod._hash_file
+
+    def counting(p):
+        mod.hashed.append(os.path.basename(p))
+        return original(p)
+
+    monkeypatch.setattr(mod, "_hash_file", counting)
+    return mod
+
+
+def _tree(root: Path) -> None:
+    _write(root, "src/a.py", "def a():\n    pass\n")
+    _write(root, "src/b.py", "def b():\n    pass\n")
+    _write(root, "docs/readme.md", "# readme\n")
+    _write(root, "node_modules/x.js", "skip()\n")
+    _write(root, "src/empty.py", "")
+    _write(root, "src/data.bin", "binary-ish\n")
+
+
+def test_cache_skips_unchanged_files(tmp_path, hook):
+    _tree(tmp_path)
+    first = hook._collect(tmp_path)
+    assert {rel: sha for rel, (sha, *_) in first.items()} == {
+        "src/a.py": _sha("def a():\n    pass\n"),
+        "src/b.py": _sha("def b():\n    pass\n"),
+        "docs/readme.md": _sha("# readme\n"),
+    }
+    assert sorted(hook.hashed) == ["a.py", "b.py", "readme.md"]
+    assert (tmp_path / ".prism" / "sync-cache").exists()
+
+    hook.hashed.clear()
+    assert hook._collect(tmp_path) == first
+    assert hook.hashed == []
+
+    _write(tmp_path, "src/b.py", "def b():\n    return 2\n")
+    (tmp_path / "docs" / "readme.md").unlink()
+    third = hook._collect(tmp_path)
+    assert hook.hashed == ["b.py"]
+    assert set(third) == {"src/a.py", "src/b.py"}
+    assert third["src/b.py"][0] == _sha("def b():\n    return 2\n")
+
+
+def test_parallel_hashing_matches_serial(tmp_path, monkeypatch):
+    for i in range(40):
+        _write(tmp_path, f"pkg/m{i}.py", f"value = {i}\n" * (i + 1))
+    mod = _hook()
+    monkeypatch.setattr(mod, "HASH_WORKERS", 1)
+    serial = mod._collect(tmp_path)
+    shutil.rmtree(tmp_path / ".prism")
+    monkeypatch.setattr(mod, "HASH_WORKERS", 8)
+    assert mod._collect(tmp_path) == serial
+    assert len(serial) == 40
+
+
+def test_corrupt_cache_is_ignored(tmp_path, hook):
+    _tree(tmp_path)
+    (tmp_path / ".prism").mkdir()
+    (tmp_path / ".prism" / "sync-cache").write_text("{not json")
+    assert len(hook._collect(tmp_path)) == 3
+    assert len(hook.hashed) == 3
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_git_blob_ids_cover_touched_files(tmp_path, hook):
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True,
+                       capture_output=True)
+
+    _tree(tmp_path)
+    _write(tmp_path, "untracked.py", "x = 1\n")
+    git("init", "-q")
+    git("add", "src/a.py", "src/b.py", "docs/readme.md")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "i")
+    first = hook._collect(tmp_path)
+    assert set(first) == {"src/a.py", "src/b.py", "docs/readme.md"}
+
+    # A checkout rewrites files with new mtimes but the same blobs.
+    hook.hashed.clear()
+    st = os.stat(tmp_path / "src/a.py")
+    os.utime(tmp_path / "src/a.py", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert hook._collect(tmp_path) == first
+    assert hook.hashed == []
+
+    # Worktree edits differ from the index blob and are read.
+    _write(tmp_path, "src/a.py", "def a():\n    return 1\n")
+    edited = hook._collect(tmp_path)
+    assert hook.hashed == ["a.py"]
+    assert edited["src/a.py"][0] == _sha("def a():\n    return 1\n")
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+def test_checkout_after_unstaged_edit_reports_index_content(tmp_path, hook):
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True,
+                       capture_output=True)
+
+    original = "def a():\n    pass\n"
+    _write(tmp_path, "foo.py", original)
+    git("init", "-q")
+    git("add", "foo.py")
+    git("-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "i")
+    assert hook._collect(tmp_path)["foo.py"][0] == _sha(original)
+
+    # Edited but not staged: the hash is of the worktree, not the blob.
+    _write(tmp_path, "foo.py", "def a():\n    return 1\n")
+    assert hook._collect(tmp_path)["foo.py"][0] == _sha("def a():\n    return 1\n")
+    assert hook._collect(tmp_path)["foo.py"][0] == _sha("def a():\n    return 1\n")
+
+    git("checkout", "foo.py")
+    assert hook._collect(tmp_path)["foo.py"][0] == _sha(original)
@@ -0,0 +1,135 @@
+"""SessionStart hook upload: bounded in-flight batches, busy backoff, detach.
+
+The hook used to push drifted files with one blocking prism_refresh call
+per batch, so a branch switch held session start for minutes. It now
+keeps a couple of prism_bulk_refresh batches in flight, waits out the
+server's {busy, retry_after_s} answers, and can hand a large upload to
+a background copy of itself.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _hook():
+    path = _SERVICE_ROOT / "app" / "assets" / "sync_hook.py"
+    spec = importlib.util.spec_from_file_location("prism_sync_hook", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _files(n: int) -> dict[str, str]:
+    return {f"src/m{i}.py": f"value = {i}\n" for i in range(n)}
+
+
+def test_upload_keeps_bounded_batches_in_flight():
+    from app.services.refresh_payload import decode
+
+    hook = _hook()
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+    seen: list[str] = []
+
+    def call(args):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.02)
+        files, _ = decode(args)  # batches this size go gzip'd
+        with lock:
+            state["now"] -= 1
+            seen.extend(files)
+        return {"refreshed_files": len(files), "need_full": []}
+
+    files = _files(hook.CHUNK_SIZE * 5 + 3)
+    assert hook._upload(call, files, {}, in_flight=2) == len(files)
+    assert sorted(seen) == sorted(files)
+    assert state["peak"] == 2
+
+
+def test_busy_answers_are_waited_out():
+    hook = _hook()
+    answers = [{"busy": True, "retry_after_s": 7},
+               {"busy": True, "retry_after_s": 600},
+               {"refreshed_files": 1, "need_full": []}]
+    calls, slept = [], []
+
+    def call(args):
+        calls.append(args)
+        return answers[len(calls) - 1]
+
+    assert hook._refresh(call, {"a.py": "a = 1\n"}, {}, sleep=slept.append) == 1
+    assert len(calls) == 3
+    assert slept == [7.0, hook.MAX_RETRY_WAIT_S]
+
+
+def test_batch_that_stays_busy_is_skipped(capsys):
+    hook = _hook()
+    slept = []
+
+    def call(args):
+        if "a.py" in (args.get("files") or {}):
+            return {"busy": True, "retry_after_s": 1}
+        return {"refreshed_files": 1, "need_full": []}
+
+    hook.CHUNK_SIZE = 1
+    n = hook._upload(call, {"a.py": "a\n", "b.py": "b\n"}, {},
+                     in_flight=1, sleep=slept.append)
+    assert n == 1
+    assert len(slept) == hook.BUSY_RETRIES
+    assert "chunk 0 failed" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("env, n, expected", [
+    (None, 5, False), (None, 500, True), ("1", 1, True), ("off", 500, False),
+])
+def test_detach_policy(monkeypatch, env, n, expected):
+    hook = _hook()
+    if env is None:
+        monkeypatch.delenv("PRISM_SYNC_DETACH", raising=False)
+    else:
+        monkeypatch.setenv("PRISM_SYNC_DETACH", env)
+    assert hook._should_detach(n) is expected
+
+
+def test_detached_child_uploads_the_spooled_drift(tmp_path, monkeypatch):
+    hook = _hook()
+    (tmp_path / ".mcp.json").write_text(json.dumps({"mcpServers": {"prism": {
+        "url": "http://localhost:9/mcp?project=demo"}}}))
+    (tmp_path / "a.py").write_text("a = 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    spawned = []
+    with monkeypatch.context() as m:
+        m.setattr(hook.subprocess, "Popen",
+                  lambda argv, **kw: spawned.append((argv, kw)))
+        assert hook._detach(tmp_path, ["a.py"], {"a.py": "0" * 64})
+    (argv, kw), = spawned
+    assert argv[-2] == "--upload"
+    spool = Path(argv[-1])
+    assert json.loads(spool.read_text())["drifted"] == ["a.py"]
+    assert kw["stdin"] is hook.subprocess.DEVNULL
+
+    pushed = []
+    monkeypatch.setattr(hook, "_push", lambda *a: pushed.append(a) or 1)
+    monkeypatch.setattr(hook.sys, "argv", argv[1:])
+    assert hook.main() == 0
+    (root, base, project, files, drifted, shas), = pushed
+    assert (base, project, drifted) == ("http://localhost:9/mcp", "demo",
+                                        ["a.py"])
+    assert set(files) == {"a.py"} and shas == {"a.py": "0" * 64}
+    assert not spool.exists()
@@ -0,0 +1,149 @@
+"""Merkle-tree sync between the SessionStart hook and prism_status.
+
+The hook used to post {path: sha256} for every tracked file on every
+session start. It now sends directory hashes and descends only into
+subtrees whose hashes differ from the server's tree over file_manifest.
+These tests drive the hook's client half (app/assets/sync_hook.py)
+against the real GraphService.sync_status.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+
+def _hook():
+    path = _SERVICE_ROOT / "app" / "assets" / "sync_hook.py"
+    spec = importlib.util.spec_from_file_location("prism_sync_hook", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+_FILES = {
+    "README.md": "# proj\n",
+    "src/app/main.py": "def main():\n    pass\n",
+    "src/app/util.py": "def util():\n    return 1\n",
+    "src/lib/deep/core.py": "def core():\n    return 2\n",
+    "docs/guide.md": "# guide\n",
+}
+
+
+@pytest.fixture
+def server(tmp_path):
+    from app.services.brain_service import BrainService
+    from app.services.graph_service import GraphService
+
+    brain = BrainService(brain_db=str(tmp_path / "brain.db"),
+                         graph_db=str(tmp_path / "graph.db"),
+                         scores_db=str(tmp_path / "scores.db"))
+    brain.graph_svc = GraphService(project_data_dir=str(tmp_path / "proj"),
+                                   graph_db_path=str(tmp_path / "graph.db"))
+    for path, text in _FILES.items():
+        brain.index_doc(path, text)
+    brain.rounds = []
+
+    def call(args):
+        # Round-trip through JSON like the MCP transport does.
+        args = json.loads(json.dumps(args))
+        brain.rounds.append(len(json.dumps(args)))
+        return json.loads(json.dumps(brain.graph_svc.sync_status(
+            str(tmp_path / "brain.db"), **args,
+        )))
+
+    brain.call = call
+    return brain
+
+
+def _disk(**changes):
+    hashes = {p: _sha(t) for p, t in _FILES.items()}
+    hashes.update({p: _sha(t) for p, t in changes.items()})
+    return hashes
+
+
+def test_hook_and_server_hash_trees_identically():
+    from app.services import sync_tree
+
+    hashes = _disk()
+    client = _hook()._build_tree(hashes)
+    server = sync_tree.build_tree(hashes.items())
+    assert {d: n[0] for d, n in client.items()} == \
+        {d: n[0] for d, n in server.items()}
+
+
+def test_hook_and_server_share_file_rules():
+    from app.services import sync_tree
+
+    hook = _hook()
+    assert hook.SOURCE_EXTS == sync_tree.SOURCE_EXTS
+    assert hook.SKIP_PARTS == sync_tree.SKIP_PARTS
+    assert hook.MAX_FILE_BYTES == sync_tree.MAX_FILE_BYTES
+
+
+def test_files_the_hook_skips_leave_the_roots_equal(server):
+    # Indexed by Brain but never hashed by the hook.
+    server.index_doc("package.json", '{"name": "proj"}\n')
+    server.index_doc("src/app/big.py", "x = 1\n" * 60_000)
+    server.index_doc("src/app/empty.py", "")
+    server.index_doc("node_modules/dep/index.js", "module.exports = 1\n")
+    assert _hook()._tree_drift(server.call, _disk()) == []
+    assert len(server.rounds) == 1
+
+
+def test_noop_sync_is_one_small_round(server):
+    assert _hook()._tree_drift(server.call, _disk()) == []
+    assert len(server.rounds) == 1
+    assert server.rounds[0] < 120
+
+
+def test_descends_only_into_changed_subtrees(server):
+    hashes = _disk(**{"src/lib/deep/core.py": "def core():\n    return 3\n",
+                      "src/new/pkg/mod.py": "x = 1\n"})
+    drifted = _hook()._tree_drift(server.call, hashes)
+    assert drifted == ["src/lib/deep/core.py", "src/new/pkg/mod.py"]
+    # root -> src -> src/lib -> src/lib/deep; the unknown src/new subtree
+    # is listed from the client's own tree without another round.
+    assert len(server.rounds) == 4
+
+
+def test_tree_follows_manifest_changes(server):
+    changed = {"src/app/util.py": "def util():\n    return 5\n"}
+    hook = _hook()
+    assert hook._tree_drift(server.call, _disk(**changed)) == \
+        ["src/app/util.py"]
+    server.index_doc("src/app/util.py", changed["src/app/util.py"])
+    assert hook._tree_drift(server.call, _disk(**changed)) == []
+
+
+def test_server_only_files_do_not_read_as_drift(server):
+    server.index_doc("/abs/outside.py", "y = 2\n")
+    server.index_doc("docs/removed.md", "# gone\n")
+    assert _hook()._tree_drift(server.call, _disk()) == []
+
+
+def test_old_server_falls_back_to_flat_map(server):
+    hook = _hook()
+
+    def legacy(args):
+        status = server.call(args)
+        status.pop("tree", None)
+        return status
+
+    hashes = _disk(**{"README.md": "# changed\n"})
+    assert hook._tree_drift(legacy, hashes) is None
+    assert hook._flat_drift(legacy, hashes) == ["README.md"]
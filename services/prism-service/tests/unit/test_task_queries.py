@@ -0,0 +1,95 @@
+"""next_task, tag filters and paging over task_deps / task_tags.
+
+next_task used to load every pending and done task and check the JSON
+dependency lists in Python; list(tag=...) decoded every row. Both are
+now single queries over normalized tables. These tests pin that the
+answers match the old Python algorithm and that old tasks.db files are
+backfilled.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.services.task_service import TaskService  # noqa: E402
+
+
+def _python_next(svc: TaskService):
+    """The old next_task: first pending task whose deps are all done."""
+    done = {t.id for t in svc.list(status="done")}
+    for t in svc.list(status="pending"):
+        if all(dep in done for dep in t.dependencies):
+            return t.id
+    return None
+
+
+def test_next_task_and_tags_match_python_filters(tmp_path):
+    rng = random.Random(9)
+    svc = TaskService(str(tmp_path / "tasks.db"))
+    ids: list[str] = []
+    for i in range(120):
+        deps = rng.sample(ids, min(len(ids), rng.randint(0, 3)))
+        if rng.random() < 0.05:
+            deps.append("missing-task")
+        task = svc.create(f"task {i}", priority=rng.randint(0, 3),
+                          dependencies=deps,
+                          tags=rng.sample(["ui", "api", "db"], rng.randint(0, 2)))
+        ids.append(task.id)
+
+    for _ in range(40):
+        svc.update(rng.choice(ids),
+                   status=rng.choice(["done", "done", "in_progress"]))
+        expected = _python_next(svc)
+        got = svc.next_task()
+        assert (got["task"].id if got else None) == expected
+
+    every = svc.list()
+    for tag in ("ui", "api", "db"):
+        assert [t.id for t in svc.list(tag=tag)] == \
+            [t.id for t in every if tag in t.tags]
+
+    victim = svc.list(tag="ui")[0]
+    svc.update(victim.id, tags=["db"])
+    assert victim.id not in {t.id for t in svc.list(tag="ui")}
+    assert victim.id in {t.id for t in svc.list(tag="db")}
+
+
+def test_keyset_pages_cover_list_order(tmp_path):
+    svc = TaskService(str(tmp_path / "tasks.db"))
+    for i in range(23):
+        svc.create(f"task {i}", priority=i % 4, tags=["x"] if i % 2 else [])
+    for kwargs in ({}, {"tag": "x"}, {"status": "pending"}):
+        seen, after = [], None
+        while True:
+            page, after = svc.list_page(limit=5, after=after, **kwargs)
+            seen += [t.id for t in page]
+            if after is None:
+                break
+        assert seen == [t.id for t in svc.list(**kwargs)]
+
+
+def test_existing_db_is_backfilled(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    TaskService(path)  # create the schema, then fake pre-table rows
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM task_meta")
+        conn.executemany(
+            "INSERT INTO tasks (id, title, status, priority, created_at, "
+            "dependencies, tags) VALUES (?, ?, ?, 0, ?, ?, ?)",
+            [("a", "first", "done", "2026-01-01", "[]", json.dumps(["ops"])),
+             ("b", "second", "pending", "2026-01-02", json.dumps(["a"]), "[]"),
+             ("c", "third", "pending", "2026-01-01", json.dumps(["b"]), "[]")],
+        )
+
+    svc = TaskService(path)
+    assert svc.next_task()["task"].id == "b"
+    assert [t.id for t in svc.list(tag="ops")] == ["a"]
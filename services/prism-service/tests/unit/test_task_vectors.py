@@ -0,0 +1,109 @@
+"""Tests for the cached task-embedding matrix behind LL-06 similar-task lookup."""
+
+from __future__ import annotations
+
+import math
+import random
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+pytest.importorskip("numpy")
+
+
+def _pack(vec: list[float]) -> bytes:
+    return struct.pack(f"<{len(vec)}f", *vec)
+
+
+def _brute_force(conn, query_id: str, k: int) -> list[tuple[str, float]]:
+    """The pre-matrix loop: decode every row, cosine in Python."""
+    def decode(blob):
+        return list(struct.unpack(f"<{len(blob) // 4}f", blob))
+
+    q = decode(conn.execute("SELECT embedding FROM tasks WHERE id=?",
+                            (query_id,)).fetchone()[0])
+    qn = math.sqrt(sum(x * x for x in q)) or 1.0
+    out = []
+    for tid, blob in conn.execute(
+        "SELECT id, embedding FROM tasks WHERE id != ? AND embedding IS NOT NULL",
+        (query_id,),
+    ):
+        v = decode(blob)
+        if len(v) != len(q):
+            continue
+        n = math.sqrt(sum(x * x for x in v)) or 1.0
+        out.append((tid, sum(a * b for a, b in zip(q, v)) / (qn * n)))
+    out.sort(key=lambda t: t[1], reverse=True)
+    return out[:k]
+
+
+def _embed(text: str) -> bytes:
+    rng = random.Random(text)
+    return _pack([rng.uniform(-1, 1) for _ in range(8)])
+
+
+def _assert_same(got, want):
+    assert [t for t, _ in got] == [t for t, _ in want]
+    for (_, a), (_, b) in zip(got, want):
+        assert a == pytest.approx(b, abs=1e-5)
+
+
+def test_top_k_matches_python_cosine_and_follows_store_embedding(tmp_path):
+    from app.engines.brain_engine import _similar_task_ids
+    from app.engines.task_vectors import task_vectors_for
+    from app.services.task_service import TaskService
+
+    path = str(tmp_path / "tasks.db")
+    svc = TaskService(path, embed_fn=_embed)
+    ids = [svc.create(title=f"task {i}").id for i in range(60)]
+    reader = sqlite3.connect(path)
+    vectors = task_vectors_for(path)
+
+    _assert_same(_similar_task_ids(reader, ids[0], 10, vectors),
+                 _brute_force(reader, ids[0], 10))
+    loaded = vectors._gen
+
+    # create / update patch the cached matrix in place: no reload.
+    ids.append(svc.create(title="one more").id)
+    svc.update(ids[5], title="task 5, reworded")
+    assert vectors._gen == loaded + 2
+    for q in (ids[0], ids[5], ids[-1]):
+        _assert_same(_similar_task_ids(reader, q, 10, vectors),
+                     _brute_force(reader, q, 10))
+    assert vectors._gen == loaded + 2
+
+
+def test_writes_from_other_connections_reload_the_cache(tmp_path):
+    from app.engines.brain_engine import _similar_task_ids
+    from app.engines.task_vectors import task_vectors_for
+    from app.services.task_service import TaskService
+
+    path = str(tmp_path / "tasks.db")
+    svc = TaskService(path)
+    for tid, vec in (("q", [1, 0]), ("a", [0.9, 0.1]), ("b", [0, 1]),
+                     ("wide", [1, 0, 0])):
+        t = svc.create(title=tid)
+        svc._db.execute("UPDATE tasks SET id=?, embedding=? WHERE id=?",
+                        (tid, _pack(vec), t.id))
+    svc._db.commit()
+    reader = sqlite3.connect(path)
+    vectors = task_vectors_for(path)
+
+    # Mismatched dimensions never compare.
+    assert [t for t, _ in _similar_task_ids(reader, "q", 5, vectors)] == [
+        "a", "b"]
+
+    other = sqlite3.connect(path)
+    other.execute("UPDATE tasks SET embedding=? WHERE id='b'",
+                  (_pack([1, 0.01]),))
+    other.execute("DELETE FROM tasks WHERE id='a'")
+    other.commit()
+    assert [t for t, _ in _similar_task_ids(reader, "q", 5, vectors)] == ["b"]
@@ -0,0 +1,132 @@
+"""Retention rollups for recall_log, searches and search_feedback.
+
+Raw telemetry rows past the retention window are folded into daily
+aggregates and deleted in batches. These tests pin that every reader
+(effectiveness scores, feedback scores and stats, the daily search
+history) answers the same before and after a rollup.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.engines.brain_engine import Brain  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+
+
+def _count(conn: sqlite3.Connection, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_recall_log_rollup_keeps_effectiveness(tmp_path):
+    memory = MemoryService(str(tmp_path / "mulch"), export_delay=60)
+    a = memory.store("api", "a", "retry idempotent writes", "pattern",
+                     "tactical")
+    b = memory.store("api", "b", "pin dependency versions", "pattern",
+                     "tactical")
+    now = datetime.now(timezone.utc)
+    rows = []
+    for age in (200, 150, 120, 100, 5, 1):
+        at = (now - timedelta(days=age)).isoformat()
+        for entry, outcome in ((a, "positive"), (a, "negative"),
+                               (b, "positive"), (b, "")):
+            rows.append((entry.id, "api", "q", at, f"t{age}", outcome))
+    memory._recall_writer.submit(lambda conn: conn.executemany(
+        "INSERT INTO recall_log (entry_id, entry_domain, query, recalled_at, "
+        "task_id, outcome) VALUES (?, ?, ?, ?, ?, ?)", rows))
+
+    before = memory.get_effectiveness_scores()
+    assert memory.apply_retention(days=90, batch=3) == 16
+    assert _count(memory._recall_db, "recall_log") == 8
+    assert memory._recall_db.execute(
+        "SELECT SUM(recalls) FROM recall_daily").fetchone()[0] == 16
+    assert memory.get_effectiveness_scores() == before
+    assert memory.apply_retention(days=90) == 0
+
+    # New outcomes rescore against raw rows and rollups together.
+    memory._recall_writer.submit(lambda conn: conn.execute(
+        "INSERT INTO recall_log (entry_id, entry_domain, query, recalled_at, "
+        "task_id) VALUES (?, 'api', 'q', ?, 'live')",
+        (b.id, now.isoformat())))
+    memory.record_outcome("live", "negative")
+    assert memory.get_entry(b.id).effectiveness == round((6 - 1) / 7, 3)
+
+
+def test_search_rollup_keeps_feedback_and_history(tmp_path):
+    brain = Brain(brain_db=str(tmp_path / "brain.db"),
+                  graph_db=str(tmp_path / "graph.db"),
+                  scores_db=str(tmp_path / "scores.db"))
+    assert brain._brain.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    kw = dict(domain=None, domains=None, mode="hybrid", rerank="off",
+              context_prefix=True, chunk_agg=False, limit_requested=5,
+              latency_ms=10)
+    ids = [brain._log_search(query=f"q{i}", results=[] if i % 3 else
+                             [{"doc_id": "doc::a"}], **kw)
+           for i in range(12)]
+    for i, sid in enumerate(ids):
+        brain.record_search_feedback(sid, "doc::a" if i % 2 else "doc::b",
+                                     "up" if i % 3 else "down")
+    brain.flush_writes()
+    # Age the first eight searches and their feedback by 40-47 days.
+    with sqlite3.connect(str(tmp_path / "brain.db")) as conn:
+        for i, sid in enumerate(ids[:8]):
+            ts = f"datetime('now', '-{40 + i} days')"
+            conn.execute(f"UPDATE searches SET ts = {ts} WHERE id = ?", (sid,))
+            conn.execute(f"UPDATE search_feedback SET ts = {ts} "
+                         "WHERE search_id = ?", (sid,))
+
+    stats = brain.feedback_stats()
+    scores = brain.get_feedback_scores(["doc::a", "doc::b"], decay_days=30)
+    history = brain.search_daily_stats(days=60)
+    assert sum(d["searches"] for d in history) == 12
+
+    assert brain.apply_retention(days=30, batch=5) == 16
+    assert _count(brain._brain, "searches") == 4
+    assert _count(brain._brain, "search_feedback") == 4
+    assert brain.feedback_stats() == stats
+    assert brain.get_feedback_scores(["doc::a", "doc::b"],
+                                     decay_days=30) == scores
+    assert brain.search_daily_stats(days=60) == history
+    recent = brain.get_recent_searches(limit=2)
+    assert [r["id"] for r in recent] == ids[:-3:-1]
+
+
+def test_roll_up_takes_each_batch_once_in_id_order():
+    from app.engines.retention import roll_up
+
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.executescript("""
+        CREATE TABLE events (id INTEGER PRIMARY KEY, ts TEXT);
+        CREATE INDEX events_ts ON events (ts);
+        CREATE TABLE daily (day TEXT PRIMARY KEY, n INTEGER);
+    """)
+    # Timestamps run against id order, so a ts-index scan would pick
+    # different rows than an id-ordered batch.
+    conn.executemany("INSERT INTO events (id, ts) VALUES (?, ?)",
+                     [(i, f"2026-01-{30 - i:02d}") for i in range(1, 11)])
+    conn.execute("INSERT INTO events (id, ts) VALUES (11, '2026-12-01')")
+    rollup = ("INSERT INTO daily (day, n) SELECT ts, COUNT(*) FROM events "
+              "WHERE id IN ({rows}) GROUP BY ts "
+              "ON CONFLICT (day) DO UPDATE SET n = n + excluded.n")
+    left = []
+
+    def submit(fn):
+        conn.execute("BEGIN")
+        out = fn(conn)
+        conn.execute("COMMIT")
+        left.append([r[0] for r in conn.execute(
+            "SELECT id FROM events ORDER BY id")])
+        return out
+
+    assert roll_up(submit, "events", "ts", rollup, "2026-06-01", 4) == 10
+    assert left[0] == [5, 6, 7, 8, 9, 10, 11]
+    assert left[-1] == [11]
+    assert conn.execute("SELECT SUM(n) FROM daily").fetchone()[0] == 10
@@ -0,0 +1,136 @@
+"""Single-writer group commit for telemetry-style writes.
+
+Search logs, recall rows, feedback, outcomes and task history each used
+to commit on their own from the request thread. They now go through
+one WriteExecutor per database file, which runs each closure in a
+savepoint and commits whatever queued up together.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+_HERE = Path(__file__).resolve()
+_SERVICE_ROOT = _HERE.parent.parent.parent
+if str(_SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(_SERVICE_ROOT))
+
+from app.engines.write_executor import WriteExecutor, writer_for  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "t.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT UNIQUE)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _count(path: str) -> int:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_concurrent_writes_share_commits(db):
+    writer = WriteExecutor(db, window_s=0.005)
+    start = threading.Barrier(16)
+
+    def client(i):
+        start.wait()
+        for j in range(25):
+            writer.submit(lambda c, v=f"{i}-{j}": c.execute(
+                "INSERT INTO t (v) VALUES (?)", (v,)), wait=(j == 24))
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert writer.flush()
+    assert _count(db) == 400
+    assert writer.stats["writes"] == 400
+    assert writer.stats["commits"] < 400 // 4
+    assert writer.stats["largest_group"] > 1
+
+
+def test_failed_write_rolls_back_alone(db, capsys):
+    writer = WriteExecutor(db, window_s=0.05)
+
+    def insert(v):
+        return lambda c: c.execute("INSERT INTO t (v) VALUES (?)",
+                                   (v,)).lastrowid
+
+    writer.submit(insert("a"), wait=False)
+
+    def partial(c):
+        c.execute("INSERT INTO t (v) VALUES ('half')")
+        c.execute("INSERT INTO t (v) VALUES ('a')")  # UNIQUE violation
+
+    writer.submit(partial, wait=False)
+    assert writer.submit(insert("b")) > 0
+    with pytest.raises(sqlite3.IntegrityError):
+        writer.submit(insert("b"))
+    with sqlite3.connect(db) as conn:
+        got = sorted(v for v, in conn.execute("SELECT v FROM t"))
+    assert got == ["a", "b"]
+    assert "write failed" in capsys.readouterr().err
+    assert writer.stats["errors"] == 2
+
+
+def test_nested_submit_joins_the_running_group(db):
+    writer = WriteExecutor(db, window_s=0)
+
+    def outer(c):
+        c.execute("INSERT INTO t (v) VALUES ('outer')")
+        return writer.submit(lambda c2: c2.execute(
+            "INSERT INTO t (v) VALUES ('inner')").lastrowid)
+
+    assert writer.submit(outer) == 2
+    assert writer.stats["commits"] == 1 and _count(db) == 2
+
+
+def test_registry_shares_one_writer_per_file(db, tmp_path):
+    assert writer_for(db) is writer_for(str(Path(db)))
+    assert writer_for(db) is not writer_for(str(tmp_path / "other.db"))
+
+
+def test_search_log_ids_survive_fire_and_forget(tmp_path):
+    from app.engines.brain_engine import Brain
+
+    brain = Brain(brain_db=str(tmp_path / "brain.db"),
+                  graph_db=str(tmp_path / "graph.db"),
+                  scores_db=str(tmp_path / "scores.db"))
+    kw = dict(domain=None, domains=None, mode="hybrid", rerank="off",
+              context_prefix=True, chunk_agg=False, limit_requested=5,
+              results=[], latency_ms=3)
+    ids = [brain._log_search(query=f"q{i}", **kw) for i in range(5)]
+    assert ids == list(range(1, 6))
+    fid = brain.record_search_feedback(ids[2], "doc::x", "up")
+    assert brain.get_search_feedback(ids[2])[0]["id"] == fid
+    recent = brain.get_recent_searches()
+    assert [r["id"] for r in recent] == ids[::-1]
+    assert recent[2]["query"] == "q2" and recent[2]["up_count"] == 1
+
+    # Another Brain (another process) and a plain AUTOINCREMENT insert
+    # interleave with ours: every returned id resolves to its own row.
+    other = Brain(brain_db=str(tmp_path / "brain.db"),
+                  graph_db=str(tmp_path / "graph2.db"),
+                  scores_db=str(tmp_path / "scores2.db"))
+    theirs = other._log_search(query="theirs", **kw)
+    with sqlite3.connect(str(tmp_path / "brain.db")) as conn:
+        conn.execute("INSERT INTO searches (query) VALUES ('plain')")
+    mine = brain._log_search(query="mine", **kw)
+    other.flush_writes()
+    brain.flush_writes()
+    assert len({mine, theirs}) == 2
+    by_id = {r["id"]: r["query"] for r in brain.get_recent_searches()}
+    assert by_id[mine] == "mine" and by_id[theirs] == "theirs"
+    assert "plain" in by_id.values()